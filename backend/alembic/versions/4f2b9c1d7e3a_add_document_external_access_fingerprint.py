@@ -0,0 +1,27 @@
+"""Add document external access fingerprint
+
+Revision ID: 4f2b9c1d7e3a
+Revises: a7688ab35c45
+Create Date: 2025-05-12 10:21:43.118204
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "4f2b9c1d7e3a"
+down_revision = "a7688ab35c45"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "document",
+        sa.Column("external_access_fingerprint", sa.String(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("document", "external_access_fingerprint")
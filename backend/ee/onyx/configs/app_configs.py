@@ -71,6 +71,25 @@ SLACK_PERMISSION_DOC_SYNC_FREQUENCY = int(
 NUM_PERMISSION_WORKERS = int(os.environ.get("NUM_PERMISSION_WORKERS") or 2)
 
 
+#####
+# Post Query Censoring
+#####
+# In seconds, upper bound on how long a change to the censoring enabled sources can
+# go unnoticed if the Redis version stamp could not be bumped
+CENSORING_ENABLED_SOURCES_CACHE_TTL_SECONDS = int(
+    os.environ.get("CENSORING_ENABLED_SOURCES_CACHE_TTL_SECONDS") or 60
+)
+# In seconds, how long a user's access to a Salesforce object is reused for. Access
+# revoked in Salesforce is only noticed after this long. 0 disables the cache
+SALESFORCE_OBJECT_ACCESS_CACHE_TTL_SECONDS = int(
+    os.environ.get("SALESFORCE_OBJECT_ACCESS_CACHE_TTL_SECONDS") or 5 * 60
+)
+# Max number of (user, object) access entries kept per process
+SALESFORCE_OBJECT_ACCESS_CACHE_SIZE = int(
+    os.environ.get("SALESFORCE_OBJECT_ACCESS_CACHE_SIZE") or 100_000
+)
+
+
 ####
 # Celery Job Frequency
 ####
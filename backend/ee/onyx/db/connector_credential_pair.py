@@ -1,4 +1,5 @@
 from sqlalchemy import delete
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from onyx.configs.constants import DocumentSource
@@ -70,3 +71,18 @@ def get_all_auto_sync_cc_pairs(
         )
         .all()
     )
+
+
+def get_all_auto_sync_sources(db_session: Session) -> set[DocumentSource]:
+    """Sources with at least one auto sync cc_pair, without loading the cc_pairs."""
+    return set(
+        db_session.scalars(
+            select(Connector.source)
+            .join(
+                ConnectorCredentialPair,
+                ConnectorCredentialPair.connector_id == Connector.id,
+            )
+            .where(ConnectorCredentialPair.access_type == AccessType.SYNC)
+            .distinct()
+        ).all()
+    )
@@ -1,15 +1,38 @@
+import hashlib
+import json
+from collections.abc import Iterable
 from datetime import datetime
 from datetime import timezone
+from typing import Any
 
 from sqlalchemy import select
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from onyx.access.models import DocExternalAccess
 from onyx.access.models import ExternalAccess
 from onyx.access.utils import build_ext_group_name_for_onyx
 from onyx.configs.constants import DocumentSource
 from onyx.db.models import Document as DbDocument
 
 
+def build_external_access_fingerprint(
+    external_user_emails: Iterable[str],
+    prefixed_external_group_ids: Iterable[str],
+    is_public: bool,
+) -> str:
+    return hashlib.sha256(
+        json.dumps(
+            [
+                sorted(set(external_user_emails)),
+                sorted(set(prefixed_external_group_ids)),
+                is_public,
+            ]
+        ).encode("utf-8")
+    ).hexdigest()
+
+
 def upsert_document_external_perms__no_commit(
     db_session: Session,
     doc_id: str,
@@ -83,6 +106,11 @@ def upsert_document_external_perms(
             external_user_emails=external_access.external_user_emails,
             external_user_group_ids=prefixed_external_groups,
             is_public=external_access.is_public,
+            external_access_fingerprint=build_external_access_fingerprint(
+                external_access.external_user_emails,
+                prefixed_external_groups,
+                external_access.is_public,
+            ),
         )
         db_session.add(document)
         db_session.commit()
@@ -97,7 +125,174 @@ def upsert_document_external_perms(
         document.external_user_emails = list(external_access.external_user_emails)
         document.external_user_group_ids = list(prefixed_external_groups)
         document.is_public = external_access.is_public
+        document.external_access_fingerprint = build_external_access_fingerprint(
+            external_access.external_user_emails,
+            prefixed_external_groups,
+            external_access.is_public,
+        )
         document.last_modified = datetime.now(timezone.utc)
         db_session.commit()
 
     return False
+
+
+def batch_upsert_document_external_perms(
+    db_session: Session,
+    document_external_accesses: list[DocExternalAccess],
+    source_type: DocumentSource,
+) -> tuple[list[DocExternalAccess], list[str]]:
+    """Sets the permissions of a batch of documents in postgres with a few set based
+    statements. Documents whose external access fingerprint did not change are not
+    written, so their last_modified is not bumped and they are not synced to Vespa.
+
+    Returns the external accesses that were written and the ids of the documents that
+    were created.
+    NOTE: this will replace any existing external access, it will not do a union
+    """
+    doc_id_to_access = {
+        doc_access.doc_id: doc_access.external_access
+        for doc_access in document_external_accesses
+    }
+    if not doc_id_to_access:
+        return [], []
+
+    doc_id_to_prefixed_groups = {
+        doc_id: sorted(
+            {
+                build_ext_group_name_for_onyx(
+                    ext_group_name=group_id,
+                    source=source_type,
+                )
+                for group_id in external_access.external_user_group_ids
+            }
+        )
+        for doc_id, external_access in doc_id_to_access.items()
+    }
+    doc_id_to_fingerprint = {
+        doc_id: build_external_access_fingerprint(
+            external_access.external_user_emails,
+            doc_id_to_prefixed_groups[doc_id],
+            external_access.is_public,
+        )
+        for doc_id, external_access in doc_id_to_access.items()
+    }
+
+    existing_fingerprints: dict[str, str | None] = {
+        doc_id: fingerprint
+        for doc_id, fingerprint in db_session.execute(
+            select(DbDocument.id, DbDocument.external_access_fingerprint).where(
+                DbDocument.id.in_(doc_id_to_access.keys())
+            )
+        )
+    }
+
+    # documents whose permissions were synced before fingerprints were stored, if the
+    # stored permissions are the same only the fingerprint is written
+    unfingerprinted_doc_ids = [
+        doc_id
+        for doc_id, fingerprint in existing_fingerprints.items()
+        if fingerprint is None
+    ]
+    fingerprint_only_doc_ids: list[str] = []
+    if unfingerprinted_doc_ids:
+        for doc_id, emails, group_ids, is_public in db_session.execute(
+            select(
+                DbDocument.id,
+                DbDocument.external_user_emails,
+                DbDocument.external_user_group_ids,
+                DbDocument.is_public,
+            ).where(DbDocument.id.in_(unfingerprinted_doc_ids))
+        ):
+            if (
+                build_external_access_fingerprint(
+                    emails or [], group_ids or [], bool(is_public)
+                )
+                == doc_id_to_fingerprint[doc_id]
+            ):
+                fingerprint_only_doc_ids.append(doc_id)
+                existing_fingerprints[doc_id] = doc_id_to_fingerprint[doc_id]
+
+    created_doc_ids: list[str] = []
+    new_doc_ids = [
+        doc_id for doc_id in doc_id_to_access if doc_id not in existing_fingerprints
+    ]
+    if new_doc_ids:
+        # If the document does not exist, still store the external access
+        # So that if the document is added later, the external access is already stored
+        # The upsert function in the indexing pipeline does not overwrite the permissions fields
+        insert_stmt = (
+            insert(DbDocument)
+            .values(
+                [
+                    _external_perms_row(
+                        doc_id,
+                        doc_id_to_access[doc_id],
+                        doc_id_to_prefixed_groups[doc_id],
+                        doc_id_to_fingerprint[doc_id],
+                    )
+                    | {"semantic_id": ""}
+                    for doc_id in new_doc_ids
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["id"])
+            .returning(DbDocument.id)
+        )
+        created_doc_ids = list(db_session.scalars(insert_stmt))
+
+    # includes documents that were created concurrently by indexing
+    created_doc_id_set = set(created_doc_ids)
+    changed_doc_ids = [
+        doc_id
+        for doc_id, fingerprint in doc_id_to_fingerprint.items()
+        if doc_id not in created_doc_id_set
+        and existing_fingerprints.get(doc_id) != fingerprint
+    ]
+    if changed_doc_ids:
+        now = datetime.now(timezone.utc)
+        db_session.execute(
+            update(DbDocument),
+            [
+                _external_perms_row(
+                    doc_id,
+                    doc_id_to_access[doc_id],
+                    doc_id_to_prefixed_groups[doc_id],
+                    doc_id_to_fingerprint[doc_id],
+                )
+                | {"last_modified": now}
+                for doc_id in changed_doc_ids
+            ],
+        )
+    if fingerprint_only_doc_ids:
+        db_session.execute(
+            update(DbDocument),
+            [
+                {
+                    "id": doc_id,
+                    "external_access_fingerprint": doc_id_to_fingerprint[doc_id],
+                }
+                for doc_id in fingerprint_only_doc_ids
+            ],
+        )
+    db_session.commit()
+
+    written_doc_ids = created_doc_id_set | set(changed_doc_ids)
+    return [
+        DocExternalAccess(external_access=doc_id_to_access[doc_id], doc_id=doc_id)
+        for doc_id in doc_id_to_access
+        if doc_id in written_doc_ids
+    ], created_doc_ids
+
+
+def _external_perms_row(
+    doc_id: str,
+    external_access: ExternalAccess,
+    prefixed_external_groups: list[str],
+    fingerprint: str,
+) -> dict[str, Any]:
+    return {
+        "id": doc_id,
+        "external_user_emails": sorted(external_access.external_user_emails),
+        "external_user_group_ids": prefixed_external_groups,
+        "is_public": external_access.is_public,
+        "external_access_fingerprint": fingerprint,
+    }
@@ -1,6 +1,8 @@
 from collections.abc import Callable
+from typing import cast
 
-from ee.onyx.db.connector_credential_pair import get_all_auto_sync_cc_pairs
+from ee.onyx.configs.app_configs import CENSORING_ENABLED_SOURCES_CACHE_TTL_SECONDS
+from ee.onyx.db.connector_credential_pair import get_all_auto_sync_sources
 from ee.onyx.external_permissions.salesforce.postprocessing import (
     censor_salesforce_chunks,
 )
@@ -8,10 +10,20 @@ from onyx.configs.constants import DocumentSource
 from onyx.context.search.pipeline import InferenceChunk
 from onyx.db.engine import get_session_context_manager
 from onyx.db.models import User
+from onyx.redis.redis_pool import get_redis_client
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
+# Bumped whenever a cc_pair of the tenant is added or removed, the key is prefixed
+# with the tenant id by the tenant aware Redis client
+_CENSORING_SOURCES_VERSION_KEY = "censoring_enabled_sources_version"
+# the cache holds one entry per tenant
+_CENSORING_ENABLED_SOURCES_CACHE_SIZE = 1024
+
 DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION: dict[
     DocumentSource,
     # list of chunks to be censored and the user email. returns censored chunks
@@ -21,7 +33,7 @@ DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION: dict[
 }
 
 
-def _get_all_censoring_enabled_sources() -> set[DocumentSource]:
+def _fetch_censoring_enabled_sources() -> set[DocumentSource]:
     """
     Returns the set of sources that have censoring enabled.
     This is based on if the access_type is set to sync and the connector
@@ -33,14 +45,80 @@ def _get_all_censoring_enabled_sources() -> set[DocumentSource]:
     for every single chunk.
     """
     with get_session_context_manager() as db_session:
-        enabled_sync_connectors = get_all_auto_sync_cc_pairs(db_session)
         return {
-            cc_pair.connector.source
-            for cc_pair in enabled_sync_connectors
-            if cc_pair.connector.source in DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION
+            source
+            for source in get_all_auto_sync_sources(db_session)
+            if source in DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION
         }
 
 
+# tenant id -> (version, sources), one entry per tenant this process served
+_CENSORING_ENABLED_SOURCES_CACHE: TTLLRUCache[
+    str, tuple[bytes | None, frozenset[DocumentSource]]
+] = TTLLRUCache(
+    max_size=_CENSORING_ENABLED_SOURCES_CACHE_SIZE,
+    ttl_seconds=CENSORING_ENABLED_SOURCES_CACHE_TTL_SECONDS,
+)
+
+
+def _get_all_censoring_enabled_sources() -> set[DocumentSource]:
+    """Cached version of _fetch_censoring_enabled_sources. An entry is reused while
+    the tenant's version stamp in Redis is unchanged and it is younger than
+    CENSORING_ENABLED_SOURCES_CACHE_TTL_SECONDS. If Redis can't be read, the
+    sources are always fetched from the db."""
+    tenant_id = get_current_tenant_id()
+    try:
+        version = cast(
+            bytes | None,
+            get_redis_client(tenant_id=tenant_id).get(_CENSORING_SOURCES_VERSION_KEY),
+        )
+    except Exception:
+        logger.exception("Failed to read the censoring enabled sources version")
+        return _fetch_censoring_enabled_sources()
+
+    entry = _CENSORING_ENABLED_SOURCES_CACHE.get(tenant_id)
+    if entry is not None:
+        cached_version, sources = entry
+        if cached_version == version:
+            return set(sources)
+
+    fetched_sources = _fetch_censoring_enabled_sources()
+    _CENSORING_ENABLED_SOURCES_CACHE.put(
+        tenant_id, (version, frozenset(fetched_sources))
+    )
+    return fetched_sources
+
+
+def invalidate_censoring_enabled_sources() -> None:
+    """Must be called after a change to the cc_pairs of the tenant is committed."""
+    tenant_id = get_current_tenant_id()
+    _CENSORING_ENABLED_SOURCES_CACHE.pop(tenant_id)
+    try:
+        # incrby, not incr: only incrby is prefixed with the tenant id by TenantRedis
+        get_redis_client(tenant_id=tenant_id).incrby(_CENSORING_SOURCES_VERSION_KEY, 1)
+    except Exception:
+        # cached entries still expire after CENSORING_ENABLED_SOURCES_CACHE_TTL_SECONDS
+        logger.exception(
+            f"Failed to invalidate the censoring enabled sources of tenant {tenant_id}"
+        )
+
+
+def _censor_chunks_for_source(
+    source: DocumentSource, chunks: list[InferenceChunk], user_email: str
+) -> list[InferenceChunk] | None:
+    """Returns None if censoring failed, i.e. all chunks of the source must be
+    thrown out."""
+    censor_chunks_for_source = DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION[source]
+    try:
+        return censor_chunks_for_source(chunks, user_email)
+    except Exception as e:
+        logger.exception(
+            f"Failed to censor chunks for source {source} so throwing out all"
+            f" chunks for this source and continuing: {e}"
+        )
+        return None
+
+
 # NOTE: This is only called if ee is enabled.
 def _post_query_chunk_censoring(
     chunks: list[InferenceChunk],
@@ -67,20 +145,22 @@ def _post_query_chunk_censoring(
             final_chunk_dict[chunk.unique_id] = chunk
 
     # For each source, filter out the chunks using the permission
-    # check function for that source
-    # TODO: Use a threadpool/multiprocessing to process the sources in parallel
-    for source, chunks_for_source in chunks_to_process.items():
-        censor_chunks_for_source = DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION[source]
-        try:
-            censored_chunks = censor_chunks_for_source(chunks_for_source, user.email)
-        except Exception as e:
-            logger.exception(
-                f"Failed to censor chunks for source {source} so throwing out all"
-                f" chunks for this source and continuing: {e}"
-            )
-            continue
-
-        for censored_chunk in censored_chunks:
+    # check function for that source. The sources are censored concurrently as
+    # censoring usually means calling out to the source
+    censoring_functions = [
+        (_censor_chunks_for_source, (source, chunks_for_source, user.email))
+        for source, chunks_for_source in chunks_to_process.items()
+    ]
+    if len(censoring_functions) == 1:
+        func, args = censoring_functions[0]
+        censored_chunks_per_source = [func(*args)]
+    else:
+        censored_chunks_per_source = run_functions_tuples_in_parallel(
+            censoring_functions, allow_failures=True
+        )
+
+    for censored_chunks in censored_chunks_per_source:
+        for censored_chunk in censored_chunks or []:
             final_chunk_dict[censored_chunk.unique_id] = censored_chunk
 
     # IMPORTANT: make sure to retain the same ordering as the original `chunks` passed in
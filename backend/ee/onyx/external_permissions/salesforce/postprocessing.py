@@ -1,5 +1,7 @@
 import time
 
+from ee.onyx.configs.app_configs import SALESFORCE_OBJECT_ACCESS_CACHE_SIZE
+from ee.onyx.configs.app_configs import SALESFORCE_OBJECT_ACCESS_CACHE_TTL_SECONDS
 from ee.onyx.db.external_perm import fetch_external_groups_for_user_email_and_group_ids
 from ee.onyx.external_permissions.salesforce.utils import (
     get_any_salesforce_client_for_doc_id,
@@ -12,6 +14,8 @@ from onyx.configs.app_configs import BLURB_SIZE
 from onyx.context.search.models import InferenceChunk
 from onyx.db.engine import get_session_context_manager
 from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
 
@@ -19,6 +23,45 @@ logger = setup_logger()
 # Types
 ChunkKey = tuple[str, int]  # (doc_id, chunk_id)
 ContentRange = tuple[int, int | None]  # (start_index, end_index) None means to the end
+ObjectAccessKey = tuple[str, str, str]  # (tenant_id, user_email, object_id)
+
+
+# (tenant_id, user_email, object_id) -> has access
+_OBJECT_ACCESS_CACHE: TTLLRUCache[ObjectAccessKey, bool] = TTLLRUCache(
+    max_size=SALESFORCE_OBJECT_ACCESS_CACHE_SIZE,
+    ttl_seconds=SALESFORCE_OBJECT_ACCESS_CACHE_TTL_SECONDS,
+)
+
+
+def _get_cached_objects_access(
+    object_ids: set[str], user_email: str
+) -> tuple[dict[str, bool], set[str]]:
+    """Returns the cached access of the user to the objects and the object ids
+    that are not cached (or expired)."""
+    if SALESFORCE_OBJECT_ACCESS_CACHE_TTL_SECONDS <= 0:
+        return {}, object_ids
+
+    tenant_id = get_current_tenant_id()
+    found = _OBJECT_ACCESS_CACHE.get_many(
+        (tenant_id, user_email, object_id) for object_id in object_ids
+    )
+    cached_access = {key[2]: has_access for key, has_access in found.items()}
+    return cached_access, object_ids - cached_access.keys()
+
+
+def _cache_objects_access(
+    object_id_to_access: dict[str, bool], user_email: str
+) -> None:
+    if SALESFORCE_OBJECT_ACCESS_CACHE_TTL_SECONDS <= 0:
+        return
+
+    tenant_id = get_current_tenant_id()
+    _OBJECT_ACCESS_CACHE.put_many(
+        {
+            (tenant_id, user_email, object_id): has_access
+            for object_id, has_access in object_id_to_access.items()
+        }
+    )
 
 
 # NOTE: Used for testing timing
@@ -40,7 +83,17 @@ def _get_objects_access_for_user_email_from_salesforce(
     """
     This function wraps the salesforce call as we may want to change how this
     is done in the future. (E.g. replace it with the above function)
+
+    The access of a user to an object is cached for
+    SALESFORCE_OBJECT_ACCESS_CACHE_TTL_SECONDS, so Salesforce is only called for
+    objects the user hasn't searched over recently.
     """
+    cached_access, missing_object_ids = _get_cached_objects_access(
+        object_ids, user_email
+    )
+    if not missing_object_ids:
+        return cached_access
+
     # This is cached in the function so the first query takes an extra 0.1-0.3 seconds
     # but subsequent queries for this source are essentially instant
     first_doc_id = chunks[0].document_id
@@ -61,13 +114,18 @@ def _get_objects_access_for_user_email_from_salesforce(
         logger.warning(f"User '{user_email}' not found in Salesforce")
         return None
 
-    # This is the only query that is not cached in the function
-    # so it takes 0.1-0.2 seconds total
+    # 0.1-0.2 seconds total, only paid for objects that are not cached
     object_id_to_access = get_objects_access_for_user_id(
-        salesforce_client, user_id, list(object_ids)
+        salesforce_client, user_id, list(missing_object_ids)
     )
-    logger.debug(f"Object ID to access: {object_id_to_access}")
-    return object_id_to_access
+    # objects Salesforce returns nothing for are not accessible
+    fetched_access = {
+        object_id: object_id_to_access.get(object_id, False)
+        for object_id in missing_object_ids
+    }
+    _cache_objects_access(fetched_access, user_email)
+    logger.debug(f"Object ID to access: {fetched_access}")
+    return {**cached_access, **fetched_access}
 
 
 def _extract_salesforce_object_id_from_url(url: str) -> str:
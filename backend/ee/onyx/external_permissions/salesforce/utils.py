@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
 from onyx.db.document import get_cc_pairs_for_document
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 logger = setup_logger()
 
@@ -105,21 +106,12 @@ def get_salesforce_user_id_from_email(
 _MAX_RECORD_IDS_PER_QUERY = 200
 
 
-def get_objects_access_for_user_id(
+def _get_objects_access_for_user_id_batch(
     salesforce_client: Salesforce,
     user_id: str,
     record_ids: list[str],
 ) -> dict[str, bool]:
-    """
-    Salesforce has a limit of 200 record ids per query. So we just truncate
-    the list of record ids to 200. We only ever retrieve 50 chunks at a time
-    so this should be fine (unlikely that we retrieve all 50 chunks contain
-    4 unique objects).
-    If we decide this isn't acceptable we can use multiple queries but they
-    should be in parallel so query time doesn't get too long.
-    """
-    truncated_record_ids = record_ids[:_MAX_RECORD_IDS_PER_QUERY]
-    record_ids_str = "'" + "','".join(truncated_record_ids) + "'"
+    record_ids_str = "'" + "','".join(record_ids) + "'"
     access_query = f"""
     SELECT RecordId, HasReadAccess
     FROM UserRecordAccess
@@ -130,6 +122,38 @@ def get_objects_access_for_user_id(
     return {record["RecordId"]: record["HasReadAccess"] for record in result["records"]}
 
 
+def get_objects_access_for_user_id(
+    salesforce_client: Salesforce,
+    user_id: str,
+    record_ids: list[str],
+) -> dict[str, bool]:
+    """
+    Salesforce has a limit of 200 record ids per query, so larger lists are split
+    into batches that are queried in parallel.
+    """
+    batches = [
+        record_ids[i : i + _MAX_RECORD_IDS_PER_QUERY]
+        for i in range(0, len(record_ids), _MAX_RECORD_IDS_PER_QUERY)
+    ]
+    if len(batches) <= 1:
+        return _get_objects_access_for_user_id_batch(
+            salesforce_client, user_id, record_ids
+        )
+
+    object_id_to_access: dict[str, bool] = {}
+    for batch_access in run_functions_tuples_in_parallel(
+        [
+            (
+                _get_objects_access_for_user_id_batch,
+                (salesforce_client, user_id, batch),
+            )
+            for batch in batches
+        ]
+    ):
+        object_id_to_access.update(batch_access)
+    return object_id_to_access
+
+
 _CC_PAIR_ID_SALESFORCE_CLIENT_MAP: dict[int, Salesforce] = {}
 _DOC_ID_TO_CC_PAIR_ID_MAP: dict[str, int] = {}
 
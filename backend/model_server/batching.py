@@ -0,0 +1,250 @@
+"""
+Dynamic micro-batching for local models. Concurrent requests for the same model
+are queued and coalesced into a single forward pass, which gives much better
+throughput than running many tiny batches when lots of API servers each send a
+few texts (e.g. query embeddings) at a time.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Generic
+from typing import TypeVar
+
+from prometheus_client import Histogram
+
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+_BATCH_SIZE = Histogram(
+    "onyx_model_server_batch_size",
+    "Number of inputs in a coalesced model forward pass",
+    ["batcher"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024),
+)
+_BATCH_REQUESTS = Histogram(
+    "onyx_model_server_batch_requests",
+    "Number of requests coalesced into a single model forward pass",
+    ["batcher"],
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+_QUEUE_LATENCY = Histogram(
+    "onyx_model_server_batch_queue_latency_seconds",
+    "Time a request waits in the queue before its forward pass starts",
+    ["batcher"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+
+@dataclass
+class _PendingRequest(Generic[T, R]):
+    items: list[T]
+    future: asyncio.Future[list[R]]
+    enqueued_at: float
+
+
+@dataclass
+class BatcherStats:
+    num_batches: int = 0
+    num_requests: int = 0
+    num_items: int = 0
+    max_batch_size: int = 0
+    total_queue_latency: float = 0.0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.num_items / self.num_batches if self.num_batches else 0.0
+
+    @property
+    def avg_queue_latency(self) -> float:
+        return (
+            self.total_queue_latency / self.num_requests if self.num_requests else 0.0
+        )
+
+
+class MicroBatcher(Generic[T, R]):
+    """Coalesces the items of concurrent `submit` calls into batches of at most
+    `max_batch_size` items. A batch is run as soon as it is full or once its oldest
+    request has waited `max_wait` seconds. Batches run one at a time in the default
+    executor, requests arriving while a batch runs are picked up by the next one.
+
+    `process_batch` must return exactly one result per item, in order. If it raises,
+    every request in the batch fails with that exception.
+
+    A `max_batch_size` of 0 disables batching, each call is run on its own."""
+
+    def __init__(
+        self,
+        name: str,
+        process_batch: Callable[[list[T]], list[R]],
+        max_batch_size: int,
+        max_wait: float,
+    ) -> None:
+        self.name = name
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.stats = BatcherStats()
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue[_PendingRequest[T, R]] | None = None
+        self._worker: asyncio.Task[None] | None = None
+        # request that did not fit in the previous batch
+        self._carry: _PendingRequest[T, R] | None = None
+
+    async def submit(self, items: list[T]) -> list[R]:
+        if not items:
+            return []
+
+        loop = asyncio.get_running_loop()
+        if self.max_batch_size <= 0:
+            return await loop.run_in_executor(None, self._run_batch, items)
+
+        queue = self._ensure_worker(loop)
+        future: asyncio.Future[list[R]] = loop.create_future()
+        queue.put_nowait(_PendingRequest(items, future, time.monotonic()))
+        return await future
+
+    async def aclose(self) -> None:
+        """Stops the worker, requests that are still queued are cancelled."""
+        worker, self._worker = self._worker, None
+        if worker is None or worker.done():
+            return
+        if worker.get_loop() is not asyncio.get_running_loop():
+            # the loop it ran on is gone, nothing left to stop
+            return
+
+        worker.cancel()
+        try:
+            await worker
+        except asyncio.CancelledError:
+            pass
+
+        pending = [self._carry] if self._carry else []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for request in pending:
+            request.future.cancel()
+        self._carry = None
+
+    def _ensure_worker(
+        self, loop: asyncio.AbstractEventLoop
+    ) -> asyncio.Queue[_PendingRequest[T, R]]:
+        if (
+            self._queue is None
+            or self._worker is None
+            or self._worker.done()
+            or self._loop is not loop
+        ):
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._carry = None
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    def _run_batch(self, items: list[T]) -> list[R]:
+        results = self.process_batch(items)
+        if len(results) != len(items):
+            raise RuntimeError(
+                f"Batcher {self.name} got {len(results)} results for {len(items)} inputs"
+            )
+        return results
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            try:
+                await self._process(loop, batch)
+            except Exception:
+                # never let the worker die, waiting requests would hang forever
+                logger.exception(f"Batcher {self.name} failed to process a batch")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(
+                            RuntimeError(f"Batcher {self.name} failed")
+                        )
+
+    async def _collect_batch(self) -> list[_PendingRequest[T, R]]:
+        assert self._queue is not None
+
+        first = self._carry or await self._queue.get()
+        self._carry = None
+        batch = [first]
+        num_items = len(first.items)
+        deadline = first.enqueued_at + self.max_wait
+
+        while num_items < self.max_batch_size:
+            try:
+                if not self._queue.empty():
+                    request = self._queue.get_nowait()
+                else:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+
+            if num_items + len(request.items) > self.max_batch_size:
+                self._carry = request
+                break
+
+            batch.append(request)
+            num_items += len(request.items)
+
+        return batch
+
+    async def _process(
+        self, loop: asyncio.AbstractEventLoop, batch: list[_PendingRequest[T, R]]
+    ) -> None:
+        # requests whose caller went away don't need to be computed
+        batch = [request for request in batch if not request.future.done()]
+        if not batch:
+            return
+
+        items = [item for request in batch for item in request.items]
+        self._record_batch(batch, num_items=len(items))
+
+        try:
+            results = await loop.run_in_executor(None, self._run_batch, items)
+        except Exception as e:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        offset = 0
+        for request in batch:
+            num_request_items = len(request.items)
+            if not request.future.done():
+                request.future.set_result(results[offset : offset + num_request_items])
+            offset += num_request_items
+
+    def _record_batch(self, batch: list[_PendingRequest[T, R]], num_items: int) -> None:
+        now = time.monotonic()
+        queue_latencies = [now - request.enqueued_at for request in batch]
+
+        self.stats.num_batches += 1
+        self.stats.num_requests += len(batch)
+        self.stats.num_items += num_items
+        self.stats.max_batch_size = max(self.stats.max_batch_size, num_items)
+        self.stats.total_queue_latency += sum(queue_latencies)
+
+        _BATCH_SIZE.labels(batcher=self.name).observe(num_items)
+        _BATCH_REQUESTS.labels(batcher=self.name).observe(len(batch))
+        for queue_latency in queue_latencies:
+            _QUEUE_LATENCY.labels(batcher=self.name).observe(queue_latency)
+
+        logger.debug(
+            f"Batcher {self.name}: "
+            f"requests={len(batch)} "
+            f"items={num_items} "
+            f"max_queue_latency={max(queue_latencies):.4f}s "
+            f"avg_batch_size={self.stats.avg_batch_size:.1f}"
+        )
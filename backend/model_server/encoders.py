@@ -1,12 +1,15 @@
 import asyncio
 import json
+import threading
 import time
 from types import TracebackType
+from typing import Any
 from typing import cast
 from typing import Optional
 
 import aioboto3  # type: ignore
 import httpx
+import numpy as np
 import openai
 import vertexai  # type: ignore
 import voyageai  # type: ignore
@@ -23,6 +26,7 @@ from sentence_transformers import SentenceTransformer  # type: ignore
 from vertexai.language_models import TextEmbeddingInput  # type: ignore
 from vertexai.language_models import TextEmbeddingModel  # type: ignore
 
+from model_server.batching import MicroBatcher
 from model_server.constants import DEFAULT_COHERE_MODEL
 from model_server.constants import DEFAULT_OPENAI_MODEL
 from model_server.constants import DEFAULT_VERTEX_MODEL
@@ -34,8 +38,11 @@ from model_server.utils import simple_log_function_time
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import API_BASED_EMBEDDING_TIMEOUT
 from shared_configs.configs import INDEXING_ONLY
+from shared_configs.configs import MODEL_SERVER_MAX_BATCH_SIZE
+from shared_configs.configs import MODEL_SERVER_MAX_BATCH_WAIT_MS
 from shared_configs.configs import OPENAI_EMBEDDING_TIMEOUT
 from shared_configs.configs import VERTEXAI_EMBEDDING_LOCAL_BATCH_SIZE
+from shared_configs.enums import EmbeddingWireFormat
 from shared_configs.enums import EmbedTextType
 from shared_configs.enums import RerankerProvider
 from shared_configs.model_server_models import Embedding
@@ -44,6 +51,7 @@ from shared_configs.model_server_models import EmbedResponse
 from shared_configs.model_server_models import RerankRequest
 from shared_configs.model_server_models import RerankResponse
 from shared_configs.utils import batch_list
+from shared_configs.utils import pack_embeddings
 
 
 logger = setup_logger()
@@ -52,6 +60,12 @@ router = APIRouter(prefix="/encoder")
 
 _GLOBAL_MODELS_DICT: dict[str, "SentenceTransformer"] = {}
 _RERANK_MODEL: Optional["CrossEncoder"] = None
+# models are loaded from the batching threads, make sure each is only loaded once
+_MODEL_LOAD_LOCK = threading.Lock()
+
+# Coalesce concurrent requests for the same local model into one forward pass
+_EMBEDDING_BATCHERS: dict[tuple[str, int, bool], MicroBatcher[str, Any]] = {}
+_RERANK_BATCHERS: dict[str, MicroBatcher[tuple[str, str], float]] = {}
 
 # If we are not only indexing, dont want retry very long
 _RETRY_DELAY = 10 if INDEXING_ONLY else 0.1
@@ -367,20 +381,21 @@ def get_embedding_model(
 
     global _GLOBAL_MODELS_DICT  # A dictionary to store models
 
-    if model_name not in _GLOBAL_MODELS_DICT:
-        logger.notice(f"Loading {model_name}")
-        # Some model architectures that aren't built into the Transformers or Sentence
-        # Transformer need to be downloaded to be loaded locally. This does not mean
-        # data is sent to remote servers for inference, however the remote code can
-        # be fairly arbitrary so only use trusted models
-        model = SentenceTransformer(
-            model_name_or_path=model_name,
-            trust_remote_code=True,
-        )
-        model.max_seq_length = max_context_length
-        _GLOBAL_MODELS_DICT[model_name] = model
-    elif max_context_length != _GLOBAL_MODELS_DICT[model_name].max_seq_length:
-        _GLOBAL_MODELS_DICT[model_name].max_seq_length = max_context_length
+    with _MODEL_LOAD_LOCK:
+        if model_name not in _GLOBAL_MODELS_DICT:
+            logger.notice(f"Loading {model_name}")
+            # Some model architectures that aren't built into the Transformers or Sentence
+            # Transformer need to be downloaded to be loaded locally. This does not mean
+            # data is sent to remote servers for inference, however the remote code can
+            # be fairly arbitrary so only use trusted models
+            model = SentenceTransformer(
+                model_name_or_path=model_name,
+                trust_remote_code=True,
+            )
+            model.max_seq_length = max_context_length
+            _GLOBAL_MODELS_DICT[model_name] = model
+        elif max_context_length != _GLOBAL_MODELS_DICT[model_name].max_seq_length:
+            _GLOBAL_MODELS_DICT[model_name].max_seq_length = max_context_length
 
     return _GLOBAL_MODELS_DICT[model_name]
 
@@ -389,13 +404,60 @@ def get_local_reranking_model(
     model_name: str,
 ) -> CrossEncoder:
     global _RERANK_MODEL
-    if _RERANK_MODEL is None:
-        logger.notice(f"Loading {model_name}")
-        model = CrossEncoder(model_name)
-        _RERANK_MODEL = model
+    with _MODEL_LOAD_LOCK:
+        if _RERANK_MODEL is None:
+            logger.notice(f"Loading {model_name}")
+            model = CrossEncoder(model_name)
+            _RERANK_MODEL = model
     return _RERANK_MODEL
 
 
+def get_embedding_batcher(
+    model_name: str, max_context_length: int, normalize_embeddings: bool
+) -> MicroBatcher[str, Any]:
+    key = (model_name, max_context_length, normalize_embeddings)
+    if key not in _EMBEDDING_BATCHERS:
+
+        def _encode_batch(texts: list[str]) -> list[Any]:
+            local_model = get_embedding_model(
+                model_name=model_name, max_context_length=max_context_length
+            )
+            return list(
+                local_model.encode(texts, normalize_embeddings=normalize_embeddings)
+            )
+
+        _EMBEDDING_BATCHERS[key] = MicroBatcher(
+            name=f"embed:{model_name}",
+            process_batch=_encode_batch,
+            max_batch_size=MODEL_SERVER_MAX_BATCH_SIZE,
+            max_wait=MODEL_SERVER_MAX_BATCH_WAIT_MS / 1000,
+        )
+    return _EMBEDDING_BATCHERS[key]
+
+
+def get_rerank_batcher(model_name: str) -> MicroBatcher[tuple[str, str], float]:
+    if model_name not in _RERANK_BATCHERS:
+
+        def _predict_batch(pairs: list[tuple[str, str]]) -> list[float]:
+            cross_encoder = get_local_reranking_model(model_name)
+            return cross_encoder.predict(pairs).tolist()  # type: ignore
+
+        _RERANK_BATCHERS[model_name] = MicroBatcher(
+            name=f"rerank:{model_name}",
+            process_batch=_predict_batch,
+            max_batch_size=MODEL_SERVER_MAX_BATCH_SIZE,
+            max_wait=MODEL_SERVER_MAX_BATCH_WAIT_MS / 1000,
+        )
+    return _RERANK_BATCHERS[model_name]
+
+
+async def close_batchers() -> None:
+    for embedding_batcher in _EMBEDDING_BATCHERS.values():
+        await embedding_batcher.aclose()
+    for rerank_batcher in _RERANK_BATCHERS.values():
+        await rerank_batcher.aclose()
+
+
 @simple_log_function_time()
 async def embed_text(
     texts: list[str],
@@ -411,7 +473,10 @@ async def embed_text(
     api_version: str | None,
     reduced_dimension: int | None,
     gpu_type: str = "UNKNOWN",
-) -> list[Embedding]:
+    as_numpy: bool = False,
+) -> list[Embedding] | np.ndarray:
+    """If as_numpy is set, local model output is returned as the (num_texts, dim)
+    array produced by the model instead of being converted to python floats."""
     if not all(texts):
         logger.error("Empty strings provided for embedding")
         raise ValueError("Empty strings are not allowed for embedding.")
@@ -422,6 +487,8 @@ async def embed_text(
 
     start = time.monotonic()
 
+    embeddings: list[Embedding] | np.ndarray
+
     total_chars = 0
     for text in texts:
         total_chars += len(text)
@@ -478,20 +545,22 @@ async def embed_text(
 
         prefixed_texts = [f"{prefix}{text}" for text in texts] if prefix else texts
 
-        local_model = get_embedding_model(
-            model_name=model_name, max_context_length=max_context_length
-        )
-        # Run CPU-bound embedding in a thread pool
-        embeddings_vectors = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: local_model.encode(
-                prefixed_texts, normalize_embeddings=normalize_embeddings
-            ),
-        )
-        embeddings = [
-            embedding if isinstance(embedding, list) else embedding.tolist()
-            for embedding in embeddings_vectors
-        ]
+        # Run CPU-bound embedding in a thread pool, batched together with concurrent
+        # requests for the same model
+        embeddings_vectors = await get_embedding_batcher(
+            model_name=model_name,
+            max_context_length=max_context_length,
+            normalize_embeddings=normalize_embeddings,
+        ).submit(prefixed_texts)
+        if as_numpy and all(
+            isinstance(embedding, np.ndarray) for embedding in embeddings_vectors
+        ):
+            embeddings = np.stack(embeddings_vectors)
+        else:
+            embeddings = [
+                embedding if isinstance(embedding, list) else embedding.tolist()
+                for embedding in embeddings_vectors
+            ]
 
         elapsed = time.monotonic() - start
         logger.info(
@@ -517,12 +586,9 @@ async def embed_text(
 
 @simple_log_function_time()
 async def local_rerank(query: str, docs: list[str], model_name: str) -> list[float]:
-    cross_encoder = get_local_reranking_model(model_name)
-    # Run CPU-bound reranking in a thread pool
-    return await asyncio.get_event_loop().run_in_executor(
-        None,
-        lambda: cross_encoder.predict([(query, doc) for doc in docs]).tolist(),  # type: ignore
-    )
+    # Run CPU-bound reranking in a thread pool, batched together with concurrent
+    # requests for the same model
+    return await get_rerank_batcher(model_name).submit([(query, doc) for doc in docs])
 
 
 async def cohere_rerank_api(
@@ -635,8 +701,14 @@ async def process_embed_request(
             reduced_dimension=embed_request.reduced_dimension,
             prefix=prefix,
             gpu_type=gpu_type,
+            as_numpy=embed_request.wire_format != EmbeddingWireFormat.JSON,
+        )
+        if embed_request.wire_format == EmbeddingWireFormat.JSON:
+            return EmbedResponse(embeddings=cast(list[Embedding], embeddings))
+
+        return EmbedResponse(
+            packed_embeddings=pack_embeddings(embeddings, embed_request.wire_format)
         )
-        return EmbedResponse(embeddings=embeddings)
     except AuthenticationError as e:
         # Handle authentication errors consistently
         logger.error(f"Authentication error: {e.provider}")
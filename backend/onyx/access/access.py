@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 
+from onyx.access.acl_cache import cached_acl_for_user
 from onyx.access.models import DocumentAccess
 from onyx.access.utils import prefix_user_email
 from onyx.configs.constants import PUBLIC_DOC_PAT
@@ -106,4 +107,11 @@ def get_acl_for_user(user: User | None, db_session: Session | None = None) -> se
     versioned_acl_for_user_fn = fetch_versioned_implementation(
         "onyx.access.access", "_get_acl_for_user"
     )
-    return versioned_acl_for_user_fn(user, db_session)  # type: ignore
+    if user is None:
+        return versioned_acl_for_user_fn(user, db_session)  # type: ignore
+
+    # see invalidate_user_acls for when the cached ACLs are dropped
+    return cached_acl_for_user(
+        user.id,
+        lambda: versioned_acl_for_user_fn(user, db_session),  # type: ignore
+    )
@@ -0,0 +1,128 @@
+import threading
+from collections.abc import Callable
+from typing import cast
+from uuid import UUID
+
+from prometheus_client import Counter
+
+from onyx.configs.app_configs import USER_ACL_CACHE_SIZE
+from onyx.configs.app_configs import USER_ACL_CACHE_TTL_SECONDS
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+# Bumped whenever the ACL of any user of the tenant may have changed. The key is
+# prefixed with the tenant id by the tenant aware Redis client.
+_ACL_VERSION_KEY = "user_acl_version"
+
+_USER_ACL_CACHE_LOOKUPS = Counter(
+    "onyx_user_acl_cache_lookups",
+    "User ACL cache lookups by result (hit, miss or bypass)",
+    ["result"],
+)
+
+
+class UserAclCache:
+    """LRU cache of user ACLs for the current process. Every entry remembers the
+    tenant's ACL version it was computed at, an entry is only used while the version
+    in Redis is unchanged (and the entry is younger than the TTL). If Redis can't be
+    read the cache is bypassed, so a stale ACL is never used because of an outage."""
+
+    def __init__(self, max_size: int, ttl_seconds: int) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        # (tenant id, user id) -> (acl version, acl)
+        self._acls: TTLLRUCache[
+            tuple[str, UUID], tuple[bytes | None, frozenset[str]]
+        ] = TTLLRUCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self) -> None:
+        self._acls.clear()
+
+    def get_or_compute(
+        self,
+        tenant_id: str,
+        user_id: UUID,
+        compute_acl: Callable[[], set[str]],
+    ) -> set[str]:
+        try:
+            # read before computing, an invalidation racing with the computation then
+            # always leaves the new entry outdated
+            version = cast(
+                bytes | None,
+                get_redis_client(tenant_id=tenant_id).get(_ACL_VERSION_KEY),
+            )
+        except Exception:
+            logger.exception("Failed to read the user ACL version from Redis")
+            _USER_ACL_CACHE_LOOKUPS.labels(result="bypass").inc()
+            return compute_acl()
+
+        key = (tenant_id, user_id)
+        entry = self._acls.get(key, count=False)
+        if entry is not None:
+            cached_version, acl = entry
+            if cached_version == version:
+                self.hits += 1
+                _USER_ACL_CACHE_LOOKUPS.labels(result="hit").inc()
+                return set(acl)
+            self._acls.pop(key)
+
+        acl = frozenset(compute_acl())
+        self._acls.put(key, (version, acl))
+        self.misses += 1
+        _USER_ACL_CACHE_LOOKUPS.labels(result="miss").inc()
+        return set(acl)
+
+    def drop_tenant(self, tenant_id: str) -> None:
+        self._acls.pop_where(lambda key: key[0] == tenant_id)
+
+
+_USER_ACL_CACHE: UserAclCache | None = None
+_USER_ACL_CACHE_LOCK = threading.Lock()
+
+
+def get_user_acl_cache() -> UserAclCache | None:
+    """Process wide user ACL cache, None if USER_ACL_CACHE_SIZE is 0."""
+    global _USER_ACL_CACHE
+
+    if USER_ACL_CACHE_SIZE <= 0:
+        return None
+
+    with _USER_ACL_CACHE_LOCK:
+        if _USER_ACL_CACHE is None:
+            _USER_ACL_CACHE = UserAclCache(
+                max_size=USER_ACL_CACHE_SIZE,
+                ttl_seconds=USER_ACL_CACHE_TTL_SECONDS,
+            )
+        return _USER_ACL_CACHE
+
+
+def cached_acl_for_user(user_id: UUID, compute_acl: Callable[[], set[str]]) -> set[str]:
+    cache = get_user_acl_cache()
+    if cache is None:
+        return compute_acl()
+    return cache.get_or_compute(get_current_tenant_id(), user_id, compute_acl)
+
+
+def invalidate_user_acls(tenant_id: str | None = None) -> None:
+    """Invalidates the cached ACLs of all users of the tenant in every process. Must
+    be called after a change to the group memberships or user roles is committed."""
+    tenant_id = tenant_id or get_current_tenant_id()
+
+    cache = get_user_acl_cache()
+    if cache is not None:
+        cache.drop_tenant(tenant_id)
+
+    try:
+        # incrby, not incr: only incrby is prefixed with the tenant id by TenantRedis
+        get_redis_client(tenant_id=tenant_id).incrby(_ACL_VERSION_KEY, 1)
+    except Exception:
+        # cached entries still expire after USER_ACL_CACHE_TTL_SECONDS
+        logger.exception(f"Failed to invalidate the user ACLs of tenant {tenant_id}")
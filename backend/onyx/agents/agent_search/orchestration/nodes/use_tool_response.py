@@ -1,3 +1,4 @@
+from collections.abc import Callable
 from typing import cast
 
 from langchain_core.messages import AIMessageChunk
@@ -8,12 +9,21 @@ from onyx.agents.agent_search.basic.states import BasicOutput
 from onyx.agents.agent_search.basic.states import BasicState
 from onyx.agents.agent_search.basic.utils import process_llm_stream
 from onyx.agents.agent_search.models import GraphConfig
+from onyx.agents.agent_search.shared_graph_utils.utils import write_custom_event
 from onyx.chat.models import LlmDoc
+from onyx.chat.models import SectionRelevancePiece
 from onyx.context.search.utils import dedupe_documents
+from onyx.tools.models import ToolResponse
+from onyx.tools.tool_implementations.search.search_tool import (
+    DEFERRED_SECTION_RELEVANCE_LIST_ID,
+)
 from onyx.tools.tool_implementations.search.search_tool import (
     SEARCH_RESPONSE_SUMMARY_ID,
 )
 from onyx.tools.tool_implementations.search.search_tool import SearchResponseSummary
+from onyx.tools.tool_implementations.search.search_tool import (
+    SECTION_RELEVANCE_LIST_ID,
+)
 from onyx.tools.tool_implementations.search.search_utils import section_to_llm_doc
 from onyx.tools.tool_implementations.search_like_tool_utils import (
     FINAL_CONTEXT_DOCUMENTS_ID,
@@ -80,4 +90,18 @@ def basic_use_tool_response(
             displayed_search_results=initial_search_results or final_search_results,
         )
 
+    # the answer did not wait for the LLM relevance evaluation of the search results
+    for yield_item in tool_call_responses:
+        if yield_item.id == DEFERRED_SECTION_RELEVANCE_LIST_ID:
+            get_section_relevance = cast(
+                Callable[[], list[SectionRelevancePiece] | None], yield_item.response
+            )
+            write_custom_event(
+                "basic_response",
+                ToolResponse(
+                    id=SECTION_RELEVANCE_LIST_ID, response=get_section_relevance()
+                ),
+                writer,
+            )
+
     return BasicOutput(tool_call_chunk=new_tool_call_chunk)
@@ -19,6 +19,7 @@ from sqlalchemy.orm import Session
 
 from ee.onyx.configs.app_configs import DEFAULT_PERMISSION_DOC_SYNC_FREQUENCY
 from ee.onyx.db.connector_credential_pair import get_all_auto_sync_cc_pairs
+from ee.onyx.db.document import batch_upsert_document_external_perms
 from ee.onyx.db.document import upsert_document_external_perms
 from ee.onyx.external_permissions.sync_params import DOC_PERMISSION_SYNC_PERIODS
 from ee.onyx.external_permissions.sync_params import DOC_PERMISSIONS_FUNC_MAP
@@ -32,6 +33,7 @@ from onyx.background.celery.celery_redis import celery_get_queue_length
 from onyx.background.celery.celery_redis import celery_get_queued_task_ids
 from onyx.background.celery.celery_redis import celery_get_unacked_task_ids
 from onyx.background.celery.tasks.shared.tasks import OnyxCeleryTaskCompletionStatus
+from onyx.configs.app_configs import DOC_PERMISSION_SYNC_BATCH_SIZE
 from onyx.configs.app_configs import JOB_TIMEOUT
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_PERMISSIONS_SYNC_LOCK_TIMEOUT
@@ -471,16 +473,31 @@ def connector_permission_sync_generator_task(
             )
 
             tasks_generated = 0
+            doc_external_access_batch: list[DocExternalAccess] = []
             for doc_external_access in document_external_accesses:
-                redis_connector.permissions.generate_tasks(
+                doc_external_access_batch.append(doc_external_access)
+                if len(doc_external_access_batch) < DOC_PERMISSION_SYNC_BATCH_SIZE:
+                    continue
+
+                tasks_generated += redis_connector.permissions.generate_tasks(
                     celery_app=self.app,
                     lock=lock,
-                    new_permissions=[doc_external_access],
+                    new_permissions=doc_external_access_batch,
+                    source_string=source_type,
+                    connector_id=cc_pair.connector.id,
+                    credential_id=cc_pair.credential.id,
+                )
+                doc_external_access_batch = []
+
+            if doc_external_access_batch:
+                tasks_generated += redis_connector.permissions.generate_tasks(
+                    celery_app=self.app,
+                    lock=lock,
+                    new_permissions=doc_external_access_batch,
                     source_string=source_type,
                     connector_id=cc_pair.connector.id,
                     credential_id=cc_pair.credential.id,
                 )
-                tasks_generated += 1
 
             task_logger.info(
                 f"RedisConnector.permissions.generate_tasks finished. "
@@ -526,6 +543,8 @@ def update_external_document_permissions_task(
     connector_id: int,
     credential_id: int,
 ) -> bool:
+    """Single document variant of update_external_document_permissions_batch_task.
+    Kept so that tasks queued before the upgrade still run."""
     start = time.monotonic()
 
     completion_status = OnyxCeleryTaskCompletionStatus.UNDEFINED
@@ -594,6 +613,103 @@ def update_external_document_permissions_task(
     return True
 
 
+@shared_task(
+    name=OnyxCeleryTask.UPDATE_EXTERNAL_DOCUMENT_PERMISSIONS_BATCH_TASK,
+    soft_time_limit=LIGHT_SOFT_TIME_LIMIT,
+    time_limit=LIGHT_TIME_LIMIT,
+    max_retries=DOCUMENT_PERMISSIONS_UPDATE_MAX_RETRIES,
+    bind=True,
+)
+def update_external_document_permissions_batch_task(
+    self: Task,
+    tenant_id: str,
+    serialized_doc_external_accesses: list[dict],
+    source_string: str,
+    connector_id: int,
+    credential_id: int,
+) -> bool:
+    """Writes the permissions of a batch of documents. Documents whose permissions did
+    not change since the last sync are skipped, so they are not synced to Vespa again.
+    """
+    start = time.monotonic()
+
+    completion_status = OnyxCeleryTaskCompletionStatus.UNDEFINED
+
+    document_external_accesses = [
+        DocExternalAccess.from_dict(serialized_doc_external_access)
+        for serialized_doc_external_access in serialized_doc_external_accesses
+    ]
+
+    try:
+        with get_session_with_current_tenant() as db_session:
+            # Add the users to the DB if they don't exist
+            batch_add_ext_perm_user_if_not_exists(
+                db_session=db_session,
+                emails=list(
+                    {
+                        email
+                        for doc_access in document_external_accesses
+                        for email in doc_access.external_access.external_user_emails
+                    }
+                ),
+                continue_on_error=True,
+            )
+            # Then upsert the documents' external permissions
+            changed_doc_accesses, created_doc_ids = (
+                batch_upsert_document_external_perms(
+                    db_session=db_session,
+                    document_external_accesses=document_external_accesses,
+                    source_type=DocumentSource(source_string),
+                )
+            )
+
+            if created_doc_ids:
+                # If new documents were created, we associate them with the cc_pair
+                upsert_document_by_connector_credential_pair(
+                    db_session=db_session,
+                    connector_id=connector_id,
+                    credential_id=credential_id,
+                    document_ids=created_doc_ids,
+                )
+
+            elapsed = time.monotonic() - start
+            task_logger.info(
+                f"connector_id={connector_id} "
+                f"docs={len(document_external_accesses)} "
+                f"changed={len(changed_doc_accesses)} "
+                f"skipped={len(document_external_accesses) - len(changed_doc_accesses)} "
+                f"action=update_permissions "
+                f"elapsed={elapsed:.2f}"
+            )
+
+        completion_status = OnyxCeleryTaskCompletionStatus.SUCCEEDED
+    except Exception as e:
+        error_msg = format_error_for_logging(e)
+        task_logger.warning(
+            f"Exception in update_external_document_permissions_batch_task: "
+            f"connector_id={connector_id} docs={len(document_external_accesses)} {error_msg}"
+        )
+        task_logger.exception(
+            f"update_external_document_permissions_batch_task exceptioned: "
+            f"connector_id={connector_id} docs={len(document_external_accesses)}"
+        )
+        completion_status = OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+    finally:
+        task_logger.info(
+            f"update_external_document_permissions_batch_task completed: "
+            f"status={completion_status.value} docs={len(document_external_accesses)}"
+        )
+
+    if completion_status != OnyxCeleryTaskCompletionStatus.SUCCEEDED:
+        return False
+
+    task_logger.info(
+        f"update_external_document_permissions_batch_task finished: "
+        f"connector_id={connector_id} docs={len(document_external_accesses)}"
+    )
+    return True
+
+
 def validate_permission_sync_fences(
     tenant_id: str,
     r: Redis,
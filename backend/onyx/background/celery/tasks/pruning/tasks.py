@@ -1,4 +1,5 @@
 import time
+from collections.abc import Iterator
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
@@ -20,10 +21,11 @@ from onyx.background.celery.celery_redis import celery_find_task
 from onyx.background.celery.celery_redis import celery_get_queue_length
 from onyx.background.celery.celery_redis import celery_get_queued_task_ids
 from onyx.background.celery.celery_redis import celery_get_unacked_task_ids
-from onyx.background.celery.celery_utils import extract_ids_from_runnable_connector
+from onyx.background.celery.celery_utils import iterate_ids_from_runnable_connector
 from onyx.background.celery.tasks.indexing.utils import IndexingCallbackBase
 from onyx.configs.app_configs import ALLOW_SIMULTANEOUS_PRUNING
 from onyx.configs.app_configs import JOB_TIMEOUT
+from onyx.configs.app_configs import PRUNING_MAX_IN_MEMORY_DOC_IDS
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_PRUNING_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_TASK_WAIT_FOR_FENCE_TIMEOUT
@@ -40,7 +42,9 @@ from onyx.db.connector import mark_ccpair_as_pruned
 from onyx.db.connector_credential_pair import get_connector_credential_pair
 from onyx.db.connector_credential_pair import get_connector_credential_pair_from_id
 from onyx.db.connector_credential_pair import get_connector_credential_pairs
-from onyx.db.document import get_documents_for_connector_credential_pair
+from onyx.db.document import (
+    construct_sorted_document_id_select_for_connector_credential_pair,
+)
 from onyx.db.engine import get_session_with_current_tenant
 from onyx.db.enums import ConnectorCredentialPairStatus
 from onyx.db.enums import SyncStatus
@@ -56,6 +60,8 @@ from onyx.redis.redis_connector_prune import RedisConnectorPrunePayload
 from onyx.redis.redis_pool import get_redis_client
 from onyx.redis.redis_pool import get_redis_replica_client
 from onyx.server.utils import make_short_id
+from onyx.utils.external_sort import ExternalSortedSet
+from onyx.utils.external_sort import sorted_difference
 from onyx.utils.logger import format_error_for_logging
 from onyx.utils.logger import LoggerContextVars
 from onyx.utils.logger import pruning_ctx
@@ -64,12 +70,45 @@ from onyx.utils.logger import setup_logger
 logger = setup_logger()
 
 
+# how many indexed document ids are fetched at a time, and how often progress is
+# reported while they are compared with the ids in the source
+PRUNING_INDEXED_IDS_YIELD_PER = 1000
+
+
 class PruneCallback(IndexingCallbackBase):
     def progress(self, tag: str, amount: int) -> None:
         self.redis_connector.prune.set_active()
         super().progress(tag, amount)
 
 
+def iterate_indexed_document_ids(
+    db_session: Session,
+    connector_id: int,
+    credential_id: int,
+    callback: IndexingCallbackBase | None = None,
+) -> Iterator[str]:
+    """Streams the ids of the documents of the cc pair in code point order, reporting
+    progress to the callback along the way."""
+    # as an execution option, yield_per also streams the rows from the server instead
+    # of buffering the whole result on the client
+    stmt = construct_sorted_document_id_select_for_connector_credential_pair(
+        connector_id, credential_id
+    ).execution_options(yield_per=PRUNING_INDEXED_IDS_YIELD_PER)
+
+    num_ids = 0
+    for doc_id in db_session.scalars(stmt):
+        yield cast(str, doc_id)
+
+        num_ids += 1
+        if callback and num_ids % PRUNING_INDEXED_IDS_YIELD_PER == 0:
+            if callback.should_stop():
+                raise RuntimeError("iterate_indexed_document_ids: Stop signal detected")
+
+            callback.progress(
+                "iterate_indexed_document_ids", PRUNING_INDEXED_IDS_YIELD_PER
+            )
+
+
 """Jobs / utils for kicking off pruning tasks."""
 
 
@@ -460,43 +499,46 @@ def connector_pruning_generator_task(
                 r,
             )
 
-            # a list of docs in the source
-            all_connector_doc_ids: set[str] = extract_ids_from_runnable_connector(
-                runnable_connector, callback
-            )
+            # the docs in the source. Past PRUNING_MAX_IN_MEMORY_DOC_IDS they are
+            # spilled to sorted files on disk, so memory doesn't grow with the connector
+            with ExternalSortedSet(
+                max_in_memory=PRUNING_MAX_IN_MEMORY_DOC_IDS
+            ) as all_connector_doc_ids:
+                for doc_ids in iterate_ids_from_runnable_connector(
+                    runnable_connector, callback
+                ):
+                    all_connector_doc_ids.update(doc_ids)
+
+                task_logger.info(
+                    "Pruning source ids collected: "
+                    f"cc_pair={cc_pair_id} "
+                    f"connector_source={cc_pair.connector.source} "
+                    f"spilled_runs={all_connector_doc_ids.num_runs}"
+                )
 
-            # a list of docs in our local index
-            all_indexed_document_ids = {
-                doc.id
-                for doc in get_documents_for_connector_credential_pair(
-                    db_session=db_session,
-                    connector_id=connector_id,
-                    credential_id=credential_id,
+                # the docs in our local index that are no longer in the source. Both
+                # sides are streamed in the same order and merged
+                doc_ids_to_remove = sorted_difference(
+                    iterate_indexed_document_ids(
+                        db_session, connector_id, credential_id, callback
+                    ),
+                    all_connector_doc_ids,
                 )
-            }
 
-            # generate list of docs to remove (no longer in the source)
-            doc_ids_to_remove = list(all_indexed_document_ids - all_connector_doc_ids)
+                task_logger.info(
+                    f"RedisConnector.prune.generate_tasks starting. cc_pair={cc_pair_id}"
+                )
+                tasks_generated = redis_connector.prune.generate_tasks(
+                    doc_ids_to_remove, self.app, db_session, None
+                )
+                if tasks_generated is None:
+                    return None
 
             task_logger.info(
-                "Pruning set collected: "
+                "RedisConnector.prune.generate_tasks finished. "
                 f"cc_pair={cc_pair_id} "
                 f"connector_source={cc_pair.connector.source} "
-                f"docs_to_remove={len(doc_ids_to_remove)}"
-            )
-
-            task_logger.info(
-                f"RedisConnector.prune.generate_tasks starting. cc_pair={cc_pair_id}"
-            )
-            tasks_generated = redis_connector.prune.generate_tasks(
-                set(doc_ids_to_remove), self.app, db_session, None
-            )
-            if tasks_generated is None:
-                return None
-
-            task_logger.info(
-                "RedisConnector.prune.generate_tasks finished. "
-                f"cc_pair={cc_pair_id} tasks_generated={tasks_generated}"
+                f"tasks_generated={tasks_generated}"
             )
 
             redis_connector.prune.generator_complete = tasks_generated
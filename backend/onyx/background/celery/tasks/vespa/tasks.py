@@ -15,6 +15,7 @@ from sqlalchemy.orm import Session
 from tenacity import RetryError
 
 from onyx.access.access import get_access_for_document
+from onyx.access.access import get_access_for_documents
 from onyx.background.celery.apps.app_base import task_logger
 from onyx.background.celery.tasks.shared.RetryDocumentIndex import RetryDocumentIndex
 from onyx.background.celery.tasks.shared.tasks import LIGHT_SOFT_TIME_LIMIT
@@ -29,10 +30,13 @@ from onyx.configs.constants import OnyxRedisLocks
 from onyx.db.connector_credential_pair import get_connector_credential_pairs
 from onyx.db.document import count_documents_by_needs_sync
 from onyx.db.document import get_document
+from onyx.db.document import get_documents_by_ids
 from onyx.db.document import mark_document_as_synced
+from onyx.db.document import mark_documents_as_synced
 from onyx.db.document_set import delete_document_set
 from onyx.db.document_set import fetch_document_sets
 from onyx.db.document_set import fetch_document_sets_for_document
+from onyx.db.document_set import fetch_document_sets_for_documents
 from onyx.db.document_set import get_document_set_by_id
 from onyx.db.document_set import mark_document_set_as_synced
 from onyx.db.engine import get_session_with_current_tenant
@@ -57,6 +61,7 @@ from onyx.redis.redis_pool import get_redis_replica_client
 from onyx.redis.redis_pool import redis_lock_dump
 from onyx.redis.redis_usergroup import RedisUserGroup
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 from onyx.utils.variable_functionality import fetch_versioned_implementation
 from onyx.utils.variable_functionality import (
     fetch_versioned_implementation_with_fallback,
@@ -66,6 +71,14 @@ from onyx.utils.variable_functionality import noop_fallback
 
 logger = setup_logger()
 
+# a batch sync task updates many documents, so it gets more time than a
+# single document light task
+VESPA_METADATA_SYNC_BATCH_SOFT_TIME_LIMIT = LIGHT_SOFT_TIME_LIMIT * 3
+VESPA_METADATA_SYNC_BATCH_TIME_LIMIT = VESPA_METADATA_SYNC_BATCH_SOFT_TIME_LIMIT + 15
+
+# number of documents within a batch that are updated in Vespa concurrently
+VESPA_METADATA_SYNC_BATCH_THREADS = 8
+
 
 # celery auto associates tasks created inside another task,
 # which bloats the result metadata considerably. trail=False prevents this.
@@ -445,7 +458,7 @@ def monitor_connector_taskset(r: Redis) -> None:
     )
     if remaining == 0:
         redis_global_ccpair.reset()
-        task_logger.info(f"Successfully synced stale documents. count={initial_count}")
+        task_logger.info(f"Successfully synced stale documents. tasks={initial_count}")
 
 
 def monitor_document_set_taskset(
@@ -525,6 +538,8 @@ def monitor_document_set_taskset(
     max_retries=3,
 )
 def vespa_metadata_sync_task(self: Task, document_id: str, *, tenant_id: str) -> bool:
+    """Syncs a single document. Task generation now uses vespa_metadata_sync_batch_task,
+    this is kept so that tasks already queued before an upgrade still run."""
     start = time.monotonic()
 
     completion_status = OnyxCeleryTaskCompletionStatus.UNDEFINED
@@ -644,3 +659,186 @@ def vespa_metadata_sync_task(self: Task, document_id: str, *, tenant_id: str) ->
         return False
 
     return True
+
+
+def _sync_document_to_vespa(
+    retry_index: RetryDocumentIndex,
+    document_id: str,
+    chunk_count: int | None,
+    fields: VespaDocumentFields,
+    tenant_id: str,
+) -> int | Exception:
+    """Returns the number of chunks affected, or the exception raised so that the
+    caller can decide per document whether it is retryable."""
+    try:
+        return retry_index.update_single(
+            document_id,
+            tenant_id=tenant_id,
+            chunk_count=chunk_count,
+            fields=fields,
+            user_fields=None,
+        )
+    except Exception as e:
+        return e
+
+
+@shared_task(
+    name=OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK,
+    bind=True,
+    soft_time_limit=VESPA_METADATA_SYNC_BATCH_SOFT_TIME_LIMIT,
+    time_limit=VESPA_METADATA_SYNC_BATCH_TIME_LIMIT,
+    max_retries=3,
+)
+def vespa_metadata_sync_batch_task(
+    self: Task, document_ids: list[str], *, tenant_id: str
+) -> bool:
+    """Batched version of vespa_metadata_sync_task. Document sets and access are
+    loaded for the whole batch with set based queries, the Vespa updates share
+    the pooled vespa http client and the successfully synced docs are marked
+    in bulk.
+
+    Documents that fail with a retryable error are retried (without the
+    documents that already succeeded) under the same task id, so the
+    taskset bookkeeping is unaffected."""
+    start = time.monotonic()
+
+    completion_status = OnyxCeleryTaskCompletionStatus.UNDEFINED
+    retry_document_ids: list[str] = []
+    retry_exception: Exception | None = None
+    num_synced = 0
+    num_chunks = 0
+
+    try:
+        with get_session_with_current_tenant() as db_session:
+            active_search_settings = get_active_search_settings(db_session)
+            doc_index = get_default_document_index(
+                search_settings=active_search_settings.primary,
+                secondary_search_settings=active_search_settings.secondary,
+                httpx_client=HttpxPool.get("vespa"),
+            )
+
+            retry_index = RetryDocumentIndex(doc_index)
+
+            docs = get_documents_by_ids(db_session, document_ids)
+            if not docs:
+                completion_status = OnyxCeleryTaskCompletionStatus.SKIPPED
+            else:
+                doc_ids = [doc.id for doc in docs]
+                doc_id_to_doc_sets = dict(
+                    fetch_document_sets_for_documents(doc_ids, db_session)
+                )
+                doc_id_to_access = get_access_for_documents(doc_ids, db_session)
+
+                functions_with_args: list[tuple[Callable, tuple]] = [
+                    (
+                        _sync_document_to_vespa,
+                        (
+                            retry_index,
+                            doc.id,
+                            doc.chunk_count,
+                            VespaDocumentFields(
+                                document_sets=set(doc_id_to_doc_sets.get(doc.id, [])),
+                                access=doc_id_to_access[doc.id],
+                                boost=doc.boost,
+                                hidden=doc.hidden,
+                            ),
+                            tenant_id,
+                        ),
+                    )
+                    for doc in docs
+                ]
+
+                results = run_functions_tuples_in_parallel(
+                    functions_with_args,
+                    max_workers=VESPA_METADATA_SYNC_BATCH_THREADS,
+                )
+
+                synced_doc_ids: list[str] = []
+                for doc_id, result in zip(doc_ids, results):
+                    if not isinstance(result, Exception):
+                        synced_doc_ids.append(doc_id)
+                        num_chunks += result
+                        continue
+
+                    e = result
+                    if isinstance(e, RetryError):
+                        # only use the inner exception if it is of type Exception
+                        e_temp = e.last_attempt.exception()
+                        if isinstance(e_temp, Exception):
+                            e = e_temp
+
+                    if (
+                        isinstance(e, httpx.HTTPStatusError)
+                        and e.response.status_code == HTTPStatus.BAD_REQUEST
+                    ):
+                        task_logger.error(
+                            f"Non-retryable HTTPStatusError: "
+                            f"doc={doc_id} "
+                            f"status={e.response.status_code}"
+                        )
+                        continue
+
+                    task_logger.warning(
+                        f"vespa_metadata_sync_batch_task doc failed: doc={doc_id} exception={e!r}"
+                    )
+                    retry_document_ids.append(doc_id)
+                    retry_exception = e
+
+                # update db last. Worst case = we crash right before this and
+                # the sync might repeat again later
+                mark_documents_as_synced(synced_doc_ids, db_session)
+                num_synced = len(synced_doc_ids)
+
+                if retry_document_ids:
+                    completion_status = (
+                        OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
+                    )
+                elif num_synced < len(docs):
+                    completion_status = (
+                        OnyxCeleryTaskCompletionStatus.NON_RETRYABLE_EXCEPTION
+                    )
+                else:
+                    completion_status = OnyxCeleryTaskCompletionStatus.SUCCEEDED
+    except SoftTimeLimitExceeded:
+        task_logger.info(
+            f"SoftTimeLimitExceeded exception. num_docs={len(document_ids)}"
+        )
+        completion_status = OnyxCeleryTaskCompletionStatus.SOFT_TIME_LIMIT
+    except Exception as e:
+        task_logger.exception(
+            f"vespa_metadata_sync_batch_task exceptioned: num_docs={len(document_ids)}"
+        )
+        completion_status = OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION
+        retry_document_ids = document_ids
+        retry_exception = e
+    finally:
+        elapsed = time.monotonic() - start
+        task_logger.info(
+            f"vespa_metadata_sync_batch_task completed: "
+            f"status={completion_status.value} "
+            f"docs={len(document_ids)} "
+            f"synced={num_synced} "
+            f"chunks={num_chunks} "
+            f"retrying={len(retry_document_ids)} "
+            f"elapsed={elapsed:.2f}"
+        )
+
+    if completion_status == OnyxCeleryTaskCompletionStatus.RETRYABLE_EXCEPTION:
+        if self.max_retries is not None and self.request.retries >= self.max_retries:
+            return False
+
+        # Exponential backoff from 2^4 to 2^6 ... i.e. 16, 32, 64
+        countdown = 2 ** (self.request.retries + 4)
+        self.retry(
+            exc=retry_exception,
+            countdown=countdown,
+            kwargs=dict(document_ids=retry_document_ids, tenant_id=tenant_id),
+        )  # this will raise a celery exception
+
+    if completion_status not in (
+        OnyxCeleryTaskCompletionStatus.SUCCEEDED,
+        OnyxCeleryTaskCompletionStatus.SKIPPED,
+    ):
+        return False
+
+    return True
@@ -1,6 +1,7 @@
 import time
 import traceback
 from collections import defaultdict
+from collections.abc import Iterator
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
@@ -13,6 +14,7 @@ from onyx.background.indexing.checkpointing_utils import get_latest_valid_checkp
 from onyx.background.indexing.checkpointing_utils import save_checkpoint
 from onyx.background.indexing.memory_tracer import MemoryTracer
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
+from onyx.configs.app_configs import INDEXING_PIPELINE_QUEUE_DEPTH
 from onyx.configs.app_configs import INDEXING_SIZE_WARNING_THRESHOLD
 from onyx.configs.app_configs import INDEXING_TRACER_INTERVAL
 from onyx.configs.app_configs import INTEGRATION_TESTS_MODE
@@ -24,6 +26,7 @@ from onyx.connectors.connector_runner import ConnectorRunner
 from onyx.connectors.exceptions import ConnectorValidationError
 from onyx.connectors.exceptions import UnexpectedValidationError
 from onyx.connectors.factory import instantiate_connector
+from onyx.connectors.models import ConnectorCheckpoint
 from onyx.connectors.models import ConnectorFailure
 from onyx.connectors.models import Document
 from onyx.connectors.models import IndexAttemptMetadata
@@ -49,6 +52,7 @@ from onyx.db.index_attempt import update_docs_indexed
 from onyx.db.models import IndexAttempt
 from onyx.db.models import IndexAttemptError
 from onyx.document_index.factory import get_default_document_index
+from onyx.document_index.interfaces import DocumentIndex
 from onyx.httpx.httpx_pool import HttpxPool
 from onyx.indexing.embedder import DefaultIndexingEmbedder
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
@@ -62,6 +66,7 @@ from onyx.utils.middleware import make_randomized_onyx_request_id
 from onyx.utils.telemetry import create_milestone_and_report
 from onyx.utils.telemetry import optional_telemetry
 from onyx.utils.telemetry import RecordType
+from onyx.utils.threadpool_concurrency import prefetch_generator
 from onyx.utils.variable_functionality import global_version
 from shared_configs.configs import MULTI_TENANT
 
@@ -173,6 +178,37 @@ def strip_null_characters(doc_batch: list[Document]) -> list[Document]:
     return cleaned_batch
 
 
+def _run_connector(
+    connector_runner: ConnectorRunner,
+    checkpoint: ConnectorCheckpoint,
+    source: DocumentSource,
+) -> Iterator[
+    tuple[
+        list[Document] | None,
+        ConnectorFailure | None,
+        ConnectorCheckpoint | None,
+        bool,
+    ]
+]:
+    """Runs the connector from the given checkpoint until it has nothing more to
+    fetch. Yields (document_batch, failure, next_checkpoint, checkpoint_complete).
+
+    checkpoint_complete is True once every batch of the current checkpoint has been
+    yielded. That item carries a copy of the checkpoint to save, since the connector
+    may keep working on (and mutating) its checkpoint while the consumer catches up."""
+    while checkpoint.has_more:
+        logger.info(f"Running '{source.value}' connector with checkpoint: {checkpoint}")
+        for document_batch, failure, next_checkpoint in connector_runner.run(
+            checkpoint
+        ):
+            if next_checkpoint:
+                checkpoint = next_checkpoint
+
+            yield document_batch, failure, next_checkpoint, False
+
+        yield None, None, checkpoint.model_copy(deep=True), True
+
+
 class ConnectorStopSignal(Exception):
     """A custom exception used to signal a stop in processing."""
 
@@ -249,6 +285,47 @@ def _check_failure_threshold(
         )
 
 
+def _seed_title_embeddings(
+    embedder: DefaultIndexingEmbedder,
+    document_index: DocumentIndex,
+    documents: list[Document],
+    tenant_id: str,
+) -> None:
+    """Seeds the title embedding cache with the title embeddings already stored in the
+    index so that a reindex into the same index does not have to embed them again.
+    Titles that changed since they were indexed are not reused."""
+    titles = {
+        document.id: title
+        for document in documents
+        if (title := document.get_title_for_document_index())
+    }
+    missing_titles = set(embedder.get_missing_titles(list(titles.values())))
+    document_ids = [
+        document_id for document_id, title in titles.items() if title in missing_titles
+    ]
+    if not document_ids:
+        return
+
+    try:
+        stored_title_embeddings = document_index.get_title_embeddings(
+            document_ids, tenant_id=tenant_id
+        )
+    except Exception:
+        logger.exception("Failed to fetch stored title embeddings, skipping seeding")
+        return
+
+    embedder.seed_title_embeddings(
+        {
+            stored_title: title_embedding
+            for document_id, (
+                stored_title,
+                title_embedding,
+            ) in stored_title_embeddings.items()
+            if stored_title == titles[document_id]
+        }
+    )
+
+
 def _run_indexing(
     db_session: Session,
     index_attempt_id: int,
@@ -440,182 +517,202 @@ def _run_indexing(
                 error for error in unresolved_errors if error.entity_id
             ]
 
-        while checkpoint.has_more:
-            logger.info(
-                f"Running '{ctx.source.value}' connector with checkpoint: {checkpoint}"
-            )
-            for document_batch, failure, next_checkpoint in connector_runner.run(
-                checkpoint
-            ):
-                # Check if connector is disabled mid run and stop if so unless it's the secondary
-                # index being built. We want to populate it even for paused connectors
-                # Often paused connectors are sources that aren't updated frequently but the
-                # contents still need to be initially pulled.
-                if callback:
-                    if callback.should_stop():
-                        raise ConnectorStopSignal("Connector stop signal detected")
-
-                    # NOTE: this progress callback runs on every loop. We've seen cases
-                    # where we loop many times with no new documents and eventually time
-                    # out, so only doing the callback after indexing isn't sufficient.
-                    callback.progress("_run_indexing", 0)
-
-                # TODO: should we move this into the above callback instead?
+        # The connector is run in a background thread and fetches up to
+        # INDEXING_PIPELINE_QUEUE_DEPTH batches ahead while the current batch is
+        # chunked, embedded and written. Items are consumed in order, so a checkpoint
+        # is only saved once every batch fetched before it has been indexed.
+        for (
+            document_batch,
+            failure,
+            next_checkpoint,
+            checkpoint_complete,
+        ) in prefetch_generator(
+            _run_connector(connector_runner, checkpoint, ctx.source),
+            INDEXING_PIPELINE_QUEUE_DEPTH,
+        ):
+            if checkpoint_complete and next_checkpoint:
+                checkpoint = next_checkpoint
+
+                # `make sure the checkpoints aren't getting too large`at some regular interval
+                CHECKPOINT_SIZE_CHECK_INTERVAL = 100
+                if batch_num % CHECKPOINT_SIZE_CHECK_INTERVAL == 0:
+                    check_checkpoint_size(checkpoint)
+
+                # save latest checkpoint
                 with get_session_with_current_tenant() as db_session_temp:
-                    # will exception if the connector/index attempt is marked as paused/failed
-                    _check_connector_and_attempt_status(
-                        db_session_temp, ctx, index_attempt_id
+                    save_checkpoint(
+                        db_session=db_session_temp,
+                        index_attempt_id=index_attempt_id,
+                        checkpoint=checkpoint,
                     )
+                continue
+
+            # Check if connector is disabled mid run and stop if so unless it's the secondary
+            # index being built. We want to populate it even for paused connectors
+            # Often paused connectors are sources that aren't updated frequently but the
+            # contents still need to be initially pulled.
+            if callback:
+                if callback.should_stop():
+                    raise ConnectorStopSignal("Connector stop signal detected")
+
+                # NOTE: this progress callback runs on every loop. We've seen cases
+                # where we loop many times with no new documents and eventually time
+                # out, so only doing the callback after indexing isn't sufficient.
+                callback.progress("_run_indexing", 0)
+
+            # TODO: should we move this into the above callback instead?
+            with get_session_with_current_tenant() as db_session_temp:
+                # will exception if the connector/index attempt is marked as paused/failed
+                _check_connector_and_attempt_status(
+                    db_session_temp, ctx, index_attempt_id
+                )
 
-                # save record of any failures at the connector level
-                if failure is not None:
-                    total_failures += 1
-                    with get_session_with_current_tenant() as db_session_temp:
-                        create_index_attempt_error(
-                            index_attempt_id,
-                            ctx.cc_pair_id,
-                            failure,
-                            db_session_temp,
-                        )
-
-                    _check_failure_threshold(
-                        total_failures, document_count, batch_num, failure
+            # save record of any failures at the connector level
+            if failure is not None:
+                total_failures += 1
+                with get_session_with_current_tenant() as db_session_temp:
+                    create_index_attempt_error(
+                        index_attempt_id,
+                        ctx.cc_pair_id,
+                        failure,
+                        db_session_temp,
                     )
 
-                # save the new checkpoint (if one is provided)
-                if next_checkpoint:
-                    checkpoint = next_checkpoint
+                _check_failure_threshold(
+                    total_failures, document_count, batch_num, failure
+                )
 
-                # below is all document processing logic, so if no batch we can just continue
-                if document_batch is None:
-                    continue
+            # save the new checkpoint (if one is provided)
+            if next_checkpoint:
+                checkpoint = next_checkpoint
 
-                batch_description = []
+            # below is all document processing logic, so if no batch we can just continue
+            if document_batch is None:
+                continue
 
-                # Generate an ID that can be used to correlate activity between here
-                # and the embedding model server
-                doc_batch_cleaned = strip_null_characters(document_batch)
-                for doc in doc_batch_cleaned:
-                    batch_description.append(doc.to_short_descriptor())
+            batch_description = []
 
-                    doc_size = 0
-                    for section in doc.sections:
-                        if (
-                            isinstance(section, TextSection)
-                            and section.text is not None
-                        ):
-                            doc_size += len(section.text)
+            # Generate an ID that can be used to correlate activity between here
+            # and the embedding model server
+            doc_batch_cleaned = strip_null_characters(document_batch)
+            for doc in doc_batch_cleaned:
+                batch_description.append(doc.to_short_descriptor())
 
-                    if doc_size > INDEXING_SIZE_WARNING_THRESHOLD:
-                        logger.warning(
-                            f"Document size: doc='{doc.to_short_descriptor()}' "
-                            f"size={doc_size} "
-                            f"threshold={INDEXING_SIZE_WARNING_THRESHOLD}"
-                        )
+                doc_size = 0
+                for section in doc.sections:
+                    if isinstance(section, TextSection) and section.text is not None:
+                        doc_size += len(section.text)
+
+                if doc_size > INDEXING_SIZE_WARNING_THRESHOLD:
+                    logger.warning(
+                        f"Document size: doc='{doc.to_short_descriptor()}' "
+                        f"size={doc_size} "
+                        f"threshold={INDEXING_SIZE_WARNING_THRESHOLD}"
+                    )
 
-                logger.debug(f"Indexing batch of documents: {batch_description}")
+            logger.debug(f"Indexing batch of documents: {batch_description}")
 
-                index_attempt_md.request_id = make_randomized_onyx_request_id("CIX")
-                index_attempt_md.structured_id = (
-                    f"{tenant_id}:{ctx.cc_pair_id}:{index_attempt_id}:{batch_num}"
-                )
-                index_attempt_md.batch_num = batch_num + 1  # use 1-index for this
+            index_attempt_md.request_id = make_randomized_onyx_request_id("CIX")
+            index_attempt_md.structured_id = (
+                f"{tenant_id}:{ctx.cc_pair_id}:{index_attempt_id}:{batch_num}"
+            )
+            index_attempt_md.batch_num = batch_num + 1  # use 1-index for this
 
-                # real work happens here!
-                index_pipeline_result = indexing_pipeline(
-                    document_batch=doc_batch_cleaned,
-                    index_attempt_metadata=index_attempt_md,
+            # a reindex into the live index re-embeds the same titles, reuse the
+            # ones that are already stored there
+            if (
+                ctx.from_beginning
+                and ctx.search_settings_status == IndexModelStatus.PRESENT
+            ):
+                _seed_title_embeddings(
+                    embedder=embedding_model,
+                    document_index=document_index,
+                    documents=doc_batch_cleaned,
+                    tenant_id=tenant_id,
                 )
 
-                batch_num += 1
-                net_doc_change += index_pipeline_result.new_docs
-                chunk_count += index_pipeline_result.total_chunks
-                document_count += index_pipeline_result.total_docs
-
-                # resolve errors for documents that were successfully indexed
-                failed_document_ids = [
-                    failure.failed_document.document_id
-                    for failure in index_pipeline_result.failures
-                    if failure.failed_document
-                ]
-                successful_document_ids = [
-                    document.id
-                    for document in document_batch
-                    if document.id not in failed_document_ids
-                ]
-                for document_id in successful_document_ids:
-                    with get_session_with_current_tenant() as db_session_temp:
-                        if document_id in doc_id_to_unresolved_errors:
-                            logger.info(
-                                f"Resolving IndexAttemptError for document '{document_id}'"
-                            )
-                            for error in doc_id_to_unresolved_errors[document_id]:
-                                error.is_resolved = True
-                                db_session_temp.add(error)
-                        db_session_temp.commit()
-
-                # add brand new failures
-                if index_pipeline_result.failures:
-                    total_failures += len(index_pipeline_result.failures)
-                    with get_session_with_current_tenant() as db_session_temp:
-                        for failure in index_pipeline_result.failures:
-                            create_index_attempt_error(
-                                index_attempt_id,
-                                ctx.cc_pair_id,
-                                failure,
-                                db_session_temp,
-                            )
+            # real work happens here!
+            index_pipeline_result = indexing_pipeline(
+                document_batch=doc_batch_cleaned,
+                index_attempt_metadata=index_attempt_md,
+            )
 
-                    _check_failure_threshold(
-                        total_failures,
-                        document_count,
-                        batch_num,
-                        index_pipeline_result.failures[-1],
-                    )
+            batch_num += 1
+            net_doc_change += index_pipeline_result.new_docs
+            chunk_count += index_pipeline_result.total_chunks
+            document_count += index_pipeline_result.total_docs
 
-                # This new value is updated every batch, so UI can refresh per batch update
+            # resolve errors for documents that were successfully indexed
+            failed_document_ids = [
+                failure.failed_document.document_id
+                for failure in index_pipeline_result.failures
+                if failure.failed_document
+            ]
+            successful_document_ids = [
+                document.id
+                for document in document_batch
+                if document.id not in failed_document_ids
+            ]
+            for document_id in successful_document_ids:
                 with get_session_with_current_tenant() as db_session_temp:
-                    # NOTE: Postgres uses the start of the transactions when computing `NOW()`
-                    # so we need either to commit() or to use a new session
-                    update_docs_indexed(
-                        db_session=db_session_temp,
-                        index_attempt_id=index_attempt_id,
-                        total_docs_indexed=document_count,
-                        new_docs_indexed=net_doc_change,
-                        docs_removed_from_index=0,
-                    )
+                    if document_id in doc_id_to_unresolved_errors:
+                        logger.info(
+                            f"Resolving IndexAttemptError for document '{document_id}'"
+                        )
+                        for error in doc_id_to_unresolved_errors[document_id]:
+                            error.is_resolved = True
+                            db_session_temp.add(error)
+                    db_session_temp.commit()
+
+            # add brand new failures
+            if index_pipeline_result.failures:
+                total_failures += len(index_pipeline_result.failures)
+                with get_session_with_current_tenant() as db_session_temp:
+                    for failure in index_pipeline_result.failures:
+                        create_index_attempt_error(
+                            index_attempt_id,
+                            ctx.cc_pair_id,
+                            failure,
+                            db_session_temp,
+                        )
 
-                if callback:
-                    callback.progress("_run_indexing", len(doc_batch_cleaned))
-
-                # Add telemetry for indexing progress
-                optional_telemetry(
-                    record_type=RecordType.INDEXING_PROGRESS,
-                    data={
-                        "index_attempt_id": index_attempt_id,
-                        "cc_pair_id": ctx.cc_pair_id,
-                        "current_docs_indexed": document_count,
-                        "current_chunks_indexed": chunk_count,
-                        "source": ctx.source.value,
-                    },
-                    tenant_id=tenant_id,
+                _check_failure_threshold(
+                    total_failures,
+                    document_count,
+                    batch_num,
+                    index_pipeline_result.failures[-1],
                 )
 
-                memory_tracer.increment_and_maybe_trace()
-
-            # `make sure the checkpoints aren't getting too large`at some regular interval
-            CHECKPOINT_SIZE_CHECK_INTERVAL = 100
-            if batch_num % CHECKPOINT_SIZE_CHECK_INTERVAL == 0:
-                check_checkpoint_size(checkpoint)
-
-            # save latest checkpoint
+            # This new value is updated every batch, so UI can refresh per batch update
             with get_session_with_current_tenant() as db_session_temp:
-                save_checkpoint(
+                # NOTE: Postgres uses the start of the transactions when computing `NOW()`
+                # so we need either to commit() or to use a new session
+                update_docs_indexed(
                     db_session=db_session_temp,
                     index_attempt_id=index_attempt_id,
-                    checkpoint=checkpoint,
+                    total_docs_indexed=document_count,
+                    new_docs_indexed=net_doc_change,
+                    docs_removed_from_index=0,
                 )
 
+            if callback:
+                callback.progress("_run_indexing", len(doc_batch_cleaned))
+
+            # Add telemetry for indexing progress
+            optional_telemetry(
+                record_type=RecordType.INDEXING_PROGRESS,
+                data={
+                    "index_attempt_id": index_attempt_id,
+                    "cc_pair_id": ctx.cc_pair_id,
+                    "current_docs_indexed": document_count,
+                    "current_chunks_indexed": chunk_count,
+                    "source": ctx.source.value,
+                },
+                tenant_id=tenant_id,
+            )
+
+            memory_tracer.increment_and_maybe_trace()
+
         optional_telemetry(
             record_type=RecordType.INDEXING_COMPLETE,
             data={
@@ -765,6 +862,22 @@ def _run_indexing(
                 f"elapsed={elapsed_time:.2f}s"
             )
 
+        if embedding_model.embedding_cache is not None:
+            logger.info(
+                f"Embedding cache: "
+                f"hits={embedding_model.embedding_cache_hits} "
+                f"misses={embedding_model.embedding_cache_misses}"
+            )
+        if embedding_model.embedding_model.num_padded_tokens:
+            logger.info(
+                f"Embedding batches: "
+                f"padding_ratio={embedding_model.embedding_model.padding_ratio:.3f}"
+            )
+        if embedding_model.title_embedding_cache is not None:
+            logger.info(
+                f"Title embedding cache: hits={embedding_model.title_embedding_cache_hits}"
+            )
+
         if ctx.is_primary:
             update_connector_credential_pair(
                 db_session=db_session_temp,
@@ -4,6 +4,7 @@ from uuid import UUID
 
 from fastapi import HTTPException
 from fastapi.datastructures import Headers
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 
 from onyx.auth.users import is_user_admin
@@ -17,7 +18,8 @@ from onyx.context.search.models import InferenceSection
 from onyx.context.search.models import RerankingDetails
 from onyx.context.search.models import RetrievalDetails
 from onyx.db.chat import create_chat_session
-from onyx.db.chat import get_chat_messages_by_session
+from onyx.db.chat import get_chat_message_tree_by_session
+from onyx.db.chat import get_chat_messages_by_ids
 from onyx.db.llm import fetch_existing_doc_sets
 from onyx.db.llm import fetch_existing_tools
 from onyx.db.models import ChatMessage
@@ -145,16 +147,15 @@ def create_chat_chain(
     prefetch_tool_calls: bool = True,
     # Optional id at which we finish processing
     stop_at_message_id: int | None = None,
+    # Optional token budget of the history, only the latest history messages that
+    # fit into it are loaded
+    max_history_tokens: int | None = None,
 ) -> tuple[ChatMessage, list[ChatMessage]]:
     """Build the linear chain of messages without including the root message"""
-    mainline_messages: list[ChatMessage] = []
+    mainline_messages: list[Row] = []
 
-    all_chat_messages = get_chat_messages_by_session(
-        chat_session_id=chat_session_id,
-        user_id=None,
-        db_session=db_session,
-        skip_permission_check=True,
-        prefetch_tool_calls=prefetch_tool_calls,
+    all_chat_messages = get_chat_message_tree_by_session(
+        chat_session_id=chat_session_id, db_session=db_session
     )
     id_to_msg = {msg.id: msg for msg in all_chat_messages}
 
@@ -167,8 +168,8 @@ def create_chat_chain(
             "Invalid root message, unable to fetch valid chat message sequence"
         )
 
-    current_message: ChatMessage | None = root_message
-    previous_message: ChatMessage | None = None
+    current_message: Row | None = root_message
+    previous_message: Row | None = None
     while current_message is not None:
         child_msg = current_message.latest_child_message
 
@@ -202,7 +203,23 @@ def create_chat_chain(
     if not mainline_messages:
         raise RuntimeError("Could not trace chat message history")
 
-    return mainline_messages[-1], mainline_messages[:-1]
+    history_start = 0
+    if max_history_tokens is not None:
+        # the stored token counts are used, messages that don't fit into the budget
+        # would be dropped when building the prompt anyways
+        history_tokens = 0
+        for ind in range(len(mainline_messages) - 2, -1, -1):
+            history_tokens += mainline_messages[ind].token_count
+            if history_tokens > max_history_tokens:
+                history_start = ind + 1
+                break
+
+    chain = get_chat_messages_by_ids(
+        chat_message_ids=[msg.id for msg in mainline_messages[history_start:]],
+        db_session=db_session,
+        prefetch_tool_calls=prefetch_tool_calls,
+    )
+    return chain[-1], chain[:-1]
 
 
 def combine_message_chain(
@@ -135,6 +135,13 @@ class LLMRelevanceFilterResponse(BaseModel):
     llm_selected_doc_indices: list[int]
 
 
+class RerankedDocsResponse(BaseModel):
+    """Order of the documents of the preceding QADocsResponse once they are reranked,
+    as indices into its top_documents"""
+
+    reranked_doc_indices: list[int]
+
+
 class FinalUsedContextDocsResponse(BaseModel):
     final_context_docs: list[LlmDoc]
 
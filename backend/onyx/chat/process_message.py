@@ -8,6 +8,7 @@ from typing import cast
 from typing import Protocol
 from uuid import UUID
 
+from prometheus_client import Histogram
 from sqlalchemy.orm import Session
 
 from onyx.agents.agent_search.orchestration.nodes.call_tool import ToolCallException
@@ -35,6 +36,7 @@ from onyx.chat.models import OnyxAnswerPiece
 from onyx.chat.models import PromptConfig
 from onyx.chat.models import QADocsResponse
 from onyx.chat.models import RefinedAnswerImprovement
+from onyx.chat.models import RerankedDocsResponse
 from onyx.chat.models import StreamingError
 from onyx.chat.models import StreamStopInfo
 from onyx.chat.models import StreamStopReason
@@ -47,6 +49,7 @@ from onyx.configs.chat_configs import CHAT_TARGET_CHUNK_PERCENTAGE
 from onyx.configs.chat_configs import DISABLE_LLM_CHOOSE_SEARCH
 from onyx.configs.chat_configs import MAX_CHUNKS_FED_TO_CHAT
 from onyx.configs.chat_configs import SELECTED_SECTIONS_MAX_WINDOW_PERCENTAGE
+from onyx.configs.chat_configs import STREAMING_SEARCH_POSTPROCESSING
 from onyx.configs.constants import AGENT_SEARCH_INITIAL_KEY
 from onyx.configs.constants import BASIC_KEY
 from onyx.configs.constants import MessageType
@@ -67,6 +70,7 @@ from onyx.context.search.utils import chunks_or_sections_to_search_docs
 from onyx.context.search.utils import dedupe_documents
 from onyx.context.search.utils import drop_llm_indices
 from onyx.context.search.utils import relevant_sections_to_indices
+from onyx.context.search.utils import reranked_sections_to_indices
 from onyx.db.chat import attach_files_to_chat_message
 from onyx.db.chat import create_db_search_doc
 from onyx.db.chat import create_new_chat_message
@@ -144,6 +148,9 @@ from onyx.tools.tool_implementations.internet_search.internet_search_tool import
 from onyx.tools.tool_implementations.search.search_tool import (
     FINAL_CONTEXT_DOCUMENTS_ID,
 )
+from onyx.tools.tool_implementations.search.search_tool import (
+    SEARCH_RERANKED_SECTIONS_ID,
+)
 from onyx.tools.tool_implementations.search.search_tool import (
     SEARCH_RESPONSE_SUMMARY_ID,
 )
@@ -161,6 +168,12 @@ from onyx.utils.timing import log_generator_function_time
 from shared_configs.contextvars import get_current_tenant_id
 
 logger = setup_logger()
+
+_TIME_TO_FIRST_TOKEN_SECONDS = Histogram(
+    "onyx_chat_time_to_first_token_seconds",
+    "Time from receiving a chat message to streaming the first answer token",
+    ["streaming_search_postprocessing"],
+)
 ERROR_TYPE_CANCELLED = "cancelled"
 
 COMMON_TOOL_RESPONSE_TYPES = {
@@ -464,6 +477,7 @@ ChatPacket = (
     StreamingError
     | QADocsResponse
     | LLMRelevanceFilterResponse
+    | RerankedDocsResponse
     | FinalUsedContextDocsResponse
     | ChatMessageDetail
     | OnyxAnswerPiece
@@ -574,6 +588,20 @@ def _process_tool_response(
             )
 
         yield LLMRelevanceFilterResponse(llm_selected_doc_indices=llm_indices)
+    elif packet.id == SEARCH_RERANKED_SECTIONS_ID:
+        if info.reference_db_search_docs is None:
+            logger.warning("No reference docs found for reranking")
+            return info_by_subq
+
+        yield RerankedDocsResponse(
+            reranked_doc_indices=reranked_sections_to_indices(
+                reranked_sections=cast(list[InferenceSection], packet.response),
+                items=[
+                    translate_db_search_doc_to_server_search_doc(doc)
+                    for doc in info.reference_db_search_docs
+                ],
+            )
+        )
     elif packet.id == FINAL_CONTEXT_DOCUMENTS_ID:
         yield FinalUsedContextDocsResponse(final_context_docs=packet.response)
 
@@ -653,6 +681,8 @@ def stream_chat_message_objects(
     3. [always] A set of streamed LLM tokens or an error anywhere along the line if something fails
     4. [always] Details on the final AI response message that is created
     """
+    stream_start_time = time.monotonic()
+    first_token_time: float | None = None
     tenant_id = get_current_tenant_id()
     use_existing_user_message = new_msg_req.use_existing_user_message
     existing_assistant_message_id = new_msg_req.existing_assistant_message_id
@@ -776,6 +806,7 @@ def stream_chat_message_objects(
                 stop_at_message_id=parent_id,
                 chat_session_id=chat_session_id,
                 db_session=db_session,
+                max_history_tokens=llm.config.max_input_tokens,
             )
 
         elif not use_existing_user_message:
@@ -794,7 +825,9 @@ def stream_chat_message_objects(
             )
             # re-create linear history of messages
             final_msg, history_msgs = create_chat_chain(
-                chat_session_id=chat_session_id, db_session=db_session
+                chat_session_id=chat_session_id,
+                db_session=db_session,
+                max_history_tokens=llm.config.max_input_tokens,
             )
             if final_msg.id != user_message.id:
                 db_session.rollback()
@@ -808,7 +841,9 @@ def stream_chat_message_objects(
         else:
             # re-create linear history of messages
             final_msg, history_msgs = create_chat_chain(
-                chat_session_id=chat_session_id, db_session=db_session
+                chat_session_id=chat_session_id,
+                db_session=db_session,
+                max_history_tokens=llm.config.max_input_tokens,
             )
             if existing_assistant_message_id is None:
                 if final_msg.message_type != MessageType.USER:
@@ -1317,6 +1352,18 @@ def stream_chat_message_objects(
                         SubQuestionKey(level=level, question_num=level_question_num)
                     ]
                     info.tool_result = packet
+                elif (
+                    isinstance(packet, OnyxAnswerPiece)
+                    and packet.answer_piece
+                    and first_token_time is None
+                ):
+                    first_token_time = time.monotonic() - stream_start_time
+                    _TIME_TO_FIRST_TOKEN_SECONDS.labels(
+                        streaming_search_postprocessing=str(
+                            STREAMING_SEARCH_POSTPROCESSING
+                        ).lower()
+                    ).observe(first_token_time)
+                    logger.debug(f"Time to first token: {first_token_time:.2f}s")
                 yield cast(ChatPacket, packet)
 
     except ValueError as e:
@@ -1,6 +1,6 @@
+import hashlib
 import json
 from collections import defaultdict
-from copy import deepcopy
 from typing import TypeVar
 
 from pydantic import BaseModel
@@ -16,11 +16,13 @@ from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.llm.interfaces import LLMConfig
+from onyx.natural_language_processing.utils import BaseTokenizer
 from onyx.natural_language_processing.utils import get_tokenizer
 from onyx.natural_language_processing.utils import tokenizer_trim_content
 from onyx.prompts.prompt_utils import build_doc_context_str
 from onyx.tools.tool_implementations.search.search_utils import section_to_dict
 from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_lru_cache import TTLLRUCache
 
 
 logger = setup_logger()
@@ -32,6 +34,13 @@ _METADATA_TOKEN_ESTIMATE = 75
 # this is only used to log a warning so we can be more forgiving with the buffer
 _OVERCOUNT_ESTIMATE = 256
 
+# Agent flows prune overlapping sets of sections many times, so the token counts of
+# the section contents (and the text around them) are memoized per process
+# (tokenizer, sha256 of the text) -> token count
+_TOKEN_COUNT_CACHE: TTLLRUCache[tuple[BaseTokenizer, bytes], int] = TTLLRUCache(
+    max_size=8192
+)
+
 
 class PruningError(Exception):
     pass
@@ -121,6 +130,58 @@ def reorder_sections(
     return reordered_sections
 
 
+def _count_tokens(text: str, tokenizer: BaseTokenizer) -> int:
+    key = (tokenizer, hashlib.sha256(text.encode("utf-8")).digest())
+    token_count = _TOKEN_COUNT_CACHE.get(key)
+    if token_count is None:
+        token_count = len(tokenizer.encode(text))
+        _TOKEN_COUNT_CACHE.put(key, token_count)
+    return token_count
+
+
+def _section_token_count(
+    section: InferenceSection,
+    ind: int,
+    using_tool_message: bool,
+    tokenizer: BaseTokenizer,
+) -> int:
+    """Token count of the section as it is passed to the LLM. The content is counted
+    separately from the text around it (which contains the index of the section),
+    so its memoized count is reused when the section shows up at another index."""
+    if using_tool_message:
+        section_dict = section_to_dict(section, ind)
+        content = json.dumps(section_dict["content"])
+        section_dict["content"] = ""
+        frame = json.dumps(section_dict)
+    else:
+        content = section.combined_content.strip()
+        frame = build_doc_context_str(
+            semantic_identifier=section.center_chunk.semantic_identifier,
+            source_type=section.center_chunk.source_type,
+            content="",
+            metadata_dict=section.center_chunk.metadata,
+            updated_at=section.center_chunk.updated_at,
+            ind=ind,
+        )
+    return _count_tokens(frame, tokenizer) + _count_tokens(content, tokenizer)
+
+
+def _with_trimmed_content(
+    section: InferenceSection, desired_length: int, tokenizer: BaseTokenizer
+) -> InferenceSection:
+    """Shallow copy of the section with its content trimmed, the passed in
+    section (and its chunks) are shared with the caller and must not be modified."""
+    return section.model_copy(
+        update={
+            "combined_content": tokenizer_trim_content(
+                content=section.combined_content,
+                desired_length=desired_length,
+                tokenizer=tokenizer,
+            )
+        }
+    )
+
+
 def _remove_sections_to_ignore(
     sections: list[InferenceSection],
 ) -> list[InferenceSection]:
@@ -144,7 +205,8 @@ def _apply_pruning(
         provider_type=llm_config.model_provider,
         model_name=llm_config.model_name,
     )
-    sections = deepcopy(sections)  # don't modify in place
+    # NOTE: the sections are not copied, only the ones that get trimmed are replaced
+    # with (shallow) copies, so nothing may be modified in place below
 
     # re-order docs with all the "relevant" docs at the front
     sections = reorder_sections(
@@ -159,23 +221,12 @@ def _apply_pruning(
     final_section_ind = None
     total_tokens = 0
     for ind, section in enumerate(sections):
-        section_str = (
-            # If using tool message, it will be a bit of an overestimate as the extra json text around the section
-            # will be counted towards the token count. However, once the Sections are merged, the extra json parts
-            # that overlap will not be counted multiple times like it is in the pruning step.
-            json.dumps(section_to_dict(section, ind))
-            if using_tool_message
-            else build_doc_context_str(
-                semantic_identifier=section.center_chunk.semantic_identifier,
-                source_type=section.center_chunk.source_type,
-                content=section.combined_content,
-                metadata_dict=section.center_chunk.metadata,
-                updated_at=section.center_chunk.updated_at,
-                ind=ind,
-            )
+        # If using tool message, it will be a bit of an overestimate as the extra json text around the section
+        # will be counted towards the token count. However, once the Sections are merged, the extra json parts
+        # that overlap will not be counted multiple times like it is in the pruning step.
+        section_token_count = _section_token_count(
+            section, ind, using_tool_message, llm_tokenizer
         )
-
-        section_token_count = len(llm_tokenizer.encode(section_str))
         # if not using sections (specifically, using Sections where each section maps exactly to the one center chunk),
         # truncate chunks that are way too long. This can happen if the embedding model tokenizer is different
         # than the LLM tokenizer
@@ -197,10 +248,8 @@ def _apply_pruning(
                     "Found more tokens in Section than expected, "
                     "likely mismatch between embedding and LLM tokenizers. Trimming content..."
                 )
-            section.combined_content = tokenizer_trim_content(
-                content=section.combined_content,
-                desired_length=DOC_EMBEDDING_CONTEXT_SIZE,
-                tokenizer=llm_tokenizer,
+            sections[ind] = _with_trimmed_content(
+                section, DOC_EMBEDDING_CONTEXT_SIZE, llm_tokenizer
             )
             section_token_count = DOC_EMBEDDING_CONTEXT_SIZE
 
@@ -241,8 +290,8 @@ def _apply_pruning(
             amount_to_truncate = total_tokens - token_limit
             # NOTE: need to recalculate the length here, since the previous calculation included
             # overhead from JSON-fying the doc / the metadata
-            final_doc_content_length = len(
-                llm_tokenizer.encode(sections[final_section_ind].combined_content)
+            final_doc_content_length = _count_tokens(
+                sections[final_section_ind].combined_content, llm_tokenizer
             ) - (amount_to_truncate)
             # this could occur if we only have space for the title / metadata
             # not ideal, but it's the most reasonable thing to do
@@ -256,10 +305,10 @@ def _apply_pruning(
                 )
                 sections.pop()
             else:
-                sections[final_section_ind].combined_content = tokenizer_trim_content(
-                    content=sections[final_section_ind].combined_content,
-                    desired_length=final_doc_content_length,
-                    tokenizer=llm_tokenizer,
+                sections[final_section_ind] = _with_trimmed_content(
+                    sections[final_section_ind],
+                    final_doc_content_length,
+                    llm_tokenizer,
                 )
         else:
             # For search on chunk level (Section is just a chunk), don't truncate the final Chunk/Section unless it's the only one
@@ -267,12 +316,13 @@ def _apply_pruning(
             if final_section_ind != 0:
                 sections = sections[:final_section_ind]
             else:
-                sections[0].combined_content = tokenizer_trim_content(
-                    content=sections[0].combined_content,
-                    desired_length=token_limit - _METADATA_TOKEN_ESTIMATE,
-                    tokenizer=llm_tokenizer,
-                )
-                sections = [sections[0]]
+                sections = [
+                    _with_trimmed_content(
+                        sections[0],
+                        token_limit - _METADATA_TOKEN_ESTIMATE,
+                        llm_tokenizer,
+                    )
+                ]
 
     return sections
 
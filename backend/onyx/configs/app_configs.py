@@ -133,6 +133,14 @@ TRACK_EXTERNAL_IDP_EXPIRY = (
     os.environ.get("TRACK_EXTERNAL_IDP_EXPIRY", "").lower() == "true"
 )
 
+# Number of user ACLs (the groups / external groups a user belongs to) cached per
+# process, so that repeated searches skip the group membership queries. Entries are
+# invalidated through a version stamp in Redis whenever group memberships change.
+# Set to 0 to disable the cache.
+USER_ACL_CACHE_SIZE = int(os.environ.get("USER_ACL_CACHE_SIZE") or 10_000)
+# Upper bound on how long a cached ACL is used, even without an invalidation
+USER_ACL_CACHE_TTL_SECONDS = int(os.environ.get("USER_ACL_CACHE_TTL_SECONDS") or 300)
+
 
 #####
 # DB Configs
@@ -163,6 +171,13 @@ VESPA_CLOUD_KEY_PATH = os.environ.get("VESPA_CLOUD_KEY_PATH")
 # Number of documents in a batch during indexing (further batching done by chunks before passing to bi-encoder)
 INDEX_BATCH_SIZE = int(os.environ.get("INDEX_BATCH_SIZE") or 16)
 
+# Number of connector batches that may be fetched ahead of the batch currently being
+# chunked / embedded / written. The connector runs in a background thread while
+# documents are indexed. Set to 0 to fetch and index strictly in sequence.
+INDEXING_PIPELINE_QUEUE_DEPTH = int(
+    os.environ.get("INDEXING_PIPELINE_QUEUE_DEPTH") or 2
+)
+
 MAX_DRIVE_WORKERS = int(os.environ.get("MAX_DRIVE_WORKERS", 4))
 
 # Below are intended to match the env variables names used by the official postgres docker image
@@ -312,6 +327,23 @@ except ValueError:
 # The maximum number of tasks that can be queued up to sync to Vespa in a single pass
 VESPA_SYNC_MAX_TASKS = 1024
 
+# The number of documents synced to Vespa by a single metadata sync task.
+# Document set / user group / stale doc syncs generate one task per batch of this size.
+VESPA_SYNC_BATCH_SIZE = int(os.environ.get("VESPA_SYNC_BATCH_SIZE") or 64)
+
+# The number of documents whose external permissions are updated by a single permission
+# sync task
+DOC_PERMISSION_SYNC_BATCH_SIZE = int(
+    os.environ.get("DOC_PERMISSION_SYNC_BATCH_SIZE") or 200
+)
+
+# When re-indexing, resolve the chunk ranges of a whole batch of documents with a single
+# grouped query and remove stale chunks with selection based deletes instead of one
+# request per document / chunk. Set to `false` to go back to the per chunk requests.
+VESPA_BULK_CHUNK_CLEANUP = (
+    os.environ.get("VESPA_BULK_CHUNK_CLEANUP", "true").lower() == "true"
+)
+
 DB_YIELD_PER_DEFAULT = 64
 
 #####
@@ -330,6 +362,21 @@ ENABLED_CONNECTOR_TYPES = os.environ.get("ENABLED_CONNECTOR_TYPES") or ""
 # for some connectors
 ENABLE_EXPENSIVE_EXPERT_CALLS = False
 
+# Share API rate limits through Redis, so that cc_pairs of the same source and host that
+# index in parallel on different workers don't each use up the quota of the external API.
+# Used by the connectors that call get_connector_rate_limiter (Confluence and Zendesk).
+CONNECTOR_REDIS_RATE_LIMIT_ENABLED = (
+    os.environ.get("CONNECTOR_REDIS_RATE_LIMIT_ENABLED", "").lower() == "true"
+)
+# Max requests per second to one host, across all workers of a tenant
+CONNECTOR_REDIS_RATE_LIMIT_REQUESTS_PER_SECOND = float(
+    os.environ.get("CONNECTOR_REDIS_RATE_LIMIT_REQUESTS_PER_SECOND") or 10
+)
+# Max requests in flight to one host, across all workers of a tenant. 0 means no limit
+CONNECTOR_REDIS_RATE_LIMIT_MAX_CONCURRENCY = int(
+    os.environ.get("CONNECTOR_REDIS_RATE_LIMIT_MAX_CONCURRENCY") or 0
+)
+
 
 # TODO these should be available for frontend configuration, via advanced options expandable
 WEB_CONNECTOR_IGNORED_CLASSES = os.environ.get(
@@ -342,6 +389,20 @@ WEB_CONNECTOR_OAUTH_CLIENT_ID = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_ID")
 WEB_CONNECTOR_OAUTH_CLIENT_SECRET = os.environ.get("WEB_CONNECTOR_OAUTH_CLIENT_SECRET")
 WEB_CONNECTOR_OAUTH_TOKEN_URL = os.environ.get("WEB_CONNECTOR_OAUTH_TOKEN_URL")
 WEB_CONNECTOR_VALIDATE_URLS = os.environ.get("WEB_CONNECTOR_VALIDATE_URLS")
+# Number of pages the web connector crawls at once. Each crawler thread starts its own
+# browser the first time one of its pages needs it.
+WEB_CONNECTOR_CONCURRENCY = int(os.environ.get("WEB_CONNECTOR_CONCURRENCY") or 1)
+# Index static pages from a plain HTTP GET instead of rendering them in a browser. Pages
+# with little text or a "JavaScript disabled" message are still rendered.
+WEB_CONNECTOR_HTTP_FAST_PATH = (
+    os.environ.get("WEB_CONNECTOR_HTTP_FAST_PATH", "").lower() == "true"
+)
+# Keep the ETag / Last-Modified and the extracted document of every crawled page in Redis
+# for this long. Recrawls then send conditional requests and reuse the pages that were not
+# modified. 0 disables it.
+WEB_CONNECTOR_RECRAWL_CACHE_TTL_SECONDS = int(
+    os.environ.get("WEB_CONNECTOR_RECRAWL_CACHE_TTL_SECONDS") or 0
+)
 
 HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY = os.environ.get(
     "HTML_BASED_CONNECTOR_TRANSFORM_LINKS_STRATEGY",
@@ -381,6 +442,18 @@ CONFLUENCE_CONNECTOR_ATTACHMENT_CHAR_COUNT_THRESHOLD = int(
     os.environ.get("CONFLUENCE_CONNECTOR_ATTACHMENT_CHAR_COUNT_THRESHOLD", 200_000)
 )
 
+# Number of pages whose comments and attachments are fetched concurrently. Documents are
+# still returned in page order. Set to 1 to process pages one at a time.
+CONFLUENCE_CONNECTOR_PAGE_CONCURRENCY = int(
+    os.environ.get("CONFLUENCE_CONNECTOR_PAGE_CONCURRENCY") or 4
+)
+# Max requests per second sent to Confluence by one connector run, shared by all of its
+# threads. A rate limit response from Confluence pauses all of them. Set to 0 to only
+# rely on the rate limit responses.
+CONFLUENCE_CONNECTOR_REQUESTS_PER_SECOND = float(
+    os.environ.get("CONFLUENCE_CONNECTOR_REQUESTS_PER_SECOND") or 10
+)
+
 # A JSON-formatted array. Each item in the array should have the following structure:
 # {
 #     "user_id": "1234567890",
@@ -490,6 +563,12 @@ MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE = int(
     os.environ.get("MAX_PRUNING_DOCUMENT_RETRIEVAL_PER_MINUTE", 0)
 )
 
+# Maximum number of source document ids a pruning job keeps in memory, the rest are
+# spilled to sorted temporary files on disk before being compared with the indexed ids
+PRUNING_MAX_IN_MEMORY_DOC_IDS = int(
+    os.environ.get("PRUNING_MAX_IN_MEMORY_DOC_IDS") or 100_000
+)
+
 # comma delimited list of zendesk article labels to skip indexing for
 ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS = os.environ.get(
     "ZENDESK_CONNECTOR_SKIP_ARTICLE_LABELS", ""
@@ -616,6 +695,15 @@ CUSTOM_ANSWER_VALIDITY_CONDITIONS = json.loads(
 
 VESPA_REQUEST_TIMEOUT = int(os.environ.get("VESPA_REQUEST_TIMEOUT") or "15")
 
+# Size of the long lived connection pool used for search path Vespa queries, shared by
+# all threads of a process
+VESPA_QUERY_POOL_MAX_CONNECTIONS = int(
+    os.environ.get("VESPA_QUERY_POOL_MAX_CONNECTIONS") or "64"
+)
+VESPA_QUERY_POOL_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.environ.get("VESPA_QUERY_POOL_MAX_KEEPALIVE_CONNECTIONS") or "32"
+)
+
 SYSTEM_RECURSION_LIMIT = int(os.environ.get("SYSTEM_RECURSION_LIMIT") or "1000")
 
 PARSE_WITH_TRAFILATURA = os.environ.get("PARSE_WITH_TRAFILATURA", "").lower() == "true"
@@ -80,6 +80,12 @@ NUM_PERSONA_PROMPT_GENERATION_CHUNKS = 5
 DISABLE_LLM_DOC_RELEVANCE = (
     os.environ.get("DISABLE_LLM_DOC_RELEVANCE", "").lower() == "true"
 )
+# Streams the search results in retrieval order and then their new order once reranking is
+# done. The answer LLM starts on the reranked sections without waiting for the LLM relevance
+# evaluation of the sections, whose results are streamed after the answer.
+STREAMING_SEARCH_POSTPROCESSING = (
+    os.environ.get("STREAMING_SEARCH_POSTPROCESSING", "").lower() == "true"
+)
 
 # Stops streaming answers back to the UI if this pattern is seen:
 STOP_STREAM_PAT = os.environ.get("STOP_STREAM_PAT") or None
@@ -438,6 +438,9 @@ class OnyxCeleryTask:
     UPDATE_EXTERNAL_DOCUMENT_PERMISSIONS_TASK = (
         "update_external_document_permissions_task"
     )
+    UPDATE_EXTERNAL_DOCUMENT_PERMISSIONS_BATCH_TASK = (
+        "update_external_document_permissions_batch_task"
+    )
     CONNECTOR_EXTERNAL_GROUP_SYNC_GENERATOR_TASK = (
         "connector_external_group_sync_generator_task"
     )
@@ -445,6 +448,7 @@ class OnyxCeleryTask:
     CONNECTOR_PRUNING_GENERATOR_TASK = "connector_pruning_generator_task"
     DOCUMENT_BY_CC_PAIR_CLEANUP_TASK = "document_by_cc_pair_cleanup_task"
     VESPA_METADATA_SYNC_TASK = "vespa_metadata_sync_task"
+    VESPA_METADATA_SYNC_BATCH_TASK = "vespa_metadata_sync_batch_task"
 
     # chat retention
     CHECK_TTL_MANAGEMENT_TASK = "check_ttl_management_task"
@@ -46,6 +46,53 @@ EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE") or 0) or None
 BATCH_SIZE_ENCODE_CHUNKS = EMBEDDING_BATCH_SIZE or 8
 # don't send over too many chunks at once, as sending too many could cause timeouts
 BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES = EMBEDDING_BATCH_SIZE or 512
+# Sort texts by token count before splitting them into batches for a local embedding model,
+# so that long chunks and short mini-chunks / titles are not padded to the same length.
+EMBEDDING_LENGTH_BUCKETING = (
+    os.environ.get("EMBEDDING_LENGTH_BUCKETING", "true").lower() == "true"
+)
+# How the indexing pipeline receives embeddings from the model server. "json" is a list of
+# floats per vector. "float32" / "float16" return one packed base64 buffer per batch which
+# is kept as a numpy array all the way into the Vespa feed, avoiding per-float python objects.
+INDEXING_EMBEDDING_WIRE_FORMAT = (
+    os.environ.get("INDEXING_EMBEDDING_WIRE_FORMAT") or "json"
+).lower()
+# Local directory for a content addressed cache of passage embeddings. Chunks whose exact
+# embedded text was already embedded with the same model settings are not sent to the model
+# server again. Leave unset to disable the cache.
+INDEXING_EMBEDDING_CACHE_DIR = os.environ.get("INDEXING_EMBEDDING_CACHE_DIR") or ""
+# Least recently used embeddings are evicted once the cache holds more than this many vectors
+INDEXING_EMBEDDING_CACHE_MAX_ENTRIES = int(
+    os.environ.get("INDEXING_EMBEDDING_CACHE_MAX_ENTRIES") or 1_000_000
+)
+# Max number of title embeddings kept in memory per embedding model by each indexing worker,
+# titles shared by many documents are then only embedded once. Set to 0 to disable.
+INDEXING_TITLE_EMBEDDING_CACHE_SIZE = int(
+    os.environ.get("INDEXING_TITLE_EMBEDDING_CACHE_SIZE") or 10_000
+)
+# Query embeddings kept in memory by each API server process, repeated queries (expanded
+# queries, agent subquestions, popular Slack bot questions) then skip the model server.
+# Set to 0 to disable the cache.
+QUERY_EMBEDDING_CACHE_SIZE = int(os.environ.get("QUERY_EMBEDDING_CACHE_SIZE") or 4096)
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = int(
+    os.environ.get("QUERY_EMBEDDING_CACHE_TTL_SECONDS") or 3600
+)
+# Also share cached query embeddings across API server pods through Redis
+QUERY_EMBEDDING_CACHE_USE_REDIS = (
+    os.environ.get("QUERY_EMBEDDING_CACHE_USE_REDIS", "").lower() == "true"
+)
+# Cross-encoder scores of (query, chunk) pairs kept in memory by each API server process,
+# agent subquestions and refinement passes rerank many of the same pairs again.
+# Set to 0 to disable the cache.
+RERANK_SCORE_CACHE_SIZE = int(os.environ.get("RERANK_SCORE_CACHE_SIZE") or 16384)
+RERANK_SCORE_CACHE_TTL_SECONDS = int(
+    os.environ.get("RERANK_SCORE_CACHE_TTL_SECONDS") or 3600
+)
+# If set, chunks are reranked in windows of this many chunks (in retrieval order) and
+# reranking stops once a window does not change the ordering of the top
+# RERANK_STAGED_TOP_K chunks. Set to 0 to always rerank all num_rerank chunks at once.
+RERANK_STAGED_WINDOW_SIZE = int(os.environ.get("RERANK_STAGED_WINDOW_SIZE") or 0)
+RERANK_STAGED_TOP_K = int(os.environ.get("RERANK_STAGED_TOP_K") or 10)
 # For score display purposes, only way is to know the expected ranges
 CROSS_ENCODER_RANGE_MAX = 1
 CROSS_ENCODER_RANGE_MIN = 0
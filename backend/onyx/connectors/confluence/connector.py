@@ -9,6 +9,7 @@ from requests.exceptions import HTTPError
 from typing_extensions import override
 
 from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_LABELS_TO_SKIP
+from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_PAGE_CONCURRENCY
 from onyx.configs.app_configs import CONFLUENCE_TIMEZONE_OFFSET
 from onyx.configs.app_configs import CONTINUE_ON_CONNECTOR_FAILURE
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
@@ -43,6 +44,7 @@ from onyx.connectors.models import SlimDocument
 from onyx.connectors.models import TextSection
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.utils.logger import setup_logger
+from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
 logger = setup_logger()
 # Potential Improvements
@@ -204,6 +206,7 @@ class ConfluenceConnector(
             url=self.wiki_base,
             credentials_provider=credentials_provider,
             timeout=3,
+            rate_limiter=confluence_client.rate_limiter,
         )
         low_timeout_confluence_client._probe_connection(**self.probe_kwargs)
         low_timeout_confluence_client._initialize_connection(**self.final_kwargs)
@@ -458,6 +461,15 @@ class ConfluenceConnector(
                 )
         return doc
 
+    def _page_to_document(self, page: dict[str, Any]) -> Document | ConnectorFailure:
+        # Build doc from page
+        doc_or_failure = self._convert_page_to_document(page)
+        if isinstance(doc_or_failure, ConnectorFailure):
+            return doc_or_failure
+
+        # Now get attachments for that page
+        return self._fetch_page_attachments(page, doc_or_failure)
+
     def _fetch_document_batches(
         self,
         checkpoint: ConfluenceCheckpoint,
@@ -470,6 +482,9 @@ class ConfluenceConnector(
          - Then fetch attachments. For each attachment:
              - Attempt to convert it with convert_attachment_to_content(...)
              - If successful, create a new Section with the extracted text or summary.
+
+        The pages of one page of results are converted concurrently (up to
+        CONFLUENCE_CONNECTOR_PAGE_CONCURRENCY at a time) and yielded in order.
         """
         checkpoint = copy.deepcopy(checkpoint)
 
@@ -484,25 +499,41 @@ class ConfluenceConnector(
         def store_next_page_url(next_page_url: str) -> None:
             checkpoint.next_page_url = next_page_url
 
-        for page in self.confluence_client.paginated_page_retrieval(
+        page_iter = self.confluence_client.paginated_page_retrieval(
             cql_url=page_query_url,
             limit=self.batch_size,
             next_page_callback=store_next_page_url,
-        ):
-            # Build doc from page
-            doc_or_failure = self._convert_page_to_document(page)
-
-            if isinstance(doc_or_failure, ConnectorFailure):
-                yield doc_or_failure
-                continue
-            # Now get attachments for that page:
-            doc_or_failure = self._fetch_page_attachments(page, doc_or_failure)
+        )
+        exhausted = False
+        while not exhausted:
+            # the next page url is stored just before the last page of a page of
+            # results is returned, so this collects one page of results without
+            # requesting the next one
+            pages: list[dict[str, Any]] = []
+            for page in page_iter:
+                pages.append(page)
+                if (
+                    checkpoint.next_page_url
+                    and checkpoint.next_page_url != page_query_url
+                ):
+                    break
+            else:
+                exhausted = True
 
-            # yield completed document (or failure)
-            yield doc_or_failure
+            # yield completed documents (or failures)
+            docs_or_failures = run_functions_tuples_in_parallel(
+                [(self._page_to_document, (page,)) for page in pages],
+                max_workers=CONFLUENCE_CONNECTOR_PAGE_CONCURRENCY,
+            )
+            yield from docs_or_failures
 
             # Create checkpoint once a full page of results is returned
-            if checkpoint.next_page_url and checkpoint.next_page_url != page_query_url:
+            if (
+                checkpoint.next_page_url
+                and checkpoint.next_page_url != page_query_url
+                and docs_or_failures
+                and not isinstance(docs_or_failures[-1], ConnectorFailure)
+            ):
                 return checkpoint
 
         checkpoint.has_more = False
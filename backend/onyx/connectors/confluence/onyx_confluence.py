@@ -3,6 +3,7 @@ import time
 from collections.abc import Callable
 from collections.abc import Generator
 from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from datetime import timedelta
 from datetime import timezone
@@ -18,7 +19,9 @@ from requests import HTTPError
 
 from ee.onyx.configs.app_configs import OAUTH_CONFLUENCE_CLOUD_CLIENT_ID
 from ee.onyx.configs.app_configs import OAUTH_CONFLUENCE_CLOUD_CLIENT_SECRET
+from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_REQUESTS_PER_SECOND
 from onyx.configs.app_configs import CONFLUENCE_CONNECTOR_USER_PROFILES_OVERRIDE
+from onyx.configs.constants import DocumentSource
 from onyx.connectors.confluence.models import ConfluenceUser
 from onyx.connectors.confluence.user_profile_override import (
     process_confluence_user_profiles_override,
@@ -27,6 +30,12 @@ from onyx.connectors.confluence.utils import _handle_http_error
 from onyx.connectors.confluence.utils import confluence_refresh_tokens
 from onyx.connectors.confluence.utils import get_start_param_from_url
 from onyx.connectors.confluence.utils import update_param_in_path
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    TokenBucketRateLimiter,
+)
+from onyx.connectors.cross_connector_utils.redis_rate_limiter import (
+    get_connector_rate_limiter,
+)
 from onyx.connectors.interfaces import CredentialsProviderInterface
 from onyx.file_processing.html_utils import format_document_soup
 from onyx.redis.redis_pool import get_redis_client
@@ -81,6 +90,9 @@ class OnyxConfluence:
         confluence_user_profiles_override: list[dict[str, str]] | None = (
             CONFLUENCE_CONNECTOR_USER_PROFILES_OVERRIDE
         ),
+        # shared by every thread that uses this client, pass one in to also share it
+        # with other clients
+        rate_limiter: TokenBucketRateLimiter | None = None,
     ) -> None:
         self._is_cloud = is_cloud
         self._url = url.rstrip("/")
@@ -103,6 +115,14 @@ class OnyxConfluence:
 
         self._kwargs: Any = None
 
+        self.rate_limiter = rate_limiter or TokenBucketRateLimiter(
+            rate=CONFLUENCE_CONNECTOR_REQUESTS_PER_SECOND
+        )
+        # shared with the other workers indexing the same Confluence instance
+        self.shared_rate_limiter = get_connector_rate_limiter(
+            DocumentSource.CONFLUENCE, self._url, credentials_provider.get_tenant_id()
+        )
+
         self.shared_base_kwargs: dict[str, str | int | bool] = {
             "api_version": "cloud" if is_cloud else "latest",
             "backoff_and_retry": True,
@@ -310,9 +330,22 @@ class OnyxConfluence:
 
         return confluence
 
+    @contextmanager
+    def rate_limited_request(self) -> Iterator[None]:
+        """Waits on the rate limiters before a request is sent to Confluence."""
+        self.rate_limiter.acquire()
+        if self.shared_rate_limiter is None:
+            yield
+            return
+
+        with self.shared_rate_limiter.request():
+            yield
+
     # https://developer.atlassian.com/cloud/confluence/rate-limiting/
     # this uses the native rate limiting option provided by the
-    # confluence client and otherwise applies a simpler set of error handling
+    # confluence client and otherwise applies a simpler set of error handling.
+    # Every call takes a token from the rate limiters, and a rate limit response
+    # pauses all the threads (and workers) sharing them instead of only the current one.
     def _make_rate_limited_confluence_method(
         self, name: str, credential_provider: CredentialsProviderInterface | None
     ) -> Callable[..., Any]:
@@ -345,7 +378,8 @@ class OnyxConfluence:
                                     f"'{type(self).__name__}' object has no attribute '{name}'"
                                 )
 
-                            return attr(*args, **kwargs)
+                            with self.rate_limited_request():
+                                return attr(*args, **kwargs)
                     else:
                         attr = getattr(self._confluence, name, None)
                         if attr is None:
@@ -354,17 +388,20 @@ class OnyxConfluence:
                                 f"'{type(self).__name__}' object has no attribute '{name}'"
                             )
 
-                        return attr(*args, **kwargs)
+                        with self.rate_limited_request():
+                            return attr(*args, **kwargs)
 
                 except HTTPError as e:
                     delay_until = _handle_http_error(e, attempt)
+                    retry_after = delay_until - time.monotonic()
                     logger.warning(
                         f"HTTPError in confluence call. "
-                        f"Retrying in {delay_until} seconds..."
+                        f"Retrying in {retry_after:.0f} seconds..."
                     )
-                    while time.monotonic() < delay_until:
-                        # in the future, check a signal here to exit
-                        time.sleep(1)
+                    # the next attempt waits in acquire, along with every other caller
+                    self.rate_limiter.pause_until(delay_until)
+                    if self.shared_rate_limiter and retry_after > 0:
+                        self.shared_rate_limiter.report_rate_limited(retry_after)
                 except AttributeError as e:
                     # Some error within the Confluence library, unclear why it fails.
                     # Users reported it to be intermittent, so just retry
@@ -172,8 +172,10 @@ def process_attachment(
             f"link={attachment_link}"
         )
 
-        # Download the attachment
-        resp: requests.Response = confluence_client._session.get(attachment_link)
+        # Download the attachment, the session is not wrapped by the client's rate
+        # limited methods
+        with confluence_client.rate_limited_request():
+            resp: requests.Response = confluence_client._session.get(attachment_link)
         if resp.status_code != 200:
             logger.warning(
                 f"Failed to fetch {attachment_link} with status code {resp.status_code}"
@@ -474,7 +476,7 @@ def _handle_http_error(e: requests.HTTPError, attempt: int) -> int:
                 "403 error. This sometimes happens when we hit "
                 f"Confluence rate limits. Retrying in {FORBIDDEN_RETRY_DELAY} seconds..."
             )
-            return FORBIDDEN_RETRY_DELAY
+            return math.ceil(time.monotonic() + FORBIDDEN_RETRY_DELAY)
 
         raise e
 
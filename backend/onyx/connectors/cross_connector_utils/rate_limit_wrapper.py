@@ -1,3 +1,4 @@
+import threading
 import time
 from collections.abc import Callable
 from functools import wraps
@@ -88,6 +89,58 @@ class _RateLimitDecorator:
 rate_limit_builder = _RateLimitDecorator
 
 
+class TokenBucketRateLimiter:
+    """Thread safe token bucket, meant to be shared by all the threads that call the
+    same external API. `acquire` blocks until a request may be sent.
+
+    `pause_until` blocks every caller until the given time, use it when the external
+    API reports that it is rate limiting us (e.g. with a Retry-After header) so that
+    the other threads stop sending requests as well."""
+
+    def __init__(
+        self,
+        rate: float,  # tokens per second, <= 0 means no rate limit
+        capacity: float | None = None,  # max burst, defaults to one second of tokens
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+
+    def acquire(self) -> float:
+        """Takes one token, returns the number of seconds spent waiting for it."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self.rate <= 0:
+                        return waited
+
+                    self._tokens = min(
+                        self.capacity,
+                        self._tokens + (now - self._last_refill) * self.rate,
+                    )
+                    self._last_refill = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+
+                    wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
+
+    def pause_until(self, until: float) -> None:
+        """`until` is a time.monotonic() timestamp."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, until)
+
+
 """If you want to allow the external service to tell you when you've hit the rate limit,
 use the following instead"""
 
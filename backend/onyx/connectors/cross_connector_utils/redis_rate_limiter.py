@@ -0,0 +1,262 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from uuid import uuid4
+
+from prometheus_client import Counter
+from prometheus_client import Histogram
+from redis import Redis
+
+from onyx.configs.app_configs import CONNECTOR_REDIS_RATE_LIMIT_ENABLED
+from onyx.configs.app_configs import CONNECTOR_REDIS_RATE_LIMIT_MAX_CONCURRENCY
+from onyx.configs.app_configs import CONNECTOR_REDIS_RATE_LIMIT_REQUESTS_PER_SECOND
+from onyx.configs.constants import DocumentSource
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from shared_configs.contextvars import get_current_tenant_id
+
+logger = setup_logger()
+
+
+_RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "onyx_connector_rate_limit_wait_seconds",
+    "Time connectors spent waiting on the shared Redis rate limiter",
+    ["source"],
+)
+_RATE_LIMITED_RESPONSES = Counter(
+    "onyx_connector_rate_limited_responses",
+    "Rate limit responses reported to the shared Redis rate limiter",
+    ["source"],
+)
+
+# All the scripts use the Redis server clock, so that workers with skewed clocks agree.
+# Numbers are returned as strings since Redis truncates Lua numbers to integers.
+
+# KEYS[1]: bucket hash
+# ARGV: rate, capacity, min rate factor, rate factor recovery per second, ttl
+_ACQUIRE_TOKEN_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local state = redis.call(
+    'HMGET', KEYS[1], 'tokens', 'updated_at', 'paused_until', 'factor', 'penalized_at'
+)
+
+local paused_until = tonumber(state[3]) or 0
+if paused_until > now then
+    return tostring(paused_until - now)
+end
+
+local factor = math.min(
+    1, (tonumber(state[4]) or 1) + (now - (tonumber(state[5]) or now)) * tonumber(ARGV[4])
+)
+local effective_rate = rate * math.max(factor, tonumber(ARGV[3]))
+local updated_at = tonumber(state[2]) or now
+local tokens = math.min(
+    capacity, (tonumber(state[1]) or capacity) + (now - updated_at) * effective_rate
+)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / effective_rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return tostring(wait)
+"""
+
+# KEYS[1]: bucket hash
+# ARGV: retry after seconds, min rate factor, rate factor recovery per second, ttl
+_REPORT_RATE_LIMITED_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'paused_until', 'factor', 'penalized_at')
+
+local paused_until = tonumber(state[1]) or 0
+local factor = math.min(
+    1, (tonumber(state[2]) or 1) + (now - (tonumber(state[3]) or now)) * tonumber(ARGV[3])
+)
+-- every request in flight when the limit was hit reports it, only the first one
+-- lowers the rate
+if paused_until <= now then
+    factor = math.max(tonumber(ARGV[2]), factor / 2)
+end
+paused_until = math.max(paused_until, now + tonumber(ARGV[1]))
+
+redis.call(
+    'HSET', KEYS[1],
+    'paused_until', tostring(paused_until),
+    'factor', tostring(factor),
+    'penalized_at', tostring(now),
+    'tokens', '0',
+    'updated_at', tostring(paused_until)
+)
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return tostring(factor)
+"""
+
+# KEYS[1]: sorted set of leases, scored by their expiry
+# ARGV: lease id, max concurrency, lease seconds
+_ACQUIRE_LEASE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), ARGV[1])
+    redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[3])))
+    return 1
+end
+return 0
+"""
+
+
+class RedisConnectorRateLimiter:
+    """Token bucket and concurrency limit for one host of one source, shared through
+    Redis by every worker of a tenant.
+
+    A rate limit response reported with `report_rate_limited` pauses all the workers
+    for the Retry-After duration and halves the request rate. The rate then recovers
+    linearly, back to the configured rate after 1 / RATE_RECOVERY_PER_SECOND seconds.
+    """
+
+    PREFIX = "connectorratelimit"
+
+    MIN_RATE_FACTOR = 0.1
+    RATE_RECOVERY_PER_SECOND = 0.01
+    # slots of crashed workers are freed after this long
+    LEASE_SECONDS = 300
+    LEASE_POLL_SECONDS = 0.1
+    KEY_TTL_SECONDS = 3600
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        tenant_id: str,
+        source: DocumentSource,
+        host: str,
+        rate: float,  # requests per second, <= 0 means no rate limit
+        capacity: float | None = None,  # max burst, defaults to one second of requests
+        max_concurrency: int = 0,  # 0 means no limit
+    ) -> None:
+        self.source = source
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self.max_concurrency = max_concurrency
+
+        # scripts are not prefixed by the tenant aware redis client, so the tenant
+        # is part of the key
+        key = f"{self.PREFIX}:{tenant_id}:{source.value}:{host.lower()}"
+        self.bucket_key = f"{key}:bucket"
+        self.leases_key = f"{key}:leases"
+
+        self._redis = redis_client
+        self._acquire_token_script = redis_client.register_script(_ACQUIRE_TOKEN_SCRIPT)
+        self._report_rate_limited_script = redis_client.register_script(
+            _REPORT_RATE_LIMITED_SCRIPT
+        )
+        self._acquire_lease_script = redis_client.register_script(_ACQUIRE_LEASE_SCRIPT)
+
+    def acquire(self) -> float:
+        """Takes one token, returns the number of seconds spent waiting for it."""
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            wait = float(
+                self._acquire_token_script(
+                    keys=[self.bucket_key],
+                    args=[
+                        self.rate,
+                        self.capacity,
+                        self.MIN_RATE_FACTOR,
+                        self.RATE_RECOVERY_PER_SECOND,
+                        self.KEY_TTL_SECONDS,
+                    ],
+                )
+            )
+            if wait <= 0:
+                break
+
+            time.sleep(wait)
+            waited += wait
+
+        _RATE_LIMIT_WAIT_SECONDS.labels(source=self.source.value).observe(waited)
+        return waited
+
+    @contextmanager
+    def request(self) -> Iterator[None]:
+        """Takes a token and holds a concurrency slot for the duration of a request."""
+        waited = self.acquire()
+        if self.max_concurrency <= 0:
+            yield
+            return
+
+        lease_id = uuid4().hex
+        lease_waited = 0.0
+        while not self._acquire_lease_script(
+            keys=[self.leases_key],
+            args=[lease_id, self.max_concurrency, self.LEASE_SECONDS],
+        ):
+            time.sleep(self.LEASE_POLL_SECONDS)
+            lease_waited += self.LEASE_POLL_SECONDS
+
+        if lease_waited:
+            _RATE_LIMIT_WAIT_SECONDS.labels(source=self.source.value).observe(
+                lease_waited
+            )
+        if waited + lease_waited > 1:
+            logger.debug(
+                f"Waited on the shared rate limiter: source={self.source.value} "
+                f"rate_wait={waited:.2f} concurrency_wait={lease_waited:.2f}"
+            )
+
+        try:
+            yield
+        finally:
+            self._redis.zrem(self.leases_key, lease_id)
+
+    def report_rate_limited(self, retry_after: float) -> None:
+        """Call when the external API responds with a rate limit error. `retry_after`
+        is in seconds, e.g. from the Retry-After header."""
+        _RATE_LIMITED_RESPONSES.labels(source=self.source.value).inc()
+        factor = float(
+            self._report_rate_limited_script(
+                keys=[self.bucket_key],
+                args=[
+                    max(retry_after, 0),
+                    self.MIN_RATE_FACTOR,
+                    self.RATE_RECOVERY_PER_SECOND,
+                    self.KEY_TTL_SECONDS,
+                ],
+            )
+        )
+        logger.warning(
+            f"Rate limited by {self.source.value}, pausing all workers for "
+            f"{retry_after:.0f} seconds. rate={self.rate * factor:.2f}/s"
+        )
+
+
+def get_connector_rate_limiter(
+    source: DocumentSource,
+    url: str,
+    tenant_id: str | None = None,
+) -> RedisConnectorRateLimiter | None:
+    """Returns the shared rate limiter for the host of `url`, None if
+    CONNECTOR_REDIS_RATE_LIMIT_ENABLED is not set."""
+    if not CONNECTOR_REDIS_RATE_LIMIT_ENABLED:
+        return None
+
+    tenant_id = tenant_id or get_current_tenant_id()
+    return RedisConnectorRateLimiter(
+        redis_client=get_redis_client(tenant_id=tenant_id),
+        tenant_id=tenant_id,
+        source=source,
+        host=urlparse(url).netloc or url,
+        rate=CONNECTOR_REDIS_RATE_LIMIT_REQUESTS_PER_SECOND,
+        max_concurrency=CONNECTOR_REDIS_RATE_LIMIT_MAX_CONCURRENCY,
+    )
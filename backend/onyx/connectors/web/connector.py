@@ -1,7 +1,11 @@
+import contextvars
 import io
 import ipaddress
+import json
+import queue
 import random
 import socket
+import threading
 import time
 from datetime import datetime
 from datetime import timezone
@@ -22,9 +26,12 @@ from requests_oauthlib import OAuth2Session  # type:ignore
 from urllib3.exceptions import MaxRetryError
 
 from onyx.configs.app_configs import INDEX_BATCH_SIZE
+from onyx.configs.app_configs import WEB_CONNECTOR_CONCURRENCY
+from onyx.configs.app_configs import WEB_CONNECTOR_HTTP_FAST_PATH
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_ID
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_CLIENT_SECRET
 from onyx.configs.app_configs import WEB_CONNECTOR_OAUTH_TOKEN_URL
+from onyx.configs.app_configs import WEB_CONNECTOR_RECRAWL_CACHE_TTL_SECONDS
 from onyx.configs.app_configs import WEB_CONNECTOR_VALIDATE_URLS
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.exceptions import ConnectorValidationError
@@ -35,8 +42,12 @@ from onyx.connectors.interfaces import GenerateDocumentsOutput
 from onyx.connectors.interfaces import LoadConnector
 from onyx.connectors.models import Document
 from onyx.connectors.models import TextSection
+from onyx.connectors.web.recrawl_cache import WebRecrawlCache
+from onyx.connectors.web.recrawl_cache import WebRecrawlCacheEntry
 from onyx.file_processing.extract_file_text import read_pdf_file
+from onyx.file_processing.html_utils import ParsedHTML
 from onyx.file_processing.html_utils import web_html_cleanup
+from onyx.redis.redis_pool import get_redis_client
 from onyx.utils.logger import setup_logger
 from onyx.utils.sitemap import list_pages_for_site
 from shared_configs.configs import MULTI_TENANT
@@ -59,12 +70,39 @@ class ScrapeSessionContext:
         self.last_error: str | None = None
         self.needs_retry: bool = False
 
+        # guards visited_links and content_hashes, which the crawler threads also use
+        self.lock = threading.Lock()
+        # bumped to make every crawler thread restart its browser
+        self.browser_generation = 0
+
+    def restart_browsers(self) -> None:
+        """Browsers are restarted lazily, by each crawler thread before it next needs
+        its browser."""
+        with self.lock:
+            self.browser_generation += 1
+
+
+class BrowserSession:
+    """Browser of one crawler thread. The sync Playwright API can only be used from
+    the thread that started it, so every crawler thread has its own, started the first
+    time one of its pages needs to be rendered."""
+
+    def __init__(self, session_ctx: ScrapeSessionContext):
+        self.session_ctx = session_ctx
+        self.generation = session_ctx.browser_generation
+
         self.playwright: Playwright | None = None
         self.playwright_context: BrowserContext | None = None
 
-    def initialize(self) -> None:
-        self.stop()
-        self.playwright, self.playwright_context = start_playwright()
+    def get_context(self) -> BrowserContext:
+        if self.generation != self.session_ctx.browser_generation:
+            self.stop()
+            self.generation = self.session_ctx.browser_generation
+
+        if self.playwright_context is None:
+            self.playwright, self.playwright_context = start_playwright()
+
+        return self.playwright_context
 
     def stop(self) -> None:
         if self.playwright_context:
@@ -77,8 +115,16 @@ class ScrapeSessionContext:
 
 
 class ScrapeResult:
-    doc: Document | None = None
-    retry: bool = False
+    def __init__(
+        self,
+        doc: Document | None = None,
+        retry: bool = False,
+        links: set[str] | None = None,
+    ):
+        self.doc = doc
+        self.retry = retry
+        # internal links found on the page, only for recursive crawls
+        self.links: set[str] = links or set()
 
 
 WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS = 20
@@ -86,6 +132,10 @@ WEB_CONNECTOR_MAX_SCROLL_ATTEMPTS = 20
 IFRAME_TEXT_LENGTH_THRESHOLD = 700
 # Message indicating JavaScript is disabled, which often appears when scraping fails
 JAVASCRIPT_DISABLED_MESSAGE = "You have JavaScript disabled in your browser"
+# Pages fetched without a browser that have less text than this are rendered in the
+# browser, they are likely filled in by javascript
+HTTP_FAST_PATH_MIN_TEXT_LENGTH = 200
+HTTP_TIMEOUT_SECONDS = 30
 
 # Define common headers that mimic a real browser
 DEFAULT_USER_AGENT = (
@@ -387,6 +437,39 @@ def _get_datetime_from_last_modified_header(last_modified: str) -> datetime | No
         return None
 
 
+def _pdf_to_document(url: str, content: bytes, last_modified: str | None) -> Document:
+    page_text, metadata, images = read_pdf_file(file=io.BytesIO(content))
+    return Document(
+        id=url,
+        sections=[TextSection(link=url, text=page_text)],
+        source=DocumentSource.WEB,
+        semantic_identifier=url.split("/")[-1],
+        metadata=metadata,
+        doc_updated_at=(
+            _get_datetime_from_last_modified_header(last_modified)
+            if last_modified
+            else None
+        ),
+    )
+
+
+def _html_to_document(
+    url: str, parsed_html: ParsedHTML, last_modified: str | None
+) -> Document:
+    return Document(
+        id=url,
+        sections=[TextSection(link=url, text=parsed_html.cleaned_text)],
+        source=DocumentSource.WEB,
+        semantic_identifier=parsed_html.title or url,
+        metadata={},
+        doc_updated_at=(
+            _get_datetime_from_last_modified_header(last_modified)
+            if last_modified
+            else None
+        ),
+    )
+
+
 def _handle_cookies(context: BrowserContext, url: str) -> None:
     """Handle cookies for the given URL to help with bot detection"""
     try:
@@ -445,6 +528,12 @@ class WebConnector(LoadConnector):
         self.recursive = False
         self.scroll_before_scraping = scroll_before_scraping
         self.web_connector_type = web_connector_type
+
+        self.concurrency = max(WEB_CONNECTOR_CONCURRENCY, 1)
+        self.http_fast_path = WEB_CONNECTOR_HTTP_FAST_PATH
+        # set in load_from_state if WEB_CONNECTOR_RECRAWL_CACHE_TTL_SECONDS is set
+        self.recrawl_cache: WebRecrawlCache | None = None
+
         if web_connector_type == WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value:
             self.recursive = True
             self.to_visit_list = [_ensure_valid_url(base_url)]
@@ -479,55 +568,201 @@ class WebConnector(LoadConnector):
             logger.warning("Unexpected credentials provided for Web Connector")
         return None
 
-    def _do_scrape(
+    def _get_recrawl_cache(self) -> WebRecrawlCache | None:
+        if WEB_CONNECTOR_RECRAWL_CACHE_TTL_SECONDS <= 0:
+            return None
+
+        # the extracted documents and links depend on these settings, connectors
+        # crawling the same pages with different settings don't share entries
+        namespace = json.dumps(
+            [
+                self.to_visit_list[0],
+                self.recursive,
+                self.mintlify_cleanup,
+                self.scroll_before_scraping,
+            ]
+        )
+        return WebRecrawlCache(
+            get_redis_client(), WEB_CONNECTOR_RECRAWL_CACHE_TTL_SECONDS, namespace
+        )
+
+    def _is_duplicate(
+        self, session_ctx: ScrapeSessionContext, title: str | None, text: str
+    ) -> bool:
+        # Sometimes pages with #! will serve duplicate content
+        # There are also just other ways this can happen
+        hashed_text = hash((title, text))
+        with session_ctx.lock:
+            if hashed_text in session_ctx.content_hashes:
+                return True
+            session_ctx.content_hashes.add(hashed_text)
+        return False
+
+    def _check_redirect(
         self,
         index: int,
         initial_url: str,
+        final_url: str,
         session_ctx: ScrapeSessionContext,
-    ) -> ScrapeResult:
-        """Returns a ScrapeResult object with a doc and retry flag."""
+    ) -> bool:
+        """Returns False if the page was redirected to an already visited url."""
+        if final_url == initial_url:
+            return True
+
+        protected_url_check(final_url)
+        with session_ctx.lock:
+            if final_url in session_ctx.visited_links:
+                logger.info(
+                    f"{index}: {initial_url} redirected to {final_url} - already indexed"
+                )
+                return False
+            session_ctx.visited_links.add(final_url)
 
-        if session_ctx.playwright is None:
-            raise RuntimeError("scrape_context.playwright is None")
+        logger.info(f"{index}: {initial_url} redirected to {final_url}")
+        return True
 
-        if session_ctx.playwright_context is None:
-            raise RuntimeError("scrape_context.playwright_context is None")
+    def _do_http_scrape(
+        self,
+        index: int,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+    ) -> ScrapeResult | None:
+        """Scrapes the page without a browser when possible: pages not modified since
+        they were cached, PDFs and, with the HTTP fast path, static pages. Returns None
+        if the page has to be rendered in the browser."""
+        cached = (
+            self.recrawl_cache.get(initial_url)
+            if self.recrawl_cache is not None
+            else None
+        )
+        headers = dict(DEFAULT_HEADERS)
+        if cached is not None:
+            headers.update(cached.conditional_headers())
+
+        # streamed, so the body of pages rendered in the browser is not downloaded
+        with requests.get(
+            initial_url,
+            headers=headers,
+            timeout=HTTP_TIMEOUT_SECONDS,
+            allow_redirects=True,
+            stream=True,
+        ) as response:
+            if response.status_code == 304 and cached is not None:
+                logger.info(f"{index}: {initial_url} not modified since the last crawl")
+                if self._is_duplicate(
+                    session_ctx, cached.title, cached.doc.get_text_content()
+                ):
+                    return ScrapeResult(links=set(cached.links))
+                return ScrapeResult(doc=cached.doc, links=set(cached.links))
+
+            # errors are handled in the browser, which gets past most bot detection
+            if response.status_code >= 400:
+                return None
+
+            is_pdf = is_pdf_content(response) or initial_url.lower().endswith(".pdf")
+            is_html = "html" in response.headers.get("content-type", "").lower()
+            if not is_pdf and (
+                not self.http_fast_path or self.scroll_before_scraping or not is_html
+            ):
+                return None
+
+            # the redirect target is only claimed once the page is not handed to the
+            # browser, which checks the redirect itself
+            url = response.url
+
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
 
-        result = ScrapeResult()
+            if is_pdf:
+                if not self._check_redirect(index, initial_url, url, session_ctx):
+                    return ScrapeResult()
+                # PDF files are not checked for links
+                doc = _pdf_to_document(url, response.content, last_modified)
+                if self.recrawl_cache is not None:
+                    self.recrawl_cache.put(
+                        initial_url,
+                        WebRecrawlCacheEntry(
+                            etag=etag, last_modified=last_modified, doc=doc
+                        ),
+                    )
+                return ScrapeResult(doc=doc)
 
-        # Handle cookies for the URL
-        _handle_cookies(session_ctx.playwright_context, initial_url)
+            soup = BeautifulSoup(response.text, "html.parser")
 
-        # First do a HEAD request to check content type without downloading the entire content
-        head_response = requests.head(
-            initial_url, headers=DEFAULT_HEADERS, allow_redirects=True
+        links = (
+            get_internal_links(session_ctx.base_url, url, soup)
+            if self.recursive
+            else set()
         )
-        is_pdf = is_pdf_content(head_response)
+        parsed_html = web_html_cleanup(soup, self.mintlify_cleanup)
+        if (
+            JAVASCRIPT_DISABLED_MESSAGE in parsed_html.cleaned_text
+            or len(parsed_html.cleaned_text) < HTTP_FAST_PATH_MIN_TEXT_LENGTH
+        ):
+            logger.debug(f"{index}: {url} needs javascript, rendering it")
+            return None
 
-        if is_pdf or initial_url.lower().endswith(".pdf"):
-            # PDF files are not checked for links
-            response = requests.get(initial_url, headers=DEFAULT_HEADERS)
-            page_text, metadata, images = read_pdf_file(
-                file=io.BytesIO(response.content)
-            )
-            last_modified = response.headers.get("Last-Modified")
+        if not self._check_redirect(index, initial_url, url, session_ctx):
+            return ScrapeResult()
+
+        if self._is_duplicate(session_ctx, parsed_html.title, parsed_html.cleaned_text):
+            logger.info(f"{index}: Skipping duplicate title + content for {url}")
+            return ScrapeResult(links=links)
 
-            result.doc = Document(
-                id=initial_url,
-                sections=[TextSection(link=initial_url, text=page_text)],
-                source=DocumentSource.WEB,
-                semantic_identifier=initial_url.split("/")[-1],
-                metadata=metadata,
-                doc_updated_at=(
-                    _get_datetime_from_last_modified_header(last_modified)
-                    if last_modified
-                    else None
+        doc = _html_to_document(url, parsed_html, last_modified)
+        if self.recrawl_cache is not None:
+            self.recrawl_cache.put(
+                initial_url,
+                WebRecrawlCacheEntry(
+                    etag=etag,
+                    last_modified=last_modified,
+                    title=parsed_html.title,
+                    doc=doc,
+                    links=sorted(links),
                 ),
             )
+        return ScrapeResult(doc=doc, links=links)
+
+    def _do_scrape(
+        self,
+        index: int,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+        browser: BrowserSession,
+    ) -> ScrapeResult:
+        """Returns a ScrapeResult object with a doc and retry flag."""
+
+        if self.http_fast_path or self.recrawl_cache is not None:
+            # a single GET replaces the HEAD request below
+            http_result = self._do_http_scrape(index, initial_url, session_ctx)
+            if http_result is not None:
+                return http_result
+        else:
+            # First do a HEAD request to check content type without downloading the entire content
+            head_response = requests.head(
+                initial_url, headers=DEFAULT_HEADERS, allow_redirects=True
+            )
+            is_pdf = is_pdf_content(head_response)
+
+            if is_pdf or initial_url.lower().endswith(".pdf"):
+                # PDF files are not checked for links
+                response = requests.get(initial_url, headers=DEFAULT_HEADERS)
+                return ScrapeResult(
+                    doc=_pdf_to_document(
+                        initial_url,
+                        response.content,
+                        response.headers.get("Last-Modified"),
+                    )
+                )
 
-            return result
+        result = ScrapeResult()
+        playwright_context = browser.get_context()
+
+        # Handle cookies for the URL
+        _handle_cookies(playwright_context, initial_url)
 
-        page = session_ctx.playwright_context.new_page()
+        cache_key = initial_url
+        page = playwright_context.new_page()
         try:
             # Can't use wait_until="networkidle" because it interferes with the scrolling behavior
             page_response = page.goto(
@@ -539,19 +774,11 @@ class WebConnector(LoadConnector):
             last_modified = (
                 page_response.header_value("Last-Modified") if page_response else None
             )
+            etag = page_response.header_value("ETag") if page_response else None
             final_url = page.url
-            if final_url != initial_url:
-                protected_url_check(final_url)
-                initial_url = final_url
-                if initial_url in session_ctx.visited_links:
-                    logger.info(
-                        f"{index}: {initial_url} redirected to {final_url} - already indexed"
-                    )
-                    page.close()
-                    return result
-
-                logger.info(f"{index}: {initial_url} redirected to {final_url}")
-                session_ctx.visited_links.add(initial_url)
+            if not self._check_redirect(index, initial_url, final_url, session_ctx):
+                return result
+            initial_url = final_url
 
             # If we got here, the request was successful
             if self.scroll_before_scraping:
@@ -573,12 +800,9 @@ class WebConnector(LoadConnector):
             soup = BeautifulSoup(content, "html.parser")
 
             if self.recursive:
-                internal_links = get_internal_links(
+                result.links = get_internal_links(
                     session_ctx.base_url, initial_url, soup
                 )
-                for link in internal_links:
-                    if link not in session_ctx.visited_links:
-                        session_ctx.to_visit.append(link)
 
             if page_response and str(page_response.status)[0] in ("4", "5"):
                 session_ctx.last_error = f"Skipped indexing {initial_url} due to HTTP {page_response.status} response"
@@ -609,34 +833,90 @@ class WebConnector(LoadConnector):
                     else:
                         parsed_html.cleaned_text += "\n" + document_text
 
-            # Sometimes pages with #! will serve duplicate content
-            # There are also just other ways this can happen
-            hashed_text = hash((parsed_html.title, parsed_html.cleaned_text))
-            if hashed_text in session_ctx.content_hashes:
+            if self._is_duplicate(
+                session_ctx, parsed_html.title, parsed_html.cleaned_text
+            ):
                 logger.info(
                     f"{index}: Skipping duplicate title + content for {initial_url}"
                 )
                 return result
 
-            session_ctx.content_hashes.add(hashed_text)
-
-            result.doc = Document(
-                id=initial_url,
-                sections=[TextSection(link=initial_url, text=parsed_html.cleaned_text)],
-                source=DocumentSource.WEB,
-                semantic_identifier=parsed_html.title or initial_url,
-                metadata={},
-                doc_updated_at=(
-                    _get_datetime_from_last_modified_header(last_modified)
-                    if last_modified
-                    else None
-                ),
-            )
+            result.doc = _html_to_document(initial_url, parsed_html, last_modified)
+            if self.recrawl_cache is not None:
+                self.recrawl_cache.put(
+                    cache_key,
+                    WebRecrawlCacheEntry(
+                        etag=etag,
+                        last_modified=last_modified,
+                        title=parsed_html.title,
+                        doc=result.doc,
+                        links=sorted(result.links),
+                    ),
+                )
         finally:
             page.close()
 
         return result
 
+    def _scrape_with_retries(
+        self,
+        index: int,
+        initial_url: str,
+        session_ctx: ScrapeSessionContext,
+        browser: BrowserSession,
+    ) -> ScrapeResult:
+        links: set[str] = set()
+
+        # Add retry mechanism with exponential backoff
+        retry_count = 0
+
+        while retry_count < self.MAX_RETRIES:
+            if retry_count > 0:
+                # Add a random delay between retries (exponential backoff)
+                delay = min(2**retry_count + random.uniform(0, 1), 10)
+                logger.info(
+                    f"Retry {retry_count}/{self.MAX_RETRIES} for {initial_url} after {delay:.2f}s delay"
+                )
+                time.sleep(delay)
+
+            try:
+                result = self._do_scrape(index, initial_url, session_ctx, browser)
+                links |= result.links
+                if result.retry:
+                    continue
+
+                return ScrapeResult(doc=result.doc, links=links)
+            except Exception as e:
+                session_ctx.last_error = f"Failed to fetch '{initial_url}': {e}"
+                logger.exception(session_ctx.last_error)
+                browser.stop()
+                continue
+            finally:
+                retry_count += 1
+
+        return ScrapeResult(links=links)
+
+    def _crawl_worker(
+        self,
+        session_ctx: ScrapeSessionContext,
+        work_queue: "queue.Queue[tuple[int, str] | None]",
+        results_queue: "queue.Queue[ScrapeResult]",
+    ) -> None:
+        browser = BrowserSession(session_ctx)
+        try:
+            while (work := work_queue.get()) is not None:
+                index, initial_url = work
+                try:
+                    result = self._scrape_with_retries(
+                        index, initial_url, session_ctx, browser
+                    )
+                except Exception:
+                    logger.exception(f"Unexpected error crawling {initial_url}")
+                    result = ScrapeResult()
+                results_queue.put(result)
+        finally:
+            browser.stop()
+
     def load_from_state(self) -> GenerateDocumentsOutput:
         """Traverses through all pages found on the website
         and converts them into documents"""
@@ -647,62 +927,74 @@ class WebConnector(LoadConnector):
         base_url = self.to_visit_list[0]  # For the recursive case
         check_internet_connection(base_url)  # make sure we can connect to the base url
 
-        session_ctx = ScrapeSessionContext(base_url, self.to_visit_list)
-        session_ctx.initialize()
+        if self.recrawl_cache is None:
+            self.recrawl_cache = self._get_recrawl_cache()
 
-        while session_ctx.to_visit:
-            initial_url = session_ctx.to_visit.pop()
-            if initial_url in session_ctx.visited_links:
-                continue
-            session_ctx.visited_links.add(initial_url)
+        session_ctx = ScrapeSessionContext(base_url, self.to_visit_list)
 
-            try:
-                protected_url_check(initial_url)
-            except Exception as e:
-                session_ctx.last_error = f"Invalid URL {initial_url} due to {e}"
-                logger.warning(session_ctx.last_error)
-                continue
+        # pages are crawled by a pool of threads, this thread only hands out the urls
+        # so that they are visited in the same order as with a single crawler
+        work_queue: queue.Queue[tuple[int, str] | None] = queue.Queue()
+        results_queue: queue.Queue[ScrapeResult] = queue.Queue()
+        workers = [
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(self._crawl_worker, session_ctx, work_queue, results_queue),
+                daemon=True,
+            )
+            for _ in range(self.concurrency)
+        ]
+        for worker in workers:
+            worker.start()
 
-            index = len(session_ctx.visited_links)
-            logger.info(f"{index}: Visiting {initial_url}")
+        in_flight = 0
+        try:
+            while session_ctx.to_visit or in_flight:
+                while session_ctx.to_visit and in_flight < self.concurrency:
+                    initial_url = session_ctx.to_visit.pop()
+                    with session_ctx.lock:
+                        if initial_url in session_ctx.visited_links:
+                            continue
+                        session_ctx.visited_links.add(initial_url)
+                        index = len(session_ctx.visited_links)
+
+                    try:
+                        protected_url_check(initial_url)
+                    except Exception as e:
+                        session_ctx.last_error = f"Invalid URL {initial_url} due to {e}"
+                        logger.warning(session_ctx.last_error)
+                        continue
 
-            # Add retry mechanism with exponential backoff
-            retry_count = 0
+                    logger.info(f"{index}: Visiting {initial_url}")
+                    work_queue.put((index, initial_url))
+                    in_flight += 1
 
-            while retry_count < self.MAX_RETRIES:
-                if retry_count > 0:
-                    # Add a random delay between retries (exponential backoff)
-                    delay = min(2**retry_count + random.uniform(0, 1), 10)
-                    logger.info(
-                        f"Retry {retry_count}/{self.MAX_RETRIES} for {initial_url} after {delay:.2f}s delay"
-                    )
-                    time.sleep(delay)
+                if not in_flight:
+                    break
 
-                try:
-                    result = self._do_scrape(index, initial_url, session_ctx)
-                    if result.retry:
-                        continue
+                result = results_queue.get()
+                in_flight -= 1
 
-                    if result.doc:
-                        session_ctx.doc_batch.append(result.doc)
-                except Exception as e:
-                    session_ctx.last_error = f"Failed to fetch '{initial_url}': {e}"
-                    logger.exception(session_ctx.last_error)
-                    session_ctx.initialize()
-                    continue
-                finally:
-                    retry_count += 1
+                with session_ctx.lock:
+                    new_links = result.links - session_ctx.visited_links
+                session_ctx.to_visit.extend(new_links)
 
-                break  # success / don't retry
+                if result.doc:
+                    session_ctx.doc_batch.append(result.doc)
 
-            if len(session_ctx.doc_batch) >= self.batch_size:
-                session_ctx.initialize()
-                session_ctx.at_least_one_doc = True
-                yield session_ctx.doc_batch
-                session_ctx.doc_batch = []
+                if len(session_ctx.doc_batch) >= self.batch_size:
+                    session_ctx.restart_browsers()
+                    session_ctx.at_least_one_doc = True
+                    yield session_ctx.doc_batch
+                    session_ctx.doc_batch = []
+        finally:
+            # the browsers are stopped by the threads that started them
+            for _ in workers:
+                work_queue.put(None)
+            for worker in workers:
+                worker.join()
 
         if session_ctx.doc_batch:
-            session_ctx.stop()
             session_ctx.at_least_one_doc = True
             yield session_ctx.doc_batch
 
@@ -711,8 +1003,6 @@ class WebConnector(LoadConnector):
                 raise RuntimeError(session_ctx.last_error)
             raise RuntimeError("No valid pages found.")
 
-        session_ctx.stop()
-
     def validate_connector_settings(self) -> None:
         # Make sure we have at least one valid URL to check
         if not self.to_visit_list:
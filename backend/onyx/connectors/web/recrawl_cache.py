@@ -0,0 +1,72 @@
+import hashlib
+from typing import cast
+
+from pydantic import BaseModel
+from redis import Redis
+
+from onyx.connectors.models import Document
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+
+class WebRecrawlCacheEntry(BaseModel):
+    # validators of the response the document was built from
+    etag: str | None = None
+    last_modified: str | None = None
+
+    # page title, used to skip pages with duplicate content
+    title: str | None = None
+    doc: Document
+    # internal links found on the page, only for recursive crawls
+    links: list[str] = []
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class WebRecrawlCache:
+    """Previous crawl of each page, kept in Redis so that recrawls can send conditional
+    requests and reuse the document of pages that were not modified.
+
+    Errors talking to Redis are logged and treated as cache misses, the page is then
+    just crawled again."""
+
+    PREFIX = "webconnectorrecrawl"
+
+    def __init__(self, redis_client: Redis, ttl_seconds: int, namespace: str) -> None:
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds
+        # separates the entries of connectors that extract the pages differently
+        self.namespace = namespace
+
+    def _key(self, url: str) -> str:
+        key = hashlib.sha256(f"{self.namespace}\n{url}".encode("utf-8")).hexdigest()
+        return f"{self.PREFIX}_{key}"
+
+    def get(self, url: str) -> WebRecrawlCacheEntry | None:
+        try:
+            raw = self.redis_client.get(self._key(url))
+            if raw is None:
+                return None
+            return WebRecrawlCacheEntry.model_validate_json(cast(bytes, raw))
+        except Exception:
+            logger.exception(f"Failed to read the recrawl cache for {url}")
+            return None
+
+    def put(self, url: str, entry: WebRecrawlCacheEntry) -> None:
+        # without validators the next crawl can't send a conditional request
+        if not entry.etag and not entry.last_modified:
+            return
+
+        try:
+            self.redis_client.set(
+                self._key(url), entry.model_dump_json(), ex=self.ttl_seconds
+            )
+        except Exception:
+            logger.exception(f"Failed to write the recrawl cache for {url}")
@@ -1,6 +1,7 @@
 import copy
 import time
 from collections.abc import Iterator
+from contextlib import nullcontext
 from typing import Any
 from typing import cast
 
@@ -14,6 +15,9 @@ from onyx.configs.constants import DocumentSource
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
     time_str_to_utc,
 )
+from onyx.connectors.cross_connector_utils.redis_rate_limiter import (
+    get_connector_rate_limiter,
+)
 from onyx.connectors.exceptions import ConnectorValidationError
 from onyx.connectors.exceptions import CredentialExpiredError
 from onyx.connectors.exceptions import InsufficientPermissionsError
@@ -50,18 +54,28 @@ class ZendeskClient:
     def __init__(self, subdomain: str, email: str, token: str):
         self.base_url = f"https://{subdomain}.zendesk.com/api/v2"
         self.auth = (f"{email}/token", token)
+        # shared with the other workers indexing the same Zendesk instance
+        self.rate_limiter = get_connector_rate_limiter(
+            DocumentSource.ZENDESK, self.base_url
+        )
 
     @retry_builder()
     def make_request(self, endpoint: str, params: dict[str, Any]) -> dict[str, Any]:
-        response = requests.get(
-            f"{self.base_url}/{endpoint}", auth=self.auth, params=params
-        )
+        with self.rate_limiter.request() if self.rate_limiter else nullcontext():
+            response = requests.get(
+                f"{self.base_url}/{endpoint}", auth=self.auth, params=params
+            )
 
         if response.status_code == 429:
             retry_after = response.headers.get("Retry-After")
             if retry_after is not None:
-                # Sleep for the duration indicated by the Retry-After header
-                time.sleep(int(retry_after))
+                if self.rate_limiter:
+                    # the retry waits in the shared rate limiter, along with the
+                    # other workers
+                    self.rate_limiter.report_rate_limited(int(retry_after))
+                else:
+                    # Sleep for the duration indicated by the Retry-After header
+                    time.sleep(int(retry_after))
 
         elif (
             response.status_code == 403
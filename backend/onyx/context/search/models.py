@@ -396,3 +396,8 @@ class RerankMetricsContainer(BaseModel):
 
     metrics: list[ChunkMetric]
     raw_similarity_scores: list[float]
+    # Chunks whose score came from the rerank score cache
+    cache_hits: int = 0
+    # Chunks not reranked because the top of the ranking was already stable
+    skipped_chunks: int = 0
+    rerank_seconds: float = 0.0
@@ -1,8 +1,12 @@
+import asyncio
+import time
 from collections import defaultdict
 from collections.abc import Callable
 from collections.abc import Iterator
+from contextlib import contextmanager
 from typing import cast
 
+from prometheus_client import Histogram
 from sqlalchemy.orm import Session
 
 from onyx.chat.models import ContextualPruningConfig
@@ -13,22 +17,32 @@ from onyx.chat.prune_and_merge import ChunkRange
 from onyx.chat.prune_and_merge import merge_chunk_intervals
 from onyx.chat.prune_and_merge import prune_and_merge_sections
 from onyx.configs.chat_configs import DISABLE_LLM_DOC_RELEVANCE
+from onyx.configs.llm_configs import get_search_time_image_analysis_enabled
 from onyx.context.search.enums import LLMEvaluationType
 from onyx.context.search.enums import QueryFlow
 from onyx.context.search.enums import SearchType
 from onyx.context.search.models import IndexFilters
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
+from onyx.context.search.models import RerankingDetails
 from onyx.context.search.models import RerankMetricsContainer
 from onyx.context.search.models import RetrievalMetricsContainer
 from onyx.context.search.models import SearchQuery
 from onyx.context.search.models import SearchRequest
 from onyx.context.search.postprocessing.postprocessing import cleanup_chunks
+from onyx.context.search.postprocessing.postprocessing import filter_sections
+from onyx.context.search.postprocessing.postprocessing import log_top_section_links
+from onyx.context.search.postprocessing.postprocessing import rerank_sections_async
 from onyx.context.search.postprocessing.postprocessing import search_postprocessing
+from onyx.context.search.postprocessing.postprocessing import should_rerank
+from onyx.context.search.postprocessing.postprocessing import (
+    update_image_sections_with_query,
+)
 from onyx.context.search.preprocessing.preprocessing import retrieval_preprocessing
 from onyx.context.search.retrieval.search_runner import (
     retrieve_chunks,
 )
+from onyx.context.search.retrieval.search_runner import retrieve_chunks_async
 from onyx.context.search.utils import inference_section_from_chunks
 from onyx.context.search.utils import relevant_sections_to_indices
 from onyx.db.models import User
@@ -45,6 +59,12 @@ from onyx.utils.variable_functionality import fetch_ee_implementation_or_noop
 
 logger = setup_logger()
 
+_SEARCH_STAGE_SECONDS = Histogram(
+    "onyx_search_pipeline_stage_seconds",
+    "Time spent in each stage of getting the search sections",
+    ["stage"],
+)
+
 
 class SearchPipeline:
     def __init__(
@@ -110,6 +130,9 @@ class SearchPipeline:
         # No longer computed but keeping around in case it's reintroduced later
         self._predicted_flow: QueryFlow | None = QueryFlow.QUESTION_ANSWER
 
+        # Seconds spent in each stage of getting the sections, see _timed_stage
+        self.stage_timings: dict[str, float] = {}
+
     """Pre-processing"""
 
     def _run_preprocessing(self) -> None:
@@ -223,12 +246,64 @@ class SearchPipeline:
         if self._retrieved_sections is not None:
             return self._retrieved_sections
 
-        # These chunks are ordered, deduped, and contain no large chunks
-        retrieved_chunks = self._get_chunks()
+        with self._timed_stage("preprocessing"):
+            search_query = self.search_query
+
+        with self._timed_stage("retrieval"):
+            # These chunks are ordered, deduped, and contain no large chunks
+            retrieved_chunks = self._get_chunks()
+
+        with self._timed_stage("censoring"):
+            censored_chunks = self._censor_chunks(retrieved_chunks)
+
+        with self._timed_stage("section_expansion"):
+            chunk_requests, inference_chunks = self._build_section_chunk_requests(
+                censored_chunks
+            )
+            if chunk_requests:
+                # every range is fetched in a single concurrent round trip
+                inference_chunks.extend(
+                    cleanup_chunks(
+                        self.document_index.id_based_retrieval(
+                            chunk_requests=chunk_requests,
+                            filters=IndexFilters(access_control_list=None),
+                            batch_retrieval=not search_query.full_doc,
+                        )
+                    )
+                )
+
+            self._retrieved_sections = self._build_sections(
+                censored_chunks, inference_chunks
+            )
+
+        self._log_stage_timings()
+        return self._retrieved_sections
+
+    @contextmanager
+    def _timed_stage(self, stage: str) -> Iterator[None]:
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            elapsed = time.monotonic() - start
+            self.stage_timings[stage] = elapsed
+            _SEARCH_STAGE_SECONDS.labels(stage=stage).observe(elapsed)
+
+    def _log_stage_timings(self) -> None:
+        logger.debug(
+            "Search stage timings: "
+            + ", ".join(
+                f"{stage}={elapsed * 1000:.1f}ms"
+                for stage, elapsed in self.stage_timings.items()
+            )
+        )
 
+    def _censor_chunks(
+        self, retrieved_chunks: list[InferenceChunk]
+    ) -> list[InferenceChunk]:
         # If ee is enabled, censor the chunk sections based on user access
         # Otherwise, return the retrieved chunks
-        censored_chunks: list[InferenceChunk] = fetch_ee_implementation_or_noop(
+        return fetch_ee_implementation_or_noop(
             "onyx.external_permissions.post_query_censoring",
             "_post_query_chunk_censoring",
             retrieved_chunks,
@@ -237,10 +312,14 @@ class SearchPipeline:
             user=self.user,
         )
 
+    def _build_section_chunk_requests(
+        self, censored_chunks: list[InferenceChunk]
+    ) -> tuple[list[VespaChunkRequest], list[InferenceChunk]]:
+        """Returns the requests for the chunks the sections are built from, and the
+        chunks which are already known and don't need to be fetched."""
         above = self.search_query.chunks_above
         below = self.search_query.chunks_below
 
-        expanded_inference_sections = []
         inference_chunks: list[InferenceChunk] = []
         chunk_requests: list[VespaChunkRequest] = []
 
@@ -257,38 +336,7 @@ class SearchPipeline:
                             document_id=chunk.document_id,
                         )
                     )
-
-            inference_chunks.extend(
-                cleanup_chunks(
-                    self.document_index.id_based_retrieval(
-                        chunk_requests=chunk_requests,
-                        filters=IndexFilters(access_control_list=None),
-                    )
-                )
-            )
-
-            # Create a dictionary to group chunks by document_id
-            grouped_inference_chunks: dict[str, list[InferenceChunk]] = {}
-            for chunk in inference_chunks:
-                if chunk.document_id not in grouped_inference_chunks:
-                    grouped_inference_chunks[chunk.document_id] = []
-                grouped_inference_chunks[chunk.document_id].append(chunk)
-
-            for chunk_group in grouped_inference_chunks.values():
-                inference_section = inference_section_from_chunks(
-                    center_chunk=chunk_group[0],
-                    chunks=chunk_group,
-                )
-
-                if inference_section is not None:
-                    expanded_inference_sections.append(inference_section)
-                else:
-                    logger.warning(
-                        "Skipped creation of section for full docs, no chunks found"
-                    )
-
-            self._retrieved_sections = expanded_inference_sections
-            return expanded_inference_sections
+            return chunk_requests, inference_chunks
 
         # General flow:
         # - Combine chunks into lists by document_id
@@ -331,16 +379,40 @@ class SearchPipeline:
                     )
                 )
 
-        if chunk_requests:
-            inference_chunks.extend(
-                cleanup_chunks(
-                    self.document_index.id_based_retrieval(
-                        chunk_requests=chunk_requests,
-                        filters=IndexFilters(access_control_list=None),
-                        batch_retrieval=True,
-                    )
+        return chunk_requests, inference_chunks
+
+    def _build_sections(
+        self,
+        censored_chunks: list[InferenceChunk],
+        inference_chunks: list[InferenceChunk],
+    ) -> list[InferenceSection]:
+        above = self.search_query.chunks_above
+        below = self.search_query.chunks_below
+
+        expanded_inference_sections = []
+
+        if self.search_query.full_doc:
+            # Create a dictionary to group chunks by document_id
+            grouped_inference_chunks: dict[str, list[InferenceChunk]] = {}
+            for chunk in inference_chunks:
+                if chunk.document_id not in grouped_inference_chunks:
+                    grouped_inference_chunks[chunk.document_id] = []
+                grouped_inference_chunks[chunk.document_id].append(chunk)
+
+            for chunk_group in grouped_inference_chunks.values():
+                inference_section = inference_section_from_chunks(
+                    center_chunk=chunk_group[0],
+                    chunks=chunk_group,
                 )
-            )
+
+                if inference_section is not None:
+                    expanded_inference_sections.append(inference_section)
+                else:
+                    logger.warning(
+                        "Skipped creation of section for full docs, no chunks found"
+                    )
+
+            return expanded_inference_sections
 
         doc_chunk_ind_to_chunk = {
             (chunk.document_id, chunk.chunk_id): chunk for chunk in inference_chunks
@@ -376,7 +448,6 @@ class SearchPipeline:
             else:
                 logger.warning("Skipped creation of section, no chunks found")
 
-        self._retrieved_sections = expanded_inference_sections
         return expanded_inference_sections
 
     @property
@@ -422,6 +493,114 @@ class SearchPipeline:
 
         return self._reranked_sections
 
+    async def aretrieved_sections(self) -> list[InferenceSection]:
+        """Async variant of `retrieved_sections`. The query preprocessing (db and LLM
+        calls) and the EE censoring are sync and run in a worker thread."""
+        if self._retrieved_sections is not None:
+            return self._retrieved_sections
+
+        with self._timed_stage("preprocessing"):
+            if self._search_query is None:
+                await asyncio.to_thread(self._run_preprocessing)
+            search_query = self.search_query
+
+        with self._timed_stage("retrieval"):
+            if self._retrieved_chunks is None:
+                self._retrieved_chunks = await retrieve_chunks_async(
+                    query=search_query,
+                    document_index=self.document_index,
+                    db_session=self.db_session,
+                    retrieval_metrics_callback=self.retrieval_metrics_callback,
+                )
+
+        with self._timed_stage("censoring"):
+            censored_chunks = await asyncio.to_thread(
+                self._censor_chunks, self._retrieved_chunks
+            )
+
+        with self._timed_stage("section_expansion"):
+            chunk_requests, inference_chunks = self._build_section_chunk_requests(
+                censored_chunks
+            )
+            if chunk_requests:
+                inference_chunks.extend(
+                    cleanup_chunks(
+                        await self.document_index.id_based_retrieval_async(
+                            chunk_requests=chunk_requests,
+                            filters=IndexFilters(access_control_list=None),
+                            batch_retrieval=not search_query.full_doc,
+                        )
+                    )
+                )
+
+            self._retrieved_sections = self._build_sections(
+                censored_chunks, inference_chunks
+            )
+
+        self._log_stage_timings()
+        return self._retrieved_sections
+
+    async def areranked_sections(self) -> list[InferenceSection]:
+        """Async variant of `reranked_sections`. Only the reranking is awaited, the
+        LLM relevance filter runs when `section_relevance` is accessed."""
+        if self._reranked_sections is not None:
+            return self._reranked_sections
+
+        retrieved_sections = await self.aretrieved_sections()
+        if self.retrieved_sections_callback is not None:
+            self.retrieved_sections_callback(retrieved_sections)
+
+        search_query = self.search_query
+        if (
+            search_query.evaluation_type == LLMEvaluationType.SKIP
+            or not retrieved_sections
+        ):
+            self._reranked_sections = retrieved_sections
+            return self._reranked_sections
+
+        reranked_sections = retrieved_sections
+        if should_rerank(search_query.rerank_settings):
+            reranked_sections = await rerank_sections_async(
+                query_str=search_query.query,
+                rerank_settings=cast(RerankingDetails, search_query.rerank_settings),
+                sections_to_rerank=retrieved_sections,
+                rerank_metrics_callback=self.rerank_metrics_callback,
+            )
+
+        def _finalize_sections() -> None:
+            if get_search_time_image_analysis_enabled():
+                update_image_sections_with_query(
+                    reranked_sections, search_query.query, self.fast_llm
+                )
+            log_top_section_links(search_query.search_type.value, reranked_sections)
+
+        await asyncio.to_thread(_finalize_sections)
+
+        self._reranked_sections = reranked_sections
+        return self._reranked_sections
+
+    def _llm_section_relevance(self) -> list[SectionRelevancePiece]:
+        """Same as the relevance pieces of search_postprocessing, for sections that
+        were reranked without the postprocessing generator."""
+        sections = self.reranked_sections
+        selected_section_ids = {
+            section.center_chunk.unique_id
+            for section in filter_sections(
+                self.search_query,
+                sections[: self.search_query.max_llm_filter_sections],
+                self.fast_llm,
+            )
+        }
+        return [
+            SectionRelevancePiece(
+                document_id=section.center_chunk.document_id,
+                chunk_id=section.center_chunk.chunk_id,
+                relevant=section.center_chunk.unique_id in selected_section_ids,
+                content="",
+            )
+            for section in sections
+        ]
+
     @property
     def final_context_sections(self) -> list[InferenceSection]:
         if self._final_context_sections is not None:
@@ -496,12 +675,16 @@ class SearchPipeline:
             # since the property sets the generator. DO NOT REMOVE.
             _ = self.final_context_sections
 
-            self._section_relevance = next(
-                cast(
-                    Iterator[list[SectionRelevancePiece]],
-                    self._postprocessing_generator,
+            if self._postprocessing_generator is None:
+                # sections were reranked by areranked_sections
+                self._section_relevance = self._llm_section_relevance()
+            else:
+                self._section_relevance = next(
+                    cast(
+                        Iterator[list[SectionRelevancePiece]],
+                        self._postprocessing_generator,
+                    )
                 )
-            )
 
         else:
             # All other cases should have been handled above
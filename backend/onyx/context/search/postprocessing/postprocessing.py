@@ -1,4 +1,5 @@
 import base64
+import time
 from collections.abc import Callable
 from collections.abc import Iterator
 from typing import cast
@@ -7,6 +8,7 @@ import numpy
 from langchain_core.messages import BaseMessage
 from langchain_core.messages import HumanMessage
 from langchain_core.messages import SystemMessage
+from prometheus_client import Histogram
 
 from onyx.chat.models import SectionRelevancePiece
 from onyx.configs.app_configs import BLURB_SIZE
@@ -16,6 +18,8 @@ from onyx.configs.constants import RETURN_SEPARATOR
 from onyx.configs.llm_configs import get_search_time_image_analysis_enabled
 from onyx.configs.model_configs import CROSS_ENCODER_RANGE_MAX
 from onyx.configs.model_configs import CROSS_ENCODER_RANGE_MIN
+from onyx.configs.model_configs import RERANK_STAGED_TOP_K
+from onyx.configs.model_configs import RERANK_STAGED_WINDOW_SIZE
 from onyx.context.search.enums import LLMEvaluationType
 from onyx.context.search.models import ChunkMetric
 from onyx.context.search.models import InferenceChunk
@@ -25,6 +29,10 @@ from onyx.context.search.models import MAX_METRICS_CONTENT
 from onyx.context.search.models import RerankingDetails
 from onyx.context.search.models import RerankMetricsContainer
 from onyx.context.search.models import SearchQuery
+from onyx.context.search.postprocessing.rerank_cache import cached_rerank_scores
+from onyx.context.search.postprocessing.rerank_cache import (
+    cached_rerank_scores_async,
+)
 from onyx.db.engine import get_session_with_current_tenant
 from onyx.document_index.document_index_utils import (
     translate_boost_count_to_multiplier,
@@ -37,6 +45,9 @@ from onyx.secondary_llm_flows.chunk_usefulness import llm_batch_eval_sections
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import FunctionCall
 from onyx.utils.threadpool_concurrency import run_functions_in_parallel
+from onyx.utils.threadpool_concurrency import run_in_background
+from onyx.utils.threadpool_concurrency import TimeoutThread
+from onyx.utils.threadpool_concurrency import wait_on_background
 from onyx.utils.timing import log_function_time
 
 
@@ -160,8 +171,13 @@ def update_image_sections_with_query(
 
 logger = setup_logger()
 
+_RERANK_SECONDS = Histogram(
+    "onyx_rerank_seconds",
+    "Time spent reranking the chunks of a search with the cross-encoder",
+)
+
 
-def _log_top_section_links(search_flow: str, sections: list[InferenceSection]) -> None:
+def log_top_section_links(search_flow: str, sections: list[InferenceSection]) -> None:
     top_links = [
         (
             section.center_chunk.source_links[0]
@@ -237,19 +253,144 @@ def semantic_reranking(
     ), "Reranking flow cannot run without a specific model"
 
     chunks_to_rerank = chunks[: rerank_settings.num_rerank]
+    passages = _rerank_passages(chunks_to_rerank)
+
+    start_time = time.monotonic()
+    cross_encoder = _get_cross_encoder(rerank_settings)
+    sim_scores_floats: list[float] = []
+    cache_hits = 0
+    top_chunk_ids: list[str] | None = None
+    for window_start, window_end in _rerank_windows(len(chunks_to_rerank)):
+        window_scores, window_cache_hits = cached_rerank_scores(
+            query=query_str,
+            rerank_settings=rerank_settings,
+            chunks=chunks_to_rerank[window_start:window_end],
+            passages=passages[window_start:window_end],
+            predict=cross_encoder.predict,
+        )
+        sim_scores_floats.extend(window_scores)
+        cache_hits += window_cache_hits
+        if window_end < len(chunks_to_rerank):
+            new_top_chunk_ids = _top_chunk_ids(chunks_to_rerank, sim_scores_floats)
+            if new_top_chunk_ids == top_chunk_ids:
+                break
+            top_chunk_ids = new_top_chunk_ids
+
+    return _apply_rerank_scores(
+        chunks_to_rerank,
+        sim_scores_floats,
+        model_min=model_min,
+        model_max=model_max,
+        rerank_metrics_callback=rerank_metrics_callback,
+        cache_hits=cache_hits,
+        rerank_seconds=time.monotonic() - start_time,
+    )
 
-    cross_encoder = RerankingModel(
-        model_name=rerank_settings.rerank_model_name,
+
+async def semantic_reranking_async(
+    query_str: str,
+    rerank_settings: RerankingDetails,
+    chunks: list[InferenceChunk],
+    model_min: int = CROSS_ENCODER_RANGE_MIN,
+    model_max: int = CROSS_ENCODER_RANGE_MAX,
+    rerank_metrics_callback: Callable[[RerankMetricsContainer], None] | None = None,
+) -> tuple[list[InferenceChunk], list[int]]:
+    """Async variant of `semantic_reranking`."""
+    assert (
+        rerank_settings.rerank_model_name
+    ), "Reranking flow cannot run without a specific model"
+
+    chunks_to_rerank = chunks[: rerank_settings.num_rerank]
+    passages = _rerank_passages(chunks_to_rerank)
+
+    start_time = time.monotonic()
+    cross_encoder = _get_cross_encoder(rerank_settings)
+    sim_scores_floats: list[float] = []
+    cache_hits = 0
+    top_chunk_ids: list[str] | None = None
+    for window_start, window_end in _rerank_windows(len(chunks_to_rerank)):
+        window_scores, window_cache_hits = await cached_rerank_scores_async(
+            query=query_str,
+            rerank_settings=rerank_settings,
+            chunks=chunks_to_rerank[window_start:window_end],
+            passages=passages[window_start:window_end],
+            predict=cross_encoder.apredict,
+        )
+        sim_scores_floats.extend(window_scores)
+        cache_hits += window_cache_hits
+        if window_end < len(chunks_to_rerank):
+            new_top_chunk_ids = _top_chunk_ids(chunks_to_rerank, sim_scores_floats)
+            if new_top_chunk_ids == top_chunk_ids:
+                break
+            top_chunk_ids = new_top_chunk_ids
+
+    return _apply_rerank_scores(
+        chunks_to_rerank,
+        sim_scores_floats,
+        model_min=model_min,
+        model_max=model_max,
+        rerank_metrics_callback=rerank_metrics_callback,
+        cache_hits=cache_hits,
+        rerank_seconds=time.monotonic() - start_time,
+    )
+
+
+def _get_cross_encoder(rerank_settings: RerankingDetails) -> RerankingModel:
+    return RerankingModel(
+        model_name=cast(str, rerank_settings.rerank_model_name),
         provider_type=rerank_settings.rerank_provider_type,
         api_key=rerank_settings.rerank_api_key,
         api_url=rerank_settings.rerank_api_url,
     )
 
-    passages = [
+
+def _rerank_passages(chunks_to_rerank: list[InferenceChunk]) -> list[str]:
+    return [
         f"{chunk.semantic_identifier or chunk.title or ''}\n{chunk.content}"
         for chunk in chunks_to_rerank
     ]
-    sim_scores_floats = cross_encoder.predict(query=query_str, passages=passages)
+
+
+def _rerank_windows(num_chunks: int) -> list[tuple[int, int]]:
+    """Ranges of the chunks (in retrieval order) sent to the cross-encoder at once,
+    a single range with all of them unless staged reranking is enabled."""
+    if RERANK_STAGED_WINDOW_SIZE <= 0:
+        return [(0, num_chunks)]
+    return [
+        (window_start, min(window_start + RERANK_STAGED_WINDOW_SIZE, num_chunks))
+        for window_start in range(0, num_chunks, RERANK_STAGED_WINDOW_SIZE)
+    ]
+
+
+def _top_chunk_ids(
+    chunks_to_rerank: list[InferenceChunk], sim_scores_floats: list[float]
+) -> list[str]:
+    """Ids of the best RERANK_STAGED_TOP_K of the chunks scored so far, ordered the
+    way `_apply_rerank_scores` would rank them."""
+    sim_scores = numpy.array(sim_scores_floats)
+    scored_chunks = chunks_to_rerank[: len(sim_scores_floats)]
+    boosted_sim_scores = (
+        (sim_scores - numpy.min(sim_scores))
+        * [translate_boost_count_to_multiplier(chunk.boost) for chunk in scored_chunks]
+        * [chunk.recency_bias for chunk in scored_chunks]
+    )
+    top_indices = numpy.argsort(-boosted_sim_scores, kind="stable")
+    return [scored_chunks[ind].unique_id for ind in top_indices[:RERANK_STAGED_TOP_K]]
+
+
+def _apply_rerank_scores(
+    chunks_to_rerank: list[InferenceChunk],
+    sim_scores_floats: list[float],
+    model_min: int,
+    model_max: int,
+    rerank_metrics_callback: Callable[[RerankMetricsContainer], None] | None,
+    cache_hits: int = 0,
+    rerank_seconds: float = 0.0,
+) -> tuple[list[InferenceChunk], list[int]]:
+    """Chunks past the scored ones (staged reranking stopped early) keep their
+    retrieval order after the reranked chunks, without a score."""
+    scored_chunks = chunks_to_rerank[: len(sim_scores_floats)]
+    unscored_chunks = chunks_to_rerank[len(sim_scores_floats) :]
 
     # Old logic to handle multiple cross-encoders preserved but not used
     sim_scores = [numpy.array(sim_scores_floats)]
@@ -263,16 +404,16 @@ def semantic_reranking(
     ) / len(sim_scores)
 
     boosts = [
-        translate_boost_count_to_multiplier(chunk.boost) for chunk in chunks_to_rerank
+        translate_boost_count_to_multiplier(chunk.boost) for chunk in scored_chunks
     ]
-    recency_multiplier = [chunk.recency_bias for chunk in chunks_to_rerank]
+    recency_multiplier = [chunk.recency_bias for chunk in scored_chunks]
     boosted_sim_scores = shifted_sim_scores * boosts * recency_multiplier
     normalized_b_s_scores = (boosted_sim_scores + cross_models_min - model_min) / (
         model_max - model_min
     )
     orig_indices = [i for i in range(len(normalized_b_s_scores))]
     scored_results = list(
-        zip(normalized_b_s_scores, raw_sim_scores, chunks_to_rerank, orig_indices)
+        zip(normalized_b_s_scores, raw_sim_scores, scored_chunks, orig_indices)
     )
     scored_results.sort(key=lambda x: x[0], reverse=True)
     ranked_sim_scores, ranked_raw_scores, ranked_chunks, ranked_indices = zip(
@@ -286,6 +427,15 @@ def semantic_reranking(
     # Assign new chunk scores based on reranking
     for ind, chunk in enumerate(ranked_chunks):
         chunk.score = ranked_sim_scores[ind]
+    for chunk in unscored_chunks:
+        chunk.score = None
+
+    _RERANK_SECONDS.observe(rerank_seconds)
+    logger.debug(
+        f"Reranked {len(scored_chunks)} chunks in {rerank_seconds * 1000:.1f}ms: "
+        f"{cache_hits} rerank score cache hits, "
+        f"{len(unscored_chunks)} chunks skipped once the top chunks were stable"
+    )
 
     if rerank_metrics_callback is not None:
         chunk_metrics = [
@@ -300,11 +450,17 @@ def semantic_reranking(
 
         rerank_metrics_callback(
             RerankMetricsContainer(
-                metrics=chunk_metrics, raw_similarity_scores=ranked_raw_scores  # type: ignore
+                metrics=chunk_metrics,
+                raw_similarity_scores=ranked_raw_scores,  # type: ignore
+                cache_hits=cache_hits,
+                skipped_chunks=len(unscored_chunks),
+                rerank_seconds=rerank_seconds,
             )
         )
 
-    return list(ranked_chunks), list(ranked_indices)
+    return list(ranked_chunks) + unscored_chunks, list(ranked_indices) + list(
+        range(len(scored_chunks), len(chunks_to_rerank))
+    )
 
 
 def should_rerank(rerank_settings: RerankingDetails | None) -> bool:
@@ -341,6 +497,37 @@ def rerank_sections(
         chunks=chunks_to_rerank,
         rerank_metrics_callback=rerank_metrics_callback,
     )
+    return _order_reranked_sections(
+        rerank_settings, sections_to_rerank, chunks_to_rerank, ranked_chunks
+    )
+
+
+async def rerank_sections_async(
+    query_str: str,
+    rerank_settings: RerankingDetails,
+    sections_to_rerank: list[InferenceSection],
+    rerank_metrics_callback: Callable[[RerankMetricsContainer], None] | None = None,
+) -> list[InferenceSection]:
+    """Async variant of `rerank_sections`."""
+    chunks_to_rerank = [section.center_chunk for section in sections_to_rerank]
+
+    ranked_chunks, _ = await semantic_reranking_async(
+        query_str=query_str,
+        rerank_settings=rerank_settings,
+        chunks=chunks_to_rerank,
+        rerank_metrics_callback=rerank_metrics_callback,
+    )
+    return _order_reranked_sections(
+        rerank_settings, sections_to_rerank, chunks_to_rerank, ranked_chunks
+    )
+
+
+def _order_reranked_sections(
+    rerank_settings: RerankingDetails,
+    sections_to_rerank: list[InferenceSection],
+    chunks_to_rerank: list[InferenceChunk],
+    ranked_chunks: list[InferenceChunk],
+) -> list[InferenceSection]:
     lower_chunks = chunks_to_rerank[rerank_settings.num_rerank :]
 
     # Scores from rerank cannot be meaningfully combined with scores without rerank
@@ -418,96 +605,54 @@ def search_postprocessing(
         yield cast(list[SectionRelevancePiece], [])
         return
 
-    post_processing_tasks: list[FunctionCall] = []
-
     if not retrieved_sections:
         # Avoids trying to rerank an empty list which throws an error
         yield cast(list[InferenceSection], [])
         yield cast(list[SectionRelevancePiece], [])
         return
 
-    rerank_task_id = None
-    sections_yielded = False
-    if should_rerank(search_query.rerank_settings):
-        post_processing_tasks.append(
-            FunctionCall(
-                rerank_sections,
-                (
-                    search_query.query,
-                    search_query.rerank_settings,  # Cannot be None here
-                    retrieved_sections,
-                    rerank_metrics_callback,
-                ),
-            )
-        )
-        rerank_task_id = post_processing_tasks[-1].result_id
-    else:
-        # NOTE: if we don't rerank, we can return the chunks immediately
-        # since we know this is the final order.
-        # This way the user experience isn't delayed by the LLM step
-        if get_search_time_image_analysis_enabled():
-            update_image_sections_with_query(
-                retrieved_sections, search_query.query, llm
-            )
-        _log_top_section_links(search_query.search_type.value, retrieved_sections)
-        yield retrieved_sections
-        sections_yielded = True
-
-    llm_filter_task_id = None
+    # The LLM relevance filter runs in the background, so the sections are yielded as
+    # soon as they are reranked instead of once the slower of the two is done
+    llm_filter_task: TimeoutThread[list[InferenceSection]] | None = None
     # Only add LLM filtering if not in SKIP mode and if LLM doc relevance is not disabled
     if not DISABLE_LLM_DOC_RELEVANCE and search_query.evaluation_type in [
         LLMEvaluationType.BASIC,
         LLMEvaluationType.UNSPECIFIED,
     ]:
         logger.info("Adding LLM filtering task for document relevance evaluation")
-        post_processing_tasks.append(
-            FunctionCall(
-                filter_sections,
-                (
-                    search_query,
-                    retrieved_sections[: search_query.max_llm_filter_sections],
-                    llm,
-                ),
-            )
+        llm_filter_task = run_in_background(
+            filter_sections,
+            search_query,
+            retrieved_sections[: search_query.max_llm_filter_sections],
+            llm,
         )
-        llm_filter_task_id = post_processing_tasks[-1].result_id
     elif DISABLE_LLM_DOC_RELEVANCE:
         logger.info("Skipping LLM filtering task because LLM doc relevance is disabled")
 
-    post_processing_results = (
-        run_functions_in_parallel(post_processing_tasks)
-        if post_processing_tasks
-        else {}
-    )
-    reranked_sections = cast(
-        list[InferenceSection] | None,
-        post_processing_results.get(str(rerank_task_id)) if rerank_task_id else None,
-    )
-    if reranked_sections:
-        if sections_yielded:
-            logger.error(
-                "Trying to yield re-ranked sections, but sections were already yielded. This should never happen."
-            )
-        else:
-            _log_top_section_links(search_query.search_type.value, reranked_sections)
-
-            # Add the image processing step here
-            if get_search_time_image_analysis_enabled():
-                update_image_sections_with_query(
-                    reranked_sections, search_query.query, llm
-                )
+    if should_rerank(search_query.rerank_settings):
+        final_sections = rerank_sections(
+            search_query.query,
+            cast(RerankingDetails, search_query.rerank_settings),
+            retrieved_sections,
+            rerank_metrics_callback,
+        )
+    else:
+        # NOTE: if we don't rerank, the retrieved order is the final order
+        final_sections = retrieved_sections
 
-            yield reranked_sections
+    log_top_section_links(search_query.search_type.value, final_sections)
+    if get_search_time_image_analysis_enabled():
+        update_image_sections_with_query(final_sections, search_query.query, llm)
+    yield final_sections
 
-    llm_selected_section_ids = (
-        [
-            section.center_chunk.unique_id
-            for section in post_processing_results.get(str(llm_filter_task_id), [])
-        ]
-        if llm_filter_task_id
-        else []
+    llm_filtered_sections = (
+        wait_on_background(llm_filter_task) if llm_filter_task is not None else []
     )
 
+    llm_selected_section_ids = {
+        section.center_chunk.unique_id for section in llm_filtered_sections
+    }
+
     yield [
         SectionRelevancePiece(
             document_id=section.center_chunk.document_id,
@@ -515,5 +660,5 @@ def search_postprocessing(
             relevant=section.center_chunk.unique_id in llm_selected_section_ids,
             content="",
         )
-        for section in (reranked_sections or retrieved_sections)
+        for section in final_sections
     ]
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import threading
+from collections.abc import Awaitable
+from collections.abc import Callable
+
+from prometheus_client import Counter
+
+from onyx.configs.model_configs import RERANK_SCORE_CACHE_SIZE
+from onyx.configs.model_configs import RERANK_SCORE_CACHE_TTL_SECONDS
+from onyx.context.search.models import InferenceChunk
+from onyx.context.search.models import RerankingDetails
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+from shared_configs.contextvars import get_current_tenant_id
+
+_RERANK_SCORE_CACHE_LOOKUPS = Counter(
+    "onyx_rerank_score_cache_lookups",
+    "Rerank score cache lookups by result (hit or miss)",
+    ["result"],
+)
+
+
+def build_rerank_score_cache_key(
+    rerank_settings: RerankingDetails,
+    query: str,
+    chunk: InferenceChunk,
+    passage: str,
+    tenant_id: str,
+) -> str:
+    """The hash of the passage is part of the key, so a reindexed chunk with new
+    content is scored again."""
+    key_parts = [
+        tenant_id,
+        rerank_settings.rerank_model_name,
+        (
+            rerank_settings.rerank_provider_type.value
+            if rerank_settings.rerank_provider_type
+            else None
+        ),
+        rerank_settings.rerank_api_url,
+        query,
+        chunk.unique_id,
+        hashlib.sha256(passage.encode("utf-8")).hexdigest(),
+    ]
+    return hashlib.sha256(
+        json.dumps(key_parts, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+class RerankScoreCache(TTLLRUCache[str, float]):
+    """TTL + LRU cache of cross-encoder scores for the API server process."""
+
+
+_RERANK_SCORE_CACHE: RerankScoreCache | None = None
+_RERANK_SCORE_CACHE_LOCK = threading.Lock()
+
+
+def get_rerank_score_cache() -> RerankScoreCache | None:
+    """Process wide rerank score cache, None if RERANK_SCORE_CACHE_SIZE is 0."""
+    global _RERANK_SCORE_CACHE
+
+    if RERANK_SCORE_CACHE_SIZE <= 0:
+        return None
+
+    with _RERANK_SCORE_CACHE_LOCK:
+        if _RERANK_SCORE_CACHE is None:
+            _RERANK_SCORE_CACHE = RerankScoreCache(
+                max_size=RERANK_SCORE_CACHE_SIZE,
+                ttl_seconds=RERANK_SCORE_CACHE_TTL_SECONDS,
+            )
+        return _RERANK_SCORE_CACHE
+
+
+def _lookup_cached_rerank_scores(
+    cache: RerankScoreCache,
+    query: str,
+    rerank_settings: RerankingDetails,
+    chunks: list[InferenceChunk],
+    passages: list[str],
+) -> tuple[list[str], dict[str, float], dict[str, str]]:
+    """Returns the cache key of every chunk, the cached scores by key and the
+    distinct passages that still need to be scored, by key."""
+    tenant_id = get_current_tenant_id()
+    keys = [
+        build_rerank_score_cache_key(rerank_settings, query, chunk, passage, tenant_id)
+        for chunk, passage in zip(chunks, passages)
+    ]
+    found = cache.get_many(keys)
+
+    missing: dict[str, str] = {}
+    for key, passage in zip(keys, passages):
+        if key not in found:
+            missing[key] = passage
+
+    _RERANK_SCORE_CACHE_LOOKUPS.labels(result="hit").inc(len(keys) - len(missing))
+    _RERANK_SCORE_CACHE_LOOKUPS.labels(result="miss").inc(len(missing))
+    return keys, found, missing
+
+
+def cached_rerank_scores(
+    query: str,
+    rerank_settings: RerankingDetails,
+    chunks: list[InferenceChunk],
+    passages: list[str],
+    predict: Callable[[str, list[str]], list[float]],
+) -> tuple[list[float], int]:
+    """Returns the cross-encoder score of every passage and the number of them that
+    came from the cache, only the others are scored with `predict`."""
+    cache = get_rerank_score_cache()
+    if cache is None or not passages:
+        return predict(query, passages), 0
+
+    keys, found, missing = _lookup_cached_rerank_scores(
+        cache, query, rerank_settings, chunks, passages
+    )
+    if missing:
+        fresh = dict(zip(missing.keys(), predict(query, list(missing.values()))))
+        cache.put_many(fresh)
+        found.update(fresh)
+
+    return [found[key] for key in keys], len(keys) - len(missing)
+
+
+async def cached_rerank_scores_async(
+    query: str,
+    rerank_settings: RerankingDetails,
+    chunks: list[InferenceChunk],
+    passages: list[str],
+    predict: Callable[[str, list[str]], Awaitable[list[float]]],
+) -> tuple[list[float], int]:
+    """Async variant of `cached_rerank_scores`."""
+    cache = get_rerank_score_cache()
+    if cache is None or not passages:
+        return await predict(query, passages), 0
+
+    keys, found, missing = _lookup_cached_rerank_scores(
+        cache, query, rerank_settings, chunks, passages
+    )
+    if missing:
+        fresh = dict(zip(missing.keys(), await predict(query, list(missing.values()))))
+        cache.put_many(fresh)
+        found.update(fresh)
+
+    return [found[key] for key in keys], len(keys) - len(missing)
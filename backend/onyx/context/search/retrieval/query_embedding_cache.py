@@ -0,0 +1,250 @@
+import asyncio
+import hashlib
+import json
+import threading
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import cast
+
+import numpy as np
+from prometheus_client import Counter
+
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_SIZE
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_TTL_SECONDS
+from onyx.configs.model_configs import QUERY_EMBEDDING_CACHE_USE_REDIS
+from onyx.db.models import SearchSettings
+from onyx.redis.redis_pool import get_redis_client
+from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+from shared_configs.contextvars import get_current_tenant_id
+from shared_configs.model_server_models import Embedding
+
+logger = setup_logger()
+
+_REDIS_KEY_PREFIX = "query_embedding:"
+
+_QUERY_EMBEDDING_CACHE_LOOKUPS = Counter(
+    "onyx_query_embedding_cache_lookups",
+    "Query embedding cache lookups by result (local_hit, redis_hit or miss)",
+    ["result"],
+)
+
+
+def build_query_embedding_cache_key(
+    search_settings: SearchSettings, query: str, tenant_id: str
+) -> str:
+    """The search settings id is part of the key, so switching to new search
+    settings (even with the same model) never serves embeddings of the old ones."""
+    key_parts = [
+        tenant_id,
+        search_settings.id,
+        search_settings.model_name,
+        (
+            search_settings.provider_type.value
+            if search_settings.provider_type
+            else None
+        ),
+        search_settings.normalize,
+        search_settings.query_prefix,
+        search_settings.reduced_dimension,
+        search_settings.api_url,
+        search_settings.deployment_name,
+        query,
+    ]
+    return hashlib.sha256(
+        json.dumps(key_parts, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+class QueryEmbeddingCache:
+    """TTL + LRU cache of query embeddings for the API server process, optionally
+    backed by Redis so that all API server pods share the embeddings they compute.
+    Redis errors are logged and treated as misses."""
+
+    def __init__(self, max_size: int, ttl_seconds: int, use_redis: bool) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.use_redis = use_redis
+
+        self._local_cache: TTLLRUCache[str, Embedding] = TTLLRUCache(
+            max_size=max_size, ttl_seconds=ttl_seconds
+        )
+
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.local_hits + self.redis_hits + self.misses
+        return (self.local_hits + self.redis_hits) / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        self._local_cache.clear()
+
+    def get_many(self, keys: list[str], tenant_id: str) -> dict[str, Embedding]:
+        unique_keys = list(dict.fromkeys(keys))
+        found = self._local_cache.get_many(unique_keys)
+        num_local_hits = len(found)
+
+        missing_keys = [key for key in unique_keys if key not in found]
+        if self.use_redis and missing_keys:
+            redis_found = self._get_many_from_redis(missing_keys, tenant_id)
+            self._local_cache.put_many(redis_found)
+            found.update(redis_found)
+
+        num_redis_hits = len(found) - num_local_hits
+        num_misses = len(unique_keys) - len(found)
+        self.local_hits += num_local_hits
+        self.redis_hits += num_redis_hits
+        self.misses += num_misses
+        _QUERY_EMBEDDING_CACHE_LOOKUPS.labels(result="local_hit").inc(num_local_hits)
+        _QUERY_EMBEDDING_CACHE_LOOKUPS.labels(result="redis_hit").inc(num_redis_hits)
+        _QUERY_EMBEDDING_CACHE_LOOKUPS.labels(result="miss").inc(num_misses)
+        return found
+
+    def put_many(self, embeddings: dict[str, Embedding], tenant_id: str) -> None:
+        if not embeddings:
+            return
+        self._local_cache.put_many(embeddings)
+        if self.use_redis:
+            self._put_many_to_redis(embeddings, tenant_id)
+
+    def _get_many_from_redis(
+        self, keys: list[str], tenant_id: str
+    ) -> dict[str, Embedding]:
+        try:
+            redis_client = get_redis_client(tenant_id=tenant_id)
+            values = cast(
+                list[bytes | None],
+                redis_client.mget([_REDIS_KEY_PREFIX + key for key in keys]),
+            )
+        except Exception:
+            logger.exception("Failed to read query embeddings from Redis")
+            return {}
+
+        return {
+            key: np.frombuffer(value, dtype="<f4").tolist()
+            for key, value in zip(keys, values)
+            if value
+        }
+
+    def _put_many_to_redis(
+        self, embeddings: dict[str, Embedding], tenant_id: str
+    ) -> None:
+        try:
+            redis_client = get_redis_client(tenant_id=tenant_id)
+            pipe = redis_client.pipeline()
+            for key, embedding in embeddings.items():
+                pipe.set(
+                    _REDIS_KEY_PREFIX + key,
+                    np.asarray(embedding, dtype="<f4").tobytes(),
+                    ex=self.ttl_seconds,
+                )
+            pipe.execute()
+        except Exception:
+            logger.exception("Failed to write query embeddings to Redis")
+
+
+_QUERY_EMBEDDING_CACHE: QueryEmbeddingCache | None = None
+_QUERY_EMBEDDING_CACHE_LOCK = threading.Lock()
+
+
+def get_query_embedding_cache() -> QueryEmbeddingCache | None:
+    """Process wide query embedding cache, None if QUERY_EMBEDDING_CACHE_SIZE is 0."""
+    global _QUERY_EMBEDDING_CACHE
+
+    if QUERY_EMBEDDING_CACHE_SIZE <= 0:
+        return None
+
+    with _QUERY_EMBEDDING_CACHE_LOCK:
+        if _QUERY_EMBEDDING_CACHE is None:
+            _QUERY_EMBEDDING_CACHE = QueryEmbeddingCache(
+                max_size=QUERY_EMBEDDING_CACHE_SIZE,
+                ttl_seconds=QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+                use_redis=QUERY_EMBEDDING_CACHE_USE_REDIS,
+            )
+        return _QUERY_EMBEDDING_CACHE
+
+
+def _lookup_cached_query_embeddings(
+    cache: QueryEmbeddingCache,
+    queries: list[str],
+    search_settings: SearchSettings,
+    tenant_id: str,
+) -> tuple[list[str], dict[str, Embedding], dict[str, str]]:
+    """Returns the cache key of every query, the cached embeddings by key and the
+    distinct queries that still need to be embedded, by key."""
+    keys = [
+        build_query_embedding_cache_key(search_settings, query, tenant_id)
+        for query in queries
+    ]
+    found = cache.get_many(keys, tenant_id)
+
+    missing: dict[str, str] = {}
+    for key, query in zip(keys, queries):
+        if key not in found:
+            missing[key] = query
+    return keys, found, missing
+
+
+def cached_query_embeddings(
+    queries: list[str],
+    search_settings: SearchSettings,
+    embed: Callable[[list[str]], list[Embedding]],
+) -> list[Embedding]:
+    """Returns the embeddings of the queries, only the ones not in the cache are
+    embedded (once per distinct query) with `embed`."""
+    cache = get_query_embedding_cache()
+    if cache is None or not queries:
+        return embed(queries)
+
+    tenant_id = get_current_tenant_id()
+    keys, found, missing = _lookup_cached_query_embeddings(
+        cache, queries, search_settings, tenant_id
+    )
+
+    if missing:
+        new_embeddings = embed(list(missing.values()))
+        fresh = dict(zip(missing.keys(), new_embeddings))
+        cache.put_many(fresh, tenant_id)
+        found.update(fresh)
+
+    return [found[key] for key in keys]
+
+
+async def cached_query_embeddings_async(
+    queries: list[str],
+    search_settings: SearchSettings,
+    embed: Callable[[list[str]], Awaitable[list[Embedding]]],
+) -> list[Embedding]:
+    """Async variant of `cached_query_embeddings`. Redis lookups run in a worker
+    thread so they don't block the event loop."""
+    cache = get_query_embedding_cache()
+    if cache is None or not queries:
+        return await embed(queries)
+
+    tenant_id = get_current_tenant_id()
+    if cache.use_redis:
+        keys, found, missing = await asyncio.to_thread(
+            _lookup_cached_query_embeddings,
+            cache,
+            queries,
+            search_settings,
+            tenant_id,
+        )
+    else:
+        keys, found, missing = _lookup_cached_query_embeddings(
+            cache, queries, search_settings, tenant_id
+        )
+
+    if missing:
+        new_embeddings = await embed(list(missing.values()))
+        fresh = dict(zip(missing.keys(), new_embeddings))
+        if cache.use_redis:
+            await asyncio.to_thread(cache.put_many, fresh, tenant_id)
+        else:
+            cache.put_many(fresh, tenant_id)
+        found.update(fresh)
+
+    return [found[key] for key in keys]
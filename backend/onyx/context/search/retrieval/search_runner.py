@@ -1,3 +1,4 @@
+import asyncio
 import string
 from collections.abc import Callable
 
@@ -17,7 +18,14 @@ from onyx.context.search.models import SearchQuery
 from onyx.context.search.postprocessing.postprocessing import cleanup_chunks
 from onyx.context.search.preprocessing.preprocessing import HYBRID_ALPHA
 from onyx.context.search.preprocessing.preprocessing import HYBRID_ALPHA_KEYWORD
+from onyx.context.search.retrieval.query_embedding_cache import (
+    cached_query_embeddings,
+)
+from onyx.context.search.retrieval.query_embedding_cache import (
+    cached_query_embeddings_async,
+)
 from onyx.context.search.utils import inference_section_from_chunks
+from onyx.db.models import SearchSettings
 from onyx.db.search_settings import get_current_search_settings
 from onyx.db.search_settings import get_multilingual_expansion
 from onyx.document_index.interfaces import DocumentIndex
@@ -115,34 +123,45 @@ def combine_retrieval_results(
     return sorted_chunks
 
 
-def get_query_embedding(query: str, db_session: Session) -> Embedding:
-    search_settings = get_current_search_settings(db_session)
-
-    model = EmbeddingModel.from_db_model(
+def _get_query_embedding_model(search_settings: SearchSettings) -> EmbeddingModel:
+    return EmbeddingModel.from_db_model(
         search_settings=search_settings,
         # The below are globally set, this flow always uses the indexing one
         server_host=MODEL_SERVER_HOST,
         server_port=MODEL_SERVER_PORT,
     )
 
-    query_embedding = model.encode([query], text_type=EmbedTextType.QUERY)[0]
-    return query_embedding
+
+def get_query_embedding(query: str, db_session: Session) -> Embedding:
+    return get_query_embeddings([query], db_session)[0]
 
 
 def get_query_embeddings(queries: list[str], db_session: Session) -> list[Embedding]:
     search_settings = get_current_search_settings(db_session)
+    model = _get_query_embedding_model(search_settings)
 
-    model = EmbeddingModel.from_db_model(
-        search_settings=search_settings,
-        # The below are globally set, this flow always uses the indexing one
-        server_host=MODEL_SERVER_HOST,
-        server_port=MODEL_SERVER_PORT,
+    query_embedding = cached_query_embeddings(
+        queries,
+        search_settings,
+        embed=lambda texts: model.encode(texts, text_type=EmbedTextType.QUERY),
     )
-
-    query_embedding = model.encode(queries, text_type=EmbedTextType.QUERY)
     return query_embedding
 
 
+async def get_query_embeddings_async(
+    queries: list[str], search_settings: SearchSettings
+) -> list[Embedding]:
+    """Async variant of `get_query_embeddings`. Takes the search settings instead of
+    a db session so that concurrent calls don't share the session."""
+    model = _get_query_embedding_model(search_settings)
+
+    return await cached_query_embeddings_async(
+        queries,
+        search_settings,
+        embed=lambda texts: model.aencode(texts, text_type=EmbedTextType.QUERY),
+    )
+
+
 @log_function_time(print_only=True)
 def doc_index_retrieval(
     query: SearchQuery,
@@ -275,6 +294,35 @@ def doc_index_retrieval(
 
     logger.info(f"Overall number of top initial retrieval chunks: {len(top_chunks)}")
 
+    retrieval_requests, normal_chunks, referenced_chunk_scores = _split_large_chunks(
+        top_chunks
+    )
+
+    # If there are no large chunks, just return the normal chunks
+    if not retrieval_requests:
+        return cleanup_chunks(normal_chunks)
+
+    # Retrieve and return the referenced normal chunks from the large chunks
+    retrieved_inference_chunks = document_index.id_based_retrieval(
+        chunk_requests=retrieval_requests,
+        filters=query.filters,
+        batch_retrieval=True,
+    )
+
+    return _merge_referenced_chunks(
+        normal_chunks, retrieved_inference_chunks, referenced_chunk_scores
+    )
+
+
+def _split_large_chunks(
+    top_chunks: list[InferenceChunkUncleaned],
+) -> tuple[
+    list[VespaChunkRequest],
+    list[InferenceChunkUncleaned],
+    dict[tuple[str, int], float],
+]:
+    """Returns the requests for the chunks referenced by the large chunks, the
+    normal chunks and the highest score of each referenced chunk."""
     retrieval_requests: list[VespaChunkRequest] = []
     normal_chunks: list[InferenceChunkUncleaned] = []
     referenced_chunk_scores: dict[tuple[str, int], float] = {}
@@ -297,17 +345,14 @@ def doc_index_retrieval(
         else:
             normal_chunks.append(chunk)
 
-    # If there are no large chunks, just return the normal chunks
-    if not retrieval_requests:
-        return cleanup_chunks(normal_chunks)
+    return retrieval_requests, normal_chunks, referenced_chunk_scores
 
-    # Retrieve and return the referenced normal chunks from the large chunks
-    retrieved_inference_chunks = document_index.id_based_retrieval(
-        chunk_requests=retrieval_requests,
-        filters=query.filters,
-        batch_retrieval=True,
-    )
 
+def _merge_referenced_chunks(
+    normal_chunks: list[InferenceChunkUncleaned],
+    retrieved_inference_chunks: list[InferenceChunkUncleaned],
+    referenced_chunk_scores: dict[tuple[str, int], float],
+) -> list[InferenceChunk]:
     # Apply the scores from the large chunks to the chunks referenced
     # by each large chunk
     for chunk in retrieved_inference_chunks:
@@ -342,65 +387,151 @@ def doc_index_retrieval(
     return cleanup_chunks(deduped_chunks)
 
 
+async def doc_index_retrieval_async(
+    query: SearchQuery,
+    document_index: DocumentIndex,
+    search_settings: SearchSettings,
+) -> list[InferenceChunk]:
+    """Async variant of `doc_index_retrieval`, the searches of the expanded queries
+    run concurrently on the event loop instead of in background threads."""
+    query_embedding = (
+        query.precomputed_query_embedding
+        or (await get_query_embeddings_async([query.query], search_settings))[0]
+    )
+
+    base_search = document_index.hybrid_retrieval_async(
+        query.query,
+        query_embedding,
+        query.processed_keywords,
+        query.filters,
+        query.hybrid_alpha,
+        query.recency_bias_multiplier,
+        query.num_hits,
+        QueryExpansionType.SEMANTIC,
+        query.offset,
+    )
+
+    if (
+        query.expanded_queries
+        and query.expanded_queries.keywords_expansions
+        and query.expanded_queries.semantic_expansions
+    ):
+        # The keyword search uses the original query embedding, so only the
+        # semantic expansions need to be embedded
+        searches = [
+            base_search,
+            document_index.hybrid_retrieval_async(
+                query.expanded_queries.keywords_expansions[0],
+                query_embedding,
+                query.processed_keywords,
+                query.filters,
+                HYBRID_ALPHA_KEYWORD,
+                query.recency_bias_multiplier,
+                query.num_hits,
+                QueryExpansionType.KEYWORD,
+                query.offset,
+            ),
+        ]
+
+        if query.search_type == SearchType.SEMANTIC:
+            semantic_embeddings = await get_query_embeddings_async(
+                query.expanded_queries.semantic_expansions, search_settings
+            )
+            searches.append(
+                document_index.hybrid_retrieval_async(
+                    query.expanded_queries.semantic_expansions[0],
+                    semantic_embeddings[0],
+                    query.processed_keywords,
+                    query.filters,
+                    HYBRID_ALPHA,
+                    query.recency_bias_multiplier,
+                    query.num_hits,
+                    QueryExpansionType.SEMANTIC,
+                    query.offset,
+                )
+            )
+
+        chunk_sets = await asyncio.gather(*searches)
+        top_chunks = _dedupe_chunks(
+            [chunk for chunk_set in chunk_sets for chunk in chunk_set]
+        )
+    else:
+        top_chunks = _dedupe_chunks(await base_search)
+
+    logger.info(f"Overall number of top initial retrieval chunks: {len(top_chunks)}")
+
+    retrieval_requests, normal_chunks, referenced_chunk_scores = _split_large_chunks(
+        top_chunks
+    )
+
+    # If there are no large chunks, just return the normal chunks
+    if not retrieval_requests:
+        return cleanup_chunks(normal_chunks)
+
+    retrieved_inference_chunks = await document_index.id_based_retrieval_async(
+        chunk_requests=retrieval_requests,
+        filters=query.filters,
+        batch_retrieval=True,
+    )
+
+    return _merge_referenced_chunks(
+        normal_chunks, retrieved_inference_chunks, referenced_chunk_scores
+    )
+
+
 def _simplify_text(text: str) -> str:
     return "".join(
         char for char in text if char not in string.punctuation and not char.isspace()
     ).lower()
 
 
-def retrieve_chunks(
+def _rephrase_query(
+    query: SearchQuery, multilingual_expansion: list[str]
+) -> list[SearchQuery]:
+    simplified_queries = set()
+    rephrased_queries: list[SearchQuery] = []
+
+    # Currently only uses query expansion on multilingual use cases
+    query_rephrases = multilingual_query_expansion(query.query, multilingual_expansion)
+    # Just to be extra sure, add the original query.
+    query_rephrases.append(query.query)
+    for rephrase in set(query_rephrases):
+        # Sometimes the model rephrases the query in the same language with minor changes
+        # Avoid doing an extra search with the minor changes as this biases the results
+        simplified_rephrase = _simplify_text(rephrase)
+        if simplified_rephrase in simplified_queries:
+            continue
+        simplified_queries.add(simplified_rephrase)
+
+        q_copy = query.model_copy(
+            update={
+                "query": rephrase,
+                # need to recompute for each rephrase
+                # note that `SearchQuery` is a frozen model, so we can't update
+                # it below
+                "precomputed_query_embedding": None,
+            },
+            deep=True,
+        )
+        rephrased_queries.append(q_copy)
+
+    return rephrased_queries
+
+
+def _should_expand_query(query: SearchQuery, multilingual_expansion: list[str]) -> bool:
+    # Don't do query expansion on complex queries, rephrasings likely would not work well
+    return bool(multilingual_expansion) and not (
+        "\n" in query.query or "\r" in query.query
+    )
+
+
+def _report_top_chunks(
     query: SearchQuery,
-    document_index: DocumentIndex,
-    db_session: Session,
+    top_chunks: list[InferenceChunk],
     retrieval_metrics_callback: (
         Callable[[RetrievalMetricsContainer], None] | None
     ) = None,
 ) -> list[InferenceChunk]:
-    """Returns a list of the best chunks from an initial keyword/semantic/ hybrid search."""
-
-    multilingual_expansion = get_multilingual_expansion(db_session)
-    # Don't do query expansion on complex queries, rephrasings likely would not work well
-    if not multilingual_expansion or "\n" in query.query or "\r" in query.query:
-        top_chunks = doc_index_retrieval(
-            query=query, document_index=document_index, db_session=db_session
-        )
-    else:
-        simplified_queries = set()
-        run_queries: list[tuple[Callable, tuple]] = []
-
-        # Currently only uses query expansion on multilingual use cases
-        query_rephrases = multilingual_query_expansion(
-            query.query, multilingual_expansion
-        )
-        # Just to be extra sure, add the original query.
-        query_rephrases.append(query.query)
-        for rephrase in set(query_rephrases):
-            # Sometimes the model rephrases the query in the same language with minor changes
-            # Avoid doing an extra search with the minor changes as this biases the results
-            simplified_rephrase = _simplify_text(rephrase)
-            if simplified_rephrase in simplified_queries:
-                continue
-            simplified_queries.add(simplified_rephrase)
-
-            q_copy = query.model_copy(
-                update={
-                    "query": rephrase,
-                    # need to recompute for each rephrase
-                    # note that `SearchQuery` is a frozen model, so we can't update
-                    # it below
-                    "precomputed_query_embedding": None,
-                },
-                deep=True,
-            )
-            run_queries.append(
-                (
-                    doc_index_retrieval,
-                    (q_copy, document_index, db_session),
-                )
-            )
-        parallel_search_results = run_functions_tuples_in_parallel(run_queries)
-        top_chunks = combine_retrieval_results(parallel_search_results)
-
     if not top_chunks:
         logger.warning(
             f"Hybrid ({query.search_type.value.capitalize()}) search returned no results "
@@ -427,6 +558,70 @@ def retrieve_chunks(
     return top_chunks
 
 
+def retrieve_chunks(
+    query: SearchQuery,
+    document_index: DocumentIndex,
+    db_session: Session,
+    retrieval_metrics_callback: (
+        Callable[[RetrievalMetricsContainer], None] | None
+    ) = None,
+) -> list[InferenceChunk]:
+    """Returns a list of the best chunks from an initial keyword/semantic/ hybrid search."""
+
+    multilingual_expansion = get_multilingual_expansion(db_session)
+    if not _should_expand_query(query, multilingual_expansion):
+        top_chunks = doc_index_retrieval(
+            query=query, document_index=document_index, db_session=db_session
+        )
+    else:
+        run_queries: list[tuple[Callable, tuple]] = [
+            (doc_index_retrieval, (q_copy, document_index, db_session))
+            for q_copy in _rephrase_query(query, multilingual_expansion)
+        ]
+        parallel_search_results = run_functions_tuples_in_parallel(run_queries)
+        top_chunks = combine_retrieval_results(parallel_search_results)
+
+    return _report_top_chunks(query, top_chunks, retrieval_metrics_callback)
+
+
+async def retrieve_chunks_async(
+    query: SearchQuery,
+    document_index: DocumentIndex,
+    db_session: Session,
+    retrieval_metrics_callback: (
+        Callable[[RetrievalMetricsContainer], None] | None
+    ) = None,
+) -> list[InferenceChunk]:
+    """Async variant of `retrieve_chunks`. The db lookups and the (LLM based) query
+    rephrasing are sync and run in a worker thread."""
+
+    def _load_settings() -> tuple[list[str], SearchSettings]:
+        return get_multilingual_expansion(db_session), get_current_search_settings(
+            db_session
+        )
+
+    multilingual_expansion, search_settings = await asyncio.to_thread(_load_settings)
+    if not _should_expand_query(query, multilingual_expansion):
+        top_chunks = await doc_index_retrieval_async(
+            query=query,
+            document_index=document_index,
+            search_settings=search_settings,
+        )
+    else:
+        rephrased_queries = await asyncio.to_thread(
+            _rephrase_query, query, multilingual_expansion
+        )
+        search_results = await asyncio.gather(
+            *(
+                doc_index_retrieval_async(q_copy, document_index, search_settings)
+                for q_copy in rephrased_queries
+            )
+        )
+        top_chunks = combine_retrieval_results(list(search_results))
+
+    return _report_top_chunks(query, top_chunks, retrieval_metrics_callback)
+
+
 def inference_sections_from_ids(
     doc_identifiers: list[tuple[str, int]],
     document_index: DocumentIndex,
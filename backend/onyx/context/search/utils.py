@@ -79,6 +79,34 @@ def relevant_sections_to_indices(
     ]
 
 
+def reranked_sections_to_indices(
+    reranked_sections: list[InferenceSection], items: list[TSection]
+) -> list[int]:
+    """New order of the items as indices into `items`, documents follow the order of
+    their best reranked section, documents without a reranked section keep their
+    place after them."""
+    document_id_to_index: dict[str, int] = {}
+    for index, item in enumerate(items):
+        document_id = (
+            item.center_chunk.document_id
+            if isinstance(item, InferenceSection)
+            else item.document_id
+        )
+        document_id_to_index.setdefault(document_id, index)
+
+    reranked_indices = list(
+        dict.fromkeys(
+            document_id_to_index[section.center_chunk.document_id]
+            for section in reranked_sections
+            if section.center_chunk.document_id in document_id_to_index
+        )
+    )
+    reranked_index_set = set(reranked_indices)
+    return reranked_indices + [
+        index for index in range(len(items)) if index not in reranked_index_set
+    ]
+
+
 def drop_llm_indices(
     llm_indices: list[int],
     search_docs: Sequence[DBSearchDoc | SavedSearchDoc],
@@ -6,6 +6,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 from sqlalchemy.orm import Session
 
+from onyx.access.acl_cache import invalidate_user_acls
 from onyx.auth.api_key import ApiKeyDescriptor
 from onyx.auth.api_key import build_displayable_api_key
 from onyx.auth.api_key import generate_api_key
@@ -126,6 +127,7 @@ def update_api_key(
     api_key_user.email = get_api_key_fake_email(email_name, str(api_key_user.id))
     api_key_user.role = api_key_args.role
     db_session.commit()
+    invalidate_user_acls()
 
     return ApiKeyDescriptor(
         api_key_id=existing_api_key.id,
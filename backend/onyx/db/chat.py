@@ -560,6 +560,46 @@ def get_chat_messages_by_session(
     return list(result)
 
 
+def get_chat_message_tree_by_session(
+    chat_session_id: UUID,
+    db_session: Session,
+) -> Sequence[Row[Tuple[int, int | None, int | None, MessageType, bool, int]]]:
+    """Only the columns needed to trace the messages of the session, without their
+    content, tool calls or sub questions. Ordered with the root message first."""
+    stmt = (
+        select(
+            ChatMessage.id,
+            ChatMessage.parent_message,
+            ChatMessage.latest_child_message,
+            ChatMessage.message_type,
+            ChatMessage.refined_answer_improvement,
+            ChatMessage.token_count,
+        )
+        .where(ChatMessage.chat_session_id == chat_session_id)
+        .order_by(nullsfirst(ChatMessage.parent_message))
+    )
+    return db_session.execute(stmt).all()
+
+
+def get_chat_messages_by_ids(
+    chat_message_ids: list[int],
+    db_session: Session,
+    prefetch_tool_calls: bool = False,
+) -> list[ChatMessage]:
+    """Returns the messages in the order of the passed in ids. Does not check
+    permissions."""
+    stmt = select(ChatMessage).where(ChatMessage.id.in_(chat_message_ids))
+    if prefetch_tool_calls:
+        stmt = stmt.options(
+            joinedload(ChatMessage.tool_call),
+            joinedload(ChatMessage.sub_questions).joinedload(
+                AgentSubQuestion.sub_queries
+            ),
+        )
+    id_to_msg = {msg.id: msg for msg in db_session.scalars(stmt).unique().all()}
+    return [id_to_msg[message_id] for message_id in chat_message_ids]
+
+
 def get_or_create_root_message(
     chat_session_id: UUID,
     db_session: Session,
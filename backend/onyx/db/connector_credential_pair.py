@@ -13,6 +13,7 @@ from sqlalchemy.orm import joinedload
 from sqlalchemy.orm import selectinload
 from sqlalchemy.orm import Session
 
+from onyx.access.acl_cache import invalidate_user_acls
 from onyx.configs.app_configs import DISABLE_AUTH
 from onyx.configs.constants import DocumentSource
 from onyx.db.connector import fetch_connector_by_id
@@ -477,6 +478,14 @@ def _relate_groups_to_cc_pair__no_commit(
         )
 
 
+def _invalidate_censoring_enabled_sources() -> None:
+    fetch_ee_implementation_or_noop(
+        "onyx.external_permissions.post_query_censoring",
+        "invalidate_censoring_enabled_sources",
+        None,
+    )()
+
+
 def add_credential_to_connector(
     db_session: Session,
     user: User | None,
@@ -568,6 +577,7 @@ def add_credential_to_connector(
     )
 
     db_session.commit()
+    _invalidate_censoring_enabled_sources()
 
     return StatusResponse(
         success=True,
@@ -617,6 +627,8 @@ def remove_credential_from_connector(
         )
         db_session.delete(association)
         db_session.commit()
+        invalidate_user_acls()
+        _invalidate_censoring_enabled_sources()
         return StatusResponse(
             success=True,
             message=f"Credential {credential_id} removed from Connector",
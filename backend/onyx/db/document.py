@@ -156,6 +156,27 @@ def construct_document_id_select_for_connector_credential_pair(
     return stmt
 
 
+def construct_sorted_document_id_select_for_connector_credential_pair(
+    connector_id: int, credential_id: int
+) -> Select:
+    """Document ids of the cc pair in code point order (COLLATE "C"), which is the
+    order Python sorts strings in, so the ids can be merged with ids sorted in Python.
+
+    This returns a statement that should be executed with the yield_per execution
+    option, so the ids are streamed instead of loaded all at once."""
+    return (
+        select(DocumentByConnectorCredentialPair.id)
+        .join(DbDocument, DbDocument.id == DocumentByConnectorCredentialPair.id)
+        .where(
+            and_(
+                DocumentByConnectorCredentialPair.connector_id == connector_id,
+                DocumentByConnectorCredentialPair.credential_id == credential_id,
+            )
+        )
+        .order_by(DocumentByConnectorCredentialPair.id.collate("C"))
+    )
+
+
 def construct_document_select_for_connector_credential_pair(
     connector_id: int, credential_id: int | None = None
 ) -> Select:
@@ -528,6 +549,20 @@ def mark_document_as_synced(document_id: str, db_session: Session) -> None:
     db_session.commit()
 
 
+def mark_documents_as_synced(document_ids: list[str], db_session: Session) -> None:
+    """Bulk version of mark_document_as_synced. Unknown document ids are ignored."""
+    if not document_ids:
+        return
+
+    stmt = (
+        update(DbDocument)
+        .where(DbDocument.id.in_(document_ids))
+        .values(last_synced=datetime.now(timezone.utc))
+    )
+    db_session.execute(stmt)
+    db_session.commit()
+
+
 def delete_document_by_connector_credential_pair__no_commit(
     db_session: Session,
     document_id: str,
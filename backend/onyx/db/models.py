@@ -585,6 +585,11 @@ class Document(Base):
         postgresql.ARRAY(String), nullable=True
     )
     is_public: Mapped[bool] = mapped_column(Boolean, default=False)
+    # Hash of the external access last written by the permission sync, documents whose
+    # external access did not change are skipped without comparing the columns above
+    external_access_fingerprint: Mapped[str | None] = mapped_column(
+        String, nullable=True
+    )
 
     retrieval_feedbacks: Mapped[list["DocumentRetrievalFeedback"]] = relationship(
         "DocumentRetrievalFeedback", back_populates="document"
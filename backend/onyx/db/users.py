@@ -12,6 +12,7 @@ from sqlalchemy.sql import expression
 from sqlalchemy.sql.elements import ColumnElement
 from sqlalchemy.sql.elements import KeyedColumnElement
 
+from onyx.access.acl_cache import invalidate_user_acls
 from onyx.auth.invited_users import get_invited_users
 from onyx.auth.invited_users import write_invited_users
 from onyx.auth.schemas import UserRole
@@ -244,6 +245,7 @@ def add_slack_user_if_not_exists(db_session: Session, email: str) -> User:
         if user.role == UserRole.EXT_PERM_USER:
             user.role = UserRole.SLACK_USER
             db_session.commit()
+            invalidate_user_acls()
         return user
 
     user = _generate_slack_user(email=email)
@@ -336,6 +338,7 @@ def delete_user_from_db(
     ).delete()
     db_session.delete(user_to_delete)
     db_session.commit()
+    invalidate_user_acls()
 
     # NOTE: edge case may exist with race conditions
     # with this `invited user` scheme generally.
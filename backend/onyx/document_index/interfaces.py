@@ -1,4 +1,5 @@
 import abc
+import asyncio
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
@@ -337,6 +338,41 @@ class IdRetrievalCapable(abc.ABC):
         """
         raise NotImplementedError
 
+    async def id_based_retrieval_async(
+        self,
+        chunk_requests: list[VespaChunkRequest],
+        filters: IndexFilters,
+        batch_retrieval: bool = False,
+    ) -> list[InferenceChunkUncleaned]:
+        """
+        Async variant of `id_based_retrieval`. Runs the sync implementation in a worker
+        thread unless the index overrides it with a native async implementation.
+        """
+        return await asyncio.to_thread(
+            self.id_based_retrieval, chunk_requests, filters, batch_retrieval
+        )
+
+    @abc.abstractmethod
+    def get_title_embeddings(
+        self,
+        document_ids: list[str],
+        *,
+        tenant_id: str,
+    ) -> dict[str, tuple[str, Embedding]]:
+        """
+        Fetch the title and title embedding currently stored for each document. Used to
+        avoid re-embedding titles when reindexing documents into the same index.
+
+        Parameters:
+        - document_ids: the documents to look up
+        - tenant_id: the tenant the documents belong to
+
+        Returns:
+            map of document id to (stored title, title embedding), documents that are not
+            indexed or have no title embedding are left out
+        """
+        raise NotImplementedError
+
 
 class HybridCapable(abc.ABC):
     """
@@ -386,6 +422,37 @@ class HybridCapable(abc.ABC):
         """
         raise NotImplementedError
 
+    async def hybrid_retrieval_async(
+        self,
+        query: str,
+        query_embedding: Embedding,
+        final_keywords: list[str] | None,
+        filters: IndexFilters,
+        hybrid_alpha: float,
+        time_decay_multiplier: float,
+        num_to_retrieve: int,
+        ranking_profile_type: QueryExpansionType,
+        offset: int = 0,
+        title_content_ratio: float | None = TITLE_CONTENT_RATIO,
+    ) -> list[InferenceChunkUncleaned]:
+        """
+        Async variant of `hybrid_retrieval`. Runs the sync implementation in a worker
+        thread unless the index overrides it with a native async implementation.
+        """
+        return await asyncio.to_thread(
+            self.hybrid_retrieval,
+            query,
+            query_embedding,
+            final_keywords,
+            filters,
+            hybrid_alpha,
+            time_decay_multiplier,
+            num_to_retrieve,
+            ranking_profile_type,
+            offset,
+            title_content_ratio,
+        )
+
 
 class AdminCapable(abc.ABC):
     """
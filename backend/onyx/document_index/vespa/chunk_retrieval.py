@@ -1,3 +1,4 @@
+import asyncio
 import json
 import string
 from collections.abc import Callable
@@ -14,7 +15,10 @@ from onyx.configs.app_configs import LOG_VESPA_TIMING_INFORMATION
 from onyx.context.search.models import IndexFilters
 from onyx.context.search.models import InferenceChunkUncleaned
 from onyx.document_index.interfaces import VespaChunkRequest
-from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
+from onyx.document_index.vespa.shared_utils.utils import (
+    get_vespa_async_query_client,
+)
+from onyx.document_index.vespa.shared_utils.utils import get_vespa_query_client
 from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
     build_vespa_filters,
 )
@@ -49,6 +53,7 @@ from onyx.document_index.vespa_constants import SOURCE_LINKS
 from onyx.document_index.vespa_constants import SOURCE_TYPE
 from onyx.document_index.vespa_constants import TITLE
 from onyx.document_index.vespa_constants import YQL_BASE
+from onyx.utils.batching import batch_generator
 from onyx.utils.logger import setup_logger
 from onyx.utils.threadpool_concurrency import run_functions_tuples_in_parallel
 
@@ -153,17 +158,13 @@ def _vespa_hit_to_inference_chunk(
     )
 
 
-def _get_chunks_via_visit_api(
-    chunk_request: VespaChunkRequest,
+def _build_visit_params(
+    chunk_requests: list[VespaChunkRequest],
     index_name: str,
     filters: IndexFilters,
-    field_names: list[str] | None = None,
-    get_large_chunks: bool = False,
-) -> list[dict]:
-    # Constructing the URL for the Visit API
-    # NOTE: visit API uses the same URL as the document API, but with different params
-    url = DOCUMENT_ID_ENDPOINT.format(index_name=index_name)
-
+    field_names: list[str] | None,
+    get_large_chunks: bool,
+) -> dict[str, Any]:
     # build the list of fields to retrieve
     field_set_list = (
         None
@@ -179,17 +180,28 @@ def _get_chunks_via_visit_api(
         field_set_list.append(acl_fieldset_entry)
     field_set = ",".join(field_set_list) if field_set_list else None
 
-    # build filters
-    selection = f"{index_name}.document_id=='{chunk_request.document_id}'"
+    # build filters, a visit scans the whole corpus regardless of the selection so
+    # several documents are folded into a single visit
+    document_selections: list[str] = []
+    for chunk_request in chunk_requests:
+        document_selection = f"{index_name}.document_id=='{chunk_request.document_id}'"
+        if chunk_request.is_capped:
+            document_selection += (
+                f" and {index_name}.chunk_id>={chunk_request.min_chunk_ind or 0}"
+                f" and {index_name}.chunk_id<={chunk_request.max_chunk_ind}"
+            )
+        document_selections.append(document_selection)
 
-    if chunk_request.is_capped:
-        selection += f" and {index_name}.chunk_id>={chunk_request.min_chunk_ind or 0}"
-        selection += f" and {index_name}.chunk_id<={chunk_request.max_chunk_ind}"
+    selection = (
+        document_selections[0]
+        if len(document_selections) == 1
+        else "(" + " or ".join(f"({sel})" for sel in document_selections) + ")"
+    )
     if not get_large_chunks:
         selection += f" and {index_name}.large_chunk_reference_ids == null"
 
     # Setting up the selection criteria in the query parameters
-    params = {
+    return {
         # NOTE: Document Selector Language doesn't allow `contains`, so we can't check
         # for the ACL in the selection. Instead, we have to check as a postfilter
         "selection": selection,
@@ -198,37 +210,67 @@ def _get_chunks_via_visit_api(
         "fieldSet": field_set,
     }
 
+
+def _log_vespa_error(e: httpx.HTTPError, params: Mapping[str, Any]) -> str:
+    error_base = "Failed to query Vespa"
+    logger.error(
+        f"{error_base}:\n"
+        f"Request URL: {e.request.url}\n"
+        f"Request Headers: {e.request.headers}\n"
+        f"Request Payload: {params}\n"
+        f"Exception: {str(e)}"
+        + (
+            f"\nResponse: {e.response.text}"
+            if isinstance(e, httpx.HTTPStatusError)
+            else ""
+        )
+    )
+    return error_base
+
+
+def _filter_visited_documents(
+    response_data: dict[str, Any], filters: IndexFilters
+) -> list[dict]:
+    document_chunks: list[dict] = []
+    for document in response_data.get("documents", []):
+        if filters.access_control_list:
+            document_acl = document["fields"].get(ACCESS_CONTROL_LIST)
+            if not document_acl or not any(
+                user_acl_entry in document_acl
+                for user_acl_entry in filters.access_control_list
+            ):
+                continue
+        document_chunks.append(document)
+    return document_chunks
+
+
+def _get_chunks_via_visit_api(
+    chunk_requests: list[VespaChunkRequest],
+    index_name: str,
+    filters: IndexFilters,
+    field_names: list[str] | None = None,
+    get_large_chunks: bool = False,
+) -> list[dict]:
+    # Constructing the URL for the Visit API
+    # NOTE: visit API uses the same URL as the document API, but with different params
+    url = DOCUMENT_ID_ENDPOINT.format(index_name=index_name)
+    params = _build_visit_params(
+        chunk_requests, index_name, filters, field_names, get_large_chunks
+    )
+
     document_chunks: list[dict] = []
     while True:
         try:
             filtered_params = {k: v for k, v in params.items() if v is not None}
-            with get_vespa_http_client() as http_client:
-                response = http_client.get(url, params=filtered_params)
-                response.raise_for_status()
+            http_client = get_vespa_query_client()
+            response = http_client.get(url, params=filtered_params)
+            response.raise_for_status()
         except httpx.HTTPError as e:
-            error_base = "Failed to query Vespa"
-            logger.error(
-                f"{error_base}:\n"
-                f"Request URL: {e.request.url}\n"
-                f"Request Headers: {e.request.headers}\n"
-                f"Request Payload: {params}\n"
-                f"Exception: {str(e)}"
-            )
-            raise httpx.HTTPError(error_base) from e
+            raise httpx.HTTPError(_log_vespa_error(e, params)) from e
 
         # Check if the response contains any documents
         response_data = response.json()
-
-        if "documents" in response_data:
-            for document in response_data["documents"]:
-                if filters.access_control_list:
-                    document_acl = document["fields"].get(ACCESS_CONTROL_LIST)
-                    if not document_acl or not any(
-                        user_acl_entry in document_acl
-                        for user_acl_entry in filters.access_control_list
-                    ):
-                        continue
-                document_chunks.append(document)
+        document_chunks.extend(_filter_visited_documents(response_data, filters))
 
         # Check for continuation token to handle pagination
         if "continuation" in response_data and response_data["continuation"]:
@@ -248,7 +290,7 @@ def _get_chunks_via_visit_api(
 #     get_large_chunks: bool = False,
 # ) -> list[str]:
 #     document_chunks = _get_chunks_via_visit_api(
-#         chunk_request=VespaChunkRequest(document_id=document_id),
+#         chunk_requests=[VespaChunkRequest(document_id=document_id)],
 #         index_name=index_name,
 #         filters=filters or IndexFilters(access_control_list=None),
 #         field_names=[DOCUMENT_ID],
@@ -257,6 +299,21 @@ def _get_chunks_via_visit_api(
 #     return [chunk["id"].split("::", 1)[-1] for chunk in document_chunks]
 
 
+def _visited_chunk_sets_to_inference_chunks(
+    vespa_chunk_sets: list[list[dict] | None],
+) -> list[InferenceChunkUncleaned]:
+    # Any failures to retrieve would give a None, drop the Nones and empty lists
+    flattened_vespa_chunks = []
+    for chunk_set in vespa_chunk_sets:
+        if chunk_set:
+            flattened_vespa_chunks.extend(chunk_set)
+
+    return [
+        _vespa_hit_to_inference_chunk(chunk, null_score=True)
+        for chunk in flattened_vespa_chunks
+    ]
+
+
 def parallel_visit_api_retrieval(
     index_name: str,
     chunk_requests: list[VespaChunkRequest],
@@ -266,38 +323,25 @@ def parallel_visit_api_retrieval(
     functions_with_args: list[tuple[Callable, tuple]] = [
         (
             _get_chunks_via_visit_api,
-            (chunk_request, index_name, filters, get_large_chunks),
+            (request_group, index_name, filters, None, get_large_chunks),
         )
-        for chunk_request in chunk_requests
+        for request_group in batch_generator(chunk_requests, MAX_OR_CONDITIONS)
     ]
 
     parallel_results = run_functions_tuples_in_parallel(
         functions_with_args, allow_failures=True
     )
 
-    # Any failures to retrieve would give a None, drop the Nones and empty lists
-    vespa_chunk_sets = [res for res in parallel_results if res]
-
-    flattened_vespa_chunks = []
-    for chunk_set in vespa_chunk_sets:
-        flattened_vespa_chunks.extend(chunk_set)
-
-    inference_chunks = [
-        _vespa_hit_to_inference_chunk(chunk, null_score=True)
-        for chunk in flattened_vespa_chunks
-    ]
-
-    return inference_chunks
+    return _visited_chunk_sets_to_inference_chunks(parallel_results)
 
 
-@retry(tries=3, delay=1, backoff=2)
-def query_vespa(
+def _build_query_params(
     query_params: Mapping[str, str | int | float],
-) -> list[InferenceChunkUncleaned]:
+) -> dict[str, Any]:
     if "query" in query_params and not cast(str, query_params["query"]).strip():
         raise ValueError("No/empty query received")
 
-    params = dict(
+    return dict(
         **query_params,
         **(
             {
@@ -308,26 +352,11 @@ def query_vespa(
         ),
     )
 
-    try:
-        with get_vespa_http_client() as http_client:
-            response = http_client.post(SEARCH_ENDPOINT, json=params)
-            response.raise_for_status()
-    except httpx.HTTPError as e:
-        error_base = "Failed to query Vespa"
-        logger.error(
-            f"{error_base}:\n"
-            f"Request URL: {e.request.url}\n"
-            f"Request Headers: {e.request.headers}\n"
-            f"Request Payload: {params}\n"
-            f"Exception: {str(e)}"
-            + (
-                f"\nResponse: {e.response.text}"
-                if isinstance(e, httpx.HTTPStatusError)
-                else ""
-            )
-        )
-        raise httpx.HTTPError(error_base) from e
 
+def _query_response_to_inference_chunks(
+    response: httpx.Response,
+    query_params: Mapping[str, str | int | float],
+) -> list[InferenceChunkUncleaned]:
     response_json: dict[str, Any] = response.json()
 
     if LOG_VESPA_TIMING_INFORMATION:
@@ -369,32 +398,45 @@ def query_vespa(
     return inference_chunks
 
 
-def _get_chunks_via_batch_search(
+@retry(tries=3, delay=1, backoff=2)
+def query_vespa(
+    query_params: Mapping[str, str | int | float],
+) -> list[InferenceChunkUncleaned]:
+    params = _build_query_params(query_params)
+
+    try:
+        http_client = get_vespa_query_client()
+        response = http_client.post(SEARCH_ENDPOINT, json=params)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        raise httpx.HTTPError(_log_vespa_error(e, params)) from e
+
+    return _query_response_to_inference_chunks(response, query_params)
+
+
+def _build_batch_search_params(
     index_name: str,
     chunk_requests: list[VespaChunkRequest],
     filters: IndexFilters,
-    get_large_chunks: bool = False,
-) -> list[InferenceChunkUncleaned]:
-    if not chunk_requests:
-        return []
-
+) -> dict[str, str | int | float]:
     filters_str = build_vespa_filters(filters=filters, include_hidden=True)
 
     yql = (
         YQL_BASE.format(index_name=index_name)
         + filters_str
-        + build_vespa_id_based_retrieval_yql(chunk_requests[0])
+        + " or ".join(
+            build_vespa_id_based_retrieval_yql(request) for request in chunk_requests
+        )
     )
-    chunk_requests.pop(0)
-
-    for request in chunk_requests:
-        yql += " or " + build_vespa_id_based_retrieval_yql(request)
-    params: dict[str, str | int | float] = {
+    return {
         "yql": yql,
         "hits": MAX_ID_SEARCH_QUERY_SIZE,
     }
 
-    inference_chunks = query_vespa(params)
+
+def _finalize_batch_search_chunks(
+    inference_chunks: list[InferenceChunkUncleaned], get_large_chunks: bool
+) -> list[InferenceChunkUncleaned]:
     if not get_large_chunks:
         inference_chunks = [
             chunk for chunk in inference_chunks if not chunk.large_chunk_reference_ids
@@ -403,13 +445,27 @@ def _get_chunks_via_batch_search(
     return inference_chunks
 
 
-def batch_search_api_retrieval(
+def _get_chunks_via_batch_search(
     index_name: str,
     chunk_requests: list[VespaChunkRequest],
     filters: IndexFilters,
     get_large_chunks: bool = False,
 ) -> list[InferenceChunkUncleaned]:
-    retrieved_chunks: list[InferenceChunkUncleaned] = []
+    if not chunk_requests:
+        return []
+
+    inference_chunks = query_vespa(
+        _build_batch_search_params(index_name, chunk_requests, filters)
+    )
+    return _finalize_batch_search_chunks(inference_chunks, get_large_chunks)
+
+
+def _plan_batch_search(
+    chunk_requests: list[VespaChunkRequest],
+) -> tuple[list[list[VespaChunkRequest]], list[VespaChunkRequest]]:
+    """Splits the requests into batches of capped requests that are each retrieved
+    with a single search query, and the uncapped requests which need the Visit API."""
+    capped_batches: list[list[VespaChunkRequest]] = []
     capped_requests: list[VespaChunkRequest] = []
     uncapped_requests: list[VespaChunkRequest] = []
     chunk_count = 0
@@ -425,35 +481,169 @@ def batch_search_api_retrieval(
             chunk_count + range > MAX_ID_SEARCH_QUERY_SIZE
             or req_ind % MAX_OR_CONDITIONS == 0
         ):
-            retrieved_chunks.extend(
-                _get_chunks_via_batch_search(
-                    index_name=index_name,
-                    chunk_requests=capped_requests,
-                    filters=filters,
-                    get_large_chunks=get_large_chunks,
-                )
-            )
+            capped_batches.append(capped_requests)
             capped_requests = []
             chunk_count = 0
         capped_requests.append(request)
         chunk_count += range
 
     if capped_requests:
-        retrieved_chunks.extend(
-            _get_chunks_via_batch_search(
-                index_name=index_name,
-                chunk_requests=capped_requests,
-                filters=filters,
-                get_large_chunks=get_large_chunks,
-            )
-        )
+        capped_batches.append(capped_requests)
 
+    return capped_batches, uncapped_requests
+
+
+def batch_search_api_retrieval(
+    index_name: str,
+    chunk_requests: list[VespaChunkRequest],
+    filters: IndexFilters,
+    get_large_chunks: bool = False,
+) -> list[InferenceChunkUncleaned]:
+    capped_batches, uncapped_requests = _plan_batch_search(chunk_requests)
+
+    # All batches are sent at once, so retrieving the chunks costs a single
+    # round trip no matter how many batches the requests are split into
+    functions_with_args: list[tuple[Callable, tuple]] = [
+        (
+            _get_chunks_via_batch_search,
+            (index_name, capped_requests, filters, get_large_chunks),
+        )
+        for capped_requests in capped_batches
+        if capped_requests
+    ]
     if uncapped_requests:
         logger.debug(f"Retrieving {len(uncapped_requests)} uncapped requests")
-        retrieved_chunks.extend(
-            parallel_visit_api_retrieval(
-                index_name, uncapped_requests, filters, get_large_chunks
+        functions_with_args.append(
+            (
+                parallel_visit_api_retrieval,
+                (index_name, uncapped_requests, filters, get_large_chunks),
             )
         )
 
-    return retrieved_chunks
+    if len(functions_with_args) == 1:
+        func, args = functions_with_args[0]
+        return func(*args)
+
+    parallel_results = run_functions_tuples_in_parallel(functions_with_args)
+    return [chunk for chunks in parallel_results for chunk in chunks]
+
+
+# Async variants for the asyncio search path. They share the request building and
+# response parsing with the functions above, but await the requests on the pooled
+# async client instead of blocking a worker thread per request.
+
+
+async def _get_chunks_via_visit_api_async(
+    chunk_requests: list[VespaChunkRequest],
+    index_name: str,
+    filters: IndexFilters,
+    field_names: list[str] | None = None,
+    get_large_chunks: bool = False,
+) -> list[dict]:
+    url = DOCUMENT_ID_ENDPOINT.format(index_name=index_name)
+    params = _build_visit_params(
+        chunk_requests, index_name, filters, field_names, get_large_chunks
+    )
+
+    document_chunks: list[dict] = []
+    while True:
+        try:
+            filtered_params = {k: v for k, v in params.items() if v is not None}
+            http_client = get_vespa_async_query_client()
+            response = await http_client.get(url, params=filtered_params)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise httpx.HTTPError(_log_vespa_error(e, params)) from e
+
+        response_data = response.json()
+        document_chunks.extend(_filter_visited_documents(response_data, filters))
+
+        if "continuation" in response_data and response_data["continuation"]:
+            params["continuation"] = response_data["continuation"]
+        else:
+            break
+
+    return document_chunks
+
+
+async def parallel_visit_api_retrieval_async(
+    index_name: str,
+    chunk_requests: list[VespaChunkRequest],
+    filters: IndexFilters,
+    get_large_chunks: bool = False,
+) -> list[InferenceChunkUncleaned]:
+    results = await asyncio.gather(
+        *(
+            _get_chunks_via_visit_api_async(
+                request_group, index_name, filters, None, get_large_chunks
+            )
+            for request_group in batch_generator(chunk_requests, MAX_OR_CONDITIONS)
+        ),
+        return_exceptions=True,
+    )
+
+    vespa_chunk_sets: list[list[dict] | None] = []
+    for result in results:
+        if isinstance(result, BaseException):
+            # same as allow_failures in the sync variant
+            logger.error(f"Failed to retrieve chunks via the Visit API: {result}")
+            vespa_chunk_sets.append(None)
+        else:
+            vespa_chunk_sets.append(result)
+    return _visited_chunk_sets_to_inference_chunks(vespa_chunk_sets)
+
+
+async def query_vespa_async(
+    query_params: Mapping[str, str | int | float],
+    tries: int = 3,
+    delay: float = 1,
+    backoff: float = 2,
+) -> list[InferenceChunkUncleaned]:
+    """Async variant of `query_vespa`, with the same retry behavior."""
+    params = _build_query_params(query_params)
+
+    attempt = 1
+    while True:
+        try:
+            http_client = get_vespa_async_query_client()
+            response = await http_client.post(SEARCH_ENDPOINT, json=params)
+            response.raise_for_status()
+            return _query_response_to_inference_chunks(response, query_params)
+        except httpx.HTTPError as e:
+            error_base = _log_vespa_error(e, params)
+            if attempt >= tries:
+                raise httpx.HTTPError(error_base) from e
+        logger.warning(f"Vespa query failed, retrying in {delay} seconds")
+        await asyncio.sleep(delay)
+        delay *= backoff
+        attempt += 1
+
+
+async def batch_search_api_retrieval_async(
+    index_name: str,
+    chunk_requests: list[VespaChunkRequest],
+    filters: IndexFilters,
+    get_large_chunks: bool = False,
+) -> list[InferenceChunkUncleaned]:
+    capped_batches, uncapped_requests = _plan_batch_search(chunk_requests)
+
+    async def _get_capped_chunks(
+        capped_requests: list[VespaChunkRequest],
+    ) -> list[InferenceChunkUncleaned]:
+        inference_chunks = await query_vespa_async(
+            _build_batch_search_params(index_name, capped_requests, filters)
+        )
+        return _finalize_batch_search_chunks(inference_chunks, get_large_chunks)
+
+    results = await asyncio.gather(
+        *(
+            _get_capped_chunks(capped_requests)
+            for capped_requests in capped_batches
+            if capped_requests
+        ),
+        parallel_visit_api_retrieval_async(
+            index_name, uncapped_requests, filters, get_large_chunks
+        ),
+    )
+
+    return [chunk for chunks in results for chunk in chunks]
@@ -6,6 +6,9 @@ from retry import retry
 
 from onyx.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
 from onyx.document_index.vespa_constants import NUM_THREADS
+from onyx.document_index.vespa_constants import TENANT_ID
+from onyx.document_index.vespa_constants import VESPA_CONTENT_CLUSTER
+from onyx.document_index.vespa_constants import VESPA_NAMESPACE
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
@@ -59,3 +62,73 @@ def delete_vespa_chunks(
     finally:
         if not external_executor:
             executor.shutdown(wait=True)
+
+
+def _selection_string(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+def build_chunk_id_selection(
+    doc_chunk_ids: list[UUID],
+    index_name: str,
+    tenant_id: str | None = None,
+) -> str:
+    """Document selection matching the chunks with the given IDs. The selection only
+    compares full document IDs, so Vespa only visits the buckets holding those chunks
+    instead of every document in the index."""
+    selection = " or ".join(
+        f"id=={_selection_string(f'id:{VESPA_NAMESPACE}:{index_name}::{doc_chunk_id}')}"
+        for doc_chunk_id in doc_chunk_ids
+    )
+    if tenant_id:
+        selection = f"({selection}) and {index_name}.{TENANT_ID}=={_selection_string(tenant_id)}"
+    return selection
+
+
+@retry(tries=10, delay=1, backoff=2)
+def _retryable_http_delete_by_selection(
+    http_client: httpx.Client, url: str, params: dict[str, str]
+) -> dict:
+    res = http_client.delete(url, params=params)
+    res.raise_for_status()
+    return res.json()
+
+
+def delete_vespa_chunks_by_selection(
+    doc_chunk_ids: list[UUID],
+    index_name: str,
+    http_client: httpx.Client,
+    tenant_id: str | None = None,
+) -> int:
+    """Deletes many chunks with a single selection based delete (paging through
+    continuations) instead of one request per chunk ID. Chunks that don't exist
+    are skipped. Returns the number of deleted chunks."""
+    if not doc_chunk_ids:
+        return 0
+
+    url = DOCUMENT_ID_ENDPOINT.format(index_name=index_name)
+    params = {
+        "selection": build_chunk_id_selection(doc_chunk_ids, index_name, tenant_id),
+        "cluster": VESPA_CONTENT_CLUSTER,
+    }
+
+    num_deleted = 0
+    while True:
+        try:
+            response_data = _retryable_http_delete_by_selection(
+                http_client, url, params
+            )
+        except httpx.HTTPStatusError as e:
+            logger.error(
+                f"Failed to delete chunks by selection, details: {e.response.text}"
+            )
+            raise
+
+        num_deleted += response_data.get("documentCount", 0)
+        continuation = response_data.get("continuation")
+        if not continuation:
+            break
+        params["continuation"] = continuation
+
+    return num_deleted
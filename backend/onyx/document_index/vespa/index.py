@@ -21,6 +21,7 @@ import requests  # type: ignore
 from retry import retry
 
 from onyx.agents.agent_search.shared_graph_utils.models import QueryExpansionType
+from onyx.configs.app_configs import VESPA_BULK_CHUNK_CLEANUP
 from onyx.configs.chat_configs import DOC_TIME_DECAY
 from onyx.configs.chat_configs import NUM_RETURNED_HITS
 from onyx.configs.chat_configs import TITLE_CONTENT_RATIO
@@ -30,6 +31,7 @@ from onyx.context.search.models import IndexFilters
 from onyx.context.search.models import InferenceChunkUncleaned
 from onyx.db.enums import EmbeddingPrecision
 from onyx.document_index.document_index_utils import get_document_chunk_ids
+from onyx.document_index.document_index_utils import get_uuid_from_chunk_info
 from onyx.document_index.interfaces import DocumentIndex
 from onyx.document_index.interfaces import DocumentInsertionRecord
 from onyx.document_index.interfaces import EnrichedDocumentIndexingInfo
@@ -40,15 +42,24 @@ from onyx.document_index.interfaces import VespaChunkRequest
 from onyx.document_index.interfaces import VespaDocumentFields
 from onyx.document_index.interfaces import VespaDocumentUserFields
 from onyx.document_index.vespa.chunk_retrieval import batch_search_api_retrieval
+from onyx.document_index.vespa.chunk_retrieval import (
+    batch_search_api_retrieval_async,
+)
 from onyx.document_index.vespa.chunk_retrieval import (
     parallel_visit_api_retrieval,
 )
+from onyx.document_index.vespa.chunk_retrieval import (
+    parallel_visit_api_retrieval_async,
+)
 from onyx.document_index.vespa.chunk_retrieval import query_vespa
+from onyx.document_index.vespa.chunk_retrieval import query_vespa_async
 from onyx.document_index.vespa.deletion import delete_vespa_chunks
+from onyx.document_index.vespa.deletion import delete_vespa_chunks_by_selection
 from onyx.document_index.vespa.indexing_utils import BaseHTTPXClientContext
 from onyx.document_index.vespa.indexing_utils import batch_index_vespa_chunks
 from onyx.document_index.vespa.indexing_utils import check_for_final_chunk_existence
 from onyx.document_index.vespa.indexing_utils import clean_chunk_id_copy
+from onyx.document_index.vespa.indexing_utils import get_final_chunk_indices
 from onyx.document_index.vespa.indexing_utils import GlobalHTTPXClientContext
 from onyx.document_index.vespa.indexing_utils import TemporaryHTTPXClientContext
 from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
@@ -61,11 +72,14 @@ from onyx.document_index.vespa.shared_utils.vespa_request_builders import (
 from onyx.document_index.vespa_constants import ACCESS_CONTROL_LIST
 from onyx.document_index.vespa_constants import BATCH_SIZE
 from onyx.document_index.vespa_constants import BOOST
+from onyx.document_index.vespa_constants import BULK_CHUNK_CLEANUP_BATCH_SIZE
 from onyx.document_index.vespa_constants import CONTENT_SUMMARY
 from onyx.document_index.vespa_constants import DOCUMENT_ID_ENDPOINT
 from onyx.document_index.vespa_constants import DOCUMENT_SETS
 from onyx.document_index.vespa_constants import HIDDEN
 from onyx.document_index.vespa_constants import NUM_THREADS
+from onyx.document_index.vespa_constants import TITLE
+from onyx.document_index.vespa_constants import TITLE_EMBEDDING
 from onyx.document_index.vespa_constants import USER_FILE
 from onyx.document_index.vespa_constants import USER_FOLDER
 from onyx.document_index.vespa_constants import VESPA_APPLICATION_ENDPOINT
@@ -126,6 +140,20 @@ def add_ngrams_to_schema(schema_content: str) -> str:
     return schema_content
 
 
+def _clean_chunk_requests(
+    chunk_requests: list[VespaChunkRequest],
+) -> list[VespaChunkRequest]:
+    # make sure to use the vespa-afied document IDs
+    return [
+        VespaChunkRequest(
+            document_id=replace_invalid_doc_id_characters(chunk_request.document_id),
+            min_chunk_ind=chunk_request.min_chunk_ind,
+            max_chunk_ind=chunk_request.max_chunk_ind,
+        )
+        for chunk_request in chunk_requests
+    ]
+
+
 class VespaIndex(DocumentIndex):
 
     VESPA_SCHEMA_JINJA_FILENAME = "danswer_chunk.sd.jinja"
@@ -404,39 +432,60 @@ class VespaIndex(DocumentIndex):
             # documents that have `chunk_count` in the database, but not for
             # `old_version` documents.
 
-            enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = [
-                VespaIndex.enrich_basic_chunk_info(
-                    index_name=self.index_name,
-                    http_client=http_client,
-                    document_id=doc_id,
-                    previous_chunk_count=doc_id_to_previous_chunk_cnt.get(doc_id, 0),
-                    new_chunk_count=doc_id_to_new_chunk_cnt.get(doc_id, 0),
+            enriched_doc_infos: list[EnrichedDocumentIndexingInfo] | None = None
+            if VESPA_BULK_CHUNK_CLEANUP:
+                try:
+                    enriched_doc_infos = self._delete_stale_chunks_bulk(
+                        http_client=http_client,
+                        doc_id_to_previous_chunk_cnt=doc_id_to_previous_chunk_cnt,
+                        doc_id_to_new_chunk_cnt=doc_id_to_new_chunk_cnt,
+                        tenant_id=tenant_id,
+                        large_chunks_enabled=large_chunks_enabled,
+                    )
+                except Exception:
+                    # deletes are idempotent, so redoing them one by one is safe
+                    logger.exception(
+                        "Bulk stale chunk cleanup failed, falling back to per chunk deletes"
+                    )
+
+            if enriched_doc_infos is None:
+                enriched_doc_infos = [
+                    VespaIndex.enrich_basic_chunk_info(
+                        index_name=self.index_name,
+                        http_client=http_client,
+                        document_id=doc_id,
+                        previous_chunk_count=doc_id_to_previous_chunk_cnt.get(
+                            doc_id, 0
+                        ),
+                        new_chunk_count=doc_id_to_new_chunk_cnt.get(doc_id, 0),
+                    )
+                    for doc_id in doc_id_to_new_chunk_cnt.keys()
+                ]
+
+                # Now, for each doc, we know exactly where to start and end our deletion
+                # So let's generate the chunk IDs for each chunk to delete
+                chunks_to_delete = get_document_chunk_ids(
+                    enriched_document_info_list=enriched_doc_infos,
+                    tenant_id=tenant_id,
+                    large_chunks_enabled=large_chunks_enabled,
                 )
-                for doc_id in doc_id_to_new_chunk_cnt.keys()
-            ]
+
+                # Delete old Vespa documents
+                for doc_chunk_ids_batch in batch_generator(
+                    chunks_to_delete, BATCH_SIZE
+                ):
+                    delete_vespa_chunks(
+                        doc_chunk_ids=doc_chunk_ids_batch,
+                        index_name=self.index_name,
+                        http_client=http_client,
+                        executor=executor,
+                    )
 
             for cleaned_doc_info in enriched_doc_infos:
                 # If the document has previously indexed chunks, we know it previously existed
                 if cleaned_doc_info.chunk_end_index:
                     existing_docs.add(cleaned_doc_info.doc_id)
 
-            # Now, for each doc, we know exactly where to start and end our deletion
-            # So let's generate the chunk IDs for each chunk to delete
-            chunks_to_delete = get_document_chunk_ids(
-                enriched_document_info_list=enriched_doc_infos,
-                tenant_id=tenant_id,
-                large_chunks_enabled=large_chunks_enabled,
-            )
-
-            # Delete old Vespa documents
-            for doc_chunk_ids_batch in batch_generator(chunks_to_delete, BATCH_SIZE):
-                delete_vespa_chunks(
-                    doc_chunk_ids=doc_chunk_ids_batch,
-                    index_name=self.index_name,
-                    http_client=http_client,
-                    executor=executor,
-                )
-
             for chunk_batch in batch_generator(cleaned_chunks, BATCH_SIZE):
                 batch_index_vespa_chunks(
                     chunks=chunk_batch,
@@ -456,6 +505,56 @@ class VespaIndex(DocumentIndex):
             for cleaned_doc_id in all_cleaned_doc_ids
         }
 
+    def _delete_stale_chunks_bulk(
+        self,
+        http_client: httpx.Client,
+        doc_id_to_previous_chunk_cnt: dict[str, int | None],
+        doc_id_to_new_chunk_cnt: dict[str, int],
+        tenant_id: str,
+        large_chunks_enabled: bool,
+    ) -> list[EnrichedDocumentIndexingInfo]:
+        """Resolves the chunk ranges of a batch of documents and deletes the chunks
+        that the new version of each document no longer has. Takes one grouped query
+        per BULK_CHUNK_CLEANUP_BATCH_SIZE documents (only for documents without a chunk
+        count in Postgres) and one selection based delete per
+        BULK_CHUNK_CLEANUP_BATCH_SIZE stale chunks. The returned infos carry the
+        cleaned document IDs."""
+        enriched_doc_infos = VespaIndex.enrich_basic_chunk_info_batch(
+            index_name=self.index_name,
+            http_client=http_client,
+            doc_id_to_previous_chunk_cnt=doc_id_to_previous_chunk_cnt,
+            doc_id_to_new_chunk_cnt=doc_id_to_new_chunk_cnt,
+            tenant_id=tenant_id if self.multitenant else None,
+        )
+
+        # deleting by the IDs of the stale chunks keeps the cost of every delete
+        # proportional to the batch, a selection on the document fields would visit
+        # the whole index
+        chunks_to_delete = get_document_chunk_ids(
+            enriched_document_info_list=enriched_doc_infos,
+            tenant_id=tenant_id,
+            large_chunks_enabled=large_chunks_enabled,
+        )
+        num_deleted = 0
+        for doc_chunk_ids in batch_generator(
+            chunks_to_delete, BULK_CHUNK_CLEANUP_BATCH_SIZE
+        ):
+            num_deleted += delete_vespa_chunks_by_selection(
+                doc_chunk_ids=doc_chunk_ids,
+                index_name=self.index_name,
+                http_client=http_client,
+                tenant_id=tenant_id if self.multitenant else None,
+            )
+
+        if chunks_to_delete:
+            logger.debug(
+                f"Deleted stale chunks by selection: "
+                f"index={self.index_name} "
+                f"chunk_ids={len(chunks_to_delete)} "
+                f"chunks={num_deleted}"
+            )
+        return enriched_doc_infos
+
     @classmethod
     def _apply_updates_batched(
         cls,
@@ -763,17 +862,7 @@ class VespaIndex(DocumentIndex):
         batch_retrieval: bool = False,
         get_large_chunks: bool = False,
     ) -> list[InferenceChunkUncleaned]:
-        # make sure to use the vespa-afied document IDs
-        chunk_requests = [
-            VespaChunkRequest(
-                document_id=replace_invalid_doc_id_characters(
-                    chunk_request.document_id
-                ),
-                min_chunk_ind=chunk_request.min_chunk_ind,
-                max_chunk_ind=chunk_request.max_chunk_ind,
-            )
-            for chunk_request in chunk_requests
-        ]
+        chunk_requests = _clean_chunk_requests(chunk_requests)
 
         if batch_retrieval:
             return batch_search_api_retrieval(
@@ -789,7 +878,93 @@ class VespaIndex(DocumentIndex):
             get_large_chunks=get_large_chunks,
         )
 
-    def hybrid_retrieval(
+    async def id_based_retrieval_async(
+        self,
+        chunk_requests: list[VespaChunkRequest],
+        filters: IndexFilters,
+        batch_retrieval: bool = False,
+        get_large_chunks: bool = False,
+    ) -> list[InferenceChunkUncleaned]:
+        chunk_requests = _clean_chunk_requests(chunk_requests)
+
+        if batch_retrieval:
+            return await batch_search_api_retrieval_async(
+                index_name=self.index_name,
+                chunk_requests=chunk_requests,
+                filters=filters,
+                get_large_chunks=get_large_chunks,
+            )
+        return await parallel_visit_api_retrieval_async(
+            index_name=self.index_name,
+            chunk_requests=chunk_requests,
+            filters=filters,
+            get_large_chunks=get_large_chunks,
+        )
+
+    def get_title_embeddings(
+        self,
+        document_ids: list[str],
+        *,
+        tenant_id: str,
+    ) -> dict[str, tuple[str, Embedding]]:
+        """Every chunk of a document stores the same title embedding, so only the
+        first chunk is fetched directly by its id."""
+        field_set = f"{self.index_name}:{TITLE},{TITLE_EMBEDDING}"
+
+        def _fetch_title_embedding(
+            document_id: str, http_client: httpx.Client
+        ) -> tuple[str, Embedding] | None:
+            chunk_uuid = get_uuid_from_chunk_info(
+                document_id=replace_invalid_doc_id_characters(document_id),
+                chunk_id=0,
+                tenant_id=tenant_id,
+            )
+            res = http_client.get(
+                f"{DOCUMENT_ID_ENDPOINT.format(index_name=self.index_name)}/{chunk_uuid}",
+                params={"fieldSet": field_set, "format.tensors": "short-value"},
+            )
+            if res.status_code == 404:
+                return None
+            res.raise_for_status()
+
+            fields = res.json().get("fields", {})
+            title = fields.get(TITLE)
+            title_embedding = fields.get(TITLE_EMBEDDING)
+            if isinstance(title_embedding, dict):
+                title_embedding = title_embedding.get("values")
+            if not title or not isinstance(title_embedding, list):
+                return None
+            return title, title_embedding
+
+        title_embeddings: dict[str, tuple[str, Embedding]] = {}
+        if not document_ids:
+            return title_embeddings
+
+        with (
+            self.httpx_client_context as http_client,
+            concurrent.futures.ThreadPoolExecutor(max_workers=NUM_THREADS) as executor,
+        ):
+            future_to_document_id = {
+                executor.submit(
+                    _fetch_title_embedding, document_id, http_client
+                ): document_id
+                for document_id in document_ids
+            }
+            for future in concurrent.futures.as_completed(future_to_document_id):
+                document_id = future_to_document_id[future]
+                try:
+                    result = future.result()
+                except Exception:
+                    logger.exception(
+                        f"Failed to fetch title embedding for document {document_id}"
+                    )
+                    continue
+                if result is not None:
+                    title_embeddings[document_id] = result
+
+        return title_embeddings
+
+    def _build_hybrid_query_params(
         self,
         query: str,
         query_embedding: Embedding,
@@ -801,7 +976,7 @@ class VespaIndex(DocumentIndex):
         ranking_profile_type: QueryExpansionType,
         offset: int = 0,
         title_content_ratio: float | None = TITLE_CONTENT_RATIO,
-    ) -> list[InferenceChunkUncleaned]:
+    ) -> dict[str, str | int | float]:
         vespa_where_clauses = build_vespa_filters(filters)
         # Needs to be at least as much as the value set in Vespa schema config
         target_hits = max(10 * num_to_retrieve, 1000)
@@ -843,8 +1018,62 @@ class VespaIndex(DocumentIndex):
             "timeout": VESPA_TIMEOUT,
         }
 
+        return params
+
+    def hybrid_retrieval(
+        self,
+        query: str,
+        query_embedding: Embedding,
+        final_keywords: list[str] | None,
+        filters: IndexFilters,
+        hybrid_alpha: float,
+        time_decay_multiplier: float,
+        num_to_retrieve: int,
+        ranking_profile_type: QueryExpansionType,
+        offset: int = 0,
+        title_content_ratio: float | None = TITLE_CONTENT_RATIO,
+    ) -> list[InferenceChunkUncleaned]:
+        params = self._build_hybrid_query_params(
+            query=query,
+            query_embedding=query_embedding,
+            final_keywords=final_keywords,
+            filters=filters,
+            hybrid_alpha=hybrid_alpha,
+            time_decay_multiplier=time_decay_multiplier,
+            num_to_retrieve=num_to_retrieve,
+            ranking_profile_type=ranking_profile_type,
+            offset=offset,
+            title_content_ratio=title_content_ratio,
+        )
         return query_vespa(params)
 
+    async def hybrid_retrieval_async(
+        self,
+        query: str,
+        query_embedding: Embedding,
+        final_keywords: list[str] | None,
+        filters: IndexFilters,
+        hybrid_alpha: float,
+        time_decay_multiplier: float,
+        num_to_retrieve: int,
+        ranking_profile_type: QueryExpansionType,
+        offset: int = 0,
+        title_content_ratio: float | None = TITLE_CONTENT_RATIO,
+    ) -> list[InferenceChunkUncleaned]:
+        params = self._build_hybrid_query_params(
+            query=query,
+            query_embedding=query_embedding,
+            final_keywords=final_keywords,
+            filters=filters,
+            hybrid_alpha=hybrid_alpha,
+            time_decay_multiplier=time_decay_multiplier,
+            num_to_retrieve=num_to_retrieve,
+            ranking_profile_type=ranking_profile_type,
+            offset=offset,
+            title_content_ratio=title_content_ratio,
+        )
+        return await query_vespa_async(params)
+
     def admin_retrieval(
         self,
         query: str,
@@ -912,6 +1141,72 @@ class VespaIndex(DocumentIndex):
         )
         return enriched_doc_info
 
+    @classmethod
+    def enrich_basic_chunk_info_batch(
+        cls,
+        index_name: str,
+        http_client: httpx.Client,
+        doc_id_to_previous_chunk_cnt: dict[str, int | None],
+        doc_id_to_new_chunk_cnt: dict[str, int],
+        tenant_id: str | None = None,
+    ) -> list[EnrichedDocumentIndexingInfo]:
+        """Bulk version of `enrich_basic_chunk_info` for all documents in
+        `doc_id_to_new_chunk_cnt`. The final chunk index of documents without a
+        `chunk_count` is resolved with one grouped query per
+        BULK_CHUNK_CLEANUP_BATCH_SIZE documents instead of probing chunk by chunk.
+        The returned infos carry the cleaned document IDs."""
+        enriched_doc_infos: list[EnrichedDocumentIndexingInfo] = []
+        old_version_doc_ids: list[str] = []
+        for doc_id, new_chunk_count in doc_id_to_new_chunk_cnt.items():
+            previous_chunk_count = doc_id_to_previous_chunk_cnt.get(doc_id, 0)
+            cleaned_doc_id = replace_invalid_doc_id_characters(doc_id)
+            if previous_chunk_count is None:
+                old_version_doc_ids.append(cleaned_doc_id)
+                continue
+
+            enriched_doc_infos.append(
+                EnrichedDocumentIndexingInfo(
+                    doc_id=cleaned_doc_id,
+                    chunk_start_index=new_chunk_count,
+                    chunk_end_index=previous_chunk_count,
+                    old_version=False,
+                )
+            )
+
+        final_chunk_indices: dict[str, int] = {}
+        for doc_ids in batch_generator(
+            old_version_doc_ids, BULK_CHUNK_CLEANUP_BATCH_SIZE
+        ):
+            final_chunk_indices.update(
+                get_final_chunk_indices(
+                    document_ids=doc_ids,
+                    index_name=index_name,
+                    http_client=http_client,
+                    tenant_id=tenant_id,
+                )
+            )
+
+        cleaned_to_new_chunk_cnt = {
+            replace_invalid_doc_id_characters(doc_id): new_chunk_count
+            for doc_id, new_chunk_count in doc_id_to_new_chunk_cnt.items()
+        }
+        for cleaned_doc_id in old_version_doc_ids:
+            new_chunk_count = cleaned_to_new_chunk_cnt[cleaned_doc_id]
+            enriched_doc_infos.append(
+                EnrichedDocumentIndexingInfo(
+                    doc_id=cleaned_doc_id,
+                    chunk_start_index=new_chunk_count,
+                    # same semantics as `check_for_final_chunk_existence`, which
+                    # starts probing at the new chunk count
+                    chunk_end_index=max(
+                        new_chunk_count, final_chunk_indices.get(cleaned_doc_id, 0)
+                    ),
+                    old_version=True,
+                )
+            )
+
+        return enriched_doc_infos
+
     @classmethod
     def delete_entries_by_tenant_id(
         cls,
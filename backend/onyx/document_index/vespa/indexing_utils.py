@@ -9,6 +9,8 @@ from datetime import timezone
 from http import HTTPStatus
 
 import httpx
+import numpy as np
+import orjson
 from retry import retry
 
 from onyx.connectors.cross_connector_utils.miscellaneous_utils import (
@@ -42,6 +44,7 @@ from onyx.document_index.vespa_constants import METADATA_LIST
 from onyx.document_index.vespa_constants import METADATA_SUFFIX
 from onyx.document_index.vespa_constants import NUM_THREADS
 from onyx.document_index.vespa_constants import PRIMARY_OWNERS
+from onyx.document_index.vespa_constants import SEARCH_ENDPOINT
 from onyx.document_index.vespa_constants import SECONDARY_OWNERS
 from onyx.document_index.vespa_constants import SECTION_CONTINUATION
 from onyx.document_index.vespa_constants import SEMANTIC_IDENTIFIER
@@ -53,6 +56,7 @@ from onyx.document_index.vespa_constants import TITLE
 from onyx.document_index.vespa_constants import TITLE_EMBEDDING
 from onyx.document_index.vespa_constants import USER_FILE
 from onyx.document_index.vespa_constants import USER_FOLDER
+from onyx.document_index.vespa_constants import VESPA_TIMEOUT
 from onyx.indexing.models import DocMetadataAwareIndexChunk
 from onyx.utils.logger import setup_logger
 
@@ -218,9 +222,21 @@ def _index_vespa_chunk(
             vespa_document_fields[TENANT_ID] = chunk.tenant_id
     vespa_url = f"{DOCUMENT_ID_ENDPOINT.format(index_name=index_name)}/{vespa_chunk_id}"
     logger.debug(f'Indexing to URL "{vespa_url}"')
-    res = http_client.post(
-        vespa_url, headers=json_header, json={"fields": vespa_document_fields}
-    )
+    if isinstance(embeddings.full_embedding, np.ndarray):
+        # numpy backed embeddings (packed model server responses) are written
+        # straight into the request body without going through python floats
+        res = http_client.post(
+            vespa_url,
+            headers=json_header,
+            content=orjson.dumps(
+                {"fields": vespa_document_fields},
+                option=orjson.OPT_SERIALIZE_NUMPY,
+            ),
+        )
+    else:
+        res = http_client.post(
+            vespa_url, headers=json_header, json={"fields": vespa_document_fields}
+        )
     try:
         res.raise_for_status()
     except Exception as e:
@@ -300,6 +316,61 @@ def check_for_final_chunk_existence(
         index += 1
 
 
+def _yql_string(value: str) -> str:
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+@retry(tries=3, delay=1, backoff=2)
+def get_final_chunk_indices(
+    document_ids: list[str],
+    index_name: str,
+    http_client: httpx.Client,
+    tenant_id: str | None = None,
+) -> dict[str, int]:
+    """Bulk alternative to `check_for_final_chunk_existence`. Resolves, with a single
+    grouped query, the index one past the highest chunk stored for each document.
+    Documents without any chunk in the index are not in the result.
+
+    The document IDs must already be cleaned via `replace_invalid_doc_id_characters`.
+    If `tenant_id` is passed, only chunks of that tenant are considered."""
+    if not document_ids:
+        return {}
+
+    where = f"{DOCUMENT_ID} in ({', '.join(_yql_string(doc_id) for doc_id in document_ids)})"
+    if tenant_id:
+        where += f" and {TENANT_ID} contains {_yql_string(tenant_id)}"
+
+    # large chunks reuse the chunk_id of their first chunk, so the max over all
+    # chunks of a document is its last regular chunk
+    grouping = (
+        f"all(group({DOCUMENT_ID}) max({len(document_ids)}) "
+        f"each(output(max({CHUNK_ID}))))"
+    )
+    params = {
+        "yql": f"select {DOCUMENT_ID} from {index_name} where {where} | {grouping}",
+        "hits": 0,
+        "timeout": VESPA_TIMEOUT,
+    }
+    response = http_client.post(SEARCH_ENDPOINT, json=params)
+    response.raise_for_status()
+    result = response.json()
+
+    root = result.get("root", {})
+    if root.get("errors"):
+        raise RuntimeError(f"Failed to resolve chunk ranges from Vespa: {root}")
+
+    final_chunk_indices: dict[str, int] = {}
+    for root_group in root.get("children", []):
+        for group_list in root_group.get("children", []):
+            for group in group_list.get("children", []):
+                max_chunk_id = group.get("fields", {}).get(f"max({CHUNK_ID})")
+                if max_chunk_id is None:
+                    continue
+                final_chunk_indices[str(group["value"])] = int(max_chunk_id) + 1
+    return final_chunk_indices
+
+
 class BaseHTTPXClientContext(ABC):
     """Abstract base class for an HTTPX client context manager."""
 
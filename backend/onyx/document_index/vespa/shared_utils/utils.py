@@ -1,5 +1,6 @@
 import re
 import time
+from typing import Any
 from typing import cast
 
 import httpx
@@ -7,12 +8,17 @@ import httpx
 from onyx.configs.app_configs import MANAGED_VESPA
 from onyx.configs.app_configs import VESPA_CLOUD_CERT_PATH
 from onyx.configs.app_configs import VESPA_CLOUD_KEY_PATH
+from onyx.configs.app_configs import VESPA_QUERY_POOL_MAX_CONNECTIONS
+from onyx.configs.app_configs import VESPA_QUERY_POOL_MAX_KEEPALIVE_CONNECTIONS
 from onyx.configs.app_configs import VESPA_REQUEST_TIMEOUT
 from onyx.document_index.vespa_constants import VESPA_APP_CONTAINER_URL
+from onyx.httpx.httpx_pool import HttpxPool
 from onyx.utils.logger import setup_logger
 
 logger = setup_logger()
 
+VESPA_QUERY_POOL_NAME = "vespa_query"
+
 # NOTE: This does not seem to be used in reality despite the Vespa Docs pointing to this code
 # See here for reference: https://docs.vespa.ai/en/documents.html
 # https://github.com/vespa-engine/vespa/blob/master/vespajlib/src/main/java/com/yahoo/text/Text.java
@@ -80,6 +86,39 @@ def get_vespa_http_client(no_timeout: bool = False, http2: bool = True) -> httpx
     )
 
 
+def _vespa_query_client_kwargs() -> dict[str, Any]:
+    return dict(
+        cert=(
+            cast(tuple[str, str], (VESPA_CLOUD_CERT_PATH, VESPA_CLOUD_KEY_PATH))
+            if MANAGED_VESPA
+            else None
+        ),
+        verify=False if not MANAGED_VESPA else True,
+        timeout=VESPA_REQUEST_TIMEOUT,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=VESPA_QUERY_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=VESPA_QUERY_POOL_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    )
+
+
+def get_vespa_query_client() -> httpx.Client:
+    """
+    Long lived, pooled HTTP/2 client for search path Vespa queries, shared by all
+    threads of the process so that queries reuse connections instead of paying for
+    a new handshake each time. Must NOT be closed by the caller.
+    """
+    HttpxPool.init_client(name=VESPA_QUERY_POOL_NAME, **_vespa_query_client_kwargs())
+    return HttpxPool.get(VESPA_QUERY_POOL_NAME)
+
+
+def get_vespa_async_query_client() -> httpx.AsyncClient:
+    """Async counterpart of `get_vespa_query_client`, one pool per event loop.
+    Must NOT be closed by the caller."""
+    return HttpxPool.get_async(VESPA_QUERY_POOL_NAME, **_vespa_query_client_kwargs())
+
+
 def wait_for_vespa_with_timeout(wait_interval: int = 5, wait_limit: int = 60) -> bool:
     """Waits for Vespa to become ready subject to a timeout.
     Returns True if Vespa is ready, False otherwise."""
@@ -17,15 +17,22 @@ VESPA_APPLICATION_ENDPOINT = f"{VESPA_CONFIG_SERVER_URL}/application/v2"
 VESPA_APP_CONTAINER_URL = VESPA_CLOUD_URL or f"http://{VESPA_HOST}:{VESPA_PORT}"
 
 
+# namespace of the chunk document ids, id:<namespace>:<index name>::<chunk uuid>
+VESPA_NAMESPACE = "default"
+
 # danswer_chunk below is defined in vespa/app_configs/schemas/danswer_chunk.sd.jinja
 DOCUMENT_ID_ENDPOINT = (
-    f"{VESPA_APP_CONTAINER_URL}/document/v1/default/{{index_name}}/docid"
+    f"{VESPA_APP_CONTAINER_URL}/document/v1/{VESPA_NAMESPACE}/{{index_name}}/docid"
 )
 
 # the default document id endpoint is http://localhost:8080/document/v1/default/danswer_chunk/docid
 
 SEARCH_ENDPOINT = f"{VESPA_APP_CONTAINER_URL}/search/"
 
+# content cluster defined in vespa/app_config/services.xml.jinja, needed for
+# selection based deletes
+VESPA_CONTENT_CLUSTER = "danswer_index"
+
 NUM_THREADS = (
     32  # since Vespa doesn't allow batching of inserts / updates, we use threads
 )
@@ -38,6 +45,10 @@ MAX_OR_CONDITIONS = 10
 # so that we can bring this back to default
 VESPA_TIMEOUT = "3s"
 BATCH_SIZE = 128  # Specific to Vespa
+# Number of documents whose chunk ranges are resolved by a single grouped query, and
+# of chunks removed by a single selection based delete. Bounded so that the request
+# URL stays small.
+BULK_CHUNK_CLEANUP_BATCH_SIZE = 64
 
 TENANT_ID = "tenant_id"
 DOCUMENT_ID = "document_id"
@@ -1,42 +1,195 @@
+import asyncio
+import os
 import threading
+import weakref
+from collections.abc import Callable
+from collections.abc import Iterator
+from dataclasses import dataclass
 from typing import Any
 
 import httpx
+from prometheus_client import Counter
+from prometheus_client import Gauge
+
+_POOL_REQUESTS = Counter(
+    "onyx_httpx_pool_requests",
+    "Requests sent through a pooled httpx client, by whether they had to open a "
+    "new connection or reused a pooled one",
+    ["pool", "connection"],
+)
+_POOL_IN_FLIGHT = Gauge(
+    "onyx_httpx_pool_in_flight_requests",
+    "Requests currently in flight on a pooled httpx client",
+    ["pool"],
+)
+
+# Client kwargs that configure the transport (and are ignored by httpx.Client once
+# an explicit transport is passed)
+_TRANSPORT_KWARGS = ("verify", "cert", "http1", "http2", "limits", "retries")
+
+
+@dataclass
+class PoolStats:
+    requests: int = 0
+    new_connections: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+    @property
+    def reused_connections(self) -> int:
+        return self.requests - self.new_connections
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.reused_connections / self.requests if self.requests else 0.0
+
+
+class _ClosingByteStream(httpx.SyncByteStream):
+    """Calls `on_close` (once) when the response body is closed, i.e. when the
+    request is no longer in flight."""
+
+    def __init__(self, stream: httpx.SyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        self._on_close: Callable[[], None] | None = on_close
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if self._on_close is not None:
+                on_close, self._on_close = self._on_close, None
+                on_close()
+
+
+class MeteredTransport(httpx.BaseTransport):
+    """Wraps a transport to track connection reuse and in flight requests of a
+    pool, exported as prometheus metrics labelled with the pool name."""
+
+    def __init__(self, name: str, transport: httpx.BaseTransport) -> None:
+        self.name = name
+        self.stats = PoolStats()
+        self._transport = transport
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        new_connection = False
+        parent_trace = request.extensions.get("trace")
+
+        def trace(event_name: str, info: dict[str, Any]) -> None:
+            nonlocal new_connection
+            if event_name.endswith(
+                ("connect_tcp.complete", "connect_unix_socket.complete")
+            ):
+                new_connection = True
+            if parent_trace is not None:
+                parent_trace(event_name, info)
+
+        request.extensions["trace"] = trace
+
+        self._start_request()
+        try:
+            response = self._transport.handle_request(request)
+        except BaseException:
+            self._finish_request(new_connection)
+            raise
+
+        if response.is_closed:
+            # body already loaded (e.g. mock transports), nothing left in flight
+            self._finish_request(new_connection)
+            return response
+
+        assert isinstance(response.stream, httpx.SyncByteStream)
+        response.stream = _ClosingByteStream(
+            response.stream, lambda: self._finish_request(new_connection)
+        )
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+    def _start_request(self) -> None:
+        with self._lock:
+            self.stats.in_flight += 1
+            self.stats.max_in_flight = max(
+                self.stats.max_in_flight, self.stats.in_flight
+            )
+        _POOL_IN_FLIGHT.labels(pool=self.name).inc()
+
+    def _finish_request(self, new_connection: bool) -> None:
+        with self._lock:
+            self.stats.in_flight -= 1
+            self.stats.requests += 1
+            if new_connection:
+                self.stats.new_connections += 1
+        _POOL_IN_FLIGHT.labels(pool=self.name).dec()
+        _POOL_REQUESTS.labels(
+            pool=self.name, connection="new" if new_connection else "reused"
+        ).inc()
 
 
 class HttpxPool:
     """Class to manage a global httpx Client instance"""
 
     _clients: dict[str, httpx.Client] = {}
+    _transports: dict[str, MeteredTransport] = {}
+    # event loop -> name -> client
+    _async_clients: weakref.WeakKeyDictionary[
+        asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]
+    ] = weakref.WeakKeyDictionary()
     _lock: threading.Lock = threading.Lock()
+    # pooled connections must not be shared with forked processes
+    _pid: int = os.getpid()
 
     # Default parameters for creation
     DEFAULT_KWARGS = {
         "http2": True,
-        "limits": lambda: httpx.Limits(),
+        "limits": httpx.Limits(),
     }
 
     def __init__(self) -> None:
         pass
 
     @classmethod
-    def _init_client(cls, **kwargs: Any) -> httpx.Client:
+    def _init_client(cls, name: str, **kwargs: Any) -> httpx.Client:
         """Private helper method to create and return an httpx.Client."""
         merged_kwargs = {**cls.DEFAULT_KWARGS, **kwargs}
-        return httpx.Client(**merged_kwargs)
+        transport_kwargs = {
+            key: merged_kwargs.pop(key)
+            for key in _TRANSPORT_KWARGS
+            if key in merged_kwargs
+        }
+        transport = MeteredTransport(name, httpx.HTTPTransport(**transport_kwargs))
+        cls._transports[name] = transport
+        return httpx.Client(transport=transport, **merged_kwargs)
+
+    @classmethod
+    def _reset_after_fork(cls) -> None:
+        """Must be called with the lock held. The clients of the parent process are
+        dropped without closing them, the parent is still using their sockets."""
+        if cls._pid != os.getpid():
+            cls._pid = os.getpid()
+            cls._clients = {}
+            cls._transports = {}
+            cls._async_clients = weakref.WeakKeyDictionary()
 
     @classmethod
     def init_client(cls, name: str, **kwargs: Any) -> None:
         """Allow the caller to init the client with extra params."""
         with cls._lock:
+            cls._reset_after_fork()
             if name not in cls._clients:
-                cls._clients[name] = cls._init_client(**kwargs)
+                cls._clients[name] = cls._init_client(name, **kwargs)
 
     @classmethod
     def close_client(cls, name: str) -> None:
         """Allow the caller to close the client."""
         with cls._lock:
+            cls._reset_after_fork()
             client = cls._clients.pop(name, None)
+            cls._transports.pop(name, None)
             if client:
                 client.close()
 
@@ -44,14 +197,50 @@ class HttpxPool:
     def close_all(cls) -> None:
         """Close all registered clients."""
         with cls._lock:
+            cls._reset_after_fork()
             for client in cls._clients.values():
                 client.close()
             cls._clients.clear()
+            cls._transports.clear()
 
     @classmethod
     def get(cls, name: str) -> httpx.Client:
         """Gets the httpx.Client. Will init to default settings if not init'd."""
         with cls._lock:
+            cls._reset_after_fork()
             if name not in cls._clients:
-                cls._clients[name] = cls._init_client()
+                cls._clients[name] = cls._init_client(name)
             return cls._clients[name]
+
+    @classmethod
+    def get_async(cls, name: str, **kwargs: Any) -> httpx.AsyncClient:
+        """Gets the httpx.AsyncClient for the running event loop, created with the
+        given params on first use. Async connections belong to the loop they were
+        opened on, so every loop gets its own client."""
+        loop = asyncio.get_running_loop()
+        with cls._lock:
+            cls._reset_after_fork()
+            loop_clients = cls._async_clients.setdefault(loop, {})
+            if name not in loop_clients:
+                loop_clients[name] = httpx.AsyncClient(
+                    **{**cls.DEFAULT_KWARGS, **kwargs}
+                )
+            return loop_clients[name]
+
+    @classmethod
+    async def aclose_all(cls) -> None:
+        """Close all async clients of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with cls._lock:
+            cls._reset_after_fork()
+            loop_clients = cls._async_clients.pop(loop, {})
+        for client in loop_clients.values():
+            await client.aclose()
+
+    @classmethod
+    def get_stats(cls, name: str) -> PoolStats | None:
+        """Connection reuse / in flight stats of the client, None if not init'd."""
+        with cls._lock:
+            cls._reset_after_fork()
+            transport = cls._transports.get(name)
+            return transport.stats if transport else None
@@ -16,6 +16,10 @@ from onyx.connectors.models import IndexingDocument
 from onyx.connectors.models import Section
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.models import DocAwareChunk
+from onyx.indexing.token_splitter import has_additive_joins
+from onyx.indexing.token_splitter import TextSpan
+from onyx.indexing.token_splitter import TokenizedText
+from onyx.indexing.token_splitter import TokenSplitter
 from onyx.llm.utils import MAX_CONTEXT_TOKENS
 from onyx.natural_language_processing.utils import BaseTokenizer
 from onyx.utils.logger import setup_logger
@@ -135,9 +139,6 @@ class Chunker:
         mini_chunk_size: int = MINI_CHUNK_SIZE,
         callback: IndexingHeartbeatInterface | None = None,
     ) -> None:
-        # importing llama_index uses a lot of RAM, so we only import it when needed.
-        from llama_index.core.node_parser import SentenceSplitter
-
         self.include_metadata = include_metadata
         self.chunk_token_limit = chunk_token_limit
         self.enable_multipass = enable_multipass
@@ -156,24 +157,17 @@ class Chunker:
         self.max_context = 0
         self.prompt_tokens = 0
 
-        self.blurb_splitter = SentenceSplitter(
-            tokenizer=tokenizer.tokenize,
-            chunk_size=blurb_size,
-            chunk_overlap=0,
-        )
+        # Each section is tokenized once, the splitters below derive chunk boundaries,
+        # blurbs and mini-chunks from the token offsets of that single pass
+        self.blurb_splitter = TokenSplitter(chunk_size=blurb_size, chunk_overlap=0)
 
-        self.chunk_splitter = SentenceSplitter(
-            tokenizer=tokenizer.tokenize,
+        self.chunk_splitter = TokenSplitter(
             chunk_size=chunk_token_limit,
             chunk_overlap=chunk_overlap,
         )
 
         self.mini_chunk_splitter = (
-            SentenceSplitter(
-                tokenizer=tokenizer.tokenize,
-                chunk_size=mini_chunk_size,
-                chunk_overlap=0,
-            )
+            TokenSplitter(chunk_size=mini_chunk_size, chunk_overlap=0)
             if enable_multipass
             else None
         )
@@ -195,21 +189,26 @@ class Chunker:
             start = end
         return chunks
 
-    def _extract_blurb(self, text: str) -> str:
+    def _tokenize(self, text: str) -> TextSpan:
+        return TokenizedText(text, self.tokenizer).span()
+
+    def _extract_blurb(self, span: TextSpan) -> str:
         """
         Extract a short blurb from the text (first chunk of size `blurb_size`).
         """
-        texts = self.blurb_splitter.split_text(text)
-        if not texts:
+        spans = self.blurb_splitter.split(span)
+        if not spans:
             return ""
-        return texts[0]
+        return spans[0].text
 
-    def _get_mini_chunk_texts(self, chunk_text: str) -> list[str] | None:
+    def _get_mini_chunk_texts(self, span: TextSpan) -> list[str] | None:
         """
         For "multipass" mode: additional sub-chunks (mini-chunks) for use in certain embeddings.
         """
-        if self.mini_chunk_splitter and chunk_text.strip():
-            return self.mini_chunk_splitter.split_text(chunk_text)
+        if self.mini_chunk_splitter and span.text.strip():
+            return [
+                mini_chunk.text for mini_chunk in self.mini_chunk_splitter.split(span)
+            ]
         return None
 
     # ADDED: extra param image_url to store in the chunk
@@ -217,7 +216,7 @@ class Chunker:
         self,
         document: IndexingDocument,
         chunks_list: list[DocAwareChunk],
-        text: str,
+        span: TextSpan,
         links: dict[int, str],
         is_continuation: bool = False,
         title_prefix: str = "",
@@ -227,19 +226,21 @@ class Chunker:
     ) -> None:
         """
         Helper to create a new DocAwareChunk, append it to chunks_list.
+        The span carries the tokenization of the text so blurb and mini-chunk
+        splitting don't need to tokenize it again.
         """
         new_chunk = DocAwareChunk(
             source_document=document,
             chunk_id=len(chunks_list),
-            blurb=self._extract_blurb(text),
-            content=text,
+            blurb=self._extract_blurb(span),
+            content=span.text,
             source_links=links or {0: ""},
             image_file_name=image_file_name,
             section_continuation=is_continuation,
             title_prefix=title_prefix,
             metadata_suffix_semantic=metadata_suffix_semantic,
             metadata_suffix_keyword=metadata_suffix_keyword,
-            mini_chunk_texts=self._get_mini_chunk_texts(text),
+            mini_chunk_texts=self._get_mini_chunk_texts(span),
             large_chunk_id=None,
             doc_summary="",
             chunk_context="",
@@ -263,6 +264,18 @@ class Chunker:
         chunks: list[DocAwareChunk] = []
         link_offsets: dict[int, str] = {}
         chunk_text = ""
+        # token count of chunk_text and, while it holds a single section, the
+        # tokenized section itself so it can be reused when the chunk is created
+        chunk_token_count = 0
+        chunk_span: TextSpan | None = None
+
+        additive_joins = has_additive_joins(self.tokenizer)
+        separator_tokens = len(self.tokenizer.encode(SECTION_SEPARATOR))
+
+        def current_chunk_span() -> TextSpan:
+            if chunk_span is not None:
+                return chunk_span
+            return self._tokenize(chunk_text)
 
         for section_idx, section in enumerate(sections):
             # Get section text and other attributes
@@ -278,6 +291,9 @@ class Chunker:
                 )
                 continue
 
+            # The only tokenization pass over this section
+            section_span = self._tokenize(section_text)
+
             # CASE 1: If this section has an image, force a separate chunk
             if image_url:
                 # First, if we have any partially built text chunk, finalize it
@@ -285,7 +301,7 @@ class Chunker:
                     self._create_chunk(
                         document,
                         chunks,
-                        chunk_text,
+                        current_chunk_span(),
                         link_offsets,
                         is_continuation=False,
                         title_prefix=title_prefix,
@@ -293,6 +309,8 @@ class Chunker:
                         metadata_suffix_keyword=metadata_suffix_keyword,
                     )
                     chunk_text = ""
+                    chunk_token_count = 0
+                    chunk_span = None
                     link_offsets = {}
 
                 # Create a chunk specifically for this image section
@@ -300,7 +318,7 @@ class Chunker:
                 self._create_chunk(
                     document,
                     chunks,
-                    section_text,
+                    section_span,
                     links={0: section_link_text} if section_link_text else {},
                     image_file_name=image_url,
                     title_prefix=title_prefix,
@@ -311,7 +329,7 @@ class Chunker:
                 continue
 
             # CASE 2: Normal text section
-            section_token_count = len(self.tokenizer.encode(section_text))
+            section_token_count = section_span.token_count()
 
             # If the section is large on its own, split it separately
             if section_token_count > content_token_limit:
@@ -319,7 +337,7 @@ class Chunker:
                     self._create_chunk(
                         document,
                         chunks,
-                        chunk_text,
+                        current_chunk_span(),
                         link_offsets,
                         False,
                         title_prefix,
@@ -327,23 +345,25 @@ class Chunker:
                         metadata_suffix_keyword,
                     )
                     chunk_text = ""
+                    chunk_token_count = 0
+                    chunk_span = None
                     link_offsets = {}
 
-                split_texts = self.chunk_splitter.split_text(section_text)
-                for i, split_text in enumerate(split_texts):
+                split_spans = self.chunk_splitter.split(section_span)
+                for i, split_span in enumerate(split_spans):
                     # If even the split_text is bigger than strict limit, further split
                     if (
                         STRICT_CHUNK_TOKEN_LIMIT
-                        and len(self.tokenizer.encode(split_text)) > content_token_limit
+                        and split_span.token_count() > content_token_limit
                     ):
                         smaller_chunks = self._split_oversized_chunk(
-                            split_text, content_token_limit
+                            split_span.text, content_token_limit
                         )
                         for j, small_chunk in enumerate(smaller_chunks):
                             self._create_chunk(
                                 document,
                                 chunks,
-                                small_chunk,
+                                self._tokenize(small_chunk),
                                 {0: section_link_text},
                                 is_continuation=(j != 0),
                                 title_prefix=title_prefix,
@@ -354,7 +374,7 @@ class Chunker:
                         self._create_chunk(
                             document,
                             chunks,
-                            split_text,
+                            split_span,
                             {0: section_link_text},
                             is_continuation=(i != 0),
                             title_prefix=title_prefix,
@@ -364,15 +384,20 @@ class Chunker:
                 continue
 
             # If we can still fit this section into the current chunk, do so
-            current_token_count = len(self.tokenizer.encode(chunk_text))
+            if not additive_joins:
+                # token counts can't simply be summed for this tokenizer
+                chunk_token_count = len(self.tokenizer.encode(chunk_text))
             current_offset = len(shared_precompare_cleanup(chunk_text))
-            next_section_tokens = (
-                len(self.tokenizer.encode(SECTION_SEPARATOR)) + section_token_count
-            )
+            next_section_tokens = separator_tokens + section_token_count
 
-            if next_section_tokens + current_token_count <= content_token_limit:
+            if next_section_tokens + chunk_token_count <= content_token_limit:
                 if chunk_text:
                     chunk_text += SECTION_SEPARATOR
+                    chunk_token_count += next_section_tokens
+                    chunk_span = None
+                else:
+                    chunk_token_count = section_token_count
+                    chunk_span = section_span
                 chunk_text += section_text
                 link_offsets[current_offset] = section_link_text
             else:
@@ -380,7 +405,7 @@ class Chunker:
                 self._create_chunk(
                     document,
                     chunks,
-                    chunk_text,
+                    current_chunk_span(),
                     link_offsets,
                     False,
                     title_prefix,
@@ -390,13 +415,15 @@ class Chunker:
                 # start a new chunk
                 link_offsets = {0: section_link_text}
                 chunk_text = section_text
+                chunk_token_count = section_token_count
+                chunk_span = section_span
 
         # finalize any leftover text chunk
         if chunk_text.strip() or not chunks:
             self._create_chunk(
                 document,
                 chunks,
-                chunk_text,
+                current_chunk_span(),
                 link_offsets or {0: ""},  # safe default
                 False,
                 title_prefix,
@@ -413,7 +440,9 @@ class Chunker:
             logger.debug(f"Chunking {document.semantic_identifier}")
 
         # Title prep
-        title = self._extract_blurb(document.get_title_for_document_index() or "")
+        title = self._extract_blurb(
+            self._tokenize(document.get_title_for_document_index() or "")
+        )
         title_prefix = title + RETURN_SEPARATOR if title else ""
         title_tokens = len(self.tokenizer.encode(title_prefix))
 
@@ -2,13 +2,22 @@ import time
 from abc import ABC
 from abc import abstractmethod
 from collections import defaultdict
+from typing import cast
 
+import numpy as np
+
+from onyx.configs.model_configs import INDEXING_EMBEDDING_WIRE_FORMAT
 from onyx.connectors.models import ConnectorFailure
 from onyx.connectors.models import DocumentFailure
 from onyx.db.models import SearchSettings
+from onyx.indexing.embedding_cache import build_embedding_cache_key
+from onyx.indexing.embedding_cache import build_embedding_settings_key
+from onyx.indexing.embedding_cache import get_embedding_cache
+from onyx.indexing.embedding_cache import get_title_embedding_cache
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.indexing.models import ChunkEmbedding
 from onyx.indexing.models import DocAwareChunk
+from onyx.indexing.models import EmbeddingVector
 from onyx.indexing.models import IndexChunk
 from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
 from onyx.utils.logger import setup_logger
@@ -16,6 +25,7 @@ from onyx.utils.timing import log_function_time
 from shared_configs.configs import INDEXING_MODEL_SERVER_HOST
 from shared_configs.configs import INDEXING_MODEL_SERVER_PORT
 from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbeddingWireFormat
 from shared_configs.enums import EmbedTextType
 from shared_configs.model_server_models import Embedding
 
@@ -50,6 +60,7 @@ class IndexingEmbedder(ABC):
         self.api_url = api_url
         self.api_version = api_version
         self.deployment_name = deployment_name
+        self.reduced_dimension = reduced_dimension
 
         self.embedding_model = EmbeddingModel(
             model_name=model_name,
@@ -68,6 +79,130 @@ class IndexingEmbedder(ABC):
             retrim_content=True,
             callback=callback,
         )
+        self.wire_format = EmbeddingWireFormat(INDEXING_EMBEDDING_WIRE_FORMAT)
+
+        self.embedding_settings_key = build_embedding_settings_key(
+            model_name=model_name,
+            provider_type=provider_type,
+            normalize=normalize,
+            passage_prefix=passage_prefix,
+            reduced_dimension=reduced_dimension,
+            api_url=api_url,
+            deployment_name=deployment_name,
+        )
+        self.embedding_cache = get_embedding_cache()
+        # shared by every embedder with the same settings in this process
+        self.title_embedding_cache = get_title_embedding_cache(
+            self.embedding_settings_key
+        )
+        # counted per embedder, i.e. per indexing attempt
+        self.embedding_cache_hits = 0
+        self.embedding_cache_misses = 0
+        self.title_embedding_cache_hits = 0
+
+    def _embedding_cache_key(self, text: str) -> str:
+        return build_embedding_cache_key(text, self.embedding_settings_key)
+
+    def get_missing_titles(self, titles: list[str]) -> list[str]:
+        """Titles that do not have an embedding in the title embedding cache."""
+        if self.title_embedding_cache is None:
+            return []
+        return [
+            title
+            for title in dict.fromkeys(titles)
+            if title and title not in self.title_embedding_cache
+        ]
+
+    def seed_title_embeddings(self, title_embeddings: dict[str, Embedding]) -> None:
+        """Adds title embeddings computed elsewhere (e.g. already stored in the
+        document index with the same settings) to the title embedding cache."""
+        if self.title_embedding_cache is None:
+            return
+        for title, embedding in title_embeddings.items():
+            self.title_embedding_cache.put(title, embedding)
+
+    def _encode_passages(
+        self,
+        texts: list[str],
+        large_chunks_present: bool = False,
+        tenant_id: str | None = None,
+        request_id: str | None = None,
+    ) -> list[Embedding] | np.ndarray:
+        """Encodes passages using the configured wire format. Packed formats return a
+        float32 array whose rows can be used directly as chunk embeddings.
+
+        If the embedding cache is enabled, only texts that are not in the cache are
+        sent to the model server."""
+        if self.embedding_cache is None or not texts:
+            return self._encode_passages_uncached(
+                texts=texts,
+                large_chunks_present=large_chunks_present,
+                tenant_id=tenant_id,
+                request_id=request_id,
+            )
+
+        keys = [self._embedding_cache_key(text) for text in texts]
+        cached = self.embedding_cache.get_many(keys)
+
+        # deduplicated, the same text may show up multiple times in a batch
+        missing: dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+
+        num_misses = sum(1 for key in keys if key not in cached)
+        self.embedding_cache_hits += len(keys) - num_misses
+        self.embedding_cache_misses += num_misses
+
+        fresh: dict[str, Embedding | np.ndarray] = {}
+        if missing:
+            new_embeddings = self._encode_passages_uncached(
+                texts=list(missing.values()),
+                large_chunks_present=large_chunks_present,
+                tenant_id=tenant_id,
+                request_id=request_id,
+            )
+            fresh = dict(zip(missing.keys(), new_embeddings))
+            self.embedding_cache.put_many(
+                {key: np.asarray(vector) for key, vector in fresh.items()}
+            )
+
+        if self.wire_format == EmbeddingWireFormat.JSON:
+            return [
+                cast(Embedding, fresh[key]) if key in fresh else cached[key].tolist()
+                for key in keys
+            ]
+        return np.stack(
+            [
+                fresh[key] if key in fresh else cached[key].astype(np.float32)
+                for key in keys
+            ]
+        )
+
+    def _encode_passages_uncached(
+        self,
+        texts: list[str],
+        large_chunks_present: bool = False,
+        tenant_id: str | None = None,
+        request_id: str | None = None,
+    ) -> list[Embedding] | np.ndarray:
+        if self.wire_format == EmbeddingWireFormat.JSON:
+            return self.embedding_model.encode(
+                texts=texts,
+                text_type=EmbedTextType.PASSAGE,
+                large_chunks_present=large_chunks_present,
+                tenant_id=tenant_id,
+                request_id=request_id,
+            )
+
+        return self.embedding_model.encode_array(
+            texts=texts,
+            text_type=EmbedTextType.PASSAGE,
+            wire_format=self.wire_format,
+            large_chunks_present=large_chunks_present,
+            tenant_id=tenant_id,
+            request_id=request_id,
+        )
 
     @abstractmethod
     def embed_chunks(
@@ -143,9 +278,8 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
                     raise RuntimeError("Large chunk contains mini chunks")
                 flat_chunk_texts.extend(chunk.mini_chunk_texts)
 
-        embeddings = self.embedding_model.encode(
+        embeddings = self._encode_passages(
             texts=flat_chunk_texts,
-            text_type=EmbedTextType.PASSAGE,
             large_chunks_present=large_chunks_present,
             tenant_id=tenant_id,
             request_id=request_id,
@@ -160,15 +294,28 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
         # which is ok, it just won't contribute at all to the scoring.
         chunk_titles_list = [title for title in chunk_titles if title]
 
-        # Cache the Title embeddings to only have to do it once
-        title_embed_dict: dict[str, Embedding] = {}
+        # Cache the Title embeddings to only have to do it once, titles embedded in
+        # earlier batches are reused from the process wide title cache
+        title_embed_dict: dict[str, EmbeddingVector] = {}
+        if self.title_embedding_cache is not None:
+            for chunk_title in chunk_titles_list:
+                cached_title_embedding = self.title_embedding_cache.get(chunk_title)
+                if cached_title_embedding is not None:
+                    title_embed_dict[chunk_title] = cached_title_embedding
+            self.title_embedding_cache_hits += len(title_embed_dict)
+            chunk_titles_list = [
+                title for title in chunk_titles_list if title not in title_embed_dict
+            ]
+
         if chunk_titles_list:
-            title_embeddings = self.embedding_model.encode(
+            title_embeddings = self._encode_passages(
                 chunk_titles_list,
-                text_type=EmbedTextType.PASSAGE,
                 tenant_id=tenant_id,
                 request_id=request_id,
             )
+            if self.title_embedding_cache is not None:
+                for chunk_title, vector in zip(chunk_titles_list, title_embeddings):
+                    self.title_embedding_cache.put(chunk_title, vector)
             title_embed_dict.update(
                 {
                     title: vector
@@ -198,9 +345,8 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
                     logger.error(
                         "Title had to be embedded separately, this should not happen!"
                     )
-                    title_embedding = self.embedding_model.encode(
+                    title_embedding = self._encode_passages(
                         [title],
-                        text_type=EmbedTextType.PASSAGE,
                         tenant_id=tenant_id,
                         request_id=request_id,
                     )[0]
@@ -210,7 +356,7 @@ class DefaultIndexingEmbedder(IndexingEmbedder):
                 **chunk.model_dump(),
                 embeddings=ChunkEmbedding(
                     full_embedding=chunk_embeddings[0],
-                    mini_chunk_embeddings=chunk_embeddings[1:],
+                    mini_chunk_embeddings=list(chunk_embeddings[1:]),
                 ),
                 title_embedding=title_embedding,
             )
@@ -0,0 +1,246 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from onyx.configs.model_configs import INDEXING_EMBEDDING_CACHE_DIR
+from onyx.configs.model_configs import INDEXING_EMBEDDING_CACHE_MAX_ENTRIES
+from onyx.configs.model_configs import INDEXING_TITLE_EMBEDDING_CACHE_SIZE
+from onyx.indexing.models import EmbeddingVector
+from onyx.utils.logger import setup_logger
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+from shared_configs.enums import EmbeddingProvider
+from shared_configs.utils import batch_list
+
+logger = setup_logger()
+
+_EMBEDDING_CACHE_FILENAME = "embedding_cache.sqlite3"
+# stay well below SQLite's limit on host parameters per statement
+_SQLITE_BATCH_SIZE = 500
+# when the cache is full, evict down to this fraction of the max entries
+_EVICTION_LOW_WATERMARK = 0.9
+
+
+def build_embedding_settings_key(
+    model_name: str,
+    provider_type: EmbeddingProvider | None,
+    normalize: bool,
+    passage_prefix: str | None,
+    reduced_dimension: int | None,
+    api_url: str | None,
+    deployment_name: str | None,
+) -> str:
+    """Everything besides the text itself that can change the passage embedding
+    produced for a text."""
+    return json.dumps(
+        [
+            model_name,
+            provider_type.value if provider_type else None,
+            normalize,
+            passage_prefix,
+            reduced_dimension,
+            api_url,
+            deployment_name,
+        ]
+    )
+
+
+def build_embedding_cache_key(text: str, settings_key: str) -> str:
+    """Content address of a passage embedding."""
+    return hashlib.sha256(
+        json.dumps([settings_key, text], ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+class EmbeddingCache:
+    """Local on-disk LRU cache of passage embeddings keyed by content hash.
+
+    Backed by SQLite so that multiple indexing processes on the same host can
+    share it. Any error talking to the cache is logged and treated as a miss,
+    the cache must never fail indexing.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int) -> None:
+        self.filename = os.path.join(cache_dir, _EMBEDDING_CACHE_FILENAME)
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        # approximate, other processes may be writing to the same file
+        self._approx_entries = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+
+        os.makedirs(os.path.dirname(self.filename), exist_ok=True)
+        conn = sqlite3.connect(self.filename, timeout=60.0, check_same_thread=False)
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,  -- little endian float32
+                    last_used REAL NOT NULL
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used "
+                "ON embeddings(last_used)"
+            )
+            self._approx_entries = conn.execute(
+                "SELECT COUNT(*) FROM embeddings"
+            ).fetchone()[0]
+
+        self._conn = conn
+        return conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        """Returns the cached vectors for the keys that are present and marks
+        them as recently used."""
+        found: dict[str, np.ndarray] = {}
+        unique_keys = list(dict.fromkeys(keys))
+        if not unique_keys:
+            return found
+
+        try:
+            with self._lock:
+                conn = self._connect()
+                for key_batch in batch_list(unique_keys, _SQLITE_BATCH_SIZE):
+                    placeholders = ",".join("?" * len(key_batch))
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                        key_batch,
+                    ).fetchall()
+                    for key, vector in rows:
+                        found[key] = np.frombuffer(vector, dtype="<f4")
+
+                now = time.time()
+                with conn:
+                    for key_batch in batch_list(list(found), _SQLITE_BATCH_SIZE):
+                        placeholders = ",".join("?" * len(key_batch))
+                        conn.execute(
+                            f"UPDATE embeddings SET last_used = ? WHERE key IN ({placeholders})",
+                            [now, *key_batch],
+                        )
+        except sqlite3.Error:
+            logger.exception("Embedding cache lookup failed, treating as misses")
+            return {}
+
+        return found
+
+    def put_many(self, entries: dict[str, np.ndarray]) -> None:
+        if not entries:
+            return
+
+        now = time.time()
+        rows = [
+            (key, np.asarray(vector, dtype="<f4").tobytes(), now)
+            for key, vector in entries.items()
+        ]
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector, last_used) "
+                        "VALUES (?, ?, ?)",
+                        rows,
+                    )
+                self._approx_entries += len(rows)
+                if self._approx_entries > self.max_entries:
+                    self._evict(conn)
+        except sqlite3.Error:
+            logger.exception("Embedding cache write failed")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Drops the least recently used entries down to the low watermark."""
+        num_entries = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        target = int(self.max_entries * _EVICTION_LOW_WATERMARK)
+        num_to_evict = num_entries - target
+        if num_entries > self.max_entries and num_to_evict > 0:
+            with conn:
+                conn.execute(
+                    "DELETE FROM embeddings WHERE key IN ("
+                    "SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                    (num_to_evict,),
+                )
+            logger.info(
+                f"Embedding cache evicted {num_to_evict} entries: "
+                f"entries={num_entries} max_entries={self.max_entries}"
+            )
+            num_entries -= num_to_evict
+        self._approx_entries = num_entries
+
+
+_EMBEDDING_CACHE: EmbeddingCache | None = None
+_EMBEDDING_CACHE_LOCK = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Process wide embedding cache, None if INDEXING_EMBEDDING_CACHE_DIR is not set."""
+    global _EMBEDDING_CACHE
+
+    if not INDEXING_EMBEDDING_CACHE_DIR:
+        return None
+
+    with _EMBEDDING_CACHE_LOCK:
+        if _EMBEDDING_CACHE is None:
+            _EMBEDDING_CACHE = EmbeddingCache(
+                cache_dir=INDEXING_EMBEDDING_CACHE_DIR,
+                max_entries=INDEXING_EMBEDDING_CACHE_MAX_ENTRIES,
+            )
+        return _EMBEDDING_CACHE
+
+
+class TitleEmbeddingCache(TTLLRUCache[str, EmbeddingVector]):
+    """Bounded in memory LRU of title embeddings for a single set of embedding
+    settings. Many documents share a title (channel names, section titles, ...),
+    this avoids re-embedding them in every batch of an indexing run."""
+
+    def put_many(self, values: dict[str, EmbeddingVector]) -> None:
+        # don't keep the whole batch array alive through a row view
+        super().put_many(
+            {
+                title: (
+                    embedding.copy() if isinstance(embedding, np.ndarray) else embedding
+                )
+                for title, embedding in values.items()
+            }
+        )
+
+
+_TITLE_EMBEDDING_CACHES: dict[str, TitleEmbeddingCache] = {}
+
+
+def get_title_embedding_cache(settings_key: str) -> TitleEmbeddingCache | None:
+    """Process wide title embedding LRU for the given embedding settings, shared by
+    all indexing attempts (and tenants) running in this worker. None if disabled
+    via INDEXING_TITLE_EMBEDDING_CACHE_SIZE."""
+    if INDEXING_TITLE_EMBEDDING_CACHE_SIZE <= 0:
+        return None
+
+    with _EMBEDDING_CACHE_LOCK:
+        cache = _TITLE_EMBEDDING_CACHES.get(settings_key)
+        if cache is None:
+            cache = TitleEmbeddingCache(max_size=INDEXING_TITLE_EMBEDDING_CACHE_SIZE)
+            _TITLE_EMBEDDING_CACHES[settings_key] = cache
+        return cache
+
+
+def clear_title_embedding_caches() -> None:
+    with _EMBEDDING_CACHE_LOCK:
+        _TITLE_EMBEDDING_CACHES.clear()
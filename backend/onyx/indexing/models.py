@@ -1,7 +1,11 @@
+from typing import Annotated
 from typing import TYPE_CHECKING
 
+import numpy as np
 from pydantic import BaseModel
+from pydantic import ConfigDict
 from pydantic import Field
+from pydantic import PlainSerializer
 
 from onyx.access.models import DocumentAccess
 from onyx.connectors.models import Document
@@ -17,9 +21,25 @@ if TYPE_CHECKING:
 logger = setup_logger()
 
 
+def _embedding_vector_to_json(vector: "np.ndarray | Embedding") -> Embedding:
+    return vector.tolist() if isinstance(vector, np.ndarray) else vector
+
+
+# Packed model server responses (see INDEXING_EMBEDDING_WIRE_FORMAT) are kept as
+# float32 numpy rows all the way into the Vespa feed, everything else uses lists.
+# Validation and model_dump pass the array through without copying it.
+EmbeddingVector = Annotated[
+    np.ndarray | Embedding,
+    Field(union_mode="left_to_right"),
+    PlainSerializer(_embedding_vector_to_json, when_used="json"),
+]
+
+
 class ChunkEmbedding(BaseModel):
-    full_embedding: Embedding
-    mini_chunk_embeddings: list[Embedding]
+    full_embedding: EmbeddingVector
+    mini_chunk_embeddings: list[EmbeddingVector]
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
 class BaseChunk(BaseModel):
@@ -78,7 +98,9 @@ class DocAwareChunk(BaseChunk):
 
 class IndexChunk(DocAwareChunk):
     embeddings: ChunkEmbedding
-    title_embedding: Embedding | None
+    title_embedding: EmbeddingVector | None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
 # TODO(rkuo): currently, this extra metadata sent during indexing is just for speed,
@@ -0,0 +1,370 @@
+"""
+Span based text splitting that tokenizes a piece of text once and derives every
+token count it needs (chunk boundaries, overlap, blurbs, mini-chunks) from the
+token offsets of that single pass.
+
+The splitting rules mirror llama_index's SentenceSplitter exactly so that the
+resulting chunks are identical to the ones produced by calling
+SentenceSplitter.split_text with the same tokenizer.
+"""
+
+import weakref
+from bisect import bisect_left
+from bisect import bisect_right
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from onyx.natural_language_processing.utils import BaseTokenizer
+from onyx.utils.logger import setup_logger
+
+logger = setup_logger()
+
+# Texts used to check once per tokenizer that counting tokens from offsets gives
+# the same result as tokenizing the sub-string on its own
+_PROBE_TEXTS = (
+    "Hello world. This is a test, with punctuation; and more!\n\n"
+    "New paragraph here.\n\n\nThird   paragraph\twith  odd   spacing. ",
+    "Ünïcödé wörds, CamelCaseWords and snake_case_words: "
+    "http://example.com/path?x=1 - 12345 67.89\n\r\nMetadata:\n\ttags - a, b",
+    "日本語のテキスト。句読点もあります！ Mixed with English text... (done)",
+)
+_PROBE_SEPARATORS = ("\n\n", "\n\r\n")
+
+_token_reuse_support: "weakref.WeakKeyDictionary[BaseTokenizer, tuple[bool, bool]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class TokenizedText:
+    """
+    A piece of text tokenized a single time. Token counts of sub-spans are
+    computed from the token offsets whenever the span boundaries fall on clean
+    token boundaries, otherwise the sub-span is tokenized on its own (memoized).
+    """
+
+    def __init__(
+        self,
+        text: str,
+        tokenizer: BaseTokenizer,
+        offsets: list[tuple[int, int]] | None = None,
+    ) -> None:
+        self.text = text
+        self.tokenizer = tokenizer
+        self._counts: dict[tuple[int, int], int] = {}
+        self._starts: list[int] | None = None
+        self._ends: list[int] = []
+
+        if offsets is None and supports_token_reuse(tokenizer):
+            offsets = tokenizer.token_offsets(text)
+
+        if offsets is not None and _is_monotonic(offsets):
+            self._starts = [start for start, _ in offsets]
+            self._ends = [end for _, end in offsets]
+            self._counts[(0, len(text))] = len(offsets)
+
+    def span(self, start: int = 0, end: int | None = None) -> "TextSpan":
+        return TextSpan(self, start, len(self.text) if end is None else end)
+
+    def token_count(self, start: int = 0, end: int | None = None) -> int:
+        end = len(self.text) if end is None else end
+        key = (start, end)
+        count = self._counts.get(key)
+        if count is not None:
+            return count
+
+        if (
+            self._starts is not None
+            and self._is_boundary(start)
+            and self._is_boundary(end)
+        ):
+            # tokens fully inside [start, end), nothing straddles either boundary
+            count = bisect_right(self._ends, end) - bisect_left(self._starts, start)
+        else:
+            count = len(self.tokenizer.tokenize(self.text[start:end]))
+
+        self._counts[key] = count
+        return count
+
+    def _is_boundary(self, pos: int) -> bool:
+        """A position is a clean boundary if it is next to whitespace and no token
+        covers it, so tokenizing either side separately yields the same tokens."""
+        if pos <= 0 or pos >= len(self.text):
+            return True
+        if not (self.text[pos - 1].isspace() or self.text[pos].isspace()):
+            return False
+
+        assert self._starts is not None
+        num_tokens = len(self._ends)
+        idx = bisect_left(self._ends, pos)
+        while idx < num_tokens and self._ends[idx] == pos:
+            if self._starts[idx] == pos:
+                # zero width token sitting on the boundary
+                return False
+            idx += 1
+        return idx == num_tokens or self._starts[idx] >= pos
+
+
+@dataclass(frozen=True)
+class TextSpan:
+    doc: TokenizedText
+    start: int
+    end: int
+
+    @property
+    def text(self) -> str:
+        return self.doc.text[self.start : self.end]
+
+    def token_count(self) -> int:
+        return self.doc.token_count(self.start, self.end)
+
+
+@dataclass
+class _SpanSplit:
+    start: int
+    end: int
+    is_sentence: bool
+    token_size: int
+
+
+class TokenSplitter:
+    """
+    Equivalent of llama_index's SentenceSplitter operating on spans of a
+    TokenizedText, so nested splits never tokenize the text again.
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int = 0) -> None:
+        # importing llama_index uses a lot of RAM, so we only import it when needed.
+        from llama_index.core.node_parser.text.sentence import CHUNKING_REGEX
+        from llama_index.core.node_parser.text.sentence import DEFAULT_PARAGRAPH_SEP
+        from llama_index.core.node_parser.text.utils import split_by_char
+        from llama_index.core.node_parser.text.utils import split_by_regex
+        from llama_index.core.node_parser.text.utils import (
+            split_by_sentence_tokenizer,
+        )
+        from llama_index.core.node_parser.text.utils import split_by_sep
+
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size "
+                f"({chunk_size}), should be smaller."
+            )
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._split_fns: list[Callable[[str], list[str]]] = [
+            split_by_sep(DEFAULT_PARAGRAPH_SEP),
+            split_by_sentence_tokenizer(),
+        ]
+        self._sub_sentence_split_fns: list[Callable[[str], list[str]]] = [
+            split_by_regex(CHUNKING_REGEX),
+            split_by_sep(" "),
+            split_by_char(),
+        ]
+
+    def split(self, span: TextSpan) -> list[TextSpan]:
+        if span.start == span.end:
+            return [span]
+
+        splits = self._split(span.doc, span.start, span.end)
+        return self._merge(span.doc, splits)
+
+    def split_text(self, text: str, tokenizer: BaseTokenizer) -> list[str]:
+        return [span.text for span in self.split(TokenizedText(text, tokenizer).span())]
+
+    def _split(self, doc: TokenizedText, start: int, end: int) -> list[_SpanSplit]:
+        token_size = doc.token_count(start, end)
+        if token_size <= self.chunk_size:
+            return [_SpanSplit(start, end, is_sentence=True, token_size=token_size)]
+
+        pieces, is_sentence = self._get_splits_by_fns(doc.text, start, end)
+        splits: list[_SpanSplit] = []
+        for piece_start, piece_end in pieces:
+            token_size = doc.token_count(piece_start, piece_end)
+            if token_size <= self.chunk_size:
+                splits.append(
+                    _SpanSplit(
+                        piece_start,
+                        piece_end,
+                        is_sentence=is_sentence,
+                        token_size=token_size,
+                    )
+                )
+            else:
+                splits.extend(self._split(doc, piece_start, piece_end))
+        return splits
+
+    def _get_splits_by_fns(
+        self, text: str, start: int, end: int
+    ) -> tuple[list[tuple[int, int]], bool]:
+        sub_text = text[start:end]
+        for split_fn in self._split_fns:
+            parts = split_fn(sub_text)
+            if len(parts) > 1:
+                return _locate(sub_text, parts, start), True
+
+        parts = [sub_text]
+        for split_fn in self._sub_sentence_split_fns:
+            parts = split_fn(sub_text)
+            if len(parts) > 1:
+                break
+        return _locate(sub_text, parts, start), False
+
+    def _merge(self, doc: TokenizedText, splits: list[_SpanSplit]) -> list[TextSpan]:
+        chunks: list[list[_SpanSplit]] = []
+        cur_chunk: list[_SpanSplit] = []
+        cur_chunk_len = 0
+        new_chunk = True
+
+        def close_chunk() -> None:
+            nonlocal cur_chunk, cur_chunk_len, new_chunk
+            chunks.append(cur_chunk)
+            last_chunk = cur_chunk
+            cur_chunk = []
+            cur_chunk_len = 0
+            new_chunk = True
+
+            # add overlap to the next chunk using the tail of the last one
+            last_index = len(last_chunk) - 1
+            while (
+                last_index >= 0
+                and cur_chunk_len + last_chunk[last_index].token_size
+                <= self.chunk_overlap
+            ):
+                cur_chunk_len += last_chunk[last_index].token_size
+                cur_chunk.insert(0, last_chunk[last_index])
+                last_index -= 1
+
+        idx = 0
+        while idx < len(splits):
+            cur_split = splits[idx]
+            if cur_split.token_size > self.chunk_size:
+                raise ValueError("Single token exceeded chunk size")
+            if cur_chunk_len + cur_split.token_size > self.chunk_size and not new_chunk:
+                close_chunk()
+            elif (
+                cur_split.is_sentence
+                or cur_chunk_len + cur_split.token_size <= self.chunk_size
+                or new_chunk
+            ):
+                cur_chunk_len += cur_split.token_size
+                cur_chunk.append(cur_split)
+                idx += 1
+                new_chunk = False
+            else:
+                close_chunk()
+
+        if not new_chunk:
+            chunks.append(cur_chunk)
+
+        return [
+            span
+            for span in (self._to_stripped_span(doc, chunk) for chunk in chunks)
+            if span is not None
+        ]
+
+    def _to_stripped_span(
+        self, doc: TokenizedText, chunk: list[_SpanSplit]
+    ) -> TextSpan | None:
+        if not chunk:
+            return None
+
+        contiguous = all(prev.end == cur.start for prev, cur in zip(chunk, chunk[1:]))
+        if not contiguous:
+            # the sentence tokenizer drops leading whitespace of a piece, the
+            # joined text is then not a slice of the original anymore
+            text = "".join(doc.text[split.start : split.end] for split in chunk)
+            text = text.strip()
+            if not text:
+                return None
+            return TokenizedText(text, doc.tokenizer).span()
+
+        start, end = chunk[0].start, chunk[-1].end
+        while start < end and doc.text[start].isspace():
+            start += 1
+        while end > start and doc.text[end - 1].isspace():
+            end -= 1
+        if start == end:
+            return None
+        return TextSpan(doc, start, end)
+
+
+def _locate(text: str, parts: list[str], base: int) -> list[tuple[int, int]]:
+    """Maps the split strings back onto (start, end) positions in the full text."""
+    spans: list[tuple[int, int]] = []
+    cursor = 0
+    for part in parts:
+        if not text.startswith(part, cursor):
+            cursor = text.index(part, cursor)
+        spans.append((base + cursor, base + cursor + len(part)))
+        cursor += len(part)
+    return spans
+
+
+def _is_monotonic(offsets: list[tuple[int, int]]) -> bool:
+    prev_start = prev_end = 0
+    for start, end in offsets:
+        if start < prev_start or end < prev_end or end < start:
+            return False
+        prev_start, prev_end = start, end
+    return True
+
+
+def _probe_offsets(tokenizer: BaseTokenizer) -> bool:
+    for text in _PROBE_TEXTS:
+        offsets = tokenizer.token_offsets(text)
+        if offsets is None or not _is_monotonic(offsets):
+            return False
+        if len(offsets) != len(tokenizer.tokenize(text)):
+            return False
+
+        doc = TokenizedText(text, tokenizer, offsets=offsets)
+        for pos in range(1, len(text)):
+            if not doc._is_boundary(pos):
+                continue
+            if doc.token_count(0, pos) != len(tokenizer.tokenize(text[:pos])):
+                return False
+            if doc.token_count(pos) != len(tokenizer.tokenize(text[pos:])):
+                return False
+    return True
+
+
+def _probe_additive_joins(tokenizer: BaseTokenizer) -> bool:
+    def count(text: str) -> int:
+        return len(tokenizer.tokenize(text))
+
+    for separator in _PROBE_SEPARATORS:
+        for first in _PROBE_TEXTS:
+            for second in _PROBE_TEXTS:
+                joined = first + separator + second
+                if count(joined) != count(first) + count(separator) + count(second):
+                    return False
+    return True
+
+
+def _get_token_reuse_support(tokenizer: BaseTokenizer) -> tuple[bool, bool]:
+    support = _token_reuse_support.get(tokenizer)
+    if support is None:
+        try:
+            support = (_probe_offsets(tokenizer), _probe_additive_joins(tokenizer))
+        except Exception:
+            logger.exception("Failed to probe tokenizer for token reuse")
+            support = (False, False)
+
+        logger.debug(
+            f"Token reuse for {type(tokenizer).__name__}: "
+            f"offsets={support[0]} additive_joins={support[1]}"
+        )
+        _token_reuse_support[tokenizer] = support
+    return support
+
+
+def supports_token_reuse(tokenizer: BaseTokenizer) -> bool:
+    """Whether token counts of sub-spans can be derived from the offsets of a
+    single tokenization pass without changing the result for this tokenizer."""
+    return _get_token_reuse_support(tokenizer)[0]
+
+
+def has_additive_joins(tokenizer: BaseTokenizer) -> bool:
+    """Whether the token count of texts joined by a separator is the sum of the
+    individual token counts for this tokenizer."""
+    return _get_token_reuse_support(tokenizer)[1]
@@ -366,11 +366,16 @@ def check_number_of_tokens(
     """
 
     if encode_fn is None:
-        encode_fn = tiktoken.get_encoding("cl100k_base").encode
+        encode_fn = _get_default_encoding().encode
 
     return len(encode_fn(text))
 
 
+@lru_cache(maxsize=1)
+def _get_default_encoding() -> tiktoken.Encoding:
+    return tiktoken.get_encoding("cl100k_base")
+
+
 def test_llm(llm: LLM) -> str | None:
     # try for up to 2 timeouts (e.g. 10 seconds in total)
     error_msg = None
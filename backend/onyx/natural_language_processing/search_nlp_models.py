@@ -1,3 +1,4 @@
+import asyncio
 import threading
 import time
 from collections.abc import Callable
@@ -6,7 +7,10 @@ from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 from functools import wraps
 from typing import Any
+from typing import cast
 
+import httpx
+import numpy as np
 import requests
 from httpx import HTTPError
 from requests import JSONDecodeError
@@ -22,19 +26,24 @@ from onyx.configs.model_configs import (
     BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES,
 )
 from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
+from onyx.configs.model_configs import EMBEDDING_LENGTH_BUCKETING
 from onyx.db.models import SearchSettings
+from onyx.httpx.httpx_pool import HttpxPool
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 from onyx.natural_language_processing.exceptions import (
     ModelServerRateLimitError,
 )
 from onyx.natural_language_processing.utils import get_tokenizer
-from onyx.natural_language_processing.utils import tokenizer_trim_content
+from onyx.natural_language_processing.utils import (
+    tokenizer_trim_content_with_count,
+)
 from onyx.utils.logger import setup_logger
 from shared_configs.configs import INDEXING_MODEL_SERVER_HOST
 from shared_configs.configs import INDEXING_MODEL_SERVER_PORT
 from shared_configs.configs import MODEL_SERVER_HOST
 from shared_configs.configs import MODEL_SERVER_PORT
 from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbeddingWireFormat
 from shared_configs.enums import EmbedTextType
 from shared_configs.enums import RerankerProvider
 from shared_configs.model_server_models import ConnectorClassificationRequest
@@ -49,10 +58,13 @@ from shared_configs.model_server_models import IntentResponse
 from shared_configs.model_server_models import RerankRequest
 from shared_configs.model_server_models import RerankResponse
 from shared_configs.utils import batch_list
+from shared_configs.utils import unpack_embeddings
 
 logger = setup_logger()
 
 
+MODEL_SERVER_ASYNC_POOL_NAME = "model_server"
+
 WARM_UP_STRINGS = [
     "Onyx is amazing!",
     "Check out our easy deployment guide at",
@@ -64,6 +76,20 @@ def clean_model_name(model_str: str) -> str:
     return model_str.replace("/", "_").replace("-", "_").replace(".", "_")
 
 
+def _padded_token_count(token_counts: list[int], batch_size: int) -> int:
+    """Number of tokens sent to the model if every batch is padded to its longest text."""
+    return sum(
+        len(batch_counts) * max(batch_counts)
+        for batch_counts in batch_list(token_counts, batch_size)
+    )
+
+
+def _padding_ratio(num_tokens: int, num_padded_tokens: int) -> float:
+    if not num_padded_tokens:
+        return 0.0
+    return 1 - num_tokens / num_padded_tokens
+
+
 def build_model_server_url(
     model_server_host: str,
     model_server_port: int,
@@ -78,6 +104,25 @@ def build_model_server_url(
     return f"http://{model_server_url}"
 
 
+def _model_server_headers(
+    tenant_id: str | None, request_id: str | None
+) -> dict[str, str]:
+    headers = {}
+    if tenant_id:
+        headers["X-Onyx-Tenant-ID"] = tenant_id
+
+    if request_id:
+        headers["X-Onyx-Request-ID"] = request_id
+    return headers
+
+
+def _get_model_server_async_client() -> httpx.AsyncClient:
+    # no timeout, same as the requests based calls
+    return HttpxPool.get_async(
+        MODEL_SERVER_ASYNC_POOL_NAME, http2=False, timeout=httpx.Timeout(None)
+    )
+
+
 class EmbeddingModel:
     def __init__(
         self,
@@ -111,6 +156,9 @@ class EmbeddingModel:
             model_name=model_name, provider_type=provider_type
         )
         self.callback = callback
+        # token totals of length bucketed local batches, see padding_ratio
+        self.num_tokens = 0
+        self.num_padded_tokens = 0
 
         model_server_url = build_model_server_url(server_host, server_port)
         self.embed_server_endpoint = f"{model_server_url}/encoder/bi-encoder-embed"
@@ -122,16 +170,9 @@ class EmbeddingModel:
         request_id: str | None = None,
     ) -> EmbedResponse:
         def _make_request() -> Response:
-            headers = {}
-            if tenant_id:
-                headers["X-Onyx-Tenant-ID"] = tenant_id
-
-            if request_id:
-                headers["X-Onyx-Request-ID"] = request_id
-
             response = requests.post(
                 self.embed_server_endpoint,
-                headers=headers,
+                headers=_model_server_headers(tenant_id, request_id),
                 json=embed_request.model_dump(),
             )
             # signify that this is a rate limit error
@@ -173,6 +214,66 @@ class EmbeddingModel:
         except requests.RequestException as e:
             raise HTTPError(f"Request failed: {str(e)}") from e
 
+    def _build_embed_request(
+        self,
+        texts: list[str],
+        text_type: EmbedTextType,
+        max_seq_length: int,
+        wire_format: EmbeddingWireFormat = EmbeddingWireFormat.JSON,
+    ) -> EmbedRequest:
+        return EmbedRequest(
+            model_name=self.model_name,
+            texts=texts,
+            api_version=self.api_version,
+            deployment_name=self.deployment_name,
+            max_context_length=max_seq_length,
+            normalize_embeddings=self.normalize,
+            api_key=self.api_key,
+            provider_type=self.provider_type,
+            text_type=text_type,
+            manual_query_prefix=self.query_prefix,
+            manual_passage_prefix=self.passage_prefix,
+            api_url=self.api_url,
+            reduced_dimension=self.reduced_dimension,
+            wire_format=wire_format,
+        )
+
+    async def _amake_model_server_request(
+        self,
+        embed_request: EmbedRequest,
+        tenant_id: str | None = None,
+        request_id: str | None = None,
+    ) -> EmbedResponse:
+        """Async variant of `_make_model_server_request` without the passage retries,
+        it is only used for queries."""
+        try:
+            response = await _get_model_server_async_client().post(
+                self.embed_server_endpoint,
+                headers=_model_server_headers(tenant_id, request_id),
+                json=embed_request.model_dump(),
+            )
+        except httpx.RequestError as e:
+            raise HTTPError(f"Request failed: {str(e)}") from e
+
+        if response.status_code == 429:
+            raise ModelServerRateLimitError(response.text)
+
+        try:
+            response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            try:
+                error_detail = response.json().get("detail", str(e))
+            except Exception:
+                error_detail = response.text
+            raise HTTPError(f"HTTP error occurred: {error_detail}") from e
+
+        return EmbedResponse(**response.json())
+
+    @property
+    def padding_ratio(self) -> float:
+        """Fraction of padding in the length bucketed batches sent so far."""
+        return _padding_ratio(self.num_tokens, self.num_padded_tokens)
+
     def _batch_encode_texts(
         self,
         texts: list[str],
@@ -182,14 +283,39 @@ class EmbeddingModel:
         num_threads: int = INDEXING_EMBEDDING_MODEL_NUM_THREADS,
         tenant_id: str | None = None,
         request_id: str | None = None,
-    ) -> list[Embedding]:
+        wire_format: EmbeddingWireFormat = EmbeddingWireFormat.JSON,
+        token_counts: list[int] | None = None,
+    ) -> list[Embedding] | np.ndarray:
+        """Returns a list of embeddings for the JSON wire format, otherwise a
+        (len(texts), dim) float32 array.
+
+        If token_counts are given, texts are sorted by token count before being split
+        into batches so that similarly sized texts are padded together. The embeddings
+        are returned in the original order of the texts."""
+        order: list[int] | None = None
+        if token_counts is not None and len(texts) > batch_size:
+            order = sorted(range(len(texts)), key=lambda ind: token_counts[ind])
+            sorted_counts = [token_counts[ind] for ind in order]
+
+            num_tokens = sum(token_counts)
+            num_padded_tokens = _padded_token_count(sorted_counts, batch_size)
+            self.num_tokens += num_tokens
+            self.num_padded_tokens += num_padded_tokens
+            logger.debug(
+                f"Length bucketed {len(texts)} texts: "
+                f"padding_ratio={_padding_ratio(num_tokens, num_padded_tokens):.3f} "
+                f"unsorted_padding_ratio="
+                f"{_padding_ratio(num_tokens, _padded_token_count(token_counts, batch_size)):.3f}"
+            )
+            texts = [texts[ind] for ind in order]
+
         text_batches = batch_list(texts, batch_size)
 
         logger.debug(
             f"Encoding {len(texts)} texts in {len(text_batches)} batches for local model"
         )
 
-        embeddings: list[Embedding] = []
+        batch_embeddings_list: list[list[Embedding] | np.ndarray] = []
 
         def process_batch(
             batch_idx: int,
@@ -197,25 +323,13 @@ class EmbeddingModel:
             text_batch: list[str],
             tenant_id: str | None = None,
             request_id: str | None = None,
-        ) -> tuple[int, list[Embedding]]:
+        ) -> tuple[int, list[Embedding] | np.ndarray]:
             if self.callback:
                 if self.callback.should_stop():
                     raise RuntimeError("_batch_encode_texts detected stop signal")
 
-            embed_request = EmbedRequest(
-                model_name=self.model_name,
-                texts=text_batch,
-                api_version=self.api_version,
-                deployment_name=self.deployment_name,
-                max_context_length=max_seq_length,
-                normalize_embeddings=self.normalize,
-                api_key=self.api_key,
-                provider_type=self.provider_type,
-                text_type=text_type,
-                manual_query_prefix=self.query_prefix,
-                manual_passage_prefix=self.passage_prefix,
-                api_url=self.api_url,
-                reduced_dimension=self.reduced_dimension,
+            embed_request = self._build_embed_request(
+                text_batch, text_type, max_seq_length, wire_format
             )
 
             start_time = time.time()
@@ -229,6 +343,9 @@ class EmbeddingModel:
                 f"EmbeddingModel.process_batch: Batch {batch_idx}/{batch_len} processing time: {processing_time:.2f} seconds"
             )
 
+            if response.packed_embeddings is not None:
+                return batch_idx, unpack_embeddings(response.packed_embeddings)
+
             return batch_idx, response.embeddings
 
         # only multi thread if:
@@ -252,7 +369,7 @@ class EmbeddingModel:
                 }
 
                 # Collect results in order
-                batch_results: list[tuple[int, list[Embedding]]] = []
+                batch_results: list[tuple[int, list[Embedding] | np.ndarray]] = []
                 for future in as_completed(future_to_batch):
                     try:
                         result = future.result()
@@ -266,7 +383,7 @@ class EmbeddingModel:
                 # Sort by batch index and extend embeddings
                 batch_results.sort(key=lambda x: x[0])
                 for _, batch_embeddings in batch_results:
-                    embeddings.extend(batch_embeddings)
+                    batch_embeddings_list.append(batch_embeddings)
         else:
             # Original sequential processing
             for idx, text_batch in enumerate(text_batches, start=1):
@@ -277,47 +394,84 @@ class EmbeddingModel:
                     tenant_id=tenant_id,
                     request_id=request_id,
                 )
-                embeddings.extend(batch_embeddings)
+                batch_embeddings_list.append(batch_embeddings)
                 if self.callback:
                     self.callback.progress("_batch_encode_texts", 1)
 
+        if wire_format != EmbeddingWireFormat.JSON:
+            embedding_array = np.concatenate(
+                [np.asarray(batch, dtype=np.float32) for batch in batch_embeddings_list]
+            )
+            if order is not None:
+                # restore the original order of the texts
+                restored_array = np.empty_like(embedding_array)
+                restored_array[order] = embedding_array
+                return restored_array
+            return embedding_array
+
+        embeddings: list[Embedding] = []
+        for batch_embeddings in batch_embeddings_list:
+            embeddings.extend(cast(list[Embedding], batch_embeddings))
+        if order is not None:
+            restored_embeddings: list[Embedding] = [[] for _ in embeddings]
+            for sorted_ind, original_ind in enumerate(order):
+                restored_embeddings[original_ind] = embeddings[sorted_ind]
+            return restored_embeddings
         return embeddings
 
-    def encode(
+    def _encode(
         self,
         texts: list[str],
         text_type: EmbedTextType,
-        large_chunks_present: bool = False,
-        local_embedding_batch_size: int = BATCH_SIZE_ENCODE_CHUNKS,
-        api_embedding_batch_size: int = BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES,
-        max_seq_length: int = DOC_EMBEDDING_CONTEXT_SIZE,
-        tenant_id: str | None = None,
-        request_id: str | None = None,
-    ) -> list[Embedding]:
+        large_chunks_present: bool,
+        local_embedding_batch_size: int,
+        api_embedding_batch_size: int,
+        max_seq_length: int,
+        tenant_id: str | None,
+        request_id: str | None,
+        wire_format: EmbeddingWireFormat,
+    ) -> list[Embedding] | np.ndarray:
         if not texts or not all(texts):
             raise ValueError(f"Empty or missing text for embedding: {texts}")
 
         if large_chunks_present:
             max_seq_length *= LARGE_CHUNK_RATIO
 
+        batch_size = (
+            api_embedding_batch_size
+            if self.provider_type
+            else local_embedding_batch_size
+        )
+
+        # padding only matters for local models, API based ones are billed per token
+        bucket_by_length = (
+            EMBEDDING_LENGTH_BUCKETING
+            and not self.provider_type
+            and len(texts) > batch_size
+        )
+
+        token_counts: list[int] | None = None
         if self.retrim_content:
             # This is applied during indexing as a catchall for overly long titles (or other uncapped fields)
             # Note that this uses just the default tokenizer which may also lead to very minor miscountings
             # However this slight miscounting is very unlikely to have any material impact.
-            texts = [
-                tokenizer_trim_content(
+            trimmed_texts = [
+                tokenizer_trim_content_with_count(
                     content=text,
                     desired_length=max_seq_length,
                     tokenizer=self.tokenizer,
                 )
                 for text in texts
             ]
-
-        batch_size = (
-            api_embedding_batch_size
-            if self.provider_type
-            else local_embedding_batch_size
-        )
+            texts = [text for text, _ in trimmed_texts]
+            if bucket_by_length:
+                # the counts of the trim pass, so every text is tokenized only once
+                token_counts = [num_tokens for _, num_tokens in trimmed_texts]
+        elif bucket_by_length:
+            # estimate with the default tokenizer, the model server truncates the rest
+            token_counts = [
+                min(len(self.tokenizer.encode(text)), max_seq_length) for text in texts
+            ]
 
         return self._batch_encode_texts(
             texts=texts,
@@ -326,6 +480,102 @@ class EmbeddingModel:
             max_seq_length=max_seq_length,
             tenant_id=tenant_id,
             request_id=request_id,
+            wire_format=wire_format,
+            token_counts=token_counts,
+        )
+
+    def encode(
+        self,
+        texts: list[str],
+        text_type: EmbedTextType,
+        large_chunks_present: bool = False,
+        local_embedding_batch_size: int = BATCH_SIZE_ENCODE_CHUNKS,
+        api_embedding_batch_size: int = BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES,
+        max_seq_length: int = DOC_EMBEDDING_CONTEXT_SIZE,
+        tenant_id: str | None = None,
+        request_id: str | None = None,
+    ) -> list[Embedding]:
+        return cast(
+            list[Embedding],
+            self._encode(
+                texts=texts,
+                text_type=text_type,
+                large_chunks_present=large_chunks_present,
+                local_embedding_batch_size=local_embedding_batch_size,
+                api_embedding_batch_size=api_embedding_batch_size,
+                max_seq_length=max_seq_length,
+                tenant_id=tenant_id,
+                request_id=request_id,
+                wire_format=EmbeddingWireFormat.JSON,
+            ),
+        )
+
+    async def aencode(
+        self,
+        texts: list[str],
+        text_type: EmbedTextType,
+        api_embedding_batch_size: int = BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES,
+        max_seq_length: int = DOC_EMBEDDING_CONTEXT_SIZE,
+        tenant_id: str | None = None,
+        request_id: str | None = None,
+    ) -> list[Embedding]:
+        """Async variant of `encode` for the search path, where only a handful of
+        queries are embedded. Texts are neither retrimmed nor length bucketed, API
+        based models get one concurrent request per batch."""
+        if not texts or not all(texts):
+            raise ValueError(f"Empty or missing text for embedding: {texts}")
+
+        text_batches = (
+            batch_list(texts, api_embedding_batch_size)
+            if self.provider_type
+            else [texts]
+        )
+        responses = await asyncio.gather(
+            *(
+                self._amake_model_server_request(
+                    self._build_embed_request(text_batch, text_type, max_seq_length),
+                    tenant_id=tenant_id,
+                    request_id=request_id,
+                )
+                for text_batch in text_batches
+            )
+        )
+
+        embeddings: list[Embedding] = []
+        for response in responses:
+            embeddings.extend(response.embeddings)
+        return embeddings
+
+    def encode_array(
+        self,
+        texts: list[str],
+        text_type: EmbedTextType,
+        wire_format: EmbeddingWireFormat = EmbeddingWireFormat.FLOAT32,
+        large_chunks_present: bool = False,
+        local_embedding_batch_size: int = BATCH_SIZE_ENCODE_CHUNKS,
+        api_embedding_batch_size: int = BATCH_SIZE_ENCODE_CHUNKS_FOR_API_EMBEDDING_SERVICES,
+        max_seq_length: int = DOC_EMBEDDING_CONTEXT_SIZE,
+        tenant_id: str | None = None,
+        request_id: str | None = None,
+    ) -> np.ndarray:
+        """Same as encode, but the embeddings are transported in a packed binary
+        format and returned as a (len(texts), dim) float32 array."""
+        if wire_format == EmbeddingWireFormat.JSON:
+            raise ValueError("encode_array requires a packed wire format")
+
+        return cast(
+            np.ndarray,
+            self._encode(
+                texts=texts,
+                text_type=text_type,
+                large_chunks_present=large_chunks_present,
+                local_embedding_batch_size=local_embedding_batch_size,
+                api_embedding_batch_size=api_embedding_batch_size,
+                max_seq_length=max_seq_length,
+                tenant_id=tenant_id,
+                request_id=request_id,
+                wire_format=wire_format,
+            ),
         )
 
     @classmethod
@@ -370,8 +620,8 @@ class RerankingModel:
         self.api_key = api_key
         self.api_url = api_url
 
-    def predict(self, query: str, passages: list[str]) -> list[float]:
-        rerank_request = RerankRequest(
+    def _build_rerank_request(self, query: str, passages: list[str]) -> RerankRequest:
+        return RerankRequest(
             query=query,
             documents=passages,
             model_name=self.model_name,
@@ -380,6 +630,9 @@ class RerankingModel:
             api_url=self.api_url,
         )
 
+    def predict(self, query: str, passages: list[str]) -> list[float]:
+        rerank_request = self._build_rerank_request(query, passages)
+
         response = requests.post(
             self.rerank_server_endpoint, json=rerank_request.model_dump()
         )
@@ -387,6 +640,16 @@ class RerankingModel:
 
         return RerankResponse(**response.json()).scores
 
+    async def apredict(self, query: str, passages: list[str]) -> list[float]:
+        rerank_request = self._build_rerank_request(query, passages)
+
+        response = await _get_model_server_async_client().post(
+            self.rerank_server_endpoint, json=rerank_request.model_dump()
+        )
+        response.raise_for_status()
+
+        return RerankResponse(**response.json()).scores
+
 
 class QueryAnalysisModel:
     def __init__(
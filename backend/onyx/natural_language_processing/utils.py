@@ -35,6 +35,11 @@ class BaseTokenizer(ABC):
     def decode(self, tokens: list[int]) -> str:
         pass
 
+    def token_offsets(self, string: str) -> list[tuple[int, int]] | None:
+        """Returns the (start, end) character span of every token in the string,
+        or None if the tokenizer can't map its tokens back onto the string."""
+        return None
+
 
 class TiktokenTokenizer(BaseTokenizer):
     _instances: dict[str, "TiktokenTokenizer"] = {}
@@ -68,6 +73,13 @@ class TiktokenTokenizer(BaseTokenizer):
     def decode(self, tokens: list[int]) -> str:
         return self.encoder.decode(tokens)
 
+    def token_offsets(self, string: str) -> list[tuple[int, int]] | None:
+        decoded, starts = self.encoder.decode_with_offsets(self.encode(string))
+        if decoded != string:
+            return None
+        ends = starts[1:] + [len(string)]
+        return list(zip(starts, ends))
+
 
 class HuggingFaceTokenizer(BaseTokenizer):
     def __init__(self, model_name: str):
@@ -96,6 +108,15 @@ class HuggingFaceTokenizer(BaseTokenizer):
     def decode(self, tokens: list[int]) -> str:
         return self.encoder.decode(tokens)
 
+    def token_offsets(self, string: str) -> list[tuple[int, int]] | None:
+        try:
+            encoding = self.encoder.encode(string, add_special_tokens=False)
+        except Exception:
+            # the ascii fallback in _safer_encode changes the string, so the
+            # offsets would not line up with the original text
+            return None
+        return encoding.offsets
+
 
 _TOKENIZER_CACHE: dict[tuple[EmbeddingProvider | None, str | None], BaseTokenizer] = {}
 
@@ -170,14 +191,22 @@ def get_tokenizer(
     return _check_tokenizer_cache(provider_type, model_name)
 
 
-def tokenizer_trim_content(
+def tokenizer_trim_content_with_count(
     content: str, desired_length: int, tokenizer: BaseTokenizer
-) -> str:
+) -> tuple[str, int]:
+    """Same as tokenizer_trim_content, also returns the token count of the trimmed
+    content so callers don't have to tokenize it again."""
     tokens = tokenizer.encode(content)
     if len(tokens) <= desired_length:
-        return content
+        return content, len(tokens)
+
+    return tokenizer.decode(tokens[:desired_length]), desired_length
+
 
-    return tokenizer.decode(tokens[:desired_length])
+def tokenizer_trim_content(
+    content: str, desired_length: int, tokenizer: BaseTokenizer
+) -> str:
+    return tokenizer_trim_content_with_count(content, desired_length, tokenizer)[0]
 
 
 def tokenizer_trim_middle(
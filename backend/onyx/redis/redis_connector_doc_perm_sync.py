@@ -10,6 +10,7 @@ from pydantic import BaseModel
 from redis.lock import Lock as RedisLock
 
 from onyx.access.models import DocExternalAccess
+from onyx.configs.app_configs import DOC_PERMISSION_SYNC_BATCH_SIZE
 from onyx.configs.constants import CELERY_GENERIC_BEAT_LOCK_TIMEOUT
 from onyx.configs.constants import CELERY_PERMISSIONS_SYNC_LOCK_TIMEOUT
 from onyx.configs.constants import OnyxCeleryPriority
@@ -168,12 +169,14 @@ class RedisConnectorPermissionSync:
         source_string: str,
         connector_id: int,
         credential_id: int,
-    ) -> int | None:
+    ) -> int:
+        """Sends one task per DOC_PERMISSION_SYNC_BATCH_SIZE documents. Returns the
+        number of tasks sent."""
         last_lock_time = time.monotonic()
         async_results = []
 
-        # Create a task for each document permission sync
-        for doc_perm in new_permissions:
+        # Create a task for each batch of document permissions
+        for i in range(0, len(new_permissions), DOC_PERMISSION_SYNC_BATCH_SIZE):
             current_time = time.monotonic()
             if lock and current_time - last_lock_time >= (
                 CELERY_GENERIC_BEAT_LOCK_TIMEOUT / 4
@@ -185,10 +188,15 @@ class RedisConnectorPermissionSync:
             self.redis.sadd(self.taskset_key, custom_task_id)
 
             result = celery_app.send_task(
-                OnyxCeleryTask.UPDATE_EXTERNAL_DOCUMENT_PERMISSIONS_TASK,
+                OnyxCeleryTask.UPDATE_EXTERNAL_DOCUMENT_PERMISSIONS_BATCH_TASK,
                 kwargs=dict(
                     tenant_id=self.tenant_id,
-                    serialized_doc_external_access=doc_perm.to_dict(),
+                    serialized_doc_external_accesses=[
+                        doc_perm.to_dict()
+                        for doc_perm in new_permissions[
+                            i : i + DOC_PERMISSION_SYNC_BATCH_SIZE
+                        ]
+                    ],
                     source_string=source_string,
                     connector_id=connector_id,
                     credential_id=credential_id,
@@ -1,3 +1,4 @@
+import asyncio
 import math
 from datetime import datetime
 
@@ -63,22 +64,27 @@ class GptSearchResponse(BaseModel):
 
 
 @router.post("/gpt-document-search")
-def gpt_search(
+async def gpt_search(
     search_request: GptSearchRequest,
     _: User | None = Depends(api_key_dep),
     db_session: Session = Depends(get_session),
 ) -> GptSearchResponse:
-    llm, fast_llm = get_default_llms()
-    top_sections = SearchPipeline(
-        search_request=SearchRequest(
-            query=search_request.query,
-        ),
-        user=None,
-        llm=llm,
-        fast_llm=fast_llm,
-        skip_query_analysis=True,
-        db_session=db_session,
-    ).reranked_sections
+    def _build_search_pipeline() -> SearchPipeline:
+        llm, fast_llm = get_default_llms()
+        return SearchPipeline(
+            search_request=SearchRequest(
+                query=search_request.query,
+            ),
+            user=None,
+            llm=llm,
+            fast_llm=fast_llm,
+            skip_query_analysis=True,
+            db_session=db_session,
+        )
+
+    # the LLM and search settings lookups are sync db calls
+    search_pipeline = await asyncio.to_thread(_build_search_pipeline)
+    top_sections = await search_pipeline.areranked_sections()
 
     return GptSearchResponse(
         matching_document_chunks=[
@@ -22,6 +22,7 @@ from onyx.chat.prune_and_merge import prune_and_merge_sections
 from onyx.chat.prune_and_merge import prune_sections
 from onyx.configs.chat_configs import CONTEXT_CHUNKS_ABOVE
 from onyx.configs.chat_configs import CONTEXT_CHUNKS_BELOW
+from onyx.configs.chat_configs import STREAMING_SEARCH_POSTPROCESSING
 from onyx.configs.model_configs import GEN_AI_MODEL_FALLBACK_MAX_TOKENS
 from onyx.context.search.enums import LLMEvaluationType
 from onyx.context.search.enums import QueryFlow
@@ -59,6 +60,10 @@ logger = setup_logger()
 
 SEARCH_RESPONSE_SUMMARY_ID = "search_response_summary"
 SECTION_RELEVANCE_LIST_ID = "section_relevance_list"
+SEARCH_RERANKED_SECTIONS_ID = "search_reranked_sections"
+# Response is a function that returns the section relevance list, called once the answer
+# has been generated (see STREAMING_SEARCH_POSTPROCESSING)
+DEFERRED_SECTION_RELEVANCE_LIST_ID = "deferred_section_relevance_list"
 SEARCH_EVALUATION_ID = "llm_doc_eval"
 QUERY_FIELD = "query"
 
@@ -423,6 +428,11 @@ class SearchTool(Tool[SearchToolOverrideKwargs]):
             search_query_info=search_query_info,
             get_section_relevance=lambda: search_pipeline.section_relevance,
             search_tool=self,
+            get_reranked_sections=(
+                (lambda: search_pipeline.reranked_sections)
+                if STREAMING_SEARCH_POSTPROCESSING
+                else None
+            ),
         )
 
     def final_result(self, *args: ToolResponse) -> JSON_ro:
@@ -567,6 +577,9 @@ def yield_search_responses(
     search_query_info: SearchQueryInfo,
     get_section_relevance: Callable[[], list[SectionRelevancePiece] | None],
     search_tool: SearchTool,
+    # If passed, the reranked sections are yielded as soon as they are available and the
+    # final context documents don't wait for the section relevance, which is deferred
+    get_reranked_sections: Callable[[], list[InferenceSection]] | None = None,
 ) -> Generator[ToolResponse, None, None]:
     # Get the search query to check if we're in ordering-only mode
     # We can infer this from the reranked_sections not containing any relevance scoring
@@ -584,6 +597,29 @@ def yield_search_responses(
         ),
     )
 
+    if get_reranked_sections is not None and not is_ordering_only:
+        yield ToolResponse(
+            id=SEARCH_RERANKED_SECTIONS_ID, response=get_reranked_sections()
+        )
+        pruned_sections = prune_sections(
+            sections=get_final_context_sections(),
+            section_relevance_list=None,
+            prompt_config=search_tool.prompt_config,
+            llm_config=search_tool.llm.config,
+            question=query,
+            contextual_pruning_config=search_tool.contextual_pruning_config,
+        )
+        yield ToolResponse(
+            id=FINAL_CONTEXT_DOCUMENTS_ID,
+            response=[
+                llm_doc_from_inference_section(section) for section in pruned_sections
+            ],
+        )
+        yield ToolResponse(
+            id=DEFERRED_SECTION_RELEVANCE_LIST_ID, response=get_section_relevance
+        )
+        return
+
     section_relevance: list[SectionRelevancePiece] | None = None
 
     # Skip section relevance in ordering-only mode
@@ -0,0 +1,135 @@
+import heapq
+import json
+import os
+import tempfile
+from collections.abc import Iterable
+from collections.abc import Iterator
+from types import TracebackType
+from typing import IO
+
+
+class ExternalSortedSet:
+    """Set of strings that keeps at most `max_in_memory` of them in memory. The rest are
+    spilled to sorted run files in a temporary directory.
+
+    Iterating yields the unique strings in code point order, which is also the order of
+    `COLLATE "C"` in Postgres. Memory is bounded by `max_in_memory` plus one read buffer
+    per run file, independent of the number of strings."""
+
+    # runs are merged into a single one past this, to bound the number of open files
+    MAX_RUNS = 64
+
+    def __init__(self, max_in_memory: int = 100_000, directory: str | None = None):
+        self.max_in_memory = max(max_in_memory, 1)
+        self._buffer: set[str] = set()
+        self._run_paths: list[str] = []
+        self._num_runs_written = 0
+        self._tmp_dir = tempfile.TemporaryDirectory(
+            prefix="onyx_external_sort_", dir=directory
+        )
+
+    def __enter__(self) -> "ExternalSortedSet":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._buffer.clear()
+        self._run_paths.clear()
+        self._tmp_dir.cleanup()
+
+    def add(self, value: str) -> None:
+        self._buffer.add(value)
+        if len(self._buffer) >= self.max_in_memory:
+            self._spill()
+
+    def update(self, values: Iterable[str]) -> None:
+        for value in values:
+            self.add(value)
+
+    @property
+    def num_runs(self) -> int:
+        return len(self._run_paths)
+
+    def _write_run(self, values: Iterable[str]) -> None:
+        path = os.path.join(self._tmp_dir.name, f"run_{self._num_runs_written}")
+        self._num_runs_written += 1
+        with open(path, "w", encoding="utf-8") as f:
+            # json encoded so that values may contain newlines
+            f.writelines(json.dumps(value) + "\n" for value in values)
+        self._run_paths.append(path)
+
+    def _spill(self) -> None:
+        if not self._buffer:
+            return
+
+        self._write_run(sorted(self._buffer))
+        self._buffer.clear()
+
+        if len(self._run_paths) >= self.MAX_RUNS:
+            run_paths = self._run_paths
+            self._run_paths = []
+            files = [open(path, encoding="utf-8") for path in run_paths]
+            try:
+                self._write_run(_unique(heapq.merge(*map(_read_run, files))))
+            finally:
+                for f in files:
+                    f.close()
+            for path in run_paths:
+                os.remove(path)
+
+    def __iter__(self) -> Iterator[str]:
+        files = [open(path, encoding="utf-8") for path in self._run_paths]
+        try:
+            yield from _unique(
+                heapq.merge(sorted(self._buffer), *map(_read_run, files))
+            )
+        finally:
+            for f in files:
+                f.close()
+
+
+def _read_run(f: IO[str]) -> Iterator[str]:
+    for line in f:
+        yield json.loads(line)
+
+
+def _unique(sorted_values: Iterable[str]) -> Iterator[str]:
+    previous: str | None = None
+    for value in sorted_values:
+        if value != previous:
+            yield value
+            previous = value
+
+
+def sorted_difference(
+    sorted_values: Iterable[str], sorted_to_exclude: Iterable[str]
+) -> Iterator[str]:
+    """Yields the values of `sorted_values` that are not in `sorted_to_exclude`, with a
+    single merge pass over both. Both must be sorted in code point order, a ValueError
+    is raised otherwise since the difference would be wrong."""
+    to_exclude = iter(sorted_to_exclude)
+    excluded: str | None = next(to_exclude, None)
+
+    previous: str | None = None
+    for value in sorted_values:
+        if previous is not None and value < previous:
+            raise ValueError(f"Values are not sorted: {previous!r} > {value!r}")
+        previous = value
+
+        while excluded is not None and excluded < value:
+            next_excluded = next(to_exclude, None)
+            if next_excluded is not None and next_excluded < excluded:
+                raise ValueError(
+                    f"Values to exclude are not sorted: {excluded!r} > {next_excluded!r}"
+                )
+            excluded = next_excluded
+
+        if excluded != value:
+            yield value
@@ -1,9 +1,12 @@
+import atexit
 import json
 import os
+import queue
 import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Any
+from typing import IO
 
 from onyx.utils.logger import setup_logger
 from onyx.utils.special_types import JSON_ro
@@ -11,87 +14,226 @@ from onyx.utils.special_types import JSON_ro
 logger = setup_logger()
 
 _LOG_FILE_NAME_TIMESTAMP_FORMAT = "%Y-%m-%d_%H-%M-%S-%f"
+_SEGMENT_SUFFIX = ".jsonl"
 
+# Every line of a segment is `<timestamp>\t<json record>`, the fixed width timestamp
+# allows skipping records outside of a time range without parsing them
+_RECORD_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+_RECORD_TIMESTAMP_LENGTH = 26
+
+# Records that are waiting to be written, once full new records are dropped
+_MAX_QUEUED_RECORDS = 10_000
+
+
+def _segment_start_time(segment: Path) -> datetime | None:
+    try:
+        return datetime.strptime(segment.stem, _LOG_FILE_NAME_TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
 
-class LongTermLogger:
-    """NOTE: should support a LOT of data AND should be extremely fast,
-    ideally done in a background thread."""
+
+def _list_segments(category_path: Path) -> list[Path]:
+    """Segments of the category, oldest first. The file name of a segment is the
+    time of its first record and its modification time is (at least) the time of
+    its last record, which makes the directory listing the time index."""
+    return sorted(
+        segment
+        for segment in category_path.glob(f"*{_SEGMENT_SUFFIX}")
+        if _segment_start_time(segment) is not None
+    )
+
+
+class _SegmentWriter:
+    """Single background thread that appends the records of all loggers of a log
+    directory to one open segment per category. A segment is closed once it's
+    larger than max_segment_bytes and only the latest max_segments_per_category
+    segments of a category written by this writer are kept. Other processes write
+    their own segments to the same directory, those are left to their writers."""
 
     def __init__(
         self,
-        metadata: dict[str, str] | None = None,
-        log_file_path: str = "/tmp/long_term_log",
-        max_files_per_category: int = 1000,
-    ):
-        self.metadata = metadata
-        self.log_file_path = Path(log_file_path)
-        self.max_files_per_category = max_files_per_category
+        log_file_path: Path,
+        max_segment_bytes: int,
+        max_segments_per_category: int,
+    ) -> None:
+        self.log_file_path = log_file_path
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments_per_category = max_segments_per_category
+
+        self.dropped_records = 0
+
+        # (category, time, metadata, message) or an event to set once the records
+        # queued before it are written
+        self._queue: queue.Queue[tuple[str, datetime, Any, Any] | threading.Event] = (
+            queue.Queue(maxsize=_MAX_QUEUED_RECORDS)
+        )
+        # category -> (open segment, characters written to it)
+        self._segments: dict[str, tuple[IO[str], int]] = {}
+        # category -> segments created by this writer, oldest first
+        self._owned_segments: dict[str, list[Path]] = {}
+        self._thread = threading.Thread(
+            target=self._run, name="long-term-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def put(self, category: str, metadata: Any, message: Any) -> None:
         try:
-            # Create directory if it doesn't exist
-            os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
-        except Exception:
-            # logger.error(f"Error creating directory for long-term logs: {e}")
-            pass
+            self._queue.put_nowait((category, datetime.now(), metadata, message))
+        except queue.Full:
+            self.dropped_records += 1
 
-    def _cleanup_old_files(self, category_path: Path) -> None:
+    def flush(self, timeout: float | None = None) -> None:
+        """Blocks until all records queued so far are written."""
+        done = threading.Event()
         try:
-            files = sorted(
-                [f for f in category_path.glob("*.json")],
-                key=lambda x: x.stat().st_mtime,  # Sort by modification time
-                reverse=True,
-            )
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
 
-            # Delete oldest files that exceed the limit
-            for file in files[self.max_files_per_category :]:
-                if not file.is_file():
-                    logger.debug(f"File already deleted: {file}")
+            flushed_events: list[threading.Event] = []
+            written_categories: set[str] = set()
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    flushed_events.append(item)
                     continue
+                category, record_time, metadata, message = item
                 try:
-                    file.unlink()
+                    self._write(category, record_time, metadata, message)
+                    written_categories.add(category)
                 except Exception:
                     pass
-                    # logger.error(f"Error deleting old log file {file
-                    # }: {e}")
-        except Exception:
-            pass
-            # logger.error(f"Error during log rotation cleanup: {e}")
 
-    def _record(self, message: Any, category: str) -> None:
+            for category in written_categories:
+                try:
+                    self._segments[category][0].flush()
+                except Exception:
+                    pass
+            for event in flushed_events:
+                event.set()
+
+    def _write(
+        self, category: str, record_time: datetime, metadata: Any, message: Any
+    ) -> None:
+        line = json.dumps(
+            {"metadata": metadata, "record": message},
+            # default allows us to "ignore" unserializable objects
+            default=lambda x: str(x),
+        )
+        segment, segment_size = self._segments.get(category, (None, 0))
+        if segment is None or segment_size >= self.max_segment_bytes:
+            segment, segment_size = self._rotate(category, record_time), 0
+
+        line = f"{record_time.strftime(_RECORD_TIMESTAMP_FORMAT)}\t{line}\n"
+        segment.write(line)
+        self._segments[category] = (segment, segment_size + len(line))
+
+    def _rotate(self, category: str, record_time: datetime) -> IO[str]:
+        previous_segment, _ = self._segments.pop(category, (None, 0))
+        if previous_segment is not None:
+            previous_segment.close()
+
         category_path = self.log_file_path / category
-        try:
-            # Create directory if it doesn't exist
-            os.makedirs(category_path, exist_ok=True)
+        os.makedirs(category_path, exist_ok=True)
+        segment_path = (
+            category_path
+            / f"{record_time.strftime(_LOG_FILE_NAME_TIMESTAMP_FORMAT)}{_SEGMENT_SUFFIX}"
+        )
+        segment = open(segment_path, "a")
+
+        # only segments of this writer are deleted, the oldest segment in the
+        # directory may be the one another process is still appending to
+        owned_segments = self._owned_segments.setdefault(category, [])
+        owned_segments.append(segment_path)
+        while len(owned_segments) > self.max_segments_per_category:
+            try:
+                owned_segments.pop(0).unlink()
+            except Exception:
+                pass
+        return segment
+
 
-            # Perform cleanup before writing new file
-            self._cleanup_old_files(category_path)
+_WRITERS: dict[Path, _SegmentWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+# the writer threads are not copied into forked processes
+_WRITERS_PID = os.getpid()
 
-            final_record = {
-                "metadata": self.metadata,
-                "record": message,
-            }
 
-            file_path = (
-                category_path
-                / f"{datetime.now().strftime(_LOG_FILE_NAME_TIMESTAMP_FORMAT)}.json"
+def _get_writer(
+    log_file_path: Path, max_segment_bytes: int, max_segments_per_category: int
+) -> _SegmentWriter:
+    global _WRITERS, _WRITERS_PID
+
+    with _WRITERS_LOCK:
+        if _WRITERS_PID != os.getpid():
+            _WRITERS_PID = os.getpid()
+            _WRITERS = {}
+        writer = _WRITERS.get(log_file_path)
+        if writer is None:
+            writer = _SegmentWriter(
+                log_file_path, max_segment_bytes, max_segments_per_category
             )
-            with open(file_path, "w+") as f:
-                # default allows us to "ignore" unserializable objects
-                json.dump(final_record, f, default=lambda x: str(x))
+            _WRITERS[log_file_path] = writer
+        return writer
+
+
+@atexit.register
+def _flush_writers() -> None:
+    with _WRITERS_LOCK:
+        writers = list(_WRITERS.values()) if _WRITERS_PID == os.getpid() else []
+    for writer in writers:
+        writer.flush(timeout=5)
+
+
+class LongTermLogger:
+    """NOTE: should support a LOT of data AND should be extremely fast. Records
+    are handed to a background writer that appends them to size capped segment
+    files per category, recording never blocks (records are dropped if the writer
+    falls too far behind)."""
+
+    def __init__(
+        self,
+        metadata: dict[str, str] | None = None,
+        log_file_path: str = "/tmp/long_term_log",
+        max_segment_bytes: int = 8 * 1024 * 1024,
+        max_segments_per_category: int = 10,
+    ):
+        self.metadata = metadata
+        self.log_file_path = Path(log_file_path)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments_per_category = max_segments_per_category
+        try:
+            # Create directory if it doesn't exist
+            os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
         except Exception:
-            # logger.error(f"Error recording log: {e}")
+            # logger.error(f"Error creating directory for long-term logs: {e}")
             pass
 
+    def _writer(self) -> _SegmentWriter:
+        return _get_writer(
+            self.log_file_path, self.max_segment_bytes, self.max_segments_per_category
+        )
+
     def record(self, message: JSON_ro, category: str = "default") -> None:
         try:
-            # Run in separate thread to have minimal overhead in main flows
-            thread = threading.Thread(
-                target=self._record, args=(message, category), daemon=True
-            )
-            thread.start()
+            self._writer().put(category, self.metadata, message)
         except Exception:
             # Should never interfere with normal functions of Onyx
             pass
 
+    def flush(self, timeout: float | None = None) -> None:
+        """Blocks until everything recorded so far is written, mostly for tests."""
+        self._writer().flush(timeout)
+
     def fetch_category(
         self,
         category: str,
@@ -100,25 +242,52 @@ class LongTermLogger:
         limit: int = 100,
     ) -> list[JSON_ro]:
         category_path = self.log_file_path / category
-        files = list(category_path.glob("*.json"))
+        # records are written with the naive local time
+        if start_time and start_time.tzinfo:
+            start_time = start_time.astimezone().replace(tzinfo=None)
+        if end_time and end_time.tzinfo:
+            end_time = end_time.astimezone().replace(tzinfo=None)
 
-        results: list[JSON_ro] = []
-        for file in files:
-            # Parse timestamp from filename (YYYY-MM-DD_HH-MM-SS.json)
-            try:
-                file_time = datetime.strptime(
-                    file.stem, _LOG_FILE_NAME_TIMESTAMP_FORMAT
-                )
+        start_str = (
+            start_time.strftime(_RECORD_TIMESTAMP_FORMAT) if start_time else None
+        )
+        end_str = end_time.strftime(_RECORD_TIMESTAMP_FORMAT) if end_time else None
 
-                # Skip if outside time range
-                if start_time and file_time < start_time:
-                    continue
-                if end_time and file_time > end_time:
+        # (record time, record), records of segments written by different processes
+        # interleave
+        timed_results: list[tuple[str, JSON_ro]] = []
+        for segment in _list_segments(category_path):
+            segment_start = _segment_start_time(segment)
+            if end_time and segment_start and segment_start > end_time:
+                break
+
+            try:
+                if start_time and (
+                    datetime.fromtimestamp(segment.stat().st_mtime) < start_time
+                ):
                     continue
 
-                results.append(json.loads(file.read_text()))
-            except ValueError:
-                # Skip files that don't match expected format
+                with open(segment) as f:
+                    for line in f:
+                        record_time = line[:_RECORD_TIMESTAMP_LENGTH]
+                        # fixed width timestamps compare like the times they represent
+                        if start_str and record_time < start_str:
+                            continue
+                        if end_str and record_time > end_str:
+                            break
+                        try:
+                            timed_results.append(
+                                (
+                                    record_time,
+                                    json.loads(line[_RECORD_TIMESTAMP_LENGTH + 1 :]),
+                                )
+                            )
+                        except ValueError:
+                            # the line that is currently being written
+                            continue
+            except FileNotFoundError:
+                # deleted by the writer in the meantime
                 continue
 
-        return results
+        timed_results.sort(key=lambda timed_result: timed_result[0])
+        return [result for _, result in timed_results]
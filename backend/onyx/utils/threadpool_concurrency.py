@@ -1,6 +1,7 @@
 import collections.abc
 import contextvars
 import copy
+import queue
 import threading
 import uuid
 from collections.abc import Callable
@@ -384,3 +385,63 @@ def parallel_yield(gens: list[Iterator[R]], max_workers: int = 10) -> Iterator[R
                     )
                     next_ind += 1
                 del future_to_index[future]
+
+
+_PREFETCH_PUT_TIMEOUT = 0.1
+
+
+def prefetch_generator(gen: Iterator[R], max_prefetch: int) -> Iterator[R]:
+    """
+    Runs the generator in a background thread, buffering up to max_prefetch items
+    ahead of the consumer. This lets a producer (e.g. a connector pulling from an API)
+    keep working while the consumer processes the previous items, with backpressure
+    once the buffer is full. Items are yielded in the order they were produced.
+
+    Exceptions raised by the generator are re-raised in the consumer. If the consumer
+    stops early, the background thread stops after the item it is currently producing.
+    A max_prefetch <= 0 just iterates the generator in the calling thread.
+    """
+    if max_prefetch <= 0:
+        yield from gen
+        return
+
+    buffer: queue.Queue[tuple[bool, Any]] = queue.Queue(maxsize=max_prefetch)
+    stop_event = threading.Event()
+
+    def _put(done: bool, item: Any) -> bool:
+        while not stop_event.is_set():
+            try:
+                buffer.put((done, item), timeout=_PREFETCH_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            for item in gen:
+                if not _put(False, item):
+                    break
+            else:
+                _put(True, None)
+        except BaseException as e:
+            _put(True, e)
+        finally:
+            close = getattr(gen, "close", None)
+            if close:
+                close()
+
+    context = contextvars.copy_context()
+    producer = threading.Thread(target=context.run, args=(_produce,), daemon=True)
+    producer.start()
+
+    try:
+        while True:
+            done, item = buffer.get()
+            if done:
+                if item is not None:
+                    raise item
+                return
+            yield cast(R, item)
+    finally:
+        stop_event.set()
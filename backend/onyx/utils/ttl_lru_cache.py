@@ -0,0 +1,93 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from collections.abc import Hashable
+from collections.abc import Iterable
+from typing import Generic
+from typing import TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLLRUCache(Generic[K, V]):
+    """Thread safe in memory cache that keeps at most `max_size` entries, evicting
+    the least recently used one first. With `ttl_seconds` set, entries also expire
+    that long after they were put. Lookups count the hits and misses."""
+
+    def __init__(self, max_size: int, ttl_seconds: float | None = None) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = threading.Lock()
+        # key -> (expires at, value)
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key, count=False) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, key: K, count: bool = True) -> V | None:
+        """Returns the value, None if it is missing or expired."""
+        return self.get_many([key], count=count).get(key)
+
+    def get_many(self, keys: Iterable[K], count: bool = True) -> dict[K, V]:
+        """Returns the values of the keys that are cached and not expired, duplicate
+        keys are only counted once."""
+        found: dict[K, V] = {}
+        num_misses = 0
+        now = time.monotonic()
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                entry = self._entries.get(key)
+                if entry is None:
+                    num_misses += 1
+                    continue
+                expires_at, value = entry
+                if expires_at < now:
+                    del self._entries[key]
+                    num_misses += 1
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = value
+
+            if count:
+                self.hits += len(found)
+                self.misses += num_misses
+        return found
+
+    def put(self, key: K, value: V) -> None:
+        self.put_many({key: value})
+
+    def put_many(self, values: dict[K, V]) -> None:
+        expires_at = (
+            time.monotonic() + self.ttl_seconds
+            if self.ttl_seconds is not None
+            else float("inf")
+        )
+        with self._lock:
+            for key, value in values.items():
+                self._entries[key] = (expires_at, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[K], bool]) -> None:
+        """Drops every entry whose key matches the predicate."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
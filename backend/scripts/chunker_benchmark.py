@@ -0,0 +1,220 @@
+"""
+Compares the throughput of the token-once chunking engine with the previous
+llama_index SentenceSplitter based splitting and verifies that both produce the
+same chunks, blurbs and mini-chunks.
+
+Usage (from the backend directory):
+    python -m scripts.chunker_benchmark --corpus-dir /path/to/text/files
+    python -m scripts.chunker_benchmark --num-docs 2000
+
+Without --corpus-dir a synthetic corpus is generated.
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+
+from onyx.configs.app_configs import BLURB_SIZE
+from onyx.configs.app_configs import MINI_CHUNK_SIZE
+from onyx.configs.constants import DocumentSource
+from onyx.configs.model_configs import DOC_EMBEDDING_CONTEXT_SIZE
+from onyx.connectors.models import Document
+from onyx.connectors.models import TextSection
+from onyx.indexing.chunker import Chunker
+from onyx.indexing.indexing_pipeline import process_image_sections
+from onyx.indexing.token_splitter import has_additive_joins
+from onyx.indexing.token_splitter import supports_token_reuse
+from onyx.indexing.token_splitter import TokenizedText
+from onyx.indexing.token_splitter import TokenSplitter
+from onyx.natural_language_processing.utils import BaseTokenizer
+from onyx.natural_language_processing.utils import get_tokenizer
+
+_WORDS = (
+    "the quick brown fox jumps over lazy dog onyx search index chunk token "
+    "embedding vector document section connector retrieval answer question "
+    "context model latency throughput benchmark offset blurb paragraph"
+).split()
+
+_TEXT_SUFFIXES = {".txt", ".md", ".rst", ".html", ".py", ".json"}
+
+
+def _synthetic_text(rng: random.Random, num_paragraphs: int) -> str:
+    paragraphs = []
+    for _ in range(num_paragraphs):
+        sentences = []
+        for _ in range(rng.randint(2, 12)):
+            words = rng.choices(_WORDS, k=rng.randint(4, 30))
+            sentences.append(" ".join(words).capitalize() + rng.choice(".?!;,"))
+        paragraphs.append(" ".join(sentences))
+    return "\n\n".join(paragraphs)
+
+
+def _load_texts(corpus_dir: str | None, num_docs: int, seed: int) -> list[str]:
+    if corpus_dir:
+        texts = []
+        for path in sorted(Path(corpus_dir).rglob("*")):
+            if path.is_file() and path.suffix in _TEXT_SUFFIXES:
+                texts.append(path.read_text(errors="ignore"))
+            if len(texts) >= num_docs:
+                break
+        return texts
+
+    rng = random.Random(seed)
+    return [_synthetic_text(rng, rng.randint(1, 40)) for _ in range(num_docs)]
+
+
+def _legacy_split(
+    sections: list[str],
+    tokenizer: BaseTokenizer,
+    chunk_size: int,
+    blurb_size: int,
+    mini_chunk_size: int,
+) -> list[tuple[str, str, list[str]]]:
+    # importing llama_index uses a lot of RAM, so we only import it when needed.
+    from llama_index.core.node_parser import SentenceSplitter
+
+    chunk_splitter = SentenceSplitter(
+        tokenizer=tokenizer.tokenize, chunk_size=chunk_size, chunk_overlap=0
+    )
+    blurb_splitter = SentenceSplitter(
+        tokenizer=tokenizer.tokenize, chunk_size=blurb_size, chunk_overlap=0
+    )
+    mini_chunk_splitter = SentenceSplitter(
+        tokenizer=tokenizer.tokenize, chunk_size=mini_chunk_size, chunk_overlap=0
+    )
+
+    results = []
+    for section in sections:
+        for chunk in chunk_splitter.split_text(section):
+            blurbs = blurb_splitter.split_text(chunk)
+            results.append(
+                (
+                    chunk,
+                    blurbs[0] if blurbs else "",
+                    mini_chunk_splitter.split_text(chunk),
+                )
+            )
+    return results
+
+
+def _token_once_split(
+    sections: list[str],
+    tokenizer: BaseTokenizer,
+    chunk_size: int,
+    blurb_size: int,
+    mini_chunk_size: int,
+) -> list[tuple[str, str, list[str]]]:
+    chunk_splitter = TokenSplitter(chunk_size=chunk_size)
+    blurb_splitter = TokenSplitter(chunk_size=blurb_size)
+    mini_chunk_splitter = TokenSplitter(chunk_size=mini_chunk_size)
+
+    results = []
+    for section in sections:
+        for chunk in chunk_splitter.split(TokenizedText(section, tokenizer).span()):
+            blurbs = blurb_splitter.split(chunk)
+            results.append(
+                (
+                    chunk.text,
+                    blurbs[0].text if blurbs else "",
+                    [
+                        mini_chunk.text
+                        for mini_chunk in mini_chunk_splitter.split(chunk)
+                    ],
+                )
+            )
+    return results
+
+
+def run_benchmark(
+    texts: list[str],
+    model_name: str | None,
+    provider_type: str | None,
+    chunk_size: int,
+    blurb_size: int,
+    mini_chunk_size: int,
+) -> None:
+    tokenizer = get_tokenizer(model_name=model_name, provider_type=provider_type)
+    total_chars = sum(len(text) for text in texts)
+    print(
+        f"Tokenizer: {type(tokenizer).__name__} "
+        f"offset reuse={supports_token_reuse(tokenizer)} "
+        f"additive joins={has_additive_joins(tokenizer)}"
+    )
+    print(f"Corpus: {len(texts)} texts, {total_chars / 1_000_000:.2f}M characters")
+
+    start = time.monotonic()
+    legacy = _legacy_split(texts, tokenizer, chunk_size, blurb_size, mini_chunk_size)
+    legacy_time = time.monotonic() - start
+
+    start = time.monotonic()
+    token_once = _token_once_split(
+        texts, tokenizer, chunk_size, blurb_size, mini_chunk_size
+    )
+    token_once_time = time.monotonic() - start
+
+    mismatches = sum(1 for old, new in zip(legacy, token_once) if old != new)
+    mismatches += abs(len(legacy) - len(token_once))
+
+    print(
+        f"SentenceSplitter: {legacy_time:.2f}s "
+        f"({total_chars / legacy_time / 1000:.1f}K chars/s)"
+    )
+    print(
+        f"Token-once:       {token_once_time:.2f}s "
+        f"({total_chars / token_once_time / 1000:.1f}K chars/s)"
+    )
+    print(f"Speedup: {legacy_time / token_once_time:.2f}x")
+    print(f"Chunks: {len(token_once)}, mismatches: {mismatches}")
+
+    # End to end chunker throughput (includes section packing and metadata)
+    documents = [
+        Document(
+            id=f"benchmark_doc_{i}",
+            source=DocumentSource.FILE,
+            semantic_identifier=f"Benchmark Document {i}",
+            metadata={"tags": ["benchmark"]},
+            doc_updated_at=None,
+            sections=[
+                TextSection(text=section, link=f"link_{i}_{j}")
+                for j, section in enumerate(text.split("\n\n\n"))
+            ],
+        )
+        for i, text in enumerate(texts)
+    ]
+    chunker = Chunker(
+        tokenizer=tokenizer,
+        enable_multipass=True,
+        blurb_size=blurb_size,
+        chunk_token_limit=chunk_size,
+        mini_chunk_size=mini_chunk_size,
+    )
+    start = time.monotonic()
+    chunks = chunker.chunk(process_image_sections(documents))
+    chunker_time = time.monotonic() - start
+    print(
+        f"Chunker.chunk:    {chunker_time:.2f}s for {len(chunks)} chunks "
+        f"({len(documents) / chunker_time:.1f} docs/s)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chunking throughput benchmark")
+    parser.add_argument("--corpus-dir", type=str, default=None)
+    parser.add_argument("--num-docs", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model-name", type=str, default=None)
+    parser.add_argument("--provider-type", type=str, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DOC_EMBEDDING_CONTEXT_SIZE)
+    parser.add_argument("--blurb-size", type=int, default=BLURB_SIZE)
+    parser.add_argument("--mini-chunk-size", type=int, default=MINI_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    run_benchmark(
+        texts=_load_texts(args.corpus_dir, args.num_docs, args.seed),
+        model_name=args.model_name,
+        provider_type=args.provider_type,
+        chunk_size=args.chunk_size,
+        blurb_size=args.blurb_size,
+        mini_chunk_size=args.mini_chunk_size,
+    )
@@ -0,0 +1,155 @@
+"""
+Compares the throughput of the LongTermLogger segment writer with the previous
+implementation that started a thread per record, listed and stat-ed the whole
+category directory on every write and wrote one JSON file per record.
+
+Usage (from the backend directory):
+    python -m scripts.long_term_log_benchmark
+    python -m scripts.long_term_log_benchmark --num-records 5000 --record-size 4000
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+
+from onyx.utils.long_term_log import LongTermLogger
+from onyx.utils.special_types import JSON_ro
+
+_LOG_FILE_NAME_TIMESTAMP_FORMAT = "%Y-%m-%d_%H-%M-%S-%f"
+
+
+class _LegacyLongTermLogger:
+    """The previous implementation, record returns its thread so that the
+    benchmark can wait for the records to be written."""
+
+    def __init__(self, log_file_path: str, max_files_per_category: int = 1000):
+        self.log_file_path = Path(log_file_path)
+        self.max_files_per_category = max_files_per_category
+
+    def _cleanup_old_files(self, category_path: Path) -> None:
+        files = sorted(
+            category_path.glob("*.json"),
+            key=lambda x: x.stat().st_mtime,
+            reverse=True,
+        )
+        for file in files[self.max_files_per_category :]:
+            try:
+                file.unlink()
+            except Exception:
+                pass
+
+    def _record(self, message: Any, category: str) -> None:
+        category_path = self.log_file_path / category
+        try:
+            os.makedirs(category_path, exist_ok=True)
+            self._cleanup_old_files(category_path)
+            file_path = (
+                category_path
+                / f"{datetime.now().strftime(_LOG_FILE_NAME_TIMESTAMP_FORMAT)}.json"
+            )
+            with open(file_path, "w+") as f:
+                json.dump({"metadata": None, "record": message}, f, default=str)
+        except Exception:
+            pass
+
+    def record(self, message: Any, category: str) -> threading.Thread:
+        thread = threading.Thread(
+            target=self._record, args=(message, category), daemon=True
+        )
+        thread.start()
+        return thread
+
+    def fetch_category(
+        self, category: str, start_time: datetime | None = None
+    ) -> list[Any]:
+        results = []
+        for file in (self.log_file_path / category).glob("*.json"):
+            try:
+                file_time = datetime.strptime(
+                    file.stem, _LOG_FILE_NAME_TIMESTAMP_FORMAT
+                )
+                if start_time and file_time < start_time:
+                    continue
+                results.append(json.loads(file.read_text()))
+            except ValueError:
+                continue
+        return results
+
+
+def run_benchmark(num_records: int, record_size: int, max_segment_bytes: int) -> None:
+    message: JSON_ro = {"prompt": "x" * record_size, "model": "benchmark"}
+    legacy_dir = tempfile.mkdtemp()
+    segment_dir = tempfile.mkdtemp()
+    try:
+        legacy_logger = _LegacyLongTermLogger(legacy_dir)
+        start = time.monotonic()
+        threads = [
+            legacy_logger.record(message, "benchmark") for _ in range(num_records)
+        ]
+        legacy_record_time = time.monotonic() - start
+        for thread in threads:
+            thread.join()
+        legacy_total_time = time.monotonic() - start
+
+        segment_logger = LongTermLogger(
+            log_file_path=segment_dir, max_segment_bytes=max_segment_bytes
+        )
+        start = time.monotonic()
+        for _ in range(num_records):
+            segment_logger.record(message, "benchmark")
+        segment_record_time = time.monotonic() - start
+        segment_logger.flush()
+        segment_total_time = time.monotonic() - start
+
+        # fetch the latest 10% of the records
+        recent = datetime.now() - timedelta(seconds=legacy_total_time / 10)
+        start = time.monotonic()
+        legacy_fetched = len(legacy_logger.fetch_category("benchmark", recent))
+        legacy_fetch_time = time.monotonic() - start
+        start = time.monotonic()
+        segment_fetched = len(segment_logger.fetch_category("benchmark"))
+        segment_fetch_time = time.monotonic() - start
+
+        print(f"{num_records} records of ~{record_size} characters")
+        print(
+            f"Thread per record: {legacy_record_time * 1000:.1f}ms in record(), "
+            f"{legacy_total_time:.2f}s until written "
+            f"({num_records / legacy_total_time:.0f} records/s)"
+        )
+        print(
+            f"Segment writer:    {segment_record_time * 1000:.1f}ms in record(), "
+            f"{segment_total_time:.2f}s until written "
+            f"({num_records / segment_total_time:.0f} records/s)"
+        )
+        print(f"Speedup: {legacy_total_time / segment_total_time:.2f}x")
+        print(
+            f"fetch_category: {legacy_fetch_time * 1000:.1f}ms for {legacy_fetched} "
+            f"records (thread per record, recent only) vs "
+            f"{segment_fetch_time * 1000:.1f}ms for {segment_fetched} records "
+            f"(segment writer, all kept records)"
+        )
+    finally:
+        shutil.rmtree(legacy_dir, ignore_errors=True)
+        shutil.rmtree(segment_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LongTermLogger throughput benchmark")
+    parser.add_argument("--num-records", type=int, default=3000)
+    parser.add_argument("--record-size", type=int, default=2000)
+    parser.add_argument("--max-segment-bytes", type=int, default=8 * 1024 * 1024)
+    args = parser.parse_args()
+
+    run_benchmark(
+        num_records=args.num_records,
+        record_size=args.record_size,
+        max_segment_bytes=args.max_segment_bytes,
+    )
@@ -0,0 +1,216 @@
+"""
+Compares the latency of context pruning (prune_and_merge._apply_pruning) with the
+previous behavior of deep copying every section and tokenizing every full section
+string on each call, and checks that both keep the same sections.
+
+Agent flows prune overlapping sets of sections repeatedly, so every round prunes
+a window of sections that is shifted by a few sections from the previous round.
+
+Usage (from the backend directory):
+    python -m scripts.prune_benchmark
+    python -m scripts.prune_benchmark --num-sections 200 --rounds 20
+"""
+
+import argparse
+import json
+import random
+import time
+from copy import deepcopy
+
+from onyx.chat import prune_and_merge
+from onyx.chat.prune_and_merge import _apply_pruning
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.models import InferenceChunk
+from onyx.context.search.models import InferenceSection
+from onyx.llm.interfaces import LLMConfig
+from onyx.natural_language_processing.utils import BaseTokenizer
+from onyx.natural_language_processing.utils import get_tokenizer
+from onyx.natural_language_processing.utils import tokenizer_trim_content
+from onyx.prompts.prompt_utils import build_doc_context_str
+from onyx.tools.tool_implementations.search.search_utils import section_to_dict
+
+_WORDS = (
+    "the quick brown fox jumps over lazy dog onyx search index chunk token "
+    "embedding vector document section connector retrieval answer question "
+    "context model latency throughput benchmark offset blurb paragraph"
+).split()
+
+
+def _synthetic_sections(
+    num_sections: int, words_per_section: int, seed: int
+) -> list[InferenceSection]:
+    rng = random.Random(seed)
+    sections = []
+    for ind in range(num_sections):
+        content = " ".join(rng.choices(_WORDS, k=words_per_section))
+        chunk = InferenceChunk(
+            document_id=f"benchmark_doc_{ind}",
+            chunk_id=0,
+            blurb=content[:100],
+            content=content,
+            source_links={0: f"https://example.com/{ind}"},
+            image_file_name=None,
+            section_continuation=False,
+            source_type=DocumentSource.WEB,
+            semantic_identifier=f"Benchmark Document {ind}",
+            title=f"Benchmark Document {ind}",
+            boost=0,
+            recency_bias=1.0,
+            score=1.0 - ind / num_sections,
+            hidden=False,
+            metadata={"tags": ["benchmark"]},
+            match_highlights=[],
+            doc_summary="",
+            chunk_context="",
+            updated_at=None,
+        )
+        sections.append(
+            InferenceSection(
+                center_chunk=chunk, chunks=[chunk], combined_content=content
+            )
+        )
+    return sections
+
+
+def _legacy_prune(
+    sections: list[InferenceSection],
+    token_limit: int,
+    using_tool_message: bool,
+    tokenizer: BaseTokenizer,
+) -> list[InferenceSection]:
+    """The previous pruning loop for use_sections=True."""
+    sections = deepcopy(sections)
+    total_tokens = 0
+    for ind, section in enumerate(sections):
+        section_str = (
+            json.dumps(section_to_dict(section, ind))
+            if using_tool_message
+            else build_doc_context_str(
+                semantic_identifier=section.center_chunk.semantic_identifier,
+                source_type=section.center_chunk.source_type,
+                content=section.combined_content,
+                metadata_dict=section.center_chunk.metadata,
+                updated_at=section.center_chunk.updated_at,
+                ind=ind,
+            )
+        )
+        total_tokens += len(tokenizer.encode(section_str))
+        if total_tokens > token_limit:
+            sections = sections[: ind + 1]
+            final_length = len(tokenizer.encode(section.combined_content)) - (
+                total_tokens - token_limit
+            )
+            if final_length <= 0:
+                sections.pop()
+            else:
+                section.combined_content = tokenizer_trim_content(
+                    section.combined_content, final_length, tokenizer
+                )
+            break
+    return sections
+
+
+def run_benchmark(
+    num_sections: int,
+    words_per_section: int,
+    window: int,
+    rounds: int,
+    token_limit: int,
+    using_tool_message: bool,
+    model_name: str,
+    provider_type: str,
+    seed: int,
+) -> None:
+    sections = _synthetic_sections(num_sections, words_per_section, seed)
+    llm_config = LLMConfig(
+        model_provider=provider_type,
+        model_name=model_name,
+        temperature=0,
+        max_input_tokens=128_000,
+    )
+    step = max(1, (num_sections - window) // max(1, rounds - 1))
+    windows = [
+        sections[start : start + window]
+        for start in range(0, num_sections - window + 1, step)
+    ][:rounds]
+
+    def prune(window_sections: list[InferenceSection]) -> list[InferenceSection]:
+        return _apply_pruning(
+            sections=window_sections,
+            section_relevance_list=None,
+            token_limit=token_limit,
+            is_manually_selected_docs=False,
+            use_sections=True,
+            using_tool_message=using_tool_message,
+            llm_config=llm_config,
+        )
+
+    # warm up the tokenizer outside of the measurements
+    prune(windows[0][:1])
+
+    tokenizer = get_tokenizer(model_name=model_name, provider_type=provider_type)
+    start = time.monotonic()
+    legacy = [
+        _legacy_prune(window_sections, token_limit, using_tool_message, tokenizer)
+        for window_sections in windows
+    ]
+    legacy_time = time.monotonic() - start
+
+    prune_and_merge._TOKEN_COUNT_CACHE.clear()
+    start = time.monotonic()
+    memoized = [prune(window_sections) for window_sections in windows]
+    memoized_time = time.monotonic() - start
+
+    # the content is tokenized separately from the text around it, so the final
+    # section may be trimmed a few tokens differently, but the same sections are kept
+    mismatches = sum(
+        1
+        for old, new in zip(legacy, memoized)
+        if [section.center_chunk.document_id for section in old]
+        != [section.center_chunk.document_id for section in new]
+    )
+    kept_sections = sum(len(pruned) for pruned in memoized) / len(memoized)
+
+    print(
+        f"{len(windows)} rounds over windows of {window} sections "
+        f"({num_sections} sections, {words_per_section} words each), "
+        f"{kept_sections:.1f} sections kept per round"
+    )
+    print(
+        f"Deep copy + full tokenization: {legacy_time * 1000:.1f}ms "
+        f"({legacy_time / len(windows) * 1000:.2f}ms per round)"
+    )
+    print(
+        f"Copy free + memoized:          {memoized_time * 1000:.1f}ms "
+        f"({memoized_time / len(windows) * 1000:.2f}ms per round)"
+    )
+    print(
+        f"Speedup: {legacy_time / memoized_time:.2f}x, "
+        f"rounds keeping different sections: {mismatches}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Context pruning latency benchmark")
+    parser.add_argument("--num-sections", type=int, default=150)
+    parser.add_argument("--words-per-section", type=int, default=400)
+    parser.add_argument("--window", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--token-limit", type=int, default=32_000)
+    parser.add_argument("--using-tool-message", action="store_true")
+    parser.add_argument("--model-name", type=str, default="gpt-4o")
+    parser.add_argument("--provider-type", type=str, default="openai")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run_benchmark(
+        num_sections=args.num_sections,
+        words_per_section=args.words_per_section,
+        window=args.window,
+        rounds=args.rounds,
+        token_limit=args.token_limit,
+        using_tool_message=args.using_tool_message,
+        model_name=args.model_name,
+        provider_type=args.provider_type,
+        seed=args.seed,
+    )
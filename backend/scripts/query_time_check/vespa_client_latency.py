@@ -0,0 +1,142 @@
+"""
+Compares the latency of search path Vespa queries sent through the pooled query
+client (get_vespa_query_client) with opening a new client per query, which is
+what query_vespa used to do.
+
+By default the queries go to a local Vespa stand-in (a tiny HTTP server answering
+every search with an empty result after --server-delay-ms), so the difference is
+the connection setup cost. Point --url at a real Vespa search endpoint to measure
+against it instead.
+
+Usage (from the backend directory):
+    python -m scripts.query_time_check.vespa_client_latency
+    python -m scripts.query_time_check.vespa_client_latency --num-queries 2000 --concurrency 16
+    python -m scripts.query_time_check.vespa_client_latency --url http://localhost:8081/search/
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+from onyx.document_index.vespa.shared_utils.utils import get_vespa_http_client
+from onyx.document_index.vespa.shared_utils.utils import get_vespa_query_client
+from onyx.document_index.vespa.shared_utils.utils import VESPA_QUERY_POOL_NAME
+from onyx.httpx.httpx_pool import HttpxPool
+
+_EMPTY_RESULT = json.dumps({"root": {"fields": {"totalCount": 0}}}).encode()
+
+
+def _start_vespa_stand_in(delay: float) -> tuple[ThreadingHTTPServer, str]:
+    class _Handler(BaseHTTPRequestHandler):
+        # keep-alive, like Vespa
+        protocol_version = "HTTP/1.1"
+        # headers and body are written separately, without this delayed ACKs add
+        # ~40ms to every response on a reused connection
+        disable_nagle_algorithm = True
+
+        def do_POST(self) -> None:
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if delay:
+                time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(_EMPTY_RESULT)))
+            self.end_headers()
+            self.wfile.write(_EMPTY_RESULT)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/search/"
+
+
+def _percentile(sorted_values: list[float], percentile: float) -> float:
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percentile / 100))
+    return sorted_values[index]
+
+
+def _run(
+    name: str,
+    query: Callable[[], None],
+    num_queries: int,
+    concurrency: int,
+) -> None:
+    def timed_query(_: int) -> float:
+        start = time.perf_counter()
+        query()
+        return time.perf_counter() - start
+
+    # warm up, e.g. to establish the pooled connections
+    for _ in range(min(concurrency, num_queries)):
+        query()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(timed_query, range(num_queries)))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:<10} "
+        f"p50={_percentile(latencies, 50) * 1000:7.2f}ms "
+        f"p99={_percentile(latencies, 99) * 1000:7.2f}ms "
+        f"max={latencies[-1] * 1000:7.2f}ms "
+        f"qps={num_queries / elapsed:8.1f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Vespa search endpoint, defaults to a stand-in")
+    parser.add_argument("--num-queries", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--server-delay-ms",
+        type=float,
+        default=2.0,
+        help="Processing time of the stand-in per query",
+    )
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        server, url = _start_vespa_stand_in(args.server_delay_ms / 1000)
+
+    params = {"yql": "select * from sources * where true", "hits": 10}
+
+    def per_call_query() -> None:
+        with get_vespa_http_client() as http_client:
+            http_client.post(url, json=params).raise_for_status()
+
+    def pooled_query() -> None:
+        get_vespa_query_client().post(url, json=params).raise_for_status()
+
+    print(f"url={url} num_queries={args.num_queries} concurrency={args.concurrency}")
+    try:
+        _run("per_call", per_call_query, args.num_queries, args.concurrency)
+        _run("pooled", pooled_query, args.num_queries, args.concurrency)
+    finally:
+        stats = HttpxPool.get_stats(VESPA_QUERY_POOL_NAME)
+        if stats:
+            print(
+                f"pool={VESPA_QUERY_POOL_NAME} "
+                f"requests={stats.requests} "
+                f"new_connections={stats.new_connections} "
+                f"reuse_ratio={stats.reuse_ratio:.3f} "
+                f"max_in_flight={stats.max_in_flight}"
+            )
+        HttpxPool.close_all()
+        if server:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Measures the pages per minute of the web connector on a generated site served locally
+with artificial latency. It runs a recursive crawl with a single crawler, then with a
+pool of crawlers, then a recrawl of the unchanged site with the recrawl cache.
+
+Pages are fetched with the HTTP fast path unless --browser is given, which renders every
+page in Playwright like the connector does by default (the browsers must be installed).
+
+Usage (from the backend directory):
+    python -m scripts.web_crawler_benchmark
+    python -m scripts.web_crawler_benchmark --num-pages 500 --latency 0.2 --concurrency 16
+"""
+
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+
+from onyx.connectors.web.connector import WEB_CONNECTOR_VALID_SETTINGS
+from onyx.connectors.web.connector import WebConnector
+from onyx.connectors.web.recrawl_cache import WebRecrawlCache
+
+_WORDS = (
+    "the quick brown fox jumps over lazy dog onyx search index chunk token "
+    "embedding vector document section connector retrieval answer question "
+    "context model latency throughput benchmark offset blurb paragraph"
+).split()
+
+
+def _generate_site(num_pages: int, links_per_page: int, seed: int) -> dict[str, bytes]:
+    rng = random.Random(seed)
+    pages = {}
+    for ind in range(num_pages):
+        paragraphs = "".join(
+            f"<p>{' '.join(rng.choices(_WORDS, k=80))}</p>" for _ in range(5)
+        )
+        # always link the next page so that every page is reachable
+        linked = {(ind + 1) % num_pages} | {
+            rng.randrange(num_pages) for _ in range(links_per_page - 1)
+        }
+        anchors = "".join(f'<a href="/page{link}">page {link}</a>' for link in linked)
+        pages[f"/page{ind}"] = (
+            f"<html><head><title>Page {ind}</title></head>"
+            f"<body>{paragraphs}{anchors}</body></html>"
+        ).encode()
+    pages["/"] = pages["/page0"]
+    return pages
+
+
+class _SiteServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, pages: dict[str, bytes], latency: float) -> None:
+        super().__init__(("127.0.0.1", 0), _SiteHandler)
+        self.pages = pages
+        self.latency = latency
+        self.not_modified = 0
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    server: _SiteServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_HEAD(self) -> None:
+        self._respond(send_body=False)
+
+    def do_GET(self) -> None:
+        self._respond(send_body=True)
+
+    def _respond(self, send_body: bool) -> None:
+        time.sleep(self.server.latency)
+        content = self.server.pages.get(self.path)
+        if content is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        etag = f'"{self.path}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.server.not_modified += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(content)
+
+
+class _InMemoryRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+    def get(self, key: str) -> bytes | None:
+        value = self.values.get(key)
+        return value.encode() if value is not None else None
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.values[key] = value
+
+
+def _crawl(
+    base_url: str,
+    concurrency: int,
+    browser: bool,
+    recrawl_cache: WebRecrawlCache | None,
+) -> tuple[int, float]:
+    connector = WebConnector(
+        base_url=base_url,
+        web_connector_type=WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value,
+    )
+    connector.concurrency = concurrency
+    connector.http_fast_path = not browser
+    connector.recrawl_cache = recrawl_cache
+
+    start = time.monotonic()
+    num_docs = sum(len(batch) for batch in connector.load_from_state())
+    return num_docs, time.monotonic() - start
+
+
+def run_benchmark(
+    num_pages: int,
+    links_per_page: int,
+    latency: float,
+    concurrency: int,
+    browser: bool,
+    seed: int,
+) -> None:
+    server = _SiteServer(_generate_site(num_pages, links_per_page, seed), latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    mode = "browser" if browser else "HTTP fast path"
+    print(
+        f"{num_pages} pages, {links_per_page} links per page, "
+        f"{latency * 1000:.0f}ms latency, {mode}"
+    )
+
+    try:
+        recrawl_cache = WebRecrawlCache(
+            _InMemoryRedis(), 3600, "benchmark"  # type: ignore
+        )
+        runs = [
+            ("1 crawler", 1, None),
+            (f"{concurrency} crawlers", concurrency, recrawl_cache),
+            (f"{concurrency} crawlers, recrawl", concurrency, recrawl_cache),
+        ]
+        baseline = None
+        for name, run_concurrency, cache in runs:
+            num_docs, elapsed = _crawl(base_url, run_concurrency, browser, cache)
+            pages_per_minute = num_docs / elapsed * 60
+            baseline = baseline or pages_per_minute
+            print(
+                f"{name + ':':<24}{num_docs} docs in {elapsed:.1f}s, "
+                f"{pages_per_minute:.0f} pages/min "
+                f"({pages_per_minute / baseline:.1f}x)"
+            )
+        print(f"Not modified responses on the recrawl: {server.not_modified}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Web connector crawl benchmark")
+    parser.add_argument("--num-pages", type=int, default=200)
+    parser.add_argument("--links-per-page", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--browser", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run_benchmark(
+        num_pages=args.num_pages,
+        links_per_page=args.links_per_page,
+        latency=args.latency,
+        concurrency=args.concurrency,
+        browser=args.browser,
+        seed=args.seed,
+    )
@@ -56,6 +56,14 @@ MIN_THREADS_ML_MODELS = int(os.environ.get("MIN_THREADS_ML_MODELS") or 1)
 # or intent classification
 INDEXING_ONLY = os.environ.get("INDEXING_ONLY", "").lower() == "true"
 
+# Concurrent requests for the same local embedding / reranking model are coalesced into
+# a single forward pass of at most this many texts. Set to 0 to disable micro-batching.
+MODEL_SERVER_MAX_BATCH_SIZE = int(os.environ.get("MODEL_SERVER_MAX_BATCH_SIZE") or 128)
+# How long the oldest queued request may wait for other requests to join its batch
+MODEL_SERVER_MAX_BATCH_WAIT_MS = float(
+    os.environ.get("MODEL_SERVER_MAX_BATCH_WAIT_MS") or 5
+)
+
 # The process needs to have this for the log file to write to
 # otherwise, it will not create additional log files
 # This should just be the filename base without extension or path.
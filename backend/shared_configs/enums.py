@@ -19,3 +19,12 @@ class RerankerProvider(str, Enum):
 class EmbedTextType(str, Enum):
     QUERY = "query"
     PASSAGE = "passage"
+
+
+class EmbeddingWireFormat(str, Enum):
+    """How embeddings are returned by the model server. JSON is a list of floats per
+    vector, the others are a single base64 encoded buffer of the given dtype."""
+
+    JSON = "json"
+    FLOAT32 = "float32"
+    FLOAT16 = "float16"
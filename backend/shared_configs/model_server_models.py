@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 
 from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbeddingWireFormat
 from shared_configs.enums import EmbedTextType
 from shared_configs.enums import RerankerProvider
 
@@ -37,12 +38,26 @@ class EmbedRequest(BaseModel):
     # will be ignored for other providers.
     reduced_dimension: int | None = None
 
+    # non-JSON formats return the embeddings as one packed buffer instead of
+    # a list of floats per vector, see EmbedResponse.packed_embeddings
+    wire_format: EmbeddingWireFormat = EmbeddingWireFormat.JSON
+
     # This disables the "model_" protected namespace for pydantic
     model_config = {"protected_namespaces": ()}
 
 
+class PackedEmbeddings(BaseModel):
+    # numpy dtype name of the buffer, e.g. "float32" or "float16"
+    dtype: str
+    dim: int
+    # base64 of the row-major, little-endian (num_embeddings, dim) buffer
+    data: str
+
+
 class EmbedResponse(BaseModel):
-    embeddings: list[Embedding]
+    # empty when the request asked for a packed wire format
+    embeddings: list[Embedding] = []
+    packed_embeddings: PackedEmbeddings | None = None
 
 
 class RerankRequest(BaseModel):
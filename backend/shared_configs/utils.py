@@ -1,5 +1,12 @@
+import base64
 from typing import TypeVar
 
+import numpy as np
+
+from shared_configs.enums import EmbeddingWireFormat
+from shared_configs.model_server_models import Embedding
+from shared_configs.model_server_models import PackedEmbeddings
+
 
 T = TypeVar("T")
 
@@ -9,3 +16,31 @@ def batch_list(
     batch_size: int,
 ) -> list[list[T]]:
     return [lst[i : i + batch_size] for i in range(0, len(lst), batch_size)]
+
+
+def pack_embeddings(
+    embeddings: np.ndarray | list[Embedding],
+    wire_format: EmbeddingWireFormat,
+) -> PackedEmbeddings:
+    """Packs a (num_embeddings, dim) matrix into a single base64 buffer."""
+    if wire_format == EmbeddingWireFormat.JSON:
+        raise ValueError("JSON embeddings are not packed")
+
+    dtype = np.dtype(wire_format.value).newbyteorder("<")
+    matrix = np.asarray(embeddings, dtype=dtype)
+    if matrix.ndim != 2:
+        raise ValueError(f"Expected a 2D embedding matrix, got shape {matrix.shape}")
+
+    return PackedEmbeddings(
+        dtype=wire_format.value,
+        dim=matrix.shape[1],
+        data=base64.b64encode(np.ascontiguousarray(matrix).tobytes()).decode("ascii"),
+    )
+
+
+def unpack_embeddings(packed: PackedEmbeddings) -> np.ndarray:
+    """Inverse of pack_embeddings. Always returns a float32 (num_embeddings, dim)
+    matrix since that is what the document index stores and serializes."""
+    dtype = np.dtype(packed.dtype).newbyteorder("<")
+    matrix = np.frombuffer(base64.b64decode(packed.data), dtype=dtype)
+    return matrix.reshape(-1, packed.dim).astype(np.float32, copy=False)
@@ -0,0 +1,183 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from sqlalchemy.dialects import postgresql
+
+from ee.onyx.db.document import batch_upsert_document_external_perms
+from ee.onyx.db.document import build_external_access_fingerprint
+from onyx.access.models import DocExternalAccess
+from onyx.access.models import ExternalAccess
+from onyx.configs.constants import DocumentSource
+from onyx.configs.constants import OnyxCeleryTask
+from onyx.redis.redis_connector_doc_perm_sync import RedisConnectorPermissionSync
+
+
+def test_external_access_fingerprint_ignores_order_and_duplicates() -> None:
+    fingerprint = build_external_access_fingerprint(
+        ["b@test.com", "a@test.com"], ["group_2", "group_1"], False
+    )
+
+    assert fingerprint == build_external_access_fingerprint(
+        ["a@test.com", "b@test.com", "a@test.com"], ["group_1", "group_2"], False
+    )
+    assert fingerprint != build_external_access_fingerprint(
+        ["a@test.com", "b@test.com"], ["group_1", "group_2"], True
+    )
+    assert fingerprint != build_external_access_fingerprint(
+        ["a@test.com"], ["group_1", "group_2"], False
+    )
+
+
+def _doc_access(doc_id: str, email: str) -> DocExternalAccess:
+    return DocExternalAccess(
+        external_access=ExternalAccess(
+            external_user_emails={email},
+            external_user_group_ids={"Group"},
+            is_public=False,
+        ),
+        doc_id=doc_id,
+    )
+
+
+def test_batch_upsert_document_external_perms_only_writes_changed_documents() -> None:
+    accesses = [
+        _doc_access("unchanged", "a@test.com"),
+        _doc_access("changed", "b@test.com"),
+        _doc_access("legacy_unchanged", "c@test.com"),
+        _doc_access("legacy_changed", "d@test.com"),
+        _doc_access("new", "e@test.com"),
+        # created by indexing between the select and the insert
+        _doc_access("created_concurrently", "f@test.com"),
+    ]
+    group_ids = ["confluence_group"]
+
+    def fingerprint(email: str) -> str:
+        return build_external_access_fingerprint([email], group_ids, False)
+
+    db_session = MagicMock()
+    db_session.execute.side_effect = [
+        # stored fingerprints
+        [
+            ("unchanged", fingerprint("a@test.com")),
+            ("changed", fingerprint("old@test.com")),
+            ("legacy_unchanged", None),
+            ("legacy_changed", None),
+        ],
+        # stored permissions of the documents synced before fingerprints existed
+        [
+            ("legacy_unchanged", ["c@test.com"], group_ids, False),
+            ("legacy_changed", ["old@test.com"], group_ids, False),
+        ],
+        None,
+        None,
+    ]
+    db_session.scalars.return_value = ["new"]
+
+    written, created_doc_ids = batch_upsert_document_external_perms(
+        db_session, accesses, DocumentSource.CONFLUENCE
+    )
+
+    assert created_doc_ids == ["new"]
+    assert [access.doc_id for access in written] == [
+        "changed",
+        "legacy_changed",
+        "new",
+        "created_concurrently",
+    ]
+
+    # both missing documents are inserted, existing rows are left alone
+    insert_stmt = db_session.scalars.call_args.args[0].compile(
+        dialect=postgresql.dialect()
+    )
+    assert "ON CONFLICT (id) DO NOTHING" in str(insert_stmt)
+    inserted_values = set(map(str, insert_stmt.params.values()))
+    assert {"new", "created_concurrently"} <= inserted_values
+    assert "unchanged" not in inserted_values
+
+    # changed permissions are written and bump last_modified
+    _, changed_rows = db_session.execute.call_args_list[2].args
+    assert [row["id"] for row in changed_rows] == [
+        "changed",
+        "legacy_changed",
+        "created_concurrently",
+    ]
+    assert all("last_modified" in row for row in changed_rows)
+    assert changed_rows[0]["external_user_emails"] == ["b@test.com"]
+    assert changed_rows[0]["external_user_group_ids"] == group_ids
+    assert changed_rows[0]["external_access_fingerprint"] == fingerprint("b@test.com")
+
+    # legacy rows with the same permissions only get their fingerprint backfilled
+    _, fingerprint_rows = db_session.execute.call_args_list[3].args
+    assert fingerprint_rows == [
+        {
+            "id": "legacy_unchanged",
+            "external_access_fingerprint": fingerprint("c@test.com"),
+        }
+    ]
+    db_session.commit.assert_called_once()
+
+
+def test_batch_upsert_document_external_perms_skips_unchanged_batch() -> None:
+    access = _doc_access("unchanged", "a@test.com")
+    db_session = MagicMock()
+    db_session.execute.return_value = [
+        (
+            "unchanged",
+            build_external_access_fingerprint(
+                ["a@test.com"], ["confluence_group"], False
+            ),
+        )
+    ]
+
+    written, created_doc_ids = batch_upsert_document_external_perms(
+        db_session, [access], DocumentSource.CONFLUENCE
+    )
+
+    assert (written, created_doc_ids) == ([], [])
+    # only the fingerprint lookup, nothing is inserted or updated
+    assert db_session.execute.call_count == 1
+    db_session.scalars.assert_not_called()
+
+
+def test_generate_tasks_sends_one_task_per_batch() -> None:
+    permissions = [
+        DocExternalAccess(
+            external_access=ExternalAccess(
+                external_user_emails={f"user{ind}@test.com"},
+                external_user_group_ids=set(),
+                is_public=False,
+            ),
+            doc_id=f"doc{ind}",
+        )
+        for ind in range(5)
+    ]
+    celery_app = MagicMock()
+
+    with patch(
+        "onyx.redis.redis_connector_doc_perm_sync.DOC_PERMISSION_SYNC_BATCH_SIZE", 2
+    ):
+        num_tasks = RedisConnectorPermissionSync(
+            "tenant", 1, MagicMock()
+        ).generate_tasks(
+            celery_app=celery_app,
+            lock=None,
+            new_permissions=permissions,
+            source_string="confluence",
+            connector_id=1,
+            credential_id=1,
+        )
+
+    assert num_tasks == 3
+    sent_batches = [
+        call.kwargs["kwargs"]["serialized_doc_external_accesses"]
+        for call in celery_app.send_task.call_args_list
+    ]
+    assert all(
+        call.args[0] == OnyxCeleryTask.UPDATE_EXTERNAL_DOCUMENT_PERMISSIONS_BATCH_TASK
+        for call in celery_app.send_task.call_args_list
+    )
+    assert [[doc["doc_id"] for doc in batch] for batch in sent_batches] == [
+        ["doc0", "doc1"],
+        ["doc2", "doc3"],
+        ["doc4"],
+    ]
@@ -1,5 +1,10 @@
 from datetime import datetime
+from unittest.mock import MagicMock
+from unittest.mock import patch
 
+from ee.onyx.external_permissions.salesforce.postprocessing import (
+    _get_objects_access_for_user_email_from_salesforce,
+)
 from ee.onyx.external_permissions.salesforce.postprocessing import (
     censor_salesforce_chunks,
 )
@@ -201,3 +206,45 @@ def test_validate_salesforce_access_blurb_update() -> None:
     assert len(filtered_chunks) == 1
     assert len(filtered_chunks[0].blurb) <= BLURB_SIZE
     assert filtered_chunks[0].blurb.startswith(section)
+
+
+def test_objects_access_is_cached_per_user() -> None:
+    chunk = create_test_chunk(
+        doc_id="doc1",
+        chunk_id=1,
+        content="content",
+        source_links={0: "https://salesforce.com/object1"},
+    )
+    queried_object_ids: list[list[str]] = []
+
+    def get_objects_access(
+        client: MagicMock, user_id: str, record_ids: list[str]
+    ) -> dict[str, bool]:
+        queried_object_ids.append(sorted(record_ids))
+        # object3 is not returned by Salesforce, i.e. not accessible
+        return {object_id: True for object_id in record_ids if object_id != "object3"}
+
+    module = "ee.onyx.external_permissions.salesforce.postprocessing"
+    with (
+        patch(f"{module}.get_session_context_manager"),
+        patch(f"{module}.get_any_salesforce_client_for_doc_id"),
+        patch(f"{module}.get_salesforce_user_id_from_email", return_value="sf_user"),
+        patch(
+            f"{module}.get_objects_access_for_user_id",
+            side_effect=get_objects_access,
+        ),
+    ):
+        first = _get_objects_access_for_user_email_from_salesforce(
+            {"object1", "object3"}, "cached@example.com", [chunk]
+        )
+        second = _get_objects_access_for_user_email_from_salesforce(
+            {"object1", "object2", "object3"}, "cached@example.com", [chunk]
+        )
+        _get_objects_access_for_user_email_from_salesforce(
+            {"object1"}, "other@example.com", [chunk]
+        )
+
+    assert first == {"object1": True, "object3": False}
+    assert second == {"object1": True, "object2": True, "object3": False}
+    # only objects that are not cached for the user are sent to Salesforce
+    assert queried_object_ids == [["object1", "object3"], ["object2"], ["object1"]]
@@ -0,0 +1,112 @@
+import threading
+from unittest.mock import patch
+
+from ee.onyx.external_permissions.post_query_censoring import (
+    _get_all_censoring_enabled_sources,
+)
+from ee.onyx.external_permissions.post_query_censoring import (
+    _post_query_chunk_censoring,
+)
+from ee.onyx.external_permissions.post_query_censoring import (
+    invalidate_censoring_enabled_sources,
+)
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.models import InferenceChunk
+from onyx.db.models import User
+from tests.unit.onyx.redis_utils import InMemoryTenantRedis
+
+_MODULE = "ee.onyx.external_permissions.post_query_censoring"
+
+
+def _chunk(document_id: str, source: DocumentSource) -> InferenceChunk:
+    return InferenceChunk(
+        document_id=document_id,
+        chunk_id=0,
+        content=document_id,
+        source_type=source,
+        semantic_identifier=document_id,
+        title=document_id,
+        boost=1,
+        recency_bias=1.0,
+        score=None,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        doc_summary="",
+        chunk_context="",
+        updated_at=None,
+        image_file_name=None,
+        source_links={},
+        section_continuation=False,
+        blurb=document_id,
+    )
+
+
+def test_censoring_enabled_sources_are_cached_until_invalidated() -> None:
+    store: dict[str, bytes] = {}
+    with (
+        patch(
+            f"{_MODULE}.get_redis_client",
+            side_effect=lambda tenant_id: InMemoryTenantRedis(tenant_id, store),
+        ),
+        patch(f"{_MODULE}.get_current_tenant_id", return_value="tenant"),
+        patch(
+            f"{_MODULE}._fetch_censoring_enabled_sources",
+            side_effect=[{DocumentSource.SALESFORCE}, set()],
+        ) as fetch_sources,
+    ):
+        invalidate_censoring_enabled_sources()
+        assert _get_all_censoring_enabled_sources() == {DocumentSource.SALESFORCE}
+        assert _get_all_censoring_enabled_sources() == {DocumentSource.SALESFORCE}
+        assert fetch_sources.call_count == 1
+
+        invalidate_censoring_enabled_sources()
+        assert _get_all_censoring_enabled_sources() == set()
+        assert fetch_sources.call_count == 2
+
+    # the version is written under the same tenant prefixed key it is read from
+    assert store == {"tenant:censoring_enabled_sources_version": b"2"}
+
+
+def test_post_query_chunk_censoring_censors_sources_concurrently() -> None:
+    # every censoring function waits for the other, so this only finishes if
+    # the sources are censored at the same time
+    barrier = threading.Barrier(2, timeout=5)
+
+    def censor_salesforce(
+        chunks: list[InferenceChunk], user_email: str
+    ) -> list[InferenceChunk]:
+        barrier.wait()
+        return chunks[:1]
+
+    def censor_slack(
+        chunks: list[InferenceChunk], user_email: str
+    ) -> list[InferenceChunk]:
+        barrier.wait()
+        raise RuntimeError("slack is down")
+
+    chunks = [
+        _chunk("sf_1", DocumentSource.SALESFORCE),
+        _chunk("web_1", DocumentSource.WEB),
+        _chunk("slack_1", DocumentSource.SLACK),
+        _chunk("sf_2", DocumentSource.SALESFORCE),
+    ]
+    with (
+        patch(
+            f"{_MODULE}._get_all_censoring_enabled_sources",
+            return_value={DocumentSource.SALESFORCE, DocumentSource.SLACK},
+        ),
+        patch.dict(
+            f"{_MODULE}.DOC_SOURCE_TO_CHUNK_CENSORING_FUNCTION",
+            {
+                DocumentSource.SALESFORCE: censor_salesforce,
+                DocumentSource.SLACK: censor_slack,
+            },
+        ),
+    ):
+        censored_chunks = _post_query_chunk_censoring(
+            chunks, User(id=1, email="test@example.com")
+        )
+
+    # the failed source is thrown out, the order of the rest is kept
+    assert [chunk.document_id for chunk in censored_chunks] == ["sf_1", "web_1"]
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+import pytest
+
+from model_server.batching import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_coalesces_concurrent_requests() -> None:
+    batches: list[list[str]] = []
+
+    def process_batch(texts: list[str]) -> list[str]:
+        batches.append(texts)
+        return [text.upper() for text in texts]
+
+    batcher = MicroBatcher(
+        name="test", process_batch=process_batch, max_batch_size=8, max_wait=0.05
+    )
+    results = await asyncio.gather(
+        batcher.submit(["a", "b"]), batcher.submit(["c"]), batcher.submit(["d", "e"])
+    )
+    await batcher.aclose()
+
+    assert list(results) == [["A", "B"], ["C"], ["D", "E"]]
+    assert batches == [["a", "b", "c", "d", "e"]]
+    assert batcher.stats.num_batches == 1
+    assert batcher.stats.num_requests == 3
+    assert batcher.stats.max_batch_size == 5
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_respects_max_batch_size() -> None:
+    batches: list[list[int]] = []
+    release = threading.Event()
+
+    def process_batch(items: list[int]) -> list[int]:
+        release.wait(timeout=5)
+        batches.append(items)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(
+        name="test", process_batch=process_batch, max_batch_size=3, max_wait=0.01
+    )
+    tasks = [asyncio.create_task(batcher.submit([i, i])) for i in range(4)]
+    await asyncio.sleep(0.05)
+    release.set()
+    results = await asyncio.gather(*tasks)
+    await batcher.aclose()
+
+    assert results == [[0, 0], [2, 2], [4, 4], [6, 6]]
+    # requests are never split, a full batch waits for the next pass
+    assert all(len(batch) <= 3 for batch in batches)
+    assert sorted(item for batch in batches for item in batch) == sorted(
+        [0, 0, 1, 1, 2, 2, 3, 3]
+    )
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_propagates_errors() -> None:
+    def process_batch(texts: list[str]) -> list[str]:
+        if "bad" in texts:
+            raise ValueError("bad input")
+        return texts
+
+    batcher = MicroBatcher(
+        name="test", process_batch=process_batch, max_batch_size=8, max_wait=0
+    )
+    with pytest.raises(ValueError):
+        await batcher.submit(["bad"])
+
+    # the worker survives a failed batch
+    assert await batcher.submit(["good"]) == ["good"]
+    await batcher.aclose()
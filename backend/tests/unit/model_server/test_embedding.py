@@ -7,6 +7,7 @@ from unittest.mock import AsyncMock
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
+import numpy as np
 import pytest
 from httpx import AsyncClient
 from litellm.exceptions import RateLimitError
@@ -16,8 +17,10 @@ from model_server.encoders import embed_text
 from model_server.encoders import local_rerank
 from model_server.encoders import process_embed_request
 from shared_configs.enums import EmbeddingProvider
+from shared_configs.enums import EmbeddingWireFormat
 from shared_configs.enums import EmbedTextType
 from shared_configs.model_server_models import EmbedRequest
+from shared_configs.utils import unpack_embeddings
 
 
 @pytest.fixture
@@ -165,9 +168,9 @@ async def test_rate_limit_handling() -> None:
 
 @pytest.mark.asyncio
 async def test_concurrent_embeddings() -> None:
-    def mock_encode(*args: Any, **kwargs: Any) -> List[List[float]]:
+    def mock_encode(texts: List[str], **kwargs: Any) -> List[List[float]]:
         time.sleep(5)
-        return [[0.1, 0.2, 0.3]]
+        return [[0.1, 0.2, 0.3]] * len(texts)
 
     test_req = EmbedRequest(
         texts=["test"],
@@ -200,3 +203,59 @@ async def test_concurrent_embeddings() -> None:
         # However, the developer may still introduce unnecessary blocking above the mock and this test will
         # still pass as long as it's less than (7 - 5) / 5 seconds
         assert end_time - start_time < 7
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "wire_format", [EmbeddingWireFormat.FLOAT32, EmbeddingWireFormat.FLOAT16]
+)
+async def test_process_embed_request_packed(
+    wire_format: EmbeddingWireFormat,
+) -> None:
+    vectors = np.array([[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]], dtype=np.float32)
+    test_req = EmbedRequest(
+        texts=["test1", "test2"],
+        model_name="fake-local-model",
+        max_context_length=512,
+        normalize_embeddings=True,
+        text_type=EmbedTextType.PASSAGE,
+        wire_format=wire_format,
+    )
+
+    with patch("model_server.encoders.get_embedding_model") as mock_get_model:
+        mock_model = MagicMock()
+        mock_model.encode.return_value = vectors
+        mock_get_model.return_value = mock_model
+
+        response = await process_embed_request(test_req)
+
+    assert response.embeddings == []
+    assert response.packed_embeddings is not None
+    assert response.packed_embeddings.dtype == wire_format.value
+    assert response.packed_embeddings.dim == 3
+
+    unpacked = unpack_embeddings(response.packed_embeddings)
+    assert unpacked.dtype == np.float32
+    assert unpacked.shape == (2, 3)
+    np.testing.assert_allclose(unpacked, vectors, atol=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_process_embed_request_json_unchanged() -> None:
+    test_req = EmbedRequest(
+        texts=["test1"],
+        model_name="fake-local-model",
+        max_context_length=512,
+        normalize_embeddings=True,
+        text_type=EmbedTextType.PASSAGE,
+    )
+
+    with patch("model_server.encoders.get_embedding_model") as mock_get_model:
+        mock_model = MagicMock()
+        mock_model.encode.return_value = np.array([[0.5, 0.25]], dtype=np.float32)
+        mock_get_model.return_value = mock_model
+
+        response = await process_embed_request(test_req)
+
+    assert response.embeddings == [[0.5, 0.25]]
+    assert response.packed_embeddings is None
@@ -0,0 +1,91 @@
+from collections.abc import Iterator
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+
+from onyx.access.acl_cache import invalidate_user_acls
+from onyx.access.acl_cache import UserAclCache
+from tests.unit.onyx.redis_utils import InMemoryTenantRedis
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+        self.clients: dict[str, InMemoryTenantRedis] = {}
+        self.fail = False
+
+    def get_client(self, tenant_id: str) -> InMemoryTenantRedis:
+        client = self.clients.setdefault(
+            tenant_id, InMemoryTenantRedis(tenant_id, self.store)
+        )
+        client.fail = self.fail
+        return client
+
+
+@pytest.fixture
+def fake_redis() -> Iterator[_FakeRedis]:
+    redis = _FakeRedis()
+    with patch(
+        "onyx.access.acl_cache.get_redis_client",
+        side_effect=lambda tenant_id: redis.get_client(tenant_id),
+    ):
+        yield redis
+
+
+def test_user_acl_cache_is_invalidated_by_version_bump(fake_redis: _FakeRedis) -> None:
+    cache = UserAclCache(max_size=10, ttl_seconds=300)
+    user_id = uuid4()
+    computed: list[set[str]] = []
+
+    def compute_acl() -> set[str]:
+        acl = {f"group:{len(computed)}"}
+        computed.append(acl)
+        return acl
+
+    assert cache.get_or_compute("tenant", user_id, compute_acl) == {"group:0"}
+    assert cache.get_or_compute("tenant", user_id, compute_acl) == {"group:0"}
+    assert len(computed) == 1
+
+    with patch("onyx.access.acl_cache.get_user_acl_cache", return_value=None):
+        invalidate_user_acls("tenant")
+    assert cache.get_or_compute("tenant", user_id, compute_acl) == {"group:1"}
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_user_acl_cache_is_bypassed_without_redis(fake_redis: _FakeRedis) -> None:
+    cache = UserAclCache(max_size=10, ttl_seconds=300)
+    user_id = uuid4()
+    calls = 0
+
+    def compute_acl() -> set[str]:
+        nonlocal calls
+        calls += 1
+        return {"user_email:a@b.com"}
+
+    cache.get_or_compute("tenant", user_id, compute_acl)
+    fake_redis.fail = True
+    cache.get_or_compute("tenant", user_id, compute_acl)
+    assert calls == 2
+
+
+def test_user_acl_version_is_bumped_per_tenant(fake_redis: _FakeRedis) -> None:
+    cache = UserAclCache(max_size=10, ttl_seconds=300)
+    user_id = uuid4()
+    computed: list[str] = []
+
+    def compute_acl(tenant_id: str) -> set[str]:
+        computed.append(tenant_id)
+        return {f"user_email:{tenant_id}@b.com"}
+
+    for tenant_id in ["tenant_a", "tenant_b"]:
+        cache.get_or_compute(tenant_id, user_id, lambda: compute_acl(tenant_id))
+
+    with patch("onyx.access.acl_cache.get_user_acl_cache", return_value=None):
+        invalidate_user_acls("tenant_a")
+    # the version is written under the same tenant prefixed key it is read from
+    assert fake_redis.store == {"tenant_a:user_acl_version": b"1"}
+
+    for tenant_id in ["tenant_a", "tenant_b"]:
+        cache.get_or_compute(tenant_id, user_id, lambda: compute_acl(tenant_id))
+    assert computed == ["tenant_a", "tenant_b", "tenant_a"]
@@ -0,0 +1,73 @@
+from collections.abc import Iterable
+from collections.abc import Iterator
+from datetime import datetime
+from datetime import timezone
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.background.celery.tasks.pruning.tasks import connector_pruning_generator_task
+from onyx.redis.redis_connector_prune import RedisConnectorPrunePayload
+
+_TASKS_MODULE = "onyx.background.celery.tasks.pruning.tasks"
+
+
+def test_pruning_generator_removes_docs_missing_from_source() -> None:
+    redis_connector = MagicMock()
+    redis_connector.stop.fenced = False
+    redis_connector.prune.payload = RedisConnectorPrunePayload(
+        id="payload",
+        submitted=datetime.now(timezone.utc),
+        started=None,
+        celery_task_id="task",
+    )
+    pruned_doc_ids: list[str] = []
+
+    def generate_tasks(doc_ids: Iterable[str], *args: Any) -> int:
+        pruned_doc_ids.extend(doc_ids)
+        return len(pruned_doc_ids)
+
+    redis_connector.prune.generate_tasks.side_effect = generate_tasks
+
+    def iterate_source_ids(*args: Any) -> Iterator[list[str]]:
+        yield ["doc_d", "doc_b"]
+        yield ["doc_f", "doc_a"]
+
+    db_session = MagicMock()
+    db_session.scalars.return_value = iter(
+        ["doc_a", "doc_b", "doc_c", "doc_d", "doc_e"]
+    )
+    session_ctx = MagicMock()
+    session_ctx.__enter__.return_value = db_session
+
+    with (
+        patch(f"{_TASKS_MODULE}.RedisConnector", return_value=redis_connector),
+        patch(f"{_TASKS_MODULE}.get_redis_client"),
+        patch(
+            f"{_TASKS_MODULE}.get_session_with_current_tenant",
+            return_value=session_ctx,
+        ),
+        patch(f"{_TASKS_MODULE}.get_connector_credential_pair"),
+        patch(f"{_TASKS_MODULE}.instantiate_connector"),
+        patch(f"{_TASKS_MODULE}.get_current_search_settings"),
+        patch(
+            f"{_TASKS_MODULE}.iterate_ids_from_runnable_connector",
+            side_effect=iterate_source_ids,
+        ),
+        patch(f"{_TASKS_MODULE}.PRUNING_INDEXED_IDS_YIELD_PER", 2),
+        # spills the source ids to disk
+        patch(f"{_TASKS_MODULE}.PRUNING_MAX_IN_MEMORY_DOC_IDS", 2),
+    ):
+        connector_pruning_generator_task.run(
+            cc_pair_id=1, connector_id=2, credential_id=3, tenant_id="tenant"
+        )
+
+    assert pruned_doc_ids == ["doc_c", "doc_e"]
+    assert redis_connector.prune.generator_complete == 2
+
+    # the indexed ids are streamed from the db
+    stmt = db_session.scalars.call_args.args[0]
+    assert stmt.get_execution_options()["yield_per"] == 2
+
+    # progress is reported every PRUNING_INDEXED_IDS_YIELD_PER indexed ids
+    assert redis_connector.prune.set_active.call_count == 2
@@ -0,0 +1,155 @@
+from collections.abc import Iterator
+from contextlib import ExitStack
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from celery.exceptions import Retry
+
+from onyx.background.celery.tasks.vespa.tasks import vespa_metadata_sync_batch_task
+from onyx.configs.constants import OnyxCeleryTask
+from onyx.db.document import mark_documents_as_synced
+from onyx.redis.redis_document_set import RedisDocumentSet
+
+_TASKS_MODULE = "onyx.background.celery.tasks.vespa.tasks"
+
+
+def test_generate_tasks_sends_one_task_per_batch() -> None:
+    db_session = MagicMock()
+    db_session.scalars.return_value.yield_per.return_value = [
+        f"doc{ind}" for ind in range(5)
+    ]
+    celery_app = MagicMock()
+    redis_client = MagicMock()
+
+    with (
+        patch("onyx.redis.redis_object_helper.get_redis_client"),
+        patch("onyx.redis.redis_document_set.construct_document_id_select_by_docset"),
+        patch("onyx.redis.redis_document_set.VESPA_SYNC_BATCH_SIZE", 2),
+    ):
+        result = RedisDocumentSet("tenant", 1).generate_tasks(
+            max_tasks=100,
+            celery_app=celery_app,
+            db_session=db_session,
+            redis_client=redis_client,
+            lock=MagicMock(),
+            tenant_id="tenant",
+        )
+
+    # counts are in batches, not documents
+    assert result == (3, 3)
+    assert all(
+        call.args[0] == OnyxCeleryTask.VESPA_METADATA_SYNC_BATCH_TASK
+        for call in celery_app.send_task.call_args_list
+    )
+    assert [
+        call.kwargs["kwargs"]["document_ids"]
+        for call in celery_app.send_task.call_args_list
+    ] == [["doc0", "doc1"], ["doc2", "doc3"], ["doc4"]]
+
+    # every task is added to the taskset before it is sent
+    task_ids = [call.kwargs["task_id"] for call in celery_app.send_task.call_args_list]
+    assert [call.args[1] for call in redis_client.sadd.call_args_list] == task_ids
+    assert all(task_id.startswith("documentset_1_") for task_id in task_ids)
+
+
+class _SyncMocks:
+    def __init__(self, stack: ExitStack) -> None:
+        self.sync_document = stack.enter_context(
+            patch(f"{_TASKS_MODULE}._sync_document_to_vespa", return_value=2)
+        )
+        self.mark_documents_as_synced = stack.enter_context(
+            patch(f"{_TASKS_MODULE}.mark_documents_as_synced")
+        )
+        self.get_documents_by_ids = stack.enter_context(
+            patch(f"{_TASKS_MODULE}.get_documents_by_ids")
+        )
+
+
+@pytest.fixture
+def sync_mocks() -> Iterator[_SyncMocks]:
+    with ExitStack() as stack:
+        for name in [
+            "get_session_with_current_tenant",
+            "get_active_search_settings",
+            "get_default_document_index",
+            "HttpxPool",
+            "RetryDocumentIndex",
+        ]:
+            stack.enter_context(patch(f"{_TASKS_MODULE}.{name}"))
+        stack.enter_context(
+            patch(
+                f"{_TASKS_MODULE}.fetch_document_sets_for_documents",
+                return_value=[("doc0", ["set_a"])],
+            )
+        )
+        stack.enter_context(
+            patch(
+                f"{_TASKS_MODULE}.get_access_for_documents",
+                side_effect=lambda doc_ids, db_session: {
+                    doc_id: MagicMock() for doc_id in doc_ids
+                },
+            )
+        )
+        yield _SyncMocks(stack)
+
+
+def _docs(document_ids: list[str]) -> list[MagicMock]:
+    docs = []
+    for doc_id in document_ids:
+        doc = MagicMock()
+        doc.id = doc_id
+        doc.chunk_count = 2
+        docs.append(doc)
+    return docs
+
+
+def test_batch_task_marks_every_document_as_synced(sync_mocks: _SyncMocks) -> None:
+    document_ids = ["doc0", "doc1", "doc2"]
+    sync_mocks.get_documents_by_ids.return_value = _docs(document_ids)
+
+    assert vespa_metadata_sync_batch_task.run(document_ids, tenant_id="tenant")
+
+    synced_doc_ids = [call.args[1] for call in sync_mocks.sync_document.call_args_list]
+    assert sorted(synced_doc_ids) == document_ids
+    fields = {
+        call.args[1]: call.args[3] for call in sync_mocks.sync_document.call_args_list
+    }
+    assert fields["doc0"].document_sets == {"set_a"}
+    assert fields["doc1"].document_sets == set()
+
+    sync_mocks.mark_documents_as_synced.assert_called_once()
+    assert sync_mocks.mark_documents_as_synced.call_args.args[0] == document_ids
+
+
+def test_batch_task_retries_only_failed_documents(sync_mocks: _SyncMocks) -> None:
+    document_ids = ["doc0", "doc1", "doc2"]
+    sync_mocks.get_documents_by_ids.return_value = _docs(document_ids)
+    sync_mocks.sync_document.side_effect = lambda index, doc_id, *args: (
+        ConnectionError("vespa is down") if doc_id == "doc1" else 2
+    )
+
+    with patch.object(
+        vespa_metadata_sync_batch_task, "retry", side_effect=Retry()
+    ) as retry:
+        with pytest.raises(Retry):
+            vespa_metadata_sync_batch_task.run(document_ids, tenant_id="tenant")
+
+    # the documents that were synced are marked, only the failed one is retried
+    assert sync_mocks.mark_documents_as_synced.call_args.args[0] == ["doc0", "doc2"]
+    assert retry.call_args.kwargs["kwargs"] == {
+        "document_ids": ["doc1"],
+        "tenant_id": "tenant",
+    }
+
+
+def test_mark_documents_as_synced_updates_all_documents_at_once() -> None:
+    db_session = MagicMock()
+    mark_documents_as_synced([], db_session)
+    db_session.execute.assert_not_called()
+
+    mark_documents_as_synced(["doc0", "doc1"], db_session)
+    stmt = db_session.execute.call_args.args[0]
+    assert stmt.compile().params["id_1"] == ["doc0", "doc1"]
+    assert "last_synced" in str(stmt)
+    db_session.commit.assert_called_once()
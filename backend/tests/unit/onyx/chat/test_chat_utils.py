@@ -0,0 +1,71 @@
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from uuid import uuid4
+
+from onyx.chat.chat_utils import create_chat_chain
+from onyx.configs.constants import MessageType
+
+
+def _tree_node(
+    message_id: int,
+    message_type: MessageType,
+    token_count: int,
+    child: int | None,
+    refined_answer_improvement: bool | None = None,
+) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=message_id,
+        parent_message=message_id - 1 if message_id > 0 else None,
+        latest_child_message=child,
+        message_type=message_type,
+        refined_answer_improvement=refined_answer_improvement,
+        token_count=token_count,
+    )
+
+
+def _create_chat_chain(max_history_tokens: int | None) -> list[int]:
+    tree = [
+        _tree_node(0, MessageType.SYSTEM, 0, 1),
+        _tree_node(1, MessageType.USER, 50, 2),
+        _tree_node(2, MessageType.ASSISTANT, 100, 3),
+        # refined answer replaces the previous answer
+        _tree_node(3, MessageType.ASSISTANT, 120, 4, refined_answer_improvement=True),
+        _tree_node(4, MessageType.USER, 30, 5),
+        _tree_node(5, MessageType.ASSISTANT, 40, 6),
+        _tree_node(6, MessageType.USER, 10, None),
+    ]
+    loaded_ids: list[list[int]] = []
+
+    def get_messages_by_ids(chat_message_ids: list[int], **kwargs: Any) -> list:
+        loaded_ids.append(chat_message_ids)
+        return [SimpleNamespace(id=message_id) for message_id in chat_message_ids]
+
+    with (
+        patch(
+            "onyx.chat.chat_utils.get_chat_message_tree_by_session",
+            return_value=tree,
+        ),
+        patch(
+            "onyx.chat.chat_utils.get_chat_messages_by_ids",
+            side_effect=get_messages_by_ids,
+        ),
+    ):
+        final_msg, history = create_chat_chain(
+            chat_session_id=uuid4(),
+            db_session=MagicMock(),
+            max_history_tokens=max_history_tokens,
+        )
+
+    assert final_msg.id == 6
+    assert loaded_ids == [[msg.id for msg in history] + [final_msg.id]]
+    return [msg.id for msg in history]
+
+
+def test_create_chat_chain_only_loads_history_within_budget() -> None:
+    assert _create_chat_chain(max_history_tokens=None) == [1, 3, 4, 5]
+    # 40 + 30 + 120 tokens fit, the first user message does not
+    assert _create_chat_chain(max_history_tokens=190) == [3, 4, 5]
+    assert _create_chat_chain(max_history_tokens=69) == [5]
+    assert _create_chat_chain(max_history_tokens=0) == []
@@ -1,10 +1,15 @@
+from unittest.mock import patch
+
 import pytest
 
+from onyx.chat.prune_and_merge import _apply_pruning
 from onyx.chat.prune_and_merge import _merge_sections
 from onyx.configs.constants import DocumentSource
 from onyx.context.search.models import InferenceChunk
 from onyx.context.search.models import InferenceSection
 from onyx.context.search.utils import inference_section_from_chunks
+from onyx.llm.interfaces import LLMConfig
+from onyx.natural_language_processing.utils import BaseTokenizer
 
 
 # This large test accounts for all of the following:
@@ -224,3 +229,61 @@ def test_merge_minimal_sections(
     merged_sections = _merge_sections(sections)
     assert merged_sections[0].combined_content == expected_content
     assert merged_sections[0].center_chunk == expected_center_chunk
+
+
+class _WordTokenizer(BaseTokenizer):
+    def __init__(self) -> None:
+        self.encode_calls = 0
+
+    def encode(self, string: str) -> list[int]:
+        self.encode_calls += 1
+        return [len(word) for word in string.split()]
+
+    def tokenize(self, string: str) -> list[str]:
+        return string.split()
+
+    def decode(self, tokens: list[int]) -> str:
+        return " ".join("x" * token for token in tokens)
+
+
+def test_apply_pruning_does_not_modify_sections_and_memoizes_token_counts() -> None:
+    chunks = [
+        create_inference_chunk(f"doc{ind}", 0, "word " * 50, None) for ind in range(5)
+    ]
+    sections = [
+        InferenceSection(
+            center_chunk=chunk, chunks=[chunk], combined_content=chunk.content
+        )
+        for chunk in chunks
+    ]
+    original_sections = [section.model_copy(deep=True) for section in sections]
+    tokenizer = _WordTokenizer()
+
+    def prune() -> list[InferenceSection]:
+        return _apply_pruning(
+            sections=sections,
+            section_relevance_list=None,
+            # 2 full sections and part of the third
+            token_limit=2 * 60 + 30,
+            is_manually_selected_docs=False,
+            use_sections=True,
+            using_tool_message=False,
+            llm_config=LLMConfig(
+                model_provider="test",
+                model_name="test",
+                temperature=0,
+                max_input_tokens=1000,
+            ),
+        )
+
+    with patch("onyx.chat.prune_and_merge.get_tokenizer", return_value=tokenizer):
+        pruned_sections = prune()
+        first_encode_calls = tokenizer.encode_calls
+        assert prune() == pruned_sections
+
+    assert len(pruned_sections) == 3
+    assert pruned_sections[:2] == sections[:2]
+    assert len(pruned_sections[2].combined_content) < len(sections[2].combined_content)
+    assert sections == original_sections
+    # the second pass only tokenizes the final section to trim it
+    assert tokenizer.encode_calls == first_encode_calls + 1
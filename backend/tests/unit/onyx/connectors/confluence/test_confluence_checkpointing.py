@@ -1,3 +1,4 @@
+import threading
 import time
 from collections.abc import Callable
 from collections.abc import Generator
@@ -465,3 +466,62 @@ def test_checkpoint_progress(
     assert isinstance(outputs_with_checkpoint[0].items[0], Document)
     assert outputs_with_checkpoint[0].items[0].semantic_identifier == "Page 3"
     assert not outputs_with_checkpoint[-1].next_checkpoint.has_more
+
+
+def test_load_from_checkpoint_converts_pages_concurrently_in_order(
+    confluence_connector: ConfluenceConnector,
+    create_mock_page: Callable[..., dict[str, Any]],
+) -> None:
+    """Pages of one page of results are converted concurrently, documents keep the
+    page order"""
+    mock_pages = [
+        create_mock_page(id=str(ind), title=f"Page {ind}") for ind in range(4)
+    ]
+
+    confluence_client = confluence_connector._confluence_client
+    assert confluence_client is not None, "bad test setup"
+    get_mock = MagicMock()
+    confluence_client.get = get_mock  # type: ignore
+    get_mock.side_effect = [
+        MagicMock(json=lambda: {"results": mock_pages, "_links": {}}),
+    ]
+
+    all_started = threading.Barrier(4, timeout=10)
+
+    def mock_page_to_document(page: dict[str, Any]) -> Document:
+        # every page waits until all of them are being converted
+        all_started.wait()
+        # the first pages finish last
+        time.sleep(0.05 * (4 - int(page["id"])))
+        return Document(
+            id=page["id"],
+            sections=[],
+            source=DocumentSource.CONFLUENCE,
+            semantic_identifier=page["title"],
+            metadata={},
+        )
+
+    with (
+        patch(
+            "onyx.connectors.confluence.connector.CONFLUENCE_CONNECTOR_PAGE_CONCURRENCY",
+            4,
+        ),
+        patch.object(confluence_connector, "batch_size", 4),
+        patch.object(
+            confluence_connector,
+            "_page_to_document",
+            side_effect=mock_page_to_document,
+        ),
+    ):
+        outputs = load_everything_from_checkpoint_connector(
+            confluence_connector, 0, time.time()
+        )
+
+    assert len(outputs) == 1
+    assert [cast(Document, item).id for item in outputs[0].items] == [
+        "0",
+        "1",
+        "2",
+        "3",
+    ]
+    assert not outputs[0].next_checkpoint.has_more
@@ -765,3 +765,73 @@ def test_paginated_cql_retrieval_cloud_no_retry_on_error(
     # Verify only two calls were made (page 1 success, page 2 fail)
     # Crucially, no retry attempts with different limits should exist.
     assert mock_get_call_paths == [page1_path, page2_path]
+
+
+def test_rate_limit_response_pauses_shared_rate_limiter(
+    mock_credentials_provider: mock.Mock,
+) -> None:
+    rate_limiter = mock.Mock()
+    confluence = OnyxConfluence(
+        is_cloud=False,
+        url="http://fake-confluence.com",
+        credentials_provider=mock_credentials_provider,
+        rate_limiter=rate_limiter,
+    )
+    confluence._confluence = mock.Mock()
+    confluence._confluence.get.side_effect = [
+        HTTPError(response=_create_mock_response(429)),
+        {"results": []},
+    ]
+
+    with mock.patch(
+        "onyx.connectors.confluence.onyx_confluence._handle_http_error",
+        return_value=1234,
+    ):
+        assert confluence.get("rest/api/content") == {"results": []}
+
+    # the retry waits in acquire along with every other thread using the limiter
+    rate_limiter.pause_until.assert_called_once_with(1234)
+    assert rate_limiter.acquire.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "delay_until_offset,reported",
+    [(30, True), (-5, False)],
+)
+def test_rate_limit_response_reports_to_shared_rate_limiter(
+    mock_credentials_provider: mock.Mock,
+    delay_until_offset: int,
+    reported: bool,
+) -> None:
+    confluence = OnyxConfluence(
+        is_cloud=False,
+        url="http://fake-confluence.com",
+        credentials_provider=mock_credentials_provider,
+        rate_limiter=mock.Mock(),
+    )
+    confluence.shared_rate_limiter = mock.MagicMock()
+    confluence._confluence = mock.Mock()
+    confluence._confluence.get.side_effect = [
+        HTTPError(response=_create_mock_response(429)),
+        {"results": []},
+    ]
+
+    with (
+        mock.patch(
+            "onyx.connectors.confluence.onyx_confluence.time.monotonic",
+            return_value=1000.0,
+        ),
+        mock.patch(
+            "onyx.connectors.confluence.onyx_confluence._handle_http_error",
+            return_value=1000 + delay_until_offset,
+        ),
+    ):
+        assert confluence.get("rest/api/content") == {"results": []}
+
+    # only a deadline still in the future slows down the other workers
+    if reported:
+        confluence.shared_rate_limiter.report_rate_limited.assert_called_once_with(
+            delay_until_offset
+        )
+    else:
+        confluence.shared_rate_limiter.report_rate_limited.assert_not_called()
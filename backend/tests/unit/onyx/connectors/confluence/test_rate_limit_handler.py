@@ -1,8 +1,10 @@
 from unittest.mock import Mock
+from unittest.mock import patch
 
 import pytest
 from requests import HTTPError
 
+from onyx.connectors.confluence.utils import _handle_http_error
 from onyx.connectors.confluence.utils import handle_confluence_rate_limit
 
 
@@ -61,3 +63,19 @@ def test_non_rate_limit_error(mock_confluence_call: Mock) -> None:
         handled_call()
 
     assert mock_confluence_call.call_count == 1
+
+
+def test_forbidden_error_returns_retry_deadline() -> None:
+    # Confluence Server returns 403 when rate limited, the caller waits until
+    # the returned monotonic deadline just like for a 429
+    error = HTTPError(response=Mock(status_code=403, text="Forbidden", headers={}))
+
+    with patch("onyx.connectors.confluence.utils.time.monotonic", return_value=1000.5):
+        assert _handle_http_error(error, attempt=0) == 1011
+
+
+def test_forbidden_error_raises_after_max_attempts() -> None:
+    error = HTTPError(response=Mock(status_code=403, text="Forbidden", headers={}))
+
+    with pytest.raises(HTTPError):
+        _handle_http_error(error, attempt=7)
@@ -3,6 +3,9 @@ import time
 from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
     rate_limit_builder,
 )
+from onyx.connectors.cross_connector_utils.rate_limit_wrapper import (
+    TokenBucketRateLimiter,
+)
 
 
 def test_rate_limit_basic() -> None:
@@ -27,3 +30,28 @@ def test_rate_limit_basic() -> None:
     assert call_cnt == 3
     assert time_to_finish_non_ratelimited < 1
     assert time_to_finish_ratelimited > 5
+
+
+def test_token_bucket_rate_limiter() -> None:
+    rate_limiter = TokenBucketRateLimiter(rate=20, capacity=2)
+
+    start = time.monotonic()
+    # the burst is free, the next 4 tokens take 1/20 of a second each
+    waited = sum(rate_limiter.acquire() for _ in range(6))
+    elapsed = time.monotonic() - start
+
+    assert 0.15 < waited < 0.5
+    assert 0.15 < elapsed < 0.5
+
+
+def test_token_bucket_rate_limiter_pause() -> None:
+    rate_limiter = TokenBucketRateLimiter(rate=0)
+    assert rate_limiter.acquire() == 0
+
+    rate_limiter.pause_until(time.monotonic() + 0.3)
+    # an earlier pause does not shorten the current one
+    rate_limiter.pause_until(time.monotonic())
+
+    start = time.monotonic()
+    rate_limiter.acquire()
+    assert time.monotonic() - start >= 0.25
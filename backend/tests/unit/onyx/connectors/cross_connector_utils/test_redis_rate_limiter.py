@@ -0,0 +1,120 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.configs.constants import DocumentSource
+from onyx.connectors.cross_connector_utils.redis_rate_limiter import (
+    get_connector_rate_limiter,
+)
+from onyx.connectors.cross_connector_utils.redis_rate_limiter import (
+    RedisConnectorRateLimiter,
+)
+
+_MODULE = "onyx.connectors.cross_connector_utils.redis_rate_limiter"
+
+
+def _rate_limiter(
+    max_concurrency: int = 0,
+) -> tuple[RedisConnectorRateLimiter, MagicMock, MagicMock, MagicMock, MagicMock]:
+    redis_client = MagicMock()
+    acquire_token, report_rate_limited, acquire_lease = (
+        MagicMock(),
+        MagicMock(),
+        MagicMock(),
+    )
+    redis_client.register_script.side_effect = [
+        acquire_token,
+        report_rate_limited,
+        acquire_lease,
+    ]
+    rate_limiter = RedisConnectorRateLimiter(
+        redis_client=redis_client,
+        tenant_id="tenant_1",
+        source=DocumentSource.CONFLUENCE,
+        host="Example.Atlassian.net",
+        rate=5,
+        max_concurrency=max_concurrency,
+    )
+    return (
+        rate_limiter,
+        redis_client,
+        acquire_token,
+        report_rate_limited,
+        acquire_lease,
+    )
+
+
+def test_keys_are_scoped_by_tenant_source_and_host() -> None:
+    rate_limiter, *_ = _rate_limiter()
+
+    assert (
+        rate_limiter.bucket_key
+        == "connectorratelimit:tenant_1:confluence:example.atlassian.net:bucket"
+    )
+    assert (
+        rate_limiter.leases_key
+        == "connectorratelimit:tenant_1:confluence:example.atlassian.net:leases"
+    )
+
+
+def test_acquire_waits_until_the_script_grants_a_token() -> None:
+    rate_limiter, _, acquire_token, _, _ = _rate_limiter()
+    # the script returns the seconds to wait, as a string
+    acquire_token.side_effect = ["0.2", "0.05", "0"]
+
+    with patch(f"{_MODULE}.time.sleep") as mock_sleep:
+        waited = rate_limiter.acquire()
+
+    assert abs(waited - 0.25) < 1e-9
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [0.2, 0.05]
+    assert acquire_token.call_args.kwargs["keys"] == [rate_limiter.bucket_key]
+
+
+def test_request_holds_a_concurrency_slot() -> None:
+    rate_limiter, redis_client, acquire_token, _, acquire_lease = _rate_limiter(
+        max_concurrency=2
+    )
+    acquire_token.return_value = "0"
+    # the other workers hold both slots the first time
+    acquire_lease.side_effect = [0, 1]
+
+    with patch(f"{_MODULE}.time.sleep") as mock_sleep:
+        with rate_limiter.request():
+            redis_client.zrem.assert_not_called()
+
+    mock_sleep.assert_called_once_with(RedisConnectorRateLimiter.LEASE_POLL_SECONDS)
+    lease_id = acquire_lease.call_args.kwargs["args"][0]
+    redis_client.zrem.assert_called_once_with(rate_limiter.leases_key, lease_id)
+
+
+def test_report_rate_limited_pauses_the_shared_bucket() -> None:
+    rate_limiter, _, _, report_rate_limited, _ = _rate_limiter()
+    report_rate_limited.return_value = "0.5"
+
+    rate_limiter.report_rate_limited(30)
+
+    assert report_rate_limited.call_args.kwargs["keys"] == [rate_limiter.bucket_key]
+    assert report_rate_limited.call_args.kwargs["args"][0] == 30
+
+
+def test_get_connector_rate_limiter() -> None:
+    with patch(f"{_MODULE}.CONNECTOR_REDIS_RATE_LIMIT_ENABLED", False):
+        assert (
+            get_connector_rate_limiter(
+                DocumentSource.ZENDESK, "https://test.zendesk.com/api/v2"
+            )
+            is None
+        )
+
+    with (
+        patch(f"{_MODULE}.CONNECTOR_REDIS_RATE_LIMIT_ENABLED", True),
+        patch(f"{_MODULE}.get_redis_client") as mock_get_redis_client,
+    ):
+        rate_limiter = get_connector_rate_limiter(
+            DocumentSource.ZENDESK, "https://test.zendesk.com/api/v2", "tenant_1"
+        )
+
+    mock_get_redis_client.assert_called_once_with(tenant_id="tenant_1")
+    assert rate_limiter is not None
+    assert rate_limiter.bucket_key == (
+        "connectorratelimit:tenant_1:zendesk:test.zendesk.com:bucket"
+    )
@@ -0,0 +1,212 @@
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+
+from onyx.connectors.web.connector import ScrapeSessionContext
+from onyx.connectors.web.connector import WEB_CONNECTOR_VALID_SETTINGS
+from onyx.connectors.web.connector import WebConnector
+from onyx.connectors.web.recrawl_cache import WebRecrawlCache
+
+_MODULE = "onyx.connectors.web.connector"
+
+_LAST_MODIFIED = "Wed, 01 Oct 2025 12:00:00 GMT"
+
+
+def _page(name: str, links: list[str]) -> bytes:
+    body = " ".join(f"This is sentence {i} of the {name} page." for i in range(20))
+    anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+    return (
+        f"<html><head><title>{name}</title></head>"
+        f"<body><p>{body}</p>{anchors}</body></html>"
+    ).encode()
+
+
+# every page links to the next two pages and back to the index
+_PAGES = {
+    "/": _page("index", ["/page1", "/page2"]),
+    **{
+        f"/page{i}": _page(f"page{i}", [f"/page{i + 1}", f"/page{i + 2}", "/"])
+        for i in range(1, 7)
+    },
+    "/page7": _page("page7", []),
+    "/page8": _page("page8", ["https://external.example.com/"]),
+}
+
+
+class _SiteServer(ThreadingHTTPServer):
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _SiteHandler)
+        self.lock = threading.Lock()
+        self.statuses: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.delay = 0.05
+        self.pages = dict(_PAGES)
+        self.redirects: dict[str, str] = {}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    server: _SiteServer
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(
+                self.server.max_in_flight, self.server.in_flight
+            )
+        try:
+            time.sleep(self.server.delay)
+            self._respond()
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def _respond(self) -> None:
+        redirect = self.server.redirects.get(self.path)
+        if redirect is not None:
+            self.send_response(301)
+            self.send_header("Location", redirect)
+            self.end_headers()
+            return
+
+        content = self.server.pages.get(self.path)
+        if content is None:
+            status = 404
+        elif self.headers.get("If-None-Match") == f'"{self.path}"':
+            status = 304
+        else:
+            status = 200
+        with self.server.lock:
+            self.server.statuses.append(status)
+
+        self.send_response(status)
+        if content is None or status == 304:
+            self.end_headers()
+            return
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("ETag", f'"{self.path}"')
+        self.send_header("Last-Modified", _LAST_MODIFIED)
+        self.end_headers()
+        self.wfile.write(content)
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+    def get(self, key: str) -> bytes | None:
+        value = self.values.get(key)
+        return value.encode() if value is not None else None
+
+    def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.values[key] = value
+
+
+@pytest.fixture
+def site_server() -> Iterator[_SiteServer]:
+    server = _SiteServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _connector(site_server: _SiteServer, concurrency: int) -> WebConnector:
+    connector = WebConnector(
+        base_url=site_server.base_url,
+        web_connector_type=WEB_CONNECTOR_VALID_SETTINGS.RECURSIVE.value,
+        batch_size=3,
+    )
+    connector.concurrency = concurrency
+    connector.http_fast_path = True
+    return connector
+
+
+@patch(f"{_MODULE}.start_playwright", side_effect=AssertionError("browser started"))
+def test_crawls_static_site_concurrently_without_browser(
+    mock_start_playwright: Any, site_server: _SiteServer
+) -> None:
+    connector = _connector(site_server, concurrency=4)
+
+    batches = list(connector.load_from_state())
+
+    assert all(len(batch) <= 3 for batch in batches)
+    docs = [doc for batch in batches for doc in batch]
+    assert sorted(doc.id for doc in docs) == sorted(
+        site_server.base_url + path.lstrip("/") for path in _PAGES
+    )
+    page1 = next(doc for doc in docs if doc.id.endswith("/page1"))
+    assert page1.semantic_identifier == "page1"
+    assert page1.doc_updated_at is not None
+    assert site_server.max_in_flight > 1
+    mock_start_playwright.assert_not_called()
+
+
+@patch(f"{_MODULE}.start_playwright", side_effect=AssertionError("browser started"))
+def test_recrawl_reuses_unmodified_pages(
+    mock_start_playwright: Any, site_server: _SiteServer
+) -> None:
+    recrawl_cache = WebRecrawlCache(_FakeRedis(), 3600, "test")  # type: ignore
+
+    connector = _connector(site_server, concurrency=2)
+    connector.recrawl_cache = recrawl_cache
+    first_crawl = {
+        doc.id: doc for batch in connector.load_from_state() for doc in batch
+    }
+    # the connectivity check is not conditional
+    assert site_server.statuses.count(304) == 0
+
+    site_server.statuses.clear()
+    connector = _connector(site_server, concurrency=2)
+    connector.recrawl_cache = recrawl_cache
+    second_crawl = {
+        doc.id: doc for batch in connector.load_from_state() for doc in batch
+    }
+
+    # every page is still yielded, and its links still followed, from the cache
+    assert second_crawl == first_crawl
+    assert site_server.statuses.count(304) == len(_PAGES)
+    assert site_server.statuses.count(200) == 1
+
+
+def test_redirected_page_falls_back_to_browser(site_server: _SiteServer) -> None:
+    # the fast path follows the redirect, but the page is too short to index
+    # without javascript so it is rendered in the browser
+    site_server.redirects["/old"] = "/app"
+    site_server.pages["/app"] = b"<html><body><div id='root'></div></body></html>"
+    old_url = site_server.base_url + "old"
+    app_url = site_server.base_url + "app"
+
+    page = MagicMock()
+    page.url = app_url
+    page.goto.return_value.status = 200
+    page.goto.return_value.header_value.return_value = None
+    page.content.return_value = _page("app", []).decode()
+    browser = MagicMock()
+    browser.get_context.return_value.new_page.return_value = page
+
+    connector = _connector(site_server, concurrency=1)
+    session_ctx = ScrapeSessionContext(site_server.base_url, [old_url])
+    session_ctx.visited_links.add(old_url)
+    result = connector._do_scrape(1, old_url, session_ctx, browser)
+
+    page.goto.assert_called_once()
+    assert result.doc is not None
+    assert result.doc.id == app_url
+    assert session_ctx.visited_links == {old_url, app_url}
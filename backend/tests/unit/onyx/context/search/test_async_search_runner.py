@@ -0,0 +1,164 @@
+import asyncio
+from typing import Any
+from typing import cast
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.agents.agent_search.shared_graph_utils.models import QueryExpansionType
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.enums import LLMEvaluationType
+from onyx.context.search.enums import SearchType
+from onyx.context.search.models import IndexFilters
+from onyx.context.search.models import InferenceChunk
+from onyx.context.search.models import InferenceChunkUncleaned
+from onyx.context.search.models import QueryExpansions
+from onyx.context.search.models import SearchQuery
+from onyx.context.search.retrieval.search_runner import doc_index_retrieval
+from onyx.context.search.retrieval.search_runner import doc_index_retrieval_async
+from onyx.document_index.interfaces import DocumentIndex
+from onyx.document_index.interfaces import HybridCapable
+from onyx.document_index.interfaces import IdRetrievalCapable
+from onyx.document_index.interfaces import VespaChunkRequest
+from shared_configs.model_server_models import Embedding
+
+
+def _chunk(
+    document_id: str,
+    chunk_id: int,
+    score: float | None,
+    large_chunk_reference_ids: list[int] | None = None,
+) -> InferenceChunkUncleaned:
+    return InferenceChunkUncleaned(
+        chunk_id=chunk_id,
+        blurb=f"{document_id} {chunk_id}",
+        content=f"{document_id} {chunk_id}",
+        source_links=None,
+        image_file_name=None,
+        section_continuation=False,
+        document_id=document_id,
+        source_type=DocumentSource.WEB,
+        semantic_identifier=document_id,
+        title=None,
+        boost=0,
+        recency_bias=1.0,
+        score=score,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        doc_summary="",
+        chunk_context="",
+        updated_at=None,
+        metadata_suffix=None,
+        large_chunk_reference_ids=large_chunk_reference_ids or [],
+    )
+
+
+class _FakeIndex(HybridCapable, IdRetrievalCapable):
+    """Only implements the sync methods, the async ones use the interface defaults."""
+
+    def __init__(self) -> None:
+        self.hybrid_calls: list[str] = []
+
+    def hybrid_retrieval(
+        self,
+        query: str,
+        query_embedding: Embedding,
+        final_keywords: list[str] | None,
+        filters: IndexFilters,
+        hybrid_alpha: float,
+        time_decay_multiplier: float,
+        num_to_retrieve: int,
+        ranking_profile_type: QueryExpansionType,
+        offset: int = 0,
+        title_content_ratio: float | None = None,
+    ) -> list[InferenceChunkUncleaned]:
+        self.hybrid_calls.append(ranking_profile_type.value)
+        if ranking_profile_type == QueryExpansionType.KEYWORD:
+            return [_chunk("doc_a", 0, 0.9), _chunk("doc_b", 1, 0.3)]
+        return [
+            _chunk("doc_a", 0, 0.5),
+            # large chunk referencing doc_c chunks 0 to 2
+            _chunk("doc_c", 0, 0.7, large_chunk_reference_ids=[0, 1, 2]),
+        ]
+
+    def id_based_retrieval(
+        self,
+        chunk_requests: list[VespaChunkRequest],
+        filters: IndexFilters,
+        batch_retrieval: bool = False,
+    ) -> list[InferenceChunkUncleaned]:
+        return [
+            _chunk(request.document_id, chunk_id, None)
+            for request in chunk_requests
+            for chunk_id in range(
+                request.min_chunk_ind or 0, (request.max_chunk_ind or 0) + 1
+            )
+        ]
+
+    def get_title_embeddings(
+        self, document_ids: list[str], *, tenant_id: str
+    ) -> dict[str, tuple[str, Embedding]]:
+        return {}
+
+
+def _search_query(search_type: SearchType) -> SearchQuery:
+    return SearchQuery(
+        query="what is onyx",
+        processed_keywords=["onyx"],
+        search_type=search_type,
+        evaluation_type=LLMEvaluationType.SKIP,
+        filters=IndexFilters(access_control_list=None),
+        chunks_above=0,
+        chunks_below=0,
+        rerank_settings=None,
+        hybrid_alpha=0.5,
+        recency_bias_multiplier=1.0,
+        max_llm_filter_sections=0,
+        precomputed_query_embedding=[0.1, 0.2],
+        expanded_queries=QueryExpansions(
+            keywords_expansions=["onyx"],
+            semantic_expansions=["what is the onyx platform"],
+        ),
+    )
+
+
+def _scored_ids(chunks: list[InferenceChunk]) -> list[tuple[str, int, float | None]]:
+    return [(chunk.document_id, chunk.chunk_id, chunk.score) for chunk in chunks]
+
+
+def test_doc_index_retrieval_async_matches_sync() -> None:
+    def get_query_embeddings(queries: list[str], *args: Any) -> list[Embedding]:
+        return [[float(len(query))] for query in queries]
+
+    async def get_query_embeddings_async(
+        queries: list[str], *args: Any
+    ) -> list[Embedding]:
+        return get_query_embeddings(queries)
+
+    query = _search_query(SearchType.SEMANTIC)
+    sync_index = _FakeIndex()
+    async_index = _FakeIndex()
+    with (
+        patch(
+            "onyx.context.search.retrieval.search_runner.get_query_embeddings",
+            side_effect=get_query_embeddings,
+        ),
+        patch(
+            "onyx.context.search.retrieval.search_runner.get_query_embeddings_async",
+            side_effect=get_query_embeddings_async,
+        ),
+    ):
+        sync_chunks = doc_index_retrieval(
+            query, cast(DocumentIndex, sync_index), MagicMock()
+        )
+        async_chunks = asyncio.run(
+            doc_index_retrieval_async(
+                query, cast(DocumentIndex, async_index), MagicMock()
+            )
+        )
+
+    assert _scored_ids(async_chunks) == _scored_ids(sync_chunks)
+    # the referenced chunks inherit the score of the large chunk
+    assert ("doc_c", 2, 0.7) in _scored_ids(async_chunks)
+    assert sorted(async_index.hybrid_calls) == sorted(sync_index.hybrid_calls)
+    assert len(async_index.hybrid_calls) == 3
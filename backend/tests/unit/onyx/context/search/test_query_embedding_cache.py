@@ -0,0 +1,65 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.context.search.retrieval.query_embedding_cache import (
+    cached_query_embeddings,
+)
+from onyx.context.search.retrieval.query_embedding_cache import QueryEmbeddingCache
+from shared_configs.model_server_models import Embedding
+
+
+def _search_settings(settings_id: int) -> MagicMock:
+    search_settings = MagicMock()
+    search_settings.id = settings_id
+    search_settings.model_name = "test-model"
+    search_settings.provider_type = None
+    search_settings.normalize = True
+    search_settings.query_prefix = "query: "
+    search_settings.reduced_dimension = None
+    search_settings.api_url = None
+    search_settings.deployment_name = None
+    return search_settings
+
+
+def test_cached_query_embeddings() -> None:
+    cache = QueryEmbeddingCache(max_size=10, ttl_seconds=60, use_redis=False)
+    embedded: list[list[str]] = []
+
+    def embed(texts: list[str]) -> list[Embedding]:
+        embedded.append(texts)
+        return [[float(len(text))] for text in texts]
+
+    with patch(
+        "onyx.context.search.retrieval.query_embedding_cache.get_query_embedding_cache",
+        return_value=cache,
+    ):
+        first = cached_query_embeddings(
+            ["hello", "hi", "hello"], _search_settings(1), embed
+        )
+        second = cached_query_embeddings(["hi", "hey"], _search_settings(1), embed)
+        # switching search settings does not reuse the old embeddings
+        third = cached_query_embeddings(["hi"], _search_settings(2), embed)
+
+    assert first == [[5.0], [2.0], [5.0]]
+    assert second == [[2.0], [3.0]]
+    assert third == [[2.0]]
+    assert embedded == [["hello", "hi"], ["hey"], ["hi"]]
+    assert cache.local_hits == 1
+    assert cache.misses == 4
+
+
+def test_query_embedding_cache_expires_entries() -> None:
+    cache = QueryEmbeddingCache(max_size=2, ttl_seconds=60, use_redis=False)
+    cache.put_many({"a": [1.0], "b": [2.0], "c": [3.0]}, tenant_id="public")
+    # least recently used entry is evicted
+    assert cache.get_many(["a", "b", "c"], tenant_id="public") == {
+        "b": [2.0],
+        "c": [3.0],
+    }
+
+    with patch(
+        "onyx.utils.ttl_lru_cache.time.monotonic",
+        return_value=10**9,
+    ):
+        assert cache.get_many(["b", "c"], tenant_id="public") == {}
+    assert cache.hit_rate == 0.4
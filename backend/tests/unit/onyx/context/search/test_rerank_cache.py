@@ -0,0 +1,104 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.models import InferenceChunk
+from onyx.context.search.models import RerankingDetails
+from onyx.context.search.models import RerankMetricsContainer
+from onyx.context.search.postprocessing.postprocessing import semantic_reranking
+from onyx.context.search.postprocessing.rerank_cache import RerankScoreCache
+
+_POSTPROCESSING_MODULE = "onyx.context.search.postprocessing.postprocessing"
+
+
+def _chunk(ind: int) -> InferenceChunk:
+    return InferenceChunk(
+        chunk_id=0,
+        document_id=f"doc{ind}",
+        semantic_identifier=f"doc{ind}",
+        title=None,
+        blurb=f"content {ind}",
+        content=f"content {ind}",
+        source_links=None,
+        section_continuation=False,
+        source_type=DocumentSource.WEB,
+        boost=0,
+        recency_bias=1.0,
+        score=None,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        updated_at=None,
+        image_file_name=None,
+        doc_summary="",
+        chunk_context="",
+    )
+
+
+def _rerank(
+    num_chunks: int, cache: RerankScoreCache, window_size: int = 0
+) -> tuple[list[int], list[list[str]], RerankMetricsContainer]:
+    scored_passages: list[list[str]] = []
+
+    def predict(query: str, passages: list[str]) -> list[float]:
+        scored_passages.append(passages)
+        # the retrieval order is already roughly right, chunk 1 is the best one
+        return [
+            1.0 if passage.endswith(" 1") else 1 / (int(passage.split()[-1]) + 2)
+            for passage in passages
+        ]
+
+    metrics: list[RerankMetricsContainer] = []
+    with (
+        patch(
+            f"{_POSTPROCESSING_MODULE}._get_cross_encoder",
+            return_value=MagicMock(predict=predict),
+        ),
+        patch(
+            "onyx.context.search.postprocessing.rerank_cache.get_rerank_score_cache",
+            return_value=cache,
+        ),
+        patch(f"{_POSTPROCESSING_MODULE}.RERANK_STAGED_WINDOW_SIZE", window_size),
+        patch(f"{_POSTPROCESSING_MODULE}.RERANK_STAGED_TOP_K", 3),
+    ):
+        ranked_chunks, ranked_indices = semantic_reranking(
+            query_str="query",
+            rerank_settings=RerankingDetails(
+                rerank_model_name="test-model",
+                rerank_api_url=None,
+                rerank_provider_type=None,
+                num_rerank=num_chunks,
+            ),
+            chunks=[_chunk(ind) for ind in range(num_chunks)],
+            rerank_metrics_callback=metrics.append,
+        )
+
+    assert [chunk.document_id for chunk in ranked_chunks] == [
+        f"doc{ind}" for ind in ranked_indices
+    ]
+    return ranked_indices, scored_passages, metrics[0]
+
+
+def test_semantic_reranking_reuses_cached_scores() -> None:
+    cache = RerankScoreCache(max_size=100, ttl_seconds=60)
+
+    ranked_indices, scored_passages, metrics = _rerank(4, cache)
+    assert ranked_indices == [1, 0, 2, 3]
+    assert len(scored_passages[0]) == 4
+    assert metrics.cache_hits == 0
+
+    ranked_indices, scored_passages, metrics = _rerank(6, cache)
+    assert ranked_indices == [1, 0, 2, 3, 4, 5]
+    # only the 2 new chunks are sent to the cross-encoder
+    assert scored_passages == [["doc4\ncontent 4", "doc5\ncontent 5"]]
+    assert metrics.cache_hits == 4
+
+
+def test_semantic_reranking_stops_once_top_chunks_are_stable() -> None:
+    cache = RerankScoreCache(max_size=100, ttl_seconds=60)
+
+    ranked_indices, scored_passages, metrics = _rerank(20, cache, window_size=4)
+    # the second window does not change the top 3, the rest keeps retrieval order
+    assert len(scored_passages) == 2
+    assert ranked_indices == [1, 0, 2, 3, 4, 5, 6, 7] + list(range(8, 20))
+    assert metrics.skipped_chunks == 12
@@ -0,0 +1,102 @@
+import threading
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from onyx.configs.constants import DocumentSource
+from onyx.context.search.enums import LLMEvaluationType
+from onyx.context.search.models import InferenceChunk
+from onyx.context.search.models import InferenceSection
+from onyx.context.search.postprocessing.postprocessing import search_postprocessing
+from onyx.context.search.utils import reranked_sections_to_indices
+
+_POSTPROCESSING_MODULE = "onyx.context.search.postprocessing.postprocessing"
+
+
+def _section(document_id: str, chunk_id: int = 0) -> InferenceSection:
+    chunk = InferenceChunk(
+        chunk_id=chunk_id,
+        document_id=document_id,
+        semantic_identifier=document_id,
+        title=None,
+        blurb=document_id,
+        content=document_id,
+        source_links=None,
+        section_continuation=False,
+        source_type=DocumentSource.WEB,
+        boost=0,
+        recency_bias=1.0,
+        score=None,
+        hidden=False,
+        metadata={},
+        match_highlights=[],
+        updated_at=None,
+        image_file_name=None,
+        doc_summary="",
+        chunk_context="",
+    )
+    return InferenceSection(
+        center_chunk=chunk, chunks=[chunk], combined_content=chunk.content
+    )
+
+
+def test_search_postprocessing_does_not_wait_on_relevance_filter() -> None:
+    sections = [_section("a"), _section("b"), _section("c")]
+    search_query = MagicMock(
+        evaluation_type=LLMEvaluationType.BASIC, max_llm_filter_sections=10
+    )
+    filter_started = threading.Event()
+    release_filter = threading.Event()
+
+    def slow_filter_sections(
+        query: MagicMock, sections_to_filter: list[InferenceSection], llm: MagicMock
+    ) -> list[InferenceSection]:
+        filter_started.set()
+        release_filter.wait(timeout=10)
+        return sections_to_filter[:1]
+
+    with (
+        patch(f"{_POSTPROCESSING_MODULE}.DISABLE_LLM_DOC_RELEVANCE", False),
+        patch(
+            f"{_POSTPROCESSING_MODULE}.get_search_time_image_analysis_enabled",
+            return_value=False,
+        ),
+        patch(f"{_POSTPROCESSING_MODULE}.should_rerank", return_value=True),
+        patch(
+            f"{_POSTPROCESSING_MODULE}.rerank_sections",
+            side_effect=lambda query, settings, sections, callback: sections[::-1],
+        ),
+        patch(
+            f"{_POSTPROCESSING_MODULE}.filter_sections",
+            side_effect=slow_filter_sections,
+        ),
+    ):
+        postprocessing = search_postprocessing(search_query, sections, MagicMock())
+        reranked_sections = next(postprocessing)
+        assert filter_started.wait(timeout=10)
+        # the relevance filter is still running
+        assert not release_filter.is_set()
+        assert [
+            section.center_chunk.document_id  # type: ignore
+            for section in reranked_sections
+        ] == ["c", "b", "a"]
+
+        release_filter.set()
+        relevance = next(postprocessing)
+
+    assert [(piece.document_id, piece.relevant) for piece in relevance] == [  # type: ignore
+        ("c", False),
+        ("b", False),
+        ("a", True),
+    ]
+
+
+def test_reranked_sections_to_indices() -> None:
+    items = [_section("a"), _section("b"), _section("c"), _section("d")]
+    reranked_sections = [
+        _section("c", 1),
+        _section("a"),
+        _section("c"),
+        _section("unknown"),
+    ]
+    # b and d have no reranked section (past num_rerank), they keep their order at the end
+    assert reranked_sections_to_indices(reranked_sections, items) == [2, 0, 1, 3]
@@ -0,0 +1,116 @@
+import json
+from uuid import UUID
+
+import httpx
+
+from onyx.document_index.vespa.deletion import build_chunk_id_selection
+from onyx.document_index.vespa.deletion import delete_vespa_chunks_by_selection
+from onyx.document_index.vespa.index import VespaIndex
+
+
+def _grouping_response(max_chunk_ids: dict[str, int]) -> dict:
+    return {
+        "root": {
+            "children": [
+                {
+                    "id": "group:root:0",
+                    "children": [
+                        {
+                            "id": "grouplist:document_id",
+                            "children": [
+                                {
+                                    "id": f"group:string:{doc_id}",
+                                    "value": doc_id,
+                                    "fields": {"max(chunk_id)": max_chunk_id},
+                                }
+                                for doc_id, max_chunk_id in max_chunk_ids.items()
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+    }
+
+
+def test_enrich_basic_chunk_info_batch_uses_one_grouped_query() -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=_grouping_response({"legacy_a": 9}))
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as http_client:
+        enriched = VespaIndex.enrich_basic_chunk_info_batch(
+            index_name="test_index",
+            http_client=http_client,
+            doc_id_to_previous_chunk_cnt={
+                "known": 5,
+                "legacy_a": None,
+                "legacy'b": None,
+            },
+            doc_id_to_new_chunk_cnt={
+                "known": 3,
+                "legacy_a": 4,
+                "legacy'b": 2,
+                "new": 7,
+            },
+        )
+
+    # only documents without a chunk count need a lookup, all in one request
+    assert len(requests) == 1
+    yql = json.loads(requests[0].content)["yql"]
+    assert 'document_id in ("legacy_a", "legacy_b")' in yql
+    assert "max(chunk_id)" in yql
+
+    by_doc_id = {doc_info.doc_id: doc_info for doc_info in enriched}
+    assert set(by_doc_id) == {"known", "legacy_a", "legacy_b", "new"}
+    assert (
+        by_doc_id["known"].chunk_start_index,
+        by_doc_id["known"].chunk_end_index,
+    ) == (3, 5)
+    assert by_doc_id["legacy_a"].old_version
+    assert by_doc_id["legacy_a"].chunk_end_index == 10
+    # not in the index, nothing to delete
+    assert by_doc_id["legacy_b"].chunk_end_index == 2
+    assert by_doc_id["new"].chunk_end_index == 0
+
+
+_CHUNK_IDS = [
+    UUID("00000000-0000-0000-0000-000000000001"),
+    UUID("00000000-0000-0000-0000-000000000002"),
+]
+
+
+def test_delete_vespa_chunks_by_selection_follows_continuations() -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if "continuation" not in request.url.params:
+            return httpx.Response(200, json={"documentCount": 1, "continuation": "c1"})
+        return httpx.Response(200, json={"documentCount": 1})
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as http_client:
+        num_deleted = delete_vespa_chunks_by_selection(
+            doc_chunk_ids=_CHUNK_IDS,
+            index_name="test_index",
+            http_client=http_client,
+        )
+
+    assert num_deleted == 2
+    assert [request.method for request in requests] == ["DELETE", "DELETE"]
+    assert requests[1].url.params["continuation"] == "c1"
+    assert requests[0].url.params["selection"] == build_chunk_id_selection(
+        _CHUNK_IDS, "test_index"
+    )
+
+
+def test_build_chunk_id_selection() -> None:
+    selection = build_chunk_id_selection(_CHUNK_IDS, "test_index", tenant_id="tenant'1")
+    # only full document ids, so Vespa can tell which buckets hold the chunks
+    assert selection == (
+        "(id=='id:default:test_index::00000000-0000-0000-0000-000000000001' or "
+        "id=='id:default:test_index::00000000-0000-0000-0000-000000000002') "
+        "and test_index.tenant_id=='tenant\\'1'"
+    )
@@ -0,0 +1,95 @@
+import threading
+from unittest.mock import patch
+
+import httpx
+
+from onyx.context.search.models import IndexFilters
+from onyx.document_index.interfaces import VespaChunkRequest
+from onyx.document_index.vespa.chunk_retrieval import batch_search_api_retrieval
+from onyx.document_index.vespa.chunk_retrieval import parallel_visit_api_retrieval
+
+
+def _vespa_chunk(document_id: str, chunk_id: int) -> dict:
+    return {
+        "id": f"id:default:test_index::{document_id}__{chunk_id}",
+        "fields": {
+            "document_id": document_id,
+            "chunk_id": chunk_id,
+            "semantic_identifier": document_id,
+            "content": f"{document_id} {chunk_id}",
+            "blurb": "",
+            "section_continuation": False,
+            "source_type": "web",
+            "boost": 0,
+            "hidden": False,
+            "metadata": "{}",
+        },
+    }
+
+
+def test_parallel_visit_api_retrieval_folds_documents_into_one_visit() -> None:
+    selections: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        selection = request.url.params["selection"]
+        selections.append(selection)
+        return httpx.Response(
+            200,
+            json={
+                "documents": [
+                    _vespa_chunk(f"doc_{ind}", 0)
+                    for ind in range(12)
+                    if f"=='doc_{ind}'" in selection
+                ]
+            },
+        )
+
+    http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    with patch(
+        "onyx.document_index.vespa.chunk_retrieval.get_vespa_query_client",
+        return_value=http_client,
+    ):
+        chunks = parallel_visit_api_retrieval(
+            index_name="test_index",
+            chunk_requests=[
+                VespaChunkRequest(document_id=f"doc_{ind}") for ind in range(12)
+            ],
+            filters=IndexFilters(access_control_list=None),
+        )
+
+    # 12 documents, at most 10 per visit
+    assert len(selections) == 2
+    assert sorted(chunk.document_id for chunk in chunks) == sorted(
+        f"doc_{ind}" for ind in range(12)
+    )
+    assert all(
+        "test_index.large_chunk_reference_ids == null" in selection
+        for selection in selections
+    )
+
+
+def test_batch_search_api_retrieval_sends_batches_concurrently() -> None:
+    num_batches = 3
+    # every request waits for all others, so this only finishes if they run at once
+    barrier = threading.Barrier(num_batches, timeout=5)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        barrier.wait()
+        return httpx.Response(200, json={"root": {"children": []}})
+
+    http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    with patch(
+        "onyx.document_index.vespa.chunk_retrieval.get_vespa_query_client",
+        return_value=http_client,
+    ):
+        batch_search_api_retrieval(
+            index_name="test_index",
+            chunk_requests=[
+                # each request spans 200 chunks, only 2 of them fit in a batch
+                VespaChunkRequest(
+                    document_id=f"doc_{ind}", min_chunk_ind=0, max_chunk_ind=199
+                )
+                for ind in range(2 * num_batches)
+            ],
+            filters=IndexFilters(access_control_list=None),
+        )
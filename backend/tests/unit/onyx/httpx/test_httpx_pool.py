@@ -0,0 +1,49 @@
+from collections.abc import Iterator
+
+import httpx
+import pytest
+
+from onyx.httpx.httpx_pool import HttpxPool
+from onyx.httpx.httpx_pool import MeteredTransport
+
+
+class _StreamedBody(httpx.SyncByteStream):
+    def __iter__(self) -> Iterator[bytes]:
+        yield b'{"ok": true}'
+
+
+def test_metered_transport_tracks_in_flight_requests() -> None:
+    in_flight_during_request: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        in_flight_during_request.append(transport.stats.in_flight)
+        return httpx.Response(200, stream=_StreamedBody())
+
+    transport = MeteredTransport("test", httpx.MockTransport(handler))
+    with httpx.Client(transport=transport) as client:
+        with client.stream("GET", "http://vespa/search/") as response:
+            # the request is in flight until its body is closed
+            assert transport.stats.in_flight == 1
+            response.read()
+        client.get("http://vespa/search/")
+
+    assert in_flight_during_request == [1, 1]
+    assert transport.stats.in_flight == 0
+    assert transport.stats.requests == 2
+    assert transport.stats.max_in_flight == 1
+    # the mock never opens a connection
+    assert transport.stats.reuse_ratio == 1.0
+
+
+def test_httpx_pool_drops_clients_after_fork(monkeypatch: pytest.MonkeyPatch) -> None:
+    HttpxPool.init_client("test_fork", http2=False)
+    client = HttpxPool.get("test_fork")
+    assert HttpxPool.get_stats("test_fork") is not None
+
+    monkeypatch.setattr("onyx.httpx.httpx_pool.os.getpid", lambda: -1)
+    forked_client = HttpxPool.get("test_fork")
+    assert forked_client is not client
+    assert not client.is_closed
+
+    HttpxPool.close_all()
+    client.close()
@@ -1,6 +1,9 @@
+from collections.abc import Generator
+
 import pytest
 
 from onyx.indexing.embedder import DefaultIndexingEmbedder
+from onyx.indexing.embedding_cache import clear_title_embedding_caches
 from onyx.indexing.indexing_heartbeat import IndexingHeartbeatInterface
 
 
@@ -28,3 +31,11 @@ def embedder() -> DefaultIndexingEmbedder:
         query_prefix=None,
         passage_prefix=None,
     )
+
+
+@pytest.fixture(autouse=True)
+def reset_title_embedding_caches() -> Generator[None, None, None]:
+    # title embeddings are cached process wide, don't leak them between tests
+    clear_title_embedding_caches()
+    yield
+    clear_title_embedding_caches()
@@ -1,13 +1,16 @@
 from collections.abc import Generator
+from pathlib import Path
 from unittest.mock import Mock
 from unittest.mock import patch
 
+import numpy as np
 import pytest
 
 from onyx.configs.constants import DocumentSource
 from onyx.connectors.models import Document
 from onyx.connectors.models import TextSection
 from onyx.indexing.embedder import DefaultIndexingEmbedder
+from onyx.indexing.embedding_cache import EmbeddingCache
 from onyx.indexing.models import ChunkEmbedding
 from onyx.indexing.models import DocAwareChunk
 from onyx.indexing.models import IndexChunk
@@ -98,8 +101,121 @@ def test_default_indexing_embedder_embed_chunks(
     )
     # Same for title only embedding call
     mock_embedding_model.return_value.encode.assert_any_call(
-        ["Test Document"],
+        texts=["Test Document"],
         text_type=EmbedTextType.PASSAGE,
+        large_chunks_present=False,
         tenant_id=None,
         request_id=None,
     )
+
+
+def test_default_indexing_embedder_uses_embedding_cache(
+    mock_embedding_model: Mock, tmp_path: Path
+) -> None:
+    cache = EmbeddingCache(cache_dir=str(tmp_path), max_entries=100)
+    with patch("onyx.indexing.embedder.get_embedding_cache", return_value=cache):
+        embedder = DefaultIndexingEmbedder(
+            model_name="test-model",
+            normalize=True,
+            query_prefix=None,
+            passage_prefix=None,
+            provider_type=EmbeddingProvider.OPENAI,
+        )
+
+    encode = mock_embedding_model.return_value.encode
+    encode.side_effect = lambda texts, **kwargs: [
+        [float(len(text)), 1.0] for text in texts
+    ]
+
+    first = embedder._encode_passages(["alpha", "beta", "alpha"])
+    assert first == [[5.0, 1.0], [4.0, 1.0], [5.0, 1.0]]
+    # duplicates within a batch are only embedded once
+    assert encode.call_args.kwargs["texts"] == ["alpha", "beta"]
+    assert embedder.embedding_cache_hits == 0
+    assert embedder.embedding_cache_misses == 3
+
+    encode.reset_mock()
+    second = embedder._encode_passages(["beta", "gamma", "alpha"])
+    assert second == [[4.0, 1.0], [5.0, 1.0], [5.0, 1.0]]
+    # only the cache miss is sent to the model server
+    assert encode.call_args.kwargs["texts"] == ["gamma"]
+    assert embedder.embedding_cache_hits == 2
+    assert embedder.embedding_cache_misses == 4
+    cache.close()
+
+
+def test_default_indexing_embedder_reuses_title_embeddings(
+    mock_embedding_model: Mock,
+) -> None:
+    encode = mock_embedding_model.return_value.encode
+    encode.side_effect = lambda texts, **kwargs: [
+        [float(len(text)), 1.0] for text in texts
+    ]
+
+    def make_chunk(doc_id: str, title: str) -> DocAwareChunk:
+        return DocAwareChunk(
+            chunk_id=0,
+            blurb="blurb",
+            content=f"content of {doc_id}",
+            source_links={},
+            image_file_name=None,
+            section_continuation=False,
+            source_document=Document(
+                id=doc_id,
+                title=title,
+                semantic_identifier=title,
+                sections=[TextSection(text="text", link="link")],
+                source=DocumentSource.FILE,
+                metadata={},
+            ),
+            title_prefix="",
+            metadata_suffix_semantic="",
+            metadata_suffix_keyword="",
+            mini_chunk_texts=None,
+            large_chunk_reference_ids=[],
+            large_chunk_id=None,
+            chunk_context="",
+            doc_summary="",
+            contextual_rag_reserved_tokens=0,
+        )
+
+    def make_embedder() -> DefaultIndexingEmbedder:
+        return DefaultIndexingEmbedder(
+            model_name="test-model",
+            normalize=True,
+            query_prefix=None,
+            passage_prefix=None,
+        )
+
+    make_embedder().embed_chunks([make_chunk("doc1", "General")])
+
+    # a later batch (or another attempt with the same settings) reuses the title
+    encode.reset_mock()
+    embedder = make_embedder()
+    embedder.seed_title_embeddings({"Seeded": [9.0, 9.0]})
+    assert embedder.get_missing_titles(["General", "Seeded", "Other"]) == ["Other"]
+
+    result = embedder.embed_chunks(
+        [make_chunk("doc2", "General"), make_chunk("doc3", "Seeded")]
+    )
+    assert [chunk.title_embedding for chunk in result] == [[7.0, 1.0], [9.0, 9.0]]
+    assert embedder.title_embedding_cache_hits == 2
+    assert [call.kwargs["texts"] for call in encode.call_args_list] == [
+        ["content of doc2", "content of doc3"]
+    ]
+
+
+def test_embedding_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = EmbeddingCache(cache_dir=str(tmp_path), max_entries=10)
+    cache.put_many({f"key_{i}": np.array([i, i], dtype=np.float32) for i in range(10)})
+    # touch the oldest entry so it survives eviction
+    assert list(cache.get_many(["key_0"])) == ["key_0"]
+
+    cache.put_many({"key_new": np.array([1, 2], dtype=np.float32)})
+
+    remaining = cache.get_many([f"key_{i}" for i in range(10)] + ["key_new"])
+    assert len(remaining) == 9
+    assert "key_0" in remaining
+    assert "key_new" in remaining
+    np.testing.assert_array_equal(remaining["key_new"], [1.0, 2.0])
+    cache.close()
@@ -0,0 +1,50 @@
+import pytest
+from llama_index.core.node_parser import SentenceSplitter
+
+from onyx.indexing.embedder import DefaultIndexingEmbedder
+from onyx.indexing.token_splitter import TokenizedText
+from onyx.indexing.token_splitter import TokenSplitter
+
+_TEXTS = [
+    "",
+    "Short text.",
+    "This is a long section that should be split into multiple chunks. " * 100,
+    "First paragraph, with a comma; and a semicolon.\n\n\nSecond paragraph!\n\n\n"
+    + "  Indented sentence follows. Another one here?  " * 40,
+    "averyveryverylongwordwithoutanyspaces" * 50 + " and then some normal words.",
+    "Line one\nLine two\n\nLine three\twith tab.\r\nWindows line. " * 30,
+]
+
+
+@pytest.mark.parametrize("chunk_size, chunk_overlap", [(16, 0), (64, 8), (512, 0)])
+def test_token_splitter_matches_sentence_splitter(
+    embedder: DefaultIndexingEmbedder, chunk_size: int, chunk_overlap: int
+) -> None:
+    tokenizer = embedder.embedding_model.tokenizer
+    sentence_splitter = SentenceSplitter(
+        tokenizer=tokenizer.tokenize,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+    )
+    token_splitter = TokenSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    for text in _TEXTS:
+        assert token_splitter.split_text(
+            text, tokenizer
+        ) == sentence_splitter.split_text(text)
+
+
+def test_tokenized_text_span_counts(embedder: DefaultIndexingEmbedder) -> None:
+    tokenizer = embedder.embedding_model.tokenizer
+    text = "Hello there, general Kenobi.\n\nYou are a bold one! " * 5
+    doc = TokenizedText(text, tokenizer)
+
+    assert doc.token_count() == len(tokenizer.tokenize(text))
+    for start, end in [(0, 13), (13, 50), (29, len(text)), (7, 9)]:
+        assert doc.token_count(start, end) == len(tokenizer.tokenize(text[start:end]))
+
+    # nested splits of a span reuse the same tokenized text
+    span = doc.span(0, 50)
+    for sub_span in TokenSplitter(chunk_size=4).split(span):
+        assert sub_span.doc is doc
+        assert text[sub_span.start : sub_span.end] == sub_span.text
@@ -0,0 +1,102 @@
+from typing import Any
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from onyx.natural_language_processing.search_nlp_models import EmbeddingModel
+from shared_configs.enums import EmbeddingWireFormat
+from shared_configs.enums import EmbedTextType
+from shared_configs.model_server_models import EmbedRequest
+from shared_configs.model_server_models import EmbedResponse
+from shared_configs.utils import pack_embeddings
+
+
+def _embedding_model(retrim_content: bool = False) -> EmbeddingModel:
+    return EmbeddingModel(
+        server_host="localhost",
+        server_port=9000,
+        model_name="intfloat/e5-base-v2",
+        normalize=True,
+        query_prefix=None,
+        passage_prefix=None,
+        api_key=None,
+        api_url=None,
+        provider_type=None,
+        retrim_content=retrim_content,
+    )
+
+
+@pytest.mark.parametrize(
+    "wire_format", [EmbeddingWireFormat.JSON, EmbeddingWireFormat.FLOAT32]
+)
+def test_length_bucketing_restores_order(wire_format: EmbeddingWireFormat) -> None:
+    model = _embedding_model()
+    # long chunks interleaved with short mini-chunks
+    texts = [("word " * (length * 10)).strip() for length in [9, 1, 8, 2, 7, 1, 9, 2]]
+    sent_batches: list[list[str]] = []
+
+    def fake_request(embed_request: EmbedRequest, **kwargs: Any) -> EmbedResponse:
+        sent_batches.append(embed_request.texts)
+        vectors = [[float(len(text)), 0.0] for text in embed_request.texts]
+        if embed_request.wire_format == EmbeddingWireFormat.JSON:
+            return EmbedResponse(embeddings=vectors)
+        return EmbedResponse(
+            packed_embeddings=pack_embeddings(
+                np.array(vectors, dtype=np.float32), embed_request.wire_format
+            )
+        )
+
+    with patch.object(model, "_make_model_server_request", side_effect=fake_request):
+        embeddings = model._encode(
+            texts=texts,
+            text_type=EmbedTextType.PASSAGE,
+            large_chunks_present=False,
+            local_embedding_batch_size=2,
+            api_embedding_batch_size=2,
+            max_seq_length=512,
+            tenant_id=None,
+            request_id=None,
+            wire_format=wire_format,
+        )
+
+    assert [embedding[0] for embedding in embeddings] == [
+        float(len(text)) for text in texts
+    ]
+    # similarly sized texts are sent together
+    sent_lengths = [len(text) for batch in sent_batches for text in batch]
+    assert sent_lengths == sorted(len(text) for text in texts)
+    assert 0 < model.padding_ratio < 0.1
+
+
+def test_retrim_content_tokenizes_each_text_once() -> None:
+    model = _embedding_model(retrim_content=True)
+    texts = [("word " * length).strip() for length in [30, 5, 20, 1]]
+    sent_batches: list[list[str]] = []
+
+    def fake_request(embed_request: EmbedRequest, **kwargs: Any) -> EmbedResponse:
+        sent_batches.append(embed_request.texts)
+        return EmbedResponse(embeddings=[[0.0, 0.0] for _ in embed_request.texts])
+
+    with (
+        patch.object(model, "_make_model_server_request", side_effect=fake_request),
+        patch.object(model.tokenizer, "encode", wraps=model.tokenizer.encode) as encode,
+    ):
+        model._encode(
+            texts=texts,
+            text_type=EmbedTextType.PASSAGE,
+            large_chunks_present=False,
+            local_embedding_batch_size=2,
+            api_embedding_batch_size=2,
+            max_seq_length=10,
+            tenant_id=None,
+            request_id=None,
+            wire_format=EmbeddingWireFormat.JSON,
+        )
+
+    # the trim pass also provides the token counts for the length bucketing
+    assert encode.call_count == len(texts)
+    # the long texts are trimmed, and the texts are still sent shortest first
+    sent_texts = [text for batch in sent_batches for text in batch]
+    assert sent_texts[:2] == [texts[3], texts[1]]
+    assert all(len(text) < len(texts[2]) for text in sent_texts[2:])
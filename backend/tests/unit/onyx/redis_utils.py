@@ -0,0 +1,28 @@
+from typing import Any
+
+from onyx.redis.redis_pool import TenantRedis
+
+
+class InMemoryTenantRedis(TenantRedis):
+    """TenantRedis that runs the few commands the caches use against a dict instead
+    of a server, so keys still go through the real tenant prefixing. Clients created
+    with the same store share their keys."""
+
+    def __init__(self, tenant_id: str, store: dict[str, bytes]) -> None:
+        super().__init__(tenant_id)
+        self.store = store
+        self.fail = False
+
+    def execute_command(self, *args: Any, **options: Any) -> Any:
+        if self.fail:
+            raise ConnectionError("redis is down")
+
+        command, key = args[0], args[1]
+        key = key.decode() if isinstance(key, bytes) else key
+        if command == "GET":
+            return self.store.get(key)
+        if command == "INCRBY":
+            value = int(self.store.get(key, b"0")) + args[2]
+            self.store[key] = str(value).encode()
+            return value
+        raise NotImplementedError(command)
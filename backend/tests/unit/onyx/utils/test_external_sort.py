@@ -0,0 +1,55 @@
+import os
+import random
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from onyx.utils.external_sort import ExternalSortedSet
+from onyx.utils.external_sort import sorted_difference
+
+
+def test_external_sorted_set_spills_and_merges(tmp_path: Path) -> None:
+    rng = random.Random(0)
+    # duplicates across runs, non ascii characters and newlines
+    values = [f"doc_{rng.randrange(2000)}" for _ in range(5000)] + [
+        "ünicode",
+        "multi\nline",
+        "",
+        "Z",
+    ]
+
+    with patch.object(ExternalSortedSet, "MAX_RUNS", 4):
+        with ExternalSortedSet(max_in_memory=100, directory=str(tmp_path)) as ids:
+            ids.update(values)
+
+            # runs are compacted into one before there are MAX_RUNS of them
+            assert 1 <= ids.num_runs < 4
+            assert list(ids) == sorted(set(values))
+            # iterating again gives the same values
+            assert list(ids) == sorted(set(values))
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_sorted_difference() -> None:
+    rng = random.Random(1)
+    indexed_ids = {f"doc_{rng.randrange(1000)}" for _ in range(600)}
+    source_ids = {f"doc_{rng.randrange(1000)}" for _ in range(600)}
+
+    with ExternalSortedSet(max_in_memory=50) as source:
+        source.update(source_ids)
+        assert list(sorted_difference(sorted(indexed_ids), source)) == sorted(
+            indexed_ids - source_ids
+        )
+
+    assert list(sorted_difference(["a", "b"], [])) == ["a", "b"]
+    assert list(sorted_difference([], ["a"])) == []
+
+
+def test_sorted_difference_rejects_unsorted_values() -> None:
+    with pytest.raises(ValueError):
+        list(sorted_difference(["b", "a"], ["a"]))
+
+    with pytest.raises(ValueError):
+        list(sorted_difference(["c"], ["b", "a"]))
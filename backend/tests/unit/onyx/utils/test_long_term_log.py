@@ -0,0 +1,71 @@
+import time
+from datetime import datetime
+from pathlib import Path
+
+from onyx.utils.long_term_log import _RECORD_TIMESTAMP_FORMAT
+from onyx.utils.long_term_log import LongTermLogger
+
+
+def test_long_term_logger_rotates_segments_and_fetches_time_range(
+    tmp_path: Path,
+) -> None:
+    long_term_logger = LongTermLogger(
+        metadata={"chat_session_id": "test"},
+        log_file_path=str(tmp_path),
+        max_segment_bytes=1000,
+        max_segments_per_category=3,
+    )
+
+    for ind in range(10):
+        long_term_logger.record({"ind": ind}, category="early")
+    long_term_logger.flush(timeout=5)
+    time.sleep(0.01)
+    middle_time = datetime.now()
+    time.sleep(0.01)
+    for ind in range(10, 100):
+        long_term_logger.record({"ind": ind, "padding": "x" * 50}, category="late")
+        if ind < 20:
+            long_term_logger.record({"ind": ind}, category="early")
+    long_term_logger.flush(timeout=5)
+
+    late_segments = list((tmp_path / "late").iterdir())
+    # ~90 chars per record, 11 records per segment, only the latest 3 are kept
+    assert len(late_segments) == 3
+    late_records = long_term_logger.fetch_category("late")
+    late_inds = [record["record"]["ind"] for record in late_records]  # type: ignore
+    assert late_inds == list(range(100 - len(late_inds), 100))
+    assert late_records[0] == {
+        "metadata": {"chat_session_id": "test"},
+        "record": {"ind": late_inds[0], "padding": "x" * 50},
+    }
+
+    early_records = long_term_logger.fetch_category("early", end_time=middle_time)
+    assert [record["record"]["ind"] for record in early_records] == list(  # type: ignore
+        range(10)
+    )
+    assert long_term_logger.fetch_category("early", start_time=datetime.now()) == []
+
+
+def test_long_term_logger_keeps_segments_of_other_processes(tmp_path: Path) -> None:
+    # a segment another process is still appending to
+    other_segment = tmp_path / "default" / "2000-01-01_00-00-00-000000.jsonl"
+    other_segment.parent.mkdir()
+    other_segment.write_text(
+        f"{datetime(2000, 1, 1).strftime(_RECORD_TIMESTAMP_FORMAT)}\t"
+        '{"metadata": null, "record": "other"}\n'
+    )
+
+    long_term_logger = LongTermLogger(
+        log_file_path=str(tmp_path),
+        max_segment_bytes=100,
+        max_segments_per_category=2,
+    )
+    for ind in range(10):
+        long_term_logger.record({"ind": ind, "padding": "x" * 50})
+    long_term_logger.flush(timeout=5)
+
+    assert other_segment.exists()
+    assert len(list(other_segment.parent.iterdir())) == 3
+    records = long_term_logger.fetch_category("default")
+    assert records[0] == {"metadata": None, "record": "other"}
+    assert [record["record"]["ind"] for record in records[1:]] == [8, 9]  # type: ignore
@@ -8,6 +8,7 @@ from concurrent.futures import ThreadPoolExecutor
 import pytest
 
 from onyx.utils.threadpool_concurrency import parallel_yield
+from onyx.utils.threadpool_concurrency import prefetch_generator
 from onyx.utils.threadpool_concurrency import run_in_background
 from onyx.utils.threadpool_concurrency import run_with_timeout
 from onyx.utils.threadpool_concurrency import ThreadSafeDict
@@ -389,3 +390,93 @@ def test_parallel_yield_non_blocking() -> None:
     # Verify no values are missing
     assert len(results) == 300  # Should have all values from 0 to 299
     assert sorted(results) == list(range(300))
+
+
+def test_prefetch_generator_preserves_order() -> None:
+    """Test prefetch_generator yields every item in production order."""
+
+    def range_gen(count: int) -> Iterator[int]:
+        for i in range(count):
+            yield i
+
+    assert list(prefetch_generator(range_gen(100), max_prefetch=3)) == list(range(100))
+    assert list(prefetch_generator(range_gen(10), max_prefetch=0)) == list(range(10))
+
+
+def test_prefetch_generator_overlaps_producer_and_consumer() -> None:
+    """Test that the producer keeps working while the consumer processes items."""
+
+    def slow_gen() -> Iterator[int]:
+        for i in range(5):
+            time.sleep(0.1)
+            yield i
+
+    start_time = time.time()
+    for _ in prefetch_generator(slow_gen(), max_prefetch=2):
+        time.sleep(0.1)
+    elapsed = time.time() - start_time
+
+    # sequential would take ~1.0s, overlapped ~0.6s
+    assert elapsed < 0.9
+
+
+def test_prefetch_generator_backpressure() -> None:
+    """Test that the producer never gets more than max_prefetch items ahead."""
+    produced: list[int] = []
+
+    def tracking_gen() -> Iterator[int]:
+        for i in range(20):
+            produced.append(i)
+            yield i
+
+    for value in prefetch_generator(tracking_gen(), max_prefetch=2):
+        time.sleep(0.02)
+        # buffered items + the one being consumed + the one blocked on put
+        assert len(produced) <= value + 1 + 2 + 1
+
+
+def test_prefetch_generator_propagates_exceptions() -> None:
+    """Test that exceptions in the producer are raised in the consumer."""
+
+    def failing_gen() -> Iterator[int]:
+        yield 1
+        raise ValueError("Generator failure")
+
+    results: list[int] = []
+    with pytest.raises(ValueError, match="Generator failure"):
+        for value in prefetch_generator(failing_gen(), max_prefetch=2):
+            results.append(value)
+
+    assert results == [1]
+
+
+def test_prefetch_generator_preserves_contextvars() -> None:
+    """Test that the producer runs with the caller's context."""
+    test_context_var.set("prefetch_value")
+
+    def context_gen() -> Iterator[str]:
+        yield test_context_var.get()
+
+    assert list(prefetch_generator(context_gen(), max_prefetch=1)) == ["prefetch_value"]
+
+
+def test_prefetch_generator_stops_producer_on_early_exit() -> None:
+    """Test that the producer stops once the consumer stops iterating."""
+    closed = threading.Event()
+
+    def endless_gen() -> Iterator[int]:
+        try:
+            i = 0
+            while True:
+                yield i
+                i += 1
+        finally:
+            closed.set()
+
+    gen = prefetch_generator(endless_gen(), max_prefetch=2)
+    for value in gen:
+        if value == 5:
+            break
+    gen.close()
+
+    assert closed.wait(timeout=2)
@@ -0,0 +1,36 @@
+from unittest.mock import patch
+
+from onyx.utils.ttl_lru_cache import TTLLRUCache
+
+
+def test_ttl_lru_cache_evicts_least_recently_used() -> None:
+    cache: TTLLRUCache[str, int] = TTLLRUCache(max_size=2)
+    cache.put_many({"a": 1, "b": 2})
+    # reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get_many(["a", "b", "c", "a"]) == {"a": 1, "c": 3}
+    assert (cache.hits, cache.misses) == (3, 1)
+    assert len(cache) == 2
+
+
+def test_ttl_lru_cache_expires_entries() -> None:
+    cache: TTLLRUCache[str, int] = TTLLRUCache(max_size=10, ttl_seconds=60)
+    cache.put("a", 1)
+    assert "a" in cache
+
+    with patch("onyx.utils.ttl_lru_cache.time.monotonic", return_value=10**9):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_lru_cache_pop_where() -> None:
+    cache: TTLLRUCache[tuple[str, int], int] = TTLLRUCache(max_size=10)
+    cache.put_many({("t1", 1): 1, ("t1", 2): 2, ("t2", 1): 3})
+    cache.pop_where(lambda key: key[0] == "t1")
+    cache.pop(("missing", 0))
+
+    assert cache.get_many([("t1", 1), ("t1", 2), ("t2", 1)], count=False) == {
+        ("t2", 1): 3
+    }